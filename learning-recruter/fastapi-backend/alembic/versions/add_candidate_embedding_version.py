@@ -0,0 +1,23 @@
+"""Record which embedder produced each candidate vector
+
+Revision ID: add_candidate_embedding_version
+Revises: add_match_runs
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_candidate_embedding_version'
+down_revision = 'add_match_runs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('candidate_vectors', sa.Column('embedding_version', sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('candidate_vectors', 'embedding_version')
@@ -0,0 +1,46 @@
+"""Add composite indexes for the hot per-user, per-day and per-recruiter lookups
+
+Revision ID: add_composite_indexes
+Revises: add_learning_plan_days
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_composite_indexes'
+down_revision = 'add_learning_plan_days'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns); checked by benchmarks/query_plans.py
+INDEXES = [
+    ('ix_quiz_submissions_user_quiz', 'quiz_submissions', ['user_id', 'quiz_id']),
+    ('ix_quiz_submissions_user_plan_day', 'quiz_submissions', ['user_id', 'plan_id', 'month_index', 'day']),
+    ('ix_quizzes_plan_month_day', 'quizzes', ['plan_id', 'month_index', 'day']),
+    ('ix_learning_plans_user_id', 'learning_plans', ['user_id']),
+    ('ix_learning_paths_plan_month', 'learning_paths', ['plan_id', 'global_month_index']),
+    ('ix_day_progress_user_plan_day', 'day_progress', ['user_id', 'plan_id', 'month_index', 'day_number']),
+    ('ix_jobs_recruiter_id', 'jobs', ['recruiter_id']),
+    ('ix_shortlists_recruiter_job_student', 'shortlists', ['recruiter_id', 'job_id', 'student_id']),
+    ('ix_job_matches_job_rank', 'job_matches', ['job_id', 'rank']),
+    ('ix_youtube_schedules_user_id', 'youtube_schedules', ['user_id']),
+]
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    if postgres:
+        # Build without blocking writes to the (large) tables
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True,
+                                if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,43 @@
+"""Create job_matches table for stored batch match results
+
+Revision ID: add_job_matches
+Revises: add_reindex_checkpoints
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_job_matches'
+down_revision = 'add_reindex_checkpoints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_matches',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('recruiter_id', sa.Integer(), nullable=True),
+        sa.Column('job_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('rank', sa.Integer(), nullable=True),
+        sa.Column('score', sa.Integer(), nullable=True),
+        sa.Column('prior_score', sa.Float(), nullable=True),
+        sa.Column('llm_score', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['recruiter_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_job_matches_recruiter_id'), 'job_matches', ['recruiter_id'], unique=False)
+    op.create_index(op.f('ix_job_matches_job_id'), 'job_matches', ['job_id'], unique=False)
+    op.create_index(op.f('ix_job_matches_user_id'), 'job_matches', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_job_matches_user_id'), table_name='job_matches')
+    op.drop_index(op.f('ix_job_matches_job_id'), table_name='job_matches')
+    op.drop_index(op.f('ix_job_matches_recruiter_id'), table_name='job_matches')
+    op.drop_table('job_matches')
@@ -0,0 +1,38 @@
+"""Add (filter, sort key, id) indexes backing the keyset-paginated listings
+
+Revision ID: add_keyset_indexes
+Revises: add_composite_indexes
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_keyset_indexes'
+down_revision = 'add_composite_indexes'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns); each ends in the listing's sort key and id so a page is one range scan
+INDEXES = [
+    ('ix_email_applications_recruiter_received', 'email_applications', ['recruiter_id', 'received_at', 'id']),
+    ('ix_quiz_submissions_user_created', 'quiz_submissions', ['user_id', 'created_at', 'id']),
+    ('ix_shortlists_recruiter_job_created', 'shortlists', ['recruiter_id', 'job_id', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    if postgres:
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True,
+                                if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
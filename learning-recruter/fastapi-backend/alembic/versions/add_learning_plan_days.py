@@ -0,0 +1,161 @@
+"""Move learning-plan days out of the plan JSON into learning_plan_days rows
+
+Revision ID: add_learning_plan_days
+Revises: add_student_stats
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+import json
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_learning_plan_days'
+down_revision = 'add_student_stats'
+branch_labels = None
+depends_on = None
+
+BATCH = 200
+COLUMN_KEYS = ('concept', 'time_estimate', 'quiz_id', 'quiz_min_score', 'completed', 'quiz_score', 'quiz_attempts',
+               'detail', 'started_at', 'completed_at')
+INTEGER_KEYS = ('time_estimate', 'quiz_id', 'quiz_min_score', 'quiz_score', 'quiz_attempts')
+
+plans = sa.table('learning_plans', sa.column('id', sa.Integer), sa.column('user_id', sa.Integer),
+                 sa.column('plan', postgresql.JSONB))
+days_table = sa.table(
+    'learning_plan_days',
+    sa.column('plan_id', sa.Integer), sa.column('user_id', sa.Integer), sa.column('month_index', sa.Integer),
+    sa.column('day_number', sa.Integer), sa.column('concept', sa.String), sa.column('status', sa.String),
+    sa.column('completed', sa.Boolean), sa.column('time_estimate', sa.Integer), sa.column('quiz_id', sa.Integer),
+    sa.column('quiz_min_score', sa.Integer), sa.column('quiz_score', sa.Integer),
+    # none_as_null: a day without detail gets SQL NULL, not JSON 'null'
+    sa.column('quiz_attempts', sa.Integer), sa.column('detail', postgresql.JSONB(none_as_null=True)),
+    sa.column('extra', postgresql.JSONB(none_as_null=True)), sa.column('started_at', sa.DateTime),
+    sa.column('completed_at', sa.DateTime), sa.column('updated_at', sa.DateTime),
+)
+
+
+def _as_document(value):
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value if isinstance(value, dict) else None
+
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(str(value)) if value else None
+    except ValueError:
+        return None
+
+
+def _day_row(plan_id, user_id, month_index, day_number, day, now):
+    extra = {k: v for k, v in day.items() if k not in COLUMN_KEYS and k != 'day'}
+    row = {'plan_id': plan_id, 'user_id': user_id, 'month_index': month_index, 'day_number': day_number,
+           'concept': day.get('concept'), 'completed': bool(day.get('completed')), 'detail': day.get('detail'),
+           'started_at': _timestamp(day.get('started_at')), 'completed_at': _timestamp(day.get('completed_at')),
+           'updated_at': now}
+    for key in INTEGER_KEYS:
+        try:
+            row[key] = None if day.get(key) is None else int(day[key])
+        except (TypeError, ValueError):
+            row[key] = None
+            extra[key] = day[key]
+    row['status'] = 'completed' if row['completed'] else ('active' if day.get('started_at') else 'locked')
+    row['extra'] = extra or None
+    return row
+
+
+def _backfill(bind):
+    """Copy each plan's days into rows and strip them from the JSON, one keyset batch of plans at a time."""
+    now = datetime.utcnow()
+    last_id = 0
+    while True:
+        batch = bind.execute(
+            sa.select(plans.c.id, plans.c.user_id, plans.c.plan).where(plans.c.id > last_id)
+            .order_by(plans.c.id).limit(BATCH)
+        ).fetchall()
+        if not batch:
+            break
+        rows, updates = [], []
+        for plan_id, user_id, plan in batch:
+            document = _as_document(plan)
+            if not document or not document.get('months'):
+                continue
+            for month_index, month in enumerate(document['months'], start=1):
+                for day_number, day in enumerate(month.pop('days', None) or [], start=1):
+                    rows.append(_day_row(plan_id, user_id, month_index, day_number, day, now))
+            updates.append({'row_id': plan_id, 'doc': document})
+        if rows:
+            bind.execute(days_table.insert(), rows)
+        if updates:
+            bind.execute(plans.update().where(plans.c.id == sa.bindparam('row_id')).values(plan=sa.bindparam('doc')),
+                         updates)
+        last_id = batch[-1][0]
+
+
+def _restore_json(bind):
+    """Fold the day rows back into each plan's months."""
+    by_plan = {}
+    for row in bind.execute(
+        sa.select(days_table).order_by(days_table.c.plan_id, days_table.c.month_index, days_table.c.day_number)
+    ).mappings():
+        day = {'day': row['day_number']}
+        for key in COLUMN_KEYS:
+            value = row[key]
+            day[key] = value.isoformat() if isinstance(value, datetime) else value
+        day.update(row['extra'] or {})
+        by_plan.setdefault(row['plan_id'], {}).setdefault(row['month_index'], []).append(day)
+    plan_ids = list(by_plan)
+    for start in range(0, len(plan_ids), BATCH):
+        updates = []
+        for plan_id, plan in bind.execute(
+            sa.select(plans.c.id, plans.c.plan).where(plans.c.id.in_(plan_ids[start:start + BATCH]))
+        ).fetchall():
+            document = _as_document(plan) or {'months': []}
+            for month_index, month in enumerate(document.get('months', []), start=1):
+                if month_index in by_plan[plan_id]:
+                    month['days'] = by_plan[plan_id][month_index]
+            updates.append({'row_id': plan_id, 'doc': document})
+        if updates:
+            bind.execute(plans.update().where(plans.c.id == sa.bindparam('row_id')).values(plan=sa.bindparam('doc')),
+                         updates)
+
+
+def upgrade():
+    op.create_table('learning_plan_days',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('plan_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('month_index', sa.Integer(), nullable=True),
+        sa.Column('day_number', sa.Integer(), nullable=True),
+        sa.Column('concept', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('completed', sa.Boolean(), nullable=True),
+        sa.Column('time_estimate', sa.Integer(), nullable=True),
+        sa.Column('quiz_id', sa.Integer(), nullable=True),
+        sa.Column('quiz_min_score', sa.Integer(), nullable=True),
+        sa.Column('quiz_score', sa.Integer(), nullable=True),
+        sa.Column('quiz_attempts', sa.Integer(), nullable=True),
+        sa.Column('detail', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('extra', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['plan_id'], ['learning_plans.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('plan_id', 'month_index', 'day_number', name='uq_learning_plan_day')
+    )
+    op.create_index(op.f('ix_learning_plan_days_plan_id'), 'learning_plan_days', ['plan_id'], unique=False)
+    op.create_index(op.f('ix_learning_plan_days_user_id'), 'learning_plan_days', ['user_id'], unique=False)
+    _backfill(op.get_bind())
+
+
+def downgrade():
+    _restore_json(op.get_bind())
+    op.drop_index(op.f('ix_learning_plan_days_user_id'), table_name='learning_plan_days')
+    op.drop_index(op.f('ix_learning_plan_days_plan_id'), table_name='learning_plan_days')
+    op.drop_table('learning_plan_days')
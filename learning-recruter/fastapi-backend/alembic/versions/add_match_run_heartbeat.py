@@ -0,0 +1,28 @@
+"""Record which worker executes a match run and when it last reported in
+
+Revision ID: add_match_run_heartbeat
+Revises: add_profile_document_updated_index
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_match_run_heartbeat'
+down_revision = 'add_profile_document_updated_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('match_runs', sa.Column('worker_id', sa.String(length=100), nullable=True))
+    op.add_column('match_runs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    # Unfinished runs get a full stale window from now instead of being failed by the next worker to start
+    now = "timezone('UTC', now())" if op.get_bind().dialect.name == 'postgresql' else 'CURRENT_TIMESTAMP'
+    op.execute(f"UPDATE match_runs SET heartbeat_at = {now} WHERE status IN ('queued', 'running')")
+
+
+def downgrade():
+    op.drop_column('match_runs', 'heartbeat_at')
+    op.drop_column('match_runs', 'worker_id')
@@ -0,0 +1,26 @@
+"""Add progress version and cancel flag to match_runs so any worker can stream or cancel a run
+
+Revision ID: add_match_run_progress
+Revises: add_keyset_indexes
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_match_run_progress'
+down_revision = 'add_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('match_runs', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('match_runs', sa.Column('cancel_requested', sa.Boolean(), nullable=False,
+                                          server_default=sa.false()))
+
+
+def downgrade():
+    op.drop_column('match_runs', 'cancel_requested')
+    op.drop_column('match_runs', 'version')
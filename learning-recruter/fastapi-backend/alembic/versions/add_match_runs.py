@@ -0,0 +1,40 @@
+"""Create match_runs table for background recruiter match jobs
+
+Revision ID: add_match_runs
+Revises: add_job_matches
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_match_runs'
+down_revision = 'add_job_matches'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('match_runs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('recruiter_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=True),
+        sa.Column('job_description', sa.Text(), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=True),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('scored', sa.Integer(), nullable=True),
+        sa.Column('results', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['recruiter_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_match_runs_recruiter_id'), 'match_runs', ['recruiter_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_match_runs_recruiter_id'), table_name='match_runs')
+    op.drop_table('match_runs')
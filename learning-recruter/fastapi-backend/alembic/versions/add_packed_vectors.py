@@ -0,0 +1,90 @@
+"""Store embeddings as packed float32 and int8 bytes instead of JSON lists
+
+Revision ID: add_packed_vectors
+Revises: add_candidate_embedding_version
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import numpy as np
+
+# revision identifiers, used by Alembic.
+revision = 'add_packed_vectors'
+down_revision = 'add_candidate_embedding_version'
+branch_labels = None
+depends_on = None
+
+TABLES = ('candidate_vectors', 'student_profile_summaries')
+BATCH = 1000
+
+
+def _as_list(value):
+    if isinstance(value, str):
+        value = json.loads(value)
+    return value
+
+
+def _backfill(bind, table):
+    """Pack every JSON vector into the new columns, one keyset batch at a time."""
+    t = sa.table(table, sa.column('id', sa.Integer), sa.column('vector'),
+                 sa.column('vector_f32', sa.LargeBinary), sa.column('vector_i8', sa.LargeBinary),
+                 sa.column('vector_scale', sa.Float))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(t.c.id, t.c.vector)
+            .where(t.c.id > last_id, t.c.vector.isnot(None), t.c.vector_f32.is_(None))
+            .order_by(t.c.id).limit(BATCH)
+        ).fetchall()
+        if not rows:
+            break
+        updates = []
+        for row_id, vector in rows:
+            vec = np.asarray(_as_list(vector) or [], dtype='<f4')
+            peak = float(np.abs(vec).max()) if vec.size else 0.0
+            scale = peak / 127.0 if peak > 0 else 1.0
+            codes = np.clip(np.rint(vec / scale), -127, 127).astype(np.int8)
+            updates.append({'row_id': row_id, 'f32': vec.tobytes(), 'i8': codes.tobytes(), 'scale': scale})
+        bind.execute(
+            t.update().where(t.c.id == sa.bindparam('row_id')).values(
+                vector_f32=sa.bindparam('f32'), vector_i8=sa.bindparam('i8'), vector_scale=sa.bindparam('scale'),
+                vector=None,
+            ),
+            updates,
+        )
+        last_id = rows[-1][0]
+
+
+def _restore_json(bind, table):
+    t = sa.table(table, sa.column('id', sa.Integer), sa.column('vector', postgresql.JSONB),
+                 sa.column('vector_f32', sa.LargeBinary))
+    rows = bind.execute(sa.select(t.c.id, t.c.vector_f32).where(t.c.vector_f32.isnot(None))).fetchall()
+    for start in range(0, len(rows), BATCH):
+        bind.execute(
+            t.update().where(t.c.id == sa.bindparam('row_id')).values(vector=sa.bindparam('vec')),
+            [{'row_id': row_id, 'vec': np.frombuffer(packed, dtype='<f4').tolist()}
+             for row_id, packed in rows[start:start + BATCH]],
+        )
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column('vector_f32', sa.LargeBinary(), nullable=True))
+        op.add_column(table, sa.Column('vector_i8', sa.LargeBinary(), nullable=True))
+        op.add_column(table, sa.Column('vector_scale', sa.Float(), nullable=True))
+    bind = op.get_bind()
+    for table in TABLES:
+        _backfill(bind, table)
+
+
+def downgrade():
+    bind = op.get_bind()
+    for table in TABLES:
+        _restore_json(bind, table)
+        op.drop_column(table, 'vector_scale')
+        op.drop_column(table, 'vector_i8')
+        op.drop_column(table, 'vector_f32')
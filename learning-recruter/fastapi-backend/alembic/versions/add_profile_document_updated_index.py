@@ -0,0 +1,29 @@
+"""Index student_profile_documents.updated_at for the roster snapshot watermark check
+
+Revision ID: add_profile_document_updated_index
+Revises: add_match_run_progress
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_profile_document_updated_index'
+down_revision = 'add_match_run_progress'
+branch_labels = None
+depends_on = None
+
+INDEX = 'ix_student_profile_documents_updated_at'
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(INDEX, 'student_profile_documents', ['updated_at'], unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+    else:
+        op.create_index(INDEX, 'student_profile_documents', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(INDEX, table_name='student_profile_documents')
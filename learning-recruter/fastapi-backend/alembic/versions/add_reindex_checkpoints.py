@@ -0,0 +1,36 @@
+"""Create reindex_checkpoints table for the background student reindex job
+
+Revision ID: add_reindex_checkpoints
+Revises: add_learning_path_tracking_to_user
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_reindex_checkpoints'
+down_revision = 'add_learning_path_tracking_to_user'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('reindex_checkpoints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_name', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=True, server_default='idle'),
+        sa.Column('last_user_id', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('processed', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('total', sa.Integer(), nullable=True, server_default='0'),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_name')
+    )
+
+
+def downgrade():
+    op.drop_table('reindex_checkpoints')
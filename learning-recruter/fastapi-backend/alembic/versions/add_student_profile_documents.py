@@ -0,0 +1,40 @@
+"""Create student_profile_documents table for materialized student profiles
+
+Revision ID: add_student_profile_documents
+Revises: add_packed_vectors
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_student_profile_documents'
+down_revision = 'add_packed_vectors'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('student_profile_documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=True),
+        sa.Column('schema_version', sa.Integer(), nullable=True),
+        sa.Column('stale', sa.Boolean(), nullable=True),
+        sa.Column('document', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('prompt_text', sa.Text(), nullable=True),
+        sa.Column('token_count', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_student_profile_documents_user_id'), 'student_profile_documents', ['user_id'], unique=True)
+    op.create_index(op.f('ix_student_profile_documents_stale'), 'student_profile_documents', ['stale'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_student_profile_documents_stale'), table_name='student_profile_documents')
+    op.drop_index(op.f('ix_student_profile_documents_user_id'), table_name='student_profile_documents')
+    op.drop_table('student_profile_documents')
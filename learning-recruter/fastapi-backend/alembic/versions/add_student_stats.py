@@ -0,0 +1,48 @@
+"""Create student_stats table for per-student aggregates maintained on write
+
+Revision ID: add_student_stats
+Revises: add_student_profile_documents
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_student_stats'
+down_revision = 'add_student_profile_documents'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('student_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('plan_id', sa.Integer(), nullable=True),
+        sa.Column('quiz_count', sa.Integer(), nullable=True),
+        sa.Column('passed_quizzes', sa.Integer(), nullable=True),
+        sa.Column('avg_quiz_score', sa.Float(), nullable=True),
+        sa.Column('last_quiz_at', sa.DateTime(), nullable=True),
+        sa.Column('total_months', sa.Integer(), nullable=True),
+        sa.Column('completed_months', sa.Integer(), nullable=True),
+        sa.Column('total_days', sa.Integer(), nullable=True),
+        sa.Column('completed_days', sa.Integer(), nullable=True),
+        sa.Column('learning_progress', sa.Float(), nullable=True),
+        sa.Column('day_progress', sa.Float(), nullable=True),
+        sa.Column('current_month', sa.Integer(), nullable=True),
+        sa.Column('current_day', sa.Integer(), nullable=True),
+        sa.Column('has_onboarding', sa.Boolean(), nullable=True),
+        sa.Column('has_plan', sa.Boolean(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_student_stats_user_id'), 'student_stats', ['user_id'], unique=True)
+    op.create_index(op.f('ix_student_stats_learning_progress'), 'student_stats', ['learning_progress'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_student_stats_learning_progress'), table_name='student_stats')
+    op.drop_index(op.f('ix_student_stats_user_id'), table_name='student_stats')
+    op.drop_table('student_stats')
@@ -0,0 +1,38 @@
+"""Drop student_stats columns no read path uses
+
+Revision ID: drop_unread_student_stats
+Revises: add_match_run_heartbeat
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'drop_unread_student_stats'
+down_revision = 'add_match_run_heartbeat'
+branch_labels = None
+depends_on = None
+
+# Recomputed on every write but never read; rebuild the table after a downgrade to fill them again
+COLUMNS = [
+    ('plan_id', sa.Integer()),
+    ('last_quiz_at', sa.DateTime()),
+    ('total_days', sa.Integer()),
+    ('completed_days', sa.Integer()),
+    ('day_progress', sa.Float()),
+    ('has_onboarding', sa.Boolean()),
+]
+
+
+def upgrade():
+    # Batch mode so SQLite (dev, benchmarks) can drop columns too
+    with op.batch_alter_table('student_stats') as batch:
+        for name, _ in COLUMNS:
+            batch.drop_column(name)
+
+
+def downgrade():
+    with op.batch_alter_table('student_stats') as batch:
+        for name, column_type in COLUMNS:
+            batch.add_column(sa.Column(name, column_type, nullable=True))
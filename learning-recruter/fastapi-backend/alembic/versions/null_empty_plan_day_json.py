@@ -0,0 +1,26 @@
+"""Store missing learning_plan_days detail/extra as SQL NULL instead of JSON null
+
+Revision ID: null_empty_plan_day_json
+Revises: drop_unread_student_stats
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'null_empty_plan_day_json'
+down_revision = 'drop_unread_student_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows the first backfill and writers wrote before the columns used none_as_null
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    for column in ('detail', 'extra'):
+        is_json_null = f"jsonb_typeof({column}) = 'null'" if postgres else f"{column} = 'null'"
+        op.execute(f"UPDATE learning_plan_days SET {column} = NULL WHERE {is_json_null}")
+
+
+def downgrade():
+    pass
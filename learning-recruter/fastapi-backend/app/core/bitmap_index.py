@@ -0,0 +1,104 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+def popcount(bits: np.ndarray, axis: Optional[int] = None):
+    """Number of set bits in a packed bitset (or per row of a bitset matrix)."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bits).sum(axis=axis, dtype=np.int64)
+    return np.unpackbits(bits, axis=-1).sum(axis=axis, dtype=np.int64)
+
+
+class BitmapIndex:
+    """One packed bitset per (facet, value) over dense row ordinals.
+
+    Bitsets are little-endian ``np.packbits`` arrays, so a filter mask and a
+    bitset convert into each other with one call. Each facet keeps its
+    values' bitsets as rows of a single matrix, so counting every value of
+    a facet against a result set is one AND and one popcount.
+    """
+
+    def __init__(self, n_rows: int):
+        self.n_rows = n_rows
+        self.n_bytes = (n_rows + 7) // 8
+        self.values: Dict[str, List[str]] = {}
+        self.matrices: Dict[str, np.ndarray] = {}
+        self._slots: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def build(cls, n_rows: int, facets: Dict[str, Sequence[Iterable[str]]]) -> "BitmapIndex":
+        """``facets`` maps a facet name to the values of each row, in ordinal order."""
+        index = cls(n_rows)
+        for facet, rows in facets.items():
+            slots: Dict[str, int] = {}
+            members: List[List[int]] = []
+            for ordinal, values in enumerate(rows):
+                for value in set(values):
+                    slot = slots.get(value)
+                    if slot is None:
+                        slot = slots[value] = len(members)
+                        members.append([])
+                    members[slot].append(ordinal)
+            masks = np.zeros((len(members), n_rows), dtype=bool)
+            for slot, ordinals in enumerate(members):
+                masks[slot, ordinals] = True
+            index._slots[facet] = slots
+            index.values[facet] = list(slots)
+            index.matrices[facet] = np.packbits(masks, axis=1, bitorder="little") if len(members) else \
+                np.zeros((0, index.n_bytes), dtype=np.uint8)
+        return index
+
+    def from_mask(self, mask: np.ndarray) -> np.ndarray:
+        return np.packbits(mask, bitorder="little")
+
+    def to_mask(self, bits: np.ndarray) -> np.ndarray:
+        return np.unpackbits(bits, count=self.n_rows, bitorder="little").astype(bool)
+
+    def ones(self) -> np.ndarray:
+        return self.from_mask(np.ones(self.n_rows, dtype=bool))
+
+    def empty(self) -> np.ndarray:
+        return np.zeros(self.n_bytes, dtype=np.uint8)
+
+    def bitmap(self, facet: str, value: str) -> np.ndarray:
+        slot = self._slots.get(facet, {}).get(value)
+        return self.matrices[facet][slot] if slot is not None else self.empty()
+
+    def any_of(self, facet: str, values: Iterable[str]) -> np.ndarray:
+        """OR of the bitsets of ``values`` within one facet."""
+        slots = [s for s in (self._slots.get(facet, {}).get(v) for v in values) if s is not None]
+        if not slots:
+            return self.empty()
+        return np.bitwise_or.reduce(self.matrices[facet][slots], axis=0)
+
+    def matching(self, facet: str, fragment: str) -> List[str]:
+        """Values of ``facet`` containing ``fragment``."""
+        return [v for v in self.values.get(facet, []) if fragment in v]
+
+    def set_row(self, facet: str, ordinal: int, values: Iterable[str]):
+        """Move one row to a new set of values in place (row ordinals unchanged)."""
+        byte, bit = divmod(ordinal, 8)
+        flag = np.uint8(1 << bit)
+        matrix = self.matrices[facet]
+        matrix[:, byte] &= ~flag
+        slots = self._slots[facet]
+        for value in set(values):
+            slot = slots.get(value)
+            if slot is None:
+                slot = slots[value] = len(self.values[facet])
+                self.values[facet].append(value)
+                matrix = np.vstack([matrix, np.zeros((1, self.n_bytes), dtype=np.uint8)])
+            matrix[slot, byte] |= flag
+        self.matrices[facet] = matrix
+
+    def counts(self, facet: str, bits: np.ndarray, top: Optional[int] = None) -> List[Dict[str, int]]:
+        """``[{value, count}]`` of every value of ``facet`` within ``bits``, largest first."""
+        values = self.values.get(facet, [])
+        if not values:
+            return []
+        totals = popcount(self.matrices[facet] & bits, axis=1)
+        order = np.argsort(-totals, kind="stable")
+        if top is not None:
+            order = order[:top]
+        return [{"value": values[i], "count": int(totals[i])} for i in order if totals[i] > 0]
@@ -6,6 +6,7 @@ from twilio.rest import Client
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.models.learning_plan import LearningPlan
+from app.services.plan_days import load_plan
 from app.models.quiz import QuizSubmission
 from app.core.learning_path_service import LearningPathService
 from app.core.config import settings
@@ -93,7 +94,7 @@ class CallBot:
                 
                 # Get detailed current topic
                 if plan.plan and isinstance(plan.plan, dict) and "months" in plan.plan:
-                    months = plan.plan.get("months", [])
+                    months = load_plan(db, plan, [user.current_month_index or 1], detail=False)["months"]
                     if user.current_month_index <= len(months):
                         current_month = months[user.current_month_index - 1]
                         month_title = current_month.get("title", f"Month {user.current_month_index}")
@@ -0,0 +1,244 @@
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Attribute edge types: user -> interned value
+EDGE_KINDS = ("skills", "topics", "career_goals")
+
+# Weights of the user-user similarity: Jaccard per edge kind plus closeness of progress
+SIMILARITY_WEIGHTS = {"skills": 0.4, "topics": 0.3, "career_goals": 0.2}
+PROGRESS_WEIGHT = 0.1
+
+# Cells per block of the pairwise similarity scan
+_BLOCK_CELLS = 1 << 22
+
+
+class StringTable:
+    """Interned strings; each distinct value is stored once and referenced by index."""
+
+    __slots__ = ("ids", "strings")
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def __getitem__(self, index: int) -> str:
+        return self.strings[index]
+
+    def intern(self, value: str) -> int:
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def get(self, value: str) -> Optional[int]:
+        return self.ids.get(value)
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.ids) + sys.getsizeof(self.strings) + sum(sys.getsizeof(s) for s in self.strings)
+
+
+def _csr(rows: Sequence[Sequence[int]]) -> Tuple[np.ndarray, np.ndarray]:
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.fromiter((v for r in rows for v in r), dtype=np.int32, count=int(indptr[-1]))
+    return indptr, indices
+
+
+def _dense_rows(indptr: np.ndarray, cols: np.ndarray, width: int, start: int, stop: int) -> np.ndarray:
+    """0/1 float32 rows ``start:stop`` of a CSR membership matrix."""
+    block = np.zeros((stop - start, width), dtype=np.float32)
+    rows = np.repeat(np.arange(stop - start), np.diff(indptr[start:stop + 1]))
+    block[rows, cols[indptr[start]:indptr[stop]]] = 1.0
+    return block
+
+
+class CompactGraph:
+    """Array-backed knowledge graph over students.
+
+    Users are dense ordinals ``0..n-1`` (``user_ids`` maps them back, sorted).
+    Skills, topics and career goals are ids into one shared ``StringTable``;
+    each edge kind is a CSR pair (``indptr``, ``indices``) from user ordinal
+    to string ids. User-user similarity edges are CSR too, with a float32
+    weight per edge and both directions stored for O(degree) neighbor
+    lookups. Per-user scalars are typed columns. Nothing holds a per-node
+    Python object, so memory is a few bytes per edge instead of a dict per
+    node and per connection.
+    """
+
+    __slots__ = ("strings", "user_ids", "progress", "completed_months", "avg_quiz_score", "total_quizzes",
+                 "grade", "time_commitment", "members", "edge_indptr", "edge_targets", "edge_weights")
+
+    def __init__(self, strings: StringTable, user_ids: np.ndarray):
+        n = len(user_ids)
+        self.strings = strings
+        self.user_ids = user_ids
+        self.progress = np.zeros(n, dtype=np.float32)
+        self.completed_months = np.zeros(n, dtype=np.int16)
+        self.avg_quiz_score = np.zeros(n, dtype=np.float32)
+        self.total_quizzes = np.zeros(n, dtype=np.int32)
+        self.grade = np.full(n, -1, dtype=np.int32)            # string id, -1 when unknown
+        self.time_commitment = np.full(n, -1, dtype=np.int32)
+        self.members: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self.edge_indptr = np.zeros(n + 1, dtype=np.int64)
+        self.edge_targets = np.zeros(0, dtype=np.int32)
+        self.edge_weights = np.zeros(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    @classmethod
+    def from_users(cls, users: List[Dict[str, Any]]) -> "CompactGraph":
+        """Graph from ``GraphRAG`` user-knowledge dicts (no similarity edges yet)."""
+        users = sorted(users, key=lambda u: u["user_id"])
+        strings = StringTable()
+        graph = cls(strings, np.asarray([u["user_id"] for u in users], dtype=np.int64))
+        for kind in EDGE_KINDS:
+            graph.members[kind] = _csr([
+                sorted({strings.intern(v) for v in (u.get(kind) or []) if isinstance(v, str)}) for u in users
+            ])
+        for i, u in enumerate(users):
+            graph.progress[i] = u.get("learning_progress") or 0
+            graph.completed_months[i] = u.get("completed_months") or 0
+            graph.avg_quiz_score[i] = u.get("avg_quiz_score") or 0
+            graph.total_quizzes[i] = u.get("total_quizzes") or 0
+            if u.get("grade"):
+                graph.grade[i] = strings.intern(u["grade"])
+            if u.get("time_commitment"):
+                graph.time_commitment[i] = strings.intern(u["time_commitment"])
+        return graph
+
+    def position(self, user_id: int) -> Optional[int]:
+        idx = int(np.searchsorted(self.user_ids, user_id))
+        return idx if idx < len(self.user_ids) and self.user_ids[idx] == user_id else None
+
+    def values(self, kind: str, idx: int) -> List[str]:
+        indptr, indices = self.members[kind]
+        return [self.strings[v] for v in indices[indptr[idx]:indptr[idx + 1]]]
+
+    def user_data(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """The user-knowledge dict of one user, materialized on demand."""
+        idx = self.position(user_id)
+        if idx is None:
+            return None
+        return {
+            "user_id": int(user_id),
+            "skills": self.values("skills", idx),
+            "topics": self.values("topics", idx),
+            "career_goals": self.values("career_goals", idx),
+            "learning_progress": float(self.progress[idx]),
+            "completed_months": int(self.completed_months[idx]),
+            "avg_quiz_score": float(self.avg_quiz_score[idx]),
+            "total_quizzes": int(self.total_quizzes[idx]),
+            "grade": self.strings[self.grade[idx]] if self.grade[idx] >= 0 else None,
+            "time_commitment": self.strings[self.time_commitment[idx]] if self.time_commitment[idx] >= 0 else None,
+        }
+
+    def users_with(self, kind: str, value: str) -> List[int]:
+        string_id = self.strings.get(value)
+        if string_id is None:
+            return []
+        indptr, indices = self.members[kind]
+        rows = np.repeat(np.arange(len(self), dtype=np.int64), np.diff(indptr))
+        return self.user_ids[rows[indices == string_id]].tolist()
+
+    def set_edges(self, src: np.ndarray, dst: np.ndarray, weights: np.ndarray):
+        """Store undirected similarity edges given once per pair (ordinals)."""
+        both_src = np.concatenate([src, dst]).astype(np.int64)
+        both_dst = np.concatenate([dst, src]).astype(np.int32)
+        both_w = np.concatenate([weights, weights]).astype(np.float32)
+        # Per source: strongest first, ties by ordinal
+        order = np.lexsort((both_dst, -both_w, both_src))
+        self.edge_targets = both_dst[order]
+        self.edge_weights = both_w[order]
+        self.edge_indptr = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(both_src, minlength=len(self)), out=self.edge_indptr[1:])
+
+    def build_similarity(self, threshold: float = 0.3):
+        """Connect users whose similarity exceeds ``threshold``.
+
+        Similarity is 0.4 * Jaccard(skills) + 0.3 * Jaccard(topics)
+        + 0.2 * Jaccard(career goals) + 0.1 * (1 - |progress difference|),
+        computed block by block with matrix products so no block holds more
+        than a few million cells.
+        """
+        n = len(self)
+        block = max(1, int(np.sqrt(_BLOCK_CELLS)))
+        kinds = {}
+        for kind in EDGE_KINDS:
+            indptr, indices = self.members[kind]
+            vocab = np.unique(indices)
+            kinds[kind] = (indptr, np.searchsorted(vocab, indices), max(len(vocab), 1),
+                           np.diff(indptr).astype(np.float32))
+        srcs, dsts, weights = [], [], []
+        for a in range(0, n, block):
+            a_end = min(a + block, n)
+            rows = {kind: _dense_rows(indptr, cols, width, a, a_end) for kind, (indptr, cols, width, _) in kinds.items()}
+            for b in range(a, n, block):
+                b_end = min(b + block, n)
+                sim = PROGRESS_WEIGHT * (1 - np.abs(self.progress[a:a_end, None] - self.progress[None, b:b_end]))
+                for kind, weight in SIMILARITY_WEIGHTS.items():
+                    indptr, cols, width, sizes = kinds[kind]
+                    inter = rows[kind] @ _dense_rows(indptr, cols, width, b, b_end).T
+                    union = sizes[a:a_end, None] + sizes[None, b:b_end] - inter
+                    sim += weight * np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+                keep = sim > threshold
+                if a == b:
+                    keep &= np.triu(np.ones_like(keep), k=1)
+                i, j = np.nonzero(keep)
+                srcs.append(i + a)
+                dsts.append(j + b)
+                weights.append(sim[i, j])
+        if srcs:
+            self.set_edges(np.concatenate(srcs), np.concatenate(dsts), np.concatenate(weights))
+
+    def neighbors(self, user_id: int, min_weight: float = 0.0, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """``(user_id, similarity)`` of connected users, strongest first."""
+        idx = self.position(user_id)
+        if idx is None:
+            return []
+        start, end = self.edge_indptr[idx], self.edge_indptr[idx + 1]
+        targets, weights = self.edge_targets[start:end], self.edge_weights[start:end]
+        keep = weights > min_weight
+        targets, weights = targets[keep][:limit], weights[keep][:limit]
+        return [(int(self.user_ids[t]), float(w)) for t, w in zip(targets, weights)]
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edge_targets) // 2
+
+    def connections(self) -> Iterator[Dict[str, Any]]:
+        """Similarity edges in the old ``{"user1", "user2", "similarity"}`` form, once per pair."""
+        for idx in range(len(self)):
+            for pos in range(self.edge_indptr[idx], self.edge_indptr[idx + 1]):
+                other = int(self.edge_targets[pos])
+                if other > idx:
+                    yield {
+                        "user1": int(self.user_ids[idx]),
+                        "user2": int(self.user_ids[other]),
+                        "similarity": float(self.edge_weights[pos]),
+                        "connection_type": "learning_similarity",
+                    }
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the graph, string table included."""
+        arrays = [self.user_ids, self.progress, self.completed_months, self.avg_quiz_score, self.total_quizzes,
+                  self.grade, self.time_commitment, self.edge_indptr, self.edge_targets, self.edge_weights]
+        for indptr, indices in self.members.values():
+            arrays.extend((indptr, indices))
+        return sum(a.nbytes for a in arrays) + self.strings.nbytes()
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "users": len(self),
+            "strings": len(self.strings),
+            **{kind: len(self.members[kind][1]) for kind in EDGE_KINDS},
+            "connections": self.edge_count,
+            "bytes": self.nbytes(),
+        }
@@ -1,27 +1,53 @@
-from typing import List
+from typing import Dict, List, Tuple
 import math
 import re
+import zlib
 
 
 def _tokenize(text: str) -> List[str]:
     return re.findall(r"[a-z0-9]+", (text or "").lower())
 
 
+def _token_slot(tok: str, dim: int) -> Tuple[int, float]:
+    # crc32 rather than hash(): str hashing is salted per process, which made
+    # stored vectors incomparable with vectors computed after a restart
+    h = zlib.crc32(tok.encode("utf-8"))
+    return h % dim, (h % 1000) / 1000.0
+
+
 def simple_text_embedding(text: str, dim: int = 256) -> List[float]:
     """Lightweight local embedding to avoid external dependency.
     Stable, deterministic hash-based vector in [0,1].
     """
     vec = [0.0] * dim
     for tok in _tokenize(text):
-        h = hash(tok)
-        idx = abs(h) % dim
-        val = (abs(h) % 1000) / 1000.0
+        idx, val = _token_slot(tok, dim)
         vec[idx] += val
     # L2 normalize
     norm = math.sqrt(sum(v * v for v in vec)) or 1.0
     return [v / norm for v in vec]
 
 
+def embed_texts(texts: List[str], dim: int = 256) -> List[List[float]]:
+    """Batch form of ``simple_text_embedding``.
+
+    Produces the same vectors, but hashes each distinct token once per batch,
+    which matters when re-embedding thousands of similar profiles.
+    """
+    slots: Dict[str, Tuple[int, float]] = {}
+    vectors = []
+    for text in texts:
+        vec = [0.0] * dim
+        for tok in _tokenize(text):
+            slot = slots.get(tok)
+            if slot is None:
+                slot = slots[tok] = _token_slot(tok, dim)
+            vec[slot[0]] += slot[1]
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        vectors.append([v / norm for v in vec])
+    return vectors
+
+
 def cosine_similarity(a: List[float], b: List[float]) -> float:
     if not a or not b or len(a) != len(b):
         return 0.0
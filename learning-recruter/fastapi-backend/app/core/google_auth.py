@@ -73,30 +73,31 @@ def get_google_oauth2_session(google_id):
     try:
         import requests
         import time
-        from app.database.db import get_db
+        from app.database.session_scope import session_scope
         from app.models.user import User
         from sqlalchemy.orm import Session
         
-        # Get the database session
-        db = next(get_db())
+        # Read the tokens and give the connection back before calling Google
+        with session_scope("google_auth.oauth2_session") as db:
+            # Find user by google_id and get their access token
+            user = db.query(User).filter(User.google_id == google_id).first()
+            if not user:
+                raise ValueError("User not found")
+            access_token = user.google_access_token
+            refresh_token = user.google_refresh_token
         
-        # Find user by google_id and get their access token
-        user = db.query(User).filter(User.google_id == google_id).first()
-        if not user:
-            raise ValueError("User not found")
-        
-        if not user.google_access_token:
+        if not access_token:
             raise ValueError("No access token available")
             
         # Check if we need to refresh the token
         # If we have a refresh token and the access token might be expired
-        if user.google_refresh_token:
+        if refresh_token:
             try:
                 # Try to refresh the token
                 refresh_payload = {
                     'client_id': GOOGLE_CLIENT_ID,
                     'client_secret': GOOGLE_CLIENT_SECRET,
-                    'refresh_token': user.google_refresh_token,
+                    'refresh_token': refresh_token,
                     'grant_type': 'refresh_token'
                 }
                 
@@ -107,9 +108,11 @@ def get_google_oauth2_session(google_id):
                 
                 if refresh_response.status_code == 200:
                     token_data = refresh_response.json()
+                    access_token = token_data['access_token']
                     # Update the access token in the database
-                    user.google_access_token = token_data['access_token']
-                    db.commit()
+                    with session_scope("google_auth.token_refresh", commit=True) as db:
+                        db.query(User).filter(User.google_id == google_id).update(
+                            {User.google_access_token: access_token}, synchronize_session=False)
                     print("Successfully refreshed Google access token")
             except Exception as refresh_error:
                 print(f"Error refreshing token: {refresh_error}")
@@ -118,7 +121,7 @@ def get_google_oauth2_session(google_id):
         # Create a session for Google API calls
         session = requests.Session()
         session.headers.update({
-            'Authorization': f'Bearer {user.google_access_token}',
+            'Authorization': f'Bearer {access_token}',
             'Content-Type': 'application/json'
         })
         
@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from app.core.google_auth import get_google_oauth2_session
 from app.models.user import User
-from app.database.db import get_db
+from app.database.session_scope import session_scope
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
@@ -21,8 +21,8 @@ class GoogleMeetService:
     
     def _get_session_for_user(self, user_id: int):
         """Get authenticated Google session for user"""
-        db = next(get_db())
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        with session_scope("google_meet.session_for_user") as db:
+            user = db.query(User).filter(User.id == int(user_id)).first()
         if not user or not user.google_id:
             raise ValueError("Google account not linked for this user")
         return get_google_oauth2_session(user.google_id)
@@ -104,8 +104,8 @@ class GoogleMeetService:
             end_time = start_time + timedelta(minutes=duration_minutes)
             
             # Get recruiter info
-            db = next(get_db())
-            recruiter = db.query(User).filter(User.id == recruiter_id).first()
+            with session_scope("google_meet.create_meet_event") as db:
+                recruiter = db.query(User).filter(User.id == recruiter_id).first()
             recruiter_name = recruiter.google_name or recruiter.email.split('@')[0]
             
             # Create event with Google Meet
@@ -211,8 +211,8 @@ This meeting was automatically scheduled through EduAI Recruitment Platform.
             session = self._get_session_for_user(recruiter_id)
             
             # Get recruiter info
-            db = next(get_db())
-            recruiter = db.query(User).filter(User.id == recruiter_id).first()
+            with session_scope("google_meet.interview_invitation") as db:
+                recruiter = db.query(User).filter(User.id == recruiter_id).first()
             recruiter_name = recruiter.google_name or recruiter.email.split('@')[0]
             
             # Format time
@@ -471,8 +471,8 @@ EduAI Recruitment Team
             session = self._get_session_for_user(recruiter_id)
             
             # Get recruiter info
-            db = next(get_db())
-            recruiter = db.query(User).filter(User.id == recruiter_id).first()
+            with session_scope("google_meet.cancellation_email") as db:
+                recruiter = db.query(User).filter(User.id == recruiter_id).first()
             recruiter_name = recruiter.google_name or recruiter.email.split('@')[0]
             
             subject = f"Interview Cancelled: {interview_title}"
@@ -584,8 +584,8 @@ EduAI Recruitment Team
             session = self._get_session_for_user(recruiter_id)
             
             # Get recruiter info
-            db = next(get_db())
-            recruiter = db.query(User).filter(User.id == recruiter_id).first()
+            with session_scope("google_meet.reschedule_email") as db:
+                recruiter = db.query(User).filter(User.id == recruiter_id).first()
             recruiter_name = recruiter.google_name or recruiter.email.split('@')[0]
             
             formatted_time = new_start_time.strftime('%A, %B %d, %Y at %I:%M %p UTC')
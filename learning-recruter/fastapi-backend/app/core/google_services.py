@@ -6,7 +6,7 @@ from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any, Union
 from app.core.google_auth import get_google_oauth2_session
 from app.models.user import User
-from app.database.db import get_db
+from app.database.session_scope import session_scope
 from composio import Composio
 import os
 
@@ -47,8 +47,8 @@ composio = Composio(api_key=COMPOSIO_API_KEY)
 
 
 def _get_session_for_user(user_id: int):
-    db = next(get_db())
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    with session_scope("google_services.session_for_user") as db:
+        user = db.query(User).filter(User.id == int(user_id)).first()
     if not user or not user.google_id:
         raise ValueError("Google account not linked for this user")
     return get_google_oauth2_session(user.google_id)
@@ -193,8 +193,8 @@ def get_day_notes(user_id: int, month_index: int, day: int) -> Optional[Dict[str
     try:
         print(f"Getting day notes for user {user_id}, month {month_index}, day {day}")
         # Get user info to construct root folder name
-        db = next(get_db())
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        with session_scope("google_services.get_day_notes") as db:
+            user = db.query(User).filter(User.id == int(user_id)).first()
         if not user:
             print(f"User {user_id} not found")
             return None
@@ -272,8 +272,8 @@ def update_day_notes(user_id: int, month_index: int, day: int, content: str) ->
     """
     try:
         # Get user info to construct root folder name
-        db = next(get_db())
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        with session_scope("google_services.update_day_notes") as db:
+            user = db.query(User).filter(User.id == int(user_id)).first()
         if not user:
             return False
             
@@ -598,8 +598,8 @@ def send_email(user_id: int, to_email: str, subject: str, html_content: str, tex
         session = _get_session_for_user(user_id)
         
         # Get user info to get sender email
-        db = next(get_db())
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        with session_scope("google_services.send_email") as db:
+            user = db.query(User).filter(User.id == int(user_id)).first()
         if not user or not user.email:
             print(f"User {user_id} not found or has no email")
             return False
@@ -654,8 +654,8 @@ def send_notification_email(user_id: int, notification_type: str, context: Dict[
     """
     try:
         # Get user info
-        db = next(get_db())
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        with session_scope("google_services.send_notification_email") as db:
+            user = db.query(User).filter(User.id == int(user_id)).first()
         if not user or not user.email:
             print(f"User {user_id} not found or has no email")
             return False
@@ -1,11 +1,10 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from app.models.user import User
-from app.models.onboarding import Onboarding
-from app.models.learning_plan import LearningPlan
-from app.models.quiz import Quiz
 from app.models.student_profile_summary import StudentProfileSummary
 from app.core.embeddings import simple_text_embedding, cosine_similarity
+from app.core.ranking import fuse, top_k_indices
+from app.core.compact_graph import CompactGraph
+from app.core.config import settings
 import json
 
 
@@ -14,201 +13,83 @@ class GraphRAG:
     
     def __init__(self, db: Session):
         self.db = db
-        self.knowledge_graph = {}
+        self.knowledge_graph: Optional[CompactGraph] = None
         self.user_embeddings = {}
+        self._documents = None
         
-    def build_knowledge_graph(self) -> Dict[str, Any]:
-        """Build comprehensive knowledge graph from all user data"""
-        users = self.db.query(User).all()
-        graph = {
-            "users": {},
-            "skills": {},
-            "topics": {},
-            "learning_paths": {},
-            "connections": []
-        }
+    def build_knowledge_graph(self) -> CompactGraph:
+        """Build the student knowledge graph: skills, topics, goals and similarity connections"""
+        from app.services.profile_documents import get_profile_documents
         
-        for user in users:
-            user_data = self._extract_user_knowledge(user.id)
-            graph["users"][str(user.id)] = user_data
-            
-            # Build skill and topic nodes
-            for skill in user_data.get("skills", []):
-                if skill not in graph["skills"]:
-                    graph["skills"][skill] = {"users": [], "related_topics": []}
-                graph["skills"][skill]["users"].append(user.id)
-            
-            for topic in user_data.get("topics", []):
-                if topic not in graph["topics"]:
-                    graph["topics"][topic] = {"users": [], "related_skills": []}
-                graph["topics"][topic]["users"].append(user.id)
+        self._documents = get_profile_documents(self.db)
+        graph = CompactGraph.from_users([self._user_data_from_features(doc) for doc in self._documents.values()])
         
         # Build connections between users based on similarity
-        self._build_user_connections(graph)
+        graph.build_similarity(threshold=0.3)  # Threshold for meaningful connection
         
         self.knowledge_graph = graph
         return graph
     
     def _extract_user_knowledge(self, user_id: int) -> Dict[str, Any]:
-        """Extract comprehensive knowledge about a user"""
-        # Get onboarding data
-        onboarding = self.db.query(Onboarding).filter(Onboarding.user_id == user_id).first()
-        
-        # Get learning plan data
-        learning_plan = self.db.query(LearningPlan).filter(LearningPlan.user_id == user_id).first()
-        
-        # Get quiz performance
-        quizzes = self.db.query(Quiz).filter(Quiz.user_id == user_id).all()
-        
-        # Extract skills and topics from learning plan
-        skills = []
-        topics = []
-        completed_months = 0
-        total_progress = 0
-        
-        if learning_plan and learning_plan.plan:
-            months = learning_plan.plan.get("months", [])
-            for month in months:
-                if month.get("status") == "completed":
-                    completed_months += 1
-                
-                month_topics = month.get("topics", [])
-                if isinstance(month_topics, list):
-                    topics.extend([t for t in month_topics if isinstance(t, str)])
-                
-                # Extract skills from topics (simplified)
-                for topic in month_topics:
-                    if isinstance(topic, str):
-                        # Simple skill extraction logic
-                        if any(tech in topic.lower() for tech in ["python", "javascript", "react", "node"]):
-                            skills.append(topic)
-            
-            total_progress = completed_months / len(months) if months else 0
-        
-        # Get quiz performance metrics - fix for Quiz model
-        quiz_scores = []
-        for q in quizzes:
-            # Try to get score from quiz submissions or use a default
-            if hasattr(q, 'submissions') and q.submissions:
-                scores = [s.score for s in q.submissions if hasattr(s, 'score') and s.score is not None]
-                if scores:
-                    quiz_scores.extend(scores)
-        avg_quiz_score = sum(quiz_scores) / len(quiz_scores) if quiz_scores else 0
-        
-        # Extract career goals and interests
-        career_goals = []
-        current_skills = []
-        
-        if onboarding:
-            if isinstance(onboarding.career_goals, list):
-                career_goals = onboarding.career_goals
-            elif isinstance(onboarding.career_goals, str):
-                career_goals = [onboarding.career_goals]
-            
-            if isinstance(onboarding.current_skills, list):
-                current_skills = onboarding.current_skills
-            elif isinstance(onboarding.current_skills, str):
-                current_skills = [onboarding.current_skills]
-        
-        return {
-            "user_id": user_id,
-            "skills": list(set(skills + current_skills)),
-            "topics": list(set(topics)),
-            "career_goals": career_goals,
-            "learning_progress": total_progress,
-            "completed_months": completed_months,
-            "avg_quiz_score": avg_quiz_score,
-            "total_quizzes": len(quizzes),
-            "grade": getattr(onboarding, "grade", None) if onboarding else None,
-            "time_commitment": getattr(onboarding, "time_commitment", None) if onboarding else None
-        }
+        """Extract comprehensive knowledge about a user from their profile document"""
+        from app.services.profile_documents import get_profile_document
+        
+        document = self._documents.get(user_id) if self._documents is not None else get_profile_document(self.db, user_id)
+        if document is None:
+            # Recruiters and other non-students have no learning profile
+            return {
+                "user_id": user_id,
+                "skills": [],
+                "topics": [],
+                "career_goals": [],
+                "learning_progress": 0,
+                "completed_months": 0,
+                "avg_quiz_score": 0,
+                "total_quizzes": 0,
+                "grade": None,
+                "time_commitment": None
+            }
+        return self._user_data_from_features(document)
     
-    def _build_user_connections(self, graph: Dict[str, Any]):
-        """Build connections between users based on similarity"""
-        users = list(graph["users"].keys())
-        
-        for i, user1 in enumerate(users):
-            for user2 in users[i+1:]:
-                similarity = self._calculate_user_similarity(
-                    graph["users"][user1], 
-                    graph["users"][user2]
-                )
-                
-                if similarity > 0.3:  # Threshold for meaningful connection
-                    graph["connections"].append({
-                        "user1": int(user1),
-                        "user2": int(user2),
-                        "similarity": similarity,
-                        "connection_type": "learning_similarity"
-                    })
-    
-    def _calculate_user_similarity(self, user1_data: Dict, user2_data: Dict) -> float:
-        """Calculate similarity between two users"""
-        # Skill overlap
-        skills1 = set(user1_data.get("skills", []))
-        skills2 = set(user2_data.get("skills", []))
-        skill_similarity = len(skills1.intersection(skills2)) / len(skills1.union(skills2)) if skills1.union(skills2) else 0
-        
-        # Topic overlap
-        topics1 = set(user1_data.get("topics", []))
-        topics2 = set(user2_data.get("topics", []))
-        topic_similarity = len(topics1.intersection(topics2)) / len(topics1.union(topics2)) if topics1.union(topics2) else 0
-        
-        # Career goal similarity
-        goals1 = set(user1_data.get("career_goals", []))
-        goals2 = set(user2_data.get("career_goals", []))
-        goal_similarity = len(goals1.intersection(goals2)) / len(goals1.union(goals2)) if goals1.union(goals2) else 0
-        
-        # Progress similarity
-        progress1 = user1_data.get("learning_progress", 0)
-        progress2 = user2_data.get("learning_progress", 0)
-        progress_similarity = 1 - abs(progress1 - progress2)
-        
-        # Weighted combination
-        return (
-            skill_similarity * 0.4 +
-            topic_similarity * 0.3 +
-            goal_similarity * 0.2 +
-            progress_similarity * 0.1
-        )
-    
-    def enhanced_candidate_matching(self, job_description: str, requirements: List[str] = None) -> List[Dict[str, Any]]:
-        """Enhanced candidate matching using graph RAG"""
-        if not self.knowledge_graph:
-            self.build_knowledge_graph()
+    def enhanced_candidate_matching(self, job_description: str, requirements: List[str] = None,
+                                    weights: Dict[str, float] = None, method: str = None) -> List[Dict[str, Any]]:
+        """Enhanced candidate matching using the shared fusion ranker over the whole roster"""
+        from app.services.candidate_features import load_candidate_features
         
-        # Create job embedding
-        job_text = f"{job_description} {' '.join(requirements or [])}"
-        job_embedding = simple_text_embedding(job_text)
+        requirements = requirements or []
+        features = load_candidate_features(self.db)
+        job_text = f"{job_description} {' '.join(requirements)}"
+        arrays = features.feature_arrays(job_text, requirements)
+        fused = fuse(arrays, weights=weights, method=method or settings.MATCH_FUSION)
         
         candidates = []
-        
-        for user_id, user_data in self.knowledge_graph["users"].items():
-            # Create user profile text for embedding
-            profile_text = self._create_user_profile_text(user_data)
-            user_embedding = simple_text_embedding(profile_text)
-            
-            # Calculate base similarity
-            base_score = cosine_similarity(job_embedding, user_embedding)
-            
-            # Apply graph-based enhancements
-            enhanced_score = self._apply_graph_enhancements(
-                int(user_id), base_score, job_description, requirements or []
-            )
-            
+        for idx in top_k_indices(fused, len(features)):
+            user_data = self._user_data_from_features(features.profiles[idx])
             candidates.append({
-                "user_id": int(user_id),
-                "base_score": float(base_score),
-                "enhanced_score": float(enhanced_score),
+                "user_id": user_data["user_id"],
+                "base_score": float(arrays["vector"][idx]),
+                "enhanced_score": float(fused[idx]),
                 "user_data": user_data,
-                "match_reasons": self._generate_match_reasons(user_data, job_description, requirements or [])
+                "match_reasons": self._generate_match_reasons(user_data, job_description, requirements)
             })
         
-        # Sort by enhanced score
-        candidates.sort(key=lambda x: x["enhanced_score"], reverse=True)
-        
         return candidates
     
+    def _user_data_from_features(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Same shape as ``_extract_user_knowledge``, built from preloaded features."""
+        return {
+            "user_id": profile["user_id"],
+            "skills": profile["skills"],
+            "topics": profile["topics"],
+            "career_goals": profile["career_goals"],
+            "learning_progress": profile["learning_progress"] / 100.0,
+            "completed_months": profile["completed_months"],
+            "avg_quiz_score": profile["avg_quiz_score"] / 100.0,
+            "total_quizzes": profile["quiz_count"],
+            "grade": profile["grade"],
+            "time_commitment": profile["time_commitment"]
+        }
+    
     def _create_user_profile_text(self, user_data: Dict[str, Any]) -> str:
         """Create comprehensive text representation of user profile"""
         parts = []
@@ -242,7 +123,7 @@ class GraphRAG:
             enhanced_score += avg_similar_score * 0.2  # 20% boost from similar users
         
         # Boost based on learning trajectory
-        user_data = self.knowledge_graph["users"][str(user_id)]
+        user_data = self.knowledge_graph.user_data(user_id) or {}
         if user_data.get("learning_progress", 0) > 0.7:  # High progress
             enhanced_score *= 1.1
         
@@ -253,19 +134,11 @@ class GraphRAG:
     
     def _find_similar_users(self, user_id: int) -> List[int]:
         """Find users similar to the given user"""
-        similar_users = []
-        
-        for connection in self.knowledge_graph.get("connections", []):
-            if connection["user1"] == user_id and connection["similarity"] > 0.5:
-                similar_users.append(connection["user2"])
-            elif connection["user2"] == user_id and connection["similarity"] > 0.5:
-                similar_users.append(connection["user1"])
-        
-        return similar_users[:5]  # Top 5 similar users
+        return [uid for uid, _ in self.knowledge_graph.neighbors(user_id, min_weight=0.5, limit=5)]  # Top 5 similar users
     
     def _calculate_job_fit(self, user_id: int, job_description: str, requirements: List[str]) -> float:
         """Calculate how well a user fits a job"""
-        user_data = self.knowledge_graph["users"][str(user_id)]
+        user_data = self.knowledge_graph.user_data(user_id) or {}
         
         # Simple job fit calculation based on skill overlap
         user_skills = set(skill.lower() for skill in user_data.get("skills", []))
@@ -321,10 +194,10 @@ class GraphRAG:
     
     def get_user_learning_insights(self, user_id: int) -> Dict[str, Any]:
         """Get comprehensive learning insights for a user"""
-        if not self.knowledge_graph:
+        if self.knowledge_graph is None:
             self.build_knowledge_graph()
         
-        user_data = self.knowledge_graph["users"].get(str(user_id))
+        user_data = self.knowledge_graph.user_data(user_id)
         if not user_data:
             return {"error": "User not found"}
         
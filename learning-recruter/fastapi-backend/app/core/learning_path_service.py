@@ -4,6 +4,8 @@ from typing import Optional, Dict, Any
 from app.models.learning_path import LearningPath, DayProgress
 from app.models.learning_plan import LearningPlan
 from app.models.user import User
+from app.services.student_stats import update_student_stats
+from app.services.plan_days import get_plan_day, load_plan, store_plan, update_plan_day
 
 
 class LearningPathService:
@@ -86,6 +88,7 @@ class LearningPathService:
                 "started_at": datetime.utcnow().isoformat()
             }
         
+        update_student_stats(db, [user_id])
         db.commit()
         db.refresh(day_progress)
         return day_progress
@@ -149,10 +152,14 @@ class LearningPathService:
                 learning_path.status = "completed"
                 learning_path.completed_at = datetime.utcnow()
 
-        # Also update plan JSON structure to reflect completion for UI
-        plan = db.query(LearningPlan).filter(LearningPlan.id == plan_id).first()
+        # Also mark the day completed in the plan for the UI: one day row, not the whole plan JSON
+        plan_day = get_plan_day(db, plan_id, month_index, day_number, lock=True)
+        if plan_day is not None:
+            update_plan_day(plan_day, completed=True, quiz_score=quiz_score, completed_at=datetime.utcnow().isoformat())
+        plan = None if plan_day is not None else db.query(LearningPlan).filter(LearningPlan.id == plan_id).first()
         if plan and plan.plan and isinstance(plan.plan, dict) and "months" in plan.plan:
-            months = plan.plan.get("months", [])
+            # Plan written before days moved to rows: storing it moves them
+            months = load_plan(db, plan, [month_index], detail=False)["months"]
             if 1 <= month_index <= len(months):
                 month = months[month_index - 1]
                 days = month.get("days", [])
@@ -164,7 +171,7 @@ class LearningPathService:
                     # Optionally unlock next day implicitly by having previous completed
                     month["days"] = days
                     months[month_index - 1] = month
-                    plan.plan = {"months": [dict(m) for m in months]}
+                    store_plan(db, plan, {"months": months})
         
         # Determine next day
         next_day_info = LearningPathService._get_next_day_info(
@@ -178,6 +185,7 @@ class LearningPathService:
             if next_day_info["month_index"] != month_index:
                 user.current_month_index = next_day_info["month_index"]
         
+        update_student_stats(db, [user_id])
         db.commit()
         
         return {
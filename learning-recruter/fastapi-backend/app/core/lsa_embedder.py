@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.embeddings import _tokenize, embed_texts
+
+# Version recorded for vectors produced by ``simple_text_embedding`` (and for
+# stored vectors that predate versioning)
+HASH_VERSION = "hash-256"
+
+_CHUNK = 65536
+
+
+def _sparse_dot(rows: np.ndarray, cols: np.ndarray, vals: np.ndarray, n_rows: int, dense: np.ndarray) -> np.ndarray:
+    """(rows, cols, vals) COO matrix times a dense matrix, in bounded-size chunks."""
+    out = np.zeros((n_rows, dense.shape[1]), dtype=np.float64)
+    for start in range(0, len(vals), _CHUNK):
+        end = start + _CHUNK
+        np.add.at(out, rows[start:end], vals[start:end, None] * dense[cols[start:end]])
+    return out
+
+
+class LsaEmbedder:
+    """TF-IDF + truncated SVD (latent semantic analysis) text embedder.
+
+    Fitted on the platform's own profile documents and job descriptions, so
+    related terms ("django", "flask", "backend") land near each other instead
+    of in unrelated hash buckets. Embedding a text is a vocabulary lookup and
+    a weighted sum of a few rows of ``projection``.
+    """
+
+    def __init__(self, vocab: Dict[str, int], idf: np.ndarray, projection: np.ndarray, version: str,
+                 fitted_at: Optional[str] = None, n_docs: int = 0):
+        self.vocab = vocab
+        self.idf = idf.astype(np.float32)
+        self.projection = projection.astype(np.float32)  # (vocab, dim)
+        self.version = version
+        self.fitted_at = fitted_at
+        self.n_docs = n_docs
+
+    @property
+    def dim(self) -> int:
+        return self.projection.shape[1]
+
+    @classmethod
+    def fit(cls, docs: Sequence[str], dim: int = 128, min_df: int = 2, max_df: float = 0.5,
+            max_features: int = 20000, n_iter: int = 4, seed: int = 0) -> "LsaEmbedder":
+        tokenized = [_tokenize(doc) for doc in docs]
+        n_docs = len(tokenized)
+        df = Counter()
+        for tokens in tokenized:
+            df.update(set(tokens))
+        # Terms in almost every document carry no signal; on tiny corpora keep everything
+        max_count = max_df * n_docs if n_docs >= 20 else n_docs
+        min_count = min_df if n_docs >= 20 else 1
+        kept = [t for t, c in df.items() if min_count <= c <= max_count]
+        kept.sort(key=lambda t: (-df[t], t))
+        vocab = {term: i for i, term in enumerate(sorted(kept[:max_features]))}
+        if not vocab:
+            raise ValueError("Corpus has no usable terms to fit an embedder")
+        idf = np.zeros(len(vocab), dtype=np.float64)
+        for term, i in vocab.items():
+            idf[i] = np.log((1 + n_docs) / (1 + df[term])) + 1.0
+
+        rows, cols, vals = [], [], []
+        for row, tokens in enumerate(tokenized):
+            counts = Counter(t for t in tokens if t in vocab)
+            for term, count in counts.items():
+                rows.append(row)
+                cols.append(vocab[term])
+                vals.append(1.0 + np.log(count))
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        vals = np.asarray(vals, dtype=np.float64) * idf[cols]
+        norms = np.sqrt(np.bincount(rows, weights=vals * vals, minlength=n_docs))
+        vals /= np.maximum(norms[rows], 1e-12)
+
+        # Randomized range finder (Halko et al.) on the sparse TF-IDF matrix
+        k = max(1, min(dim, n_docs, len(vocab)))
+        width = min(k + 10, len(vocab))
+        rng = np.random.default_rng(seed)
+        q = _sparse_dot(rows, cols, vals, n_docs, rng.standard_normal((len(vocab), width)))
+        q, _ = np.linalg.qr(q)
+        for _ in range(n_iter):
+            z, _ = np.linalg.qr(_sparse_dot(cols, rows, vals, len(vocab), q))
+            q, _ = np.linalg.qr(_sparse_dot(rows, cols, vals, n_docs, z))
+        b = _sparse_dot(cols, rows, vals, len(vocab), q).T  # (width, vocab) = Q^T X
+        _, _, vt = np.linalg.svd(b, full_matrices=False)
+        projection = vt[:k].T
+
+        digest = hashlib.sha1()
+        digest.update(json.dumps(sorted(vocab)).encode("utf-8"))
+        digest.update(projection.astype(np.float32).tobytes())
+        version = f"lsa-{k}-{digest.hexdigest()[:12]}"
+        return cls(vocab, idf, projection, version, fitted_at=datetime.utcnow().isoformat(), n_docs=n_docs)
+
+    def _weights(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        counts = Counter(t for t in _tokenize(text) if t in self.vocab)
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        ids = np.fromiter((self.vocab[t] for t in counts), dtype=np.int64, count=len(counts))
+        tf = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        return ids, tf * self.idf[ids]
+
+    def embed(self, text: str) -> np.ndarray:
+        """Unit-length embedding of one text; all zeros when no term is known."""
+        ids, weights = self._weights(text)
+        if not len(ids):
+            return np.zeros(self.dim, dtype=np.float32)
+        vec = weights @ self.projection[ids]
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm > 0 else vec
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            matrix[i] = self.embed(text)
+        return matrix
+
+    def save(self, path: str):
+        """Write ``<path>.npz`` (arrays) and ``<path>.json`` (vocabulary and version)."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(f"{path}.npz", idf=self.idf, projection=self.projection)
+        meta = {
+            "version": self.version,
+            "dim": self.dim,
+            "n_docs": self.n_docs,
+            "fitted_at": self.fitted_at,
+            "vocab": sorted(self.vocab, key=self.vocab.get),
+        }
+        # Metadata goes last and atomically: its presence marks a complete model
+        tmp = f"{path}.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, f"{path}.json")
+
+    @classmethod
+    def load(cls, path: str) -> "LsaEmbedder":
+        with open(f"{path}.json") as f:
+            meta = json.load(f)
+        arrays = np.load(f"{path}.npz")
+        vocab = {term: i for i, term in enumerate(meta["vocab"])}
+        return cls(vocab, arrays["idf"], arrays["projection"], meta["version"],
+                   fitted_at=meta.get("fitted_at"), n_docs=meta.get("n_docs", 0))
+
+
+_lock = threading.Lock()
+_active: Optional[LsaEmbedder] = None
+_active_mtime: Optional[float] = None
+
+
+def active_embedder() -> Optional[LsaEmbedder]:
+    """The fitted embedder at ``settings.LSA_MODEL_PATH``, reloaded when the file changes.
+
+    None when no model has been fitted yet; callers then fall back to
+    ``simple_text_embedding``.
+    """
+    global _active, _active_mtime
+    meta_path = f"{settings.LSA_MODEL_PATH}.json"
+    try:
+        mtime = os.path.getmtime(meta_path)
+    except OSError:
+        return None
+    if _active is None or mtime != _active_mtime:
+        with _lock:
+            if _active is None or mtime != _active_mtime:
+                try:
+                    _active = LsaEmbedder.load(settings.LSA_MODEL_PATH)
+                    _active_mtime = mtime
+                except Exception as e:
+                    print(f"⚠️ Could not load LSA embedder from {settings.LSA_MODEL_PATH}: {e}")
+                    return None
+    return _active
+
+
+def embedding_version() -> str:
+    embedder = active_embedder()
+    return embedder.version if embedder else HASH_VERSION
+
+
+def embed_documents(texts: List[str]) -> Tuple[np.ndarray, str]:
+    """Embed texts with the active embedder and return them with its version."""
+    embedder = active_embedder()
+    if embedder is None:
+        return np.asarray(embed_texts(texts), dtype=np.float32).reshape(len(texts), 256), HASH_VERSION
+    return embedder.embed_many(texts), embedder.version
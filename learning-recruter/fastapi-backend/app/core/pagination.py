@@ -0,0 +1,94 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if hasattr(value, "item"):  # NumPy scalars from the roster snapshot
+        return value.item()
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(sort: str, value: Any, last_id: int) -> str:
+    """Opaque cursor for the row after ``(value, last_id)`` in listing order ``sort``."""
+    payload = json.dumps({"s": sort, "v": _encode_value(value), "id": int(last_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, int]:
+    """``(sort value, id)`` of a cursor made by ``encode_cursor`` for the same ``sort``."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != sort:
+            raise InvalidCursor("Cursor belongs to a different sort order")
+        return _decode_value(payload["v"]), int(payload["id"])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        if isinstance(e, InvalidCursor):
+            raise
+        raise InvalidCursor("Malformed cursor") from e
+
+
+def clamp_limit(limit: Optional[int], default: int = DEFAULT_LIMIT) -> int:
+    return max(1, min(limit or default, MAX_LIMIT))
+
+
+def _after(sort_column, id_column, cursor: str, sort: str, descending: bool):
+    value, last_id = decode_cursor(cursor, sort)
+    if descending:
+        return or_(sort_column < value, and_(sort_column == value, id_column < last_id))
+    return or_(sort_column > value, and_(sort_column == value, id_column > last_id))
+
+
+def _order(sort_column, id_column, descending: bool):
+    return (sort_column.desc(), id_column.desc()) if descending else (sort_column.asc(), id_column.asc())
+
+
+def _page(rows: List[Any], sort_column, id_column, limit: int, sort: str) -> Tuple[List[Any], Optional[str]]:
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(sort, getattr(last, sort_column.key), getattr(last, id_column.key))
+
+
+def keyset_page(query, sort_column, id_column, cursor: Optional[str], limit: int, sort: str,
+                descending: bool = True) -> Tuple[List[Any], Optional[str]]:
+    """One page of ``query`` ordered by ``(sort_column, id_column)``, plus the cursor of the next page.
+
+    The cursor becomes a ``WHERE (sort, id) < (value, last_id)`` condition
+    (``>`` ascending), so with an index on the two columns every page is an
+    index range scan of ``limit + 1`` rows, however deep it is. Rows must
+    have non-null sort values.
+    """
+    if cursor:
+        query = query.filter(_after(sort_column, id_column, cursor, sort, descending))
+    rows = query.order_by(*_order(sort_column, id_column, descending)).limit(limit + 1).all()
+    return _page(rows, sort_column, id_column, limit, sort)
+
+
+async def keyset_page_async(db, statement, sort_column, id_column, cursor: Optional[str], limit: int, sort: str,
+                            descending: bool = True) -> Tuple[List[Any], Optional[str]]:
+    """``keyset_page`` for a ``select()`` of one entity on an ``AsyncSession``."""
+    if cursor:
+        statement = statement.where(_after(sort_column, id_column, cursor, sort, descending))
+    result = await db.execute(statement.order_by(*_order(sort_column, id_column, descending)).limit(limit + 1))
+    return _page(list(result.scalars()), sort_column, id_column, limit, sort)
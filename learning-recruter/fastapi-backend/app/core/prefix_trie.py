@@ -0,0 +1,121 @@
+import heapq
+import re
+from typing import Dict, List, Optional, Tuple
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_term(text: str) -> str:
+    """Lowercase, trim and collapse inner whitespace."""
+    return _SPACES.sub(" ", (text or "").strip().lower())
+
+
+class _Node:
+    __slots__ = ("children", "ends", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.ends: Dict[str, int] = {}  # key -> count of terms reachable by exactly this path
+        self.top: List[Tuple[int, str]] = []  # best (count, key) in this subtree
+
+
+class PrefixTrie:
+    """Frequency-ranked prefix completion with the best ``top_k`` cached per node.
+
+    A lookup walks ``len(prefix)`` nodes and slices a precomputed list, so
+    it costs the same whatever the vocabulary size. Multi-word terms are
+    also reachable from the start of each later word ("smi" finds "John
+    Smith"). Count changes refresh only the cached lists on the affected
+    paths.
+    """
+
+    def __init__(self, top_k: int = 10):
+        self.top_k = top_k
+        self.root = _Node()
+        self.counts: Dict[str, int] = {}
+        self.labels: Dict[str, str] = {}  # key -> display form
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @classmethod
+    def build(cls, counts: Dict[str, int], top_k: int = 10) -> "PrefixTrie":
+        """Trie over ``{term: count}``, ranking every node once instead of per insert."""
+        trie = cls(top_k)
+        for term, count in counts.items():
+            key = normalize_term(term)
+            if key and count > 0:
+                trie.counts[key] = trie.counts.get(key, 0) + count
+                trie.labels.setdefault(key, " ".join(term.split()))
+        for key, count in trie.counts.items():
+            for path in trie._paths(key):
+                node = trie.root
+                for ch in path:
+                    node = node.children.setdefault(ch, _Node())
+                node.ends[key] = count
+        stack = [(trie.root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                trie._rank(node)
+            else:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children.values())
+        return trie
+
+    def _paths(self, key: str) -> set:
+        words = key.split(" ")
+        return {" ".join(words[i:]) for i in range(len(words))}
+
+    def add(self, term: str, delta: int = 1):
+        """Change the frequency of ``term`` by ``delta``; terms at zero are dropped."""
+        key = normalize_term(term)
+        if not key or not delta:
+            return
+        count = max(self.counts.get(key, 0) + delta, 0)
+        if count:
+            self.counts[key] = count
+            self.labels.setdefault(key, " ".join(term.split()))
+        else:
+            self.counts.pop(key, None)
+            self.labels.pop(key, None)
+        for path in self._paths(key):
+            self._update(path, key, count)
+
+    def _update(self, path: str, key: str, count: int):
+        nodes = [self.root]
+        for ch in path:
+            child = nodes[-1].children.get(ch)
+            if child is None:
+                if not count:
+                    return
+                child = nodes[-1].children[ch] = _Node()
+            nodes.append(child)
+        if count:
+            nodes[-1].ends[key] = count
+        else:
+            nodes[-1].ends.pop(key, None)
+        for depth in range(len(nodes) - 1, -1, -1):
+            node = nodes[depth]
+            if depth and not node.ends and not node.children:
+                del nodes[depth - 1].children[path[depth - 1]]
+                continue
+            self._rank(node)
+
+    def _rank(self, node: _Node):
+        # The best k of a subtree are among its own terms and each child's best k
+        entries = dict(node.ends)
+        for child in node.children.values():
+            for c, k in child.top:
+                entries[k] = c
+        node.top = heapq.nsmallest(self.top_k, ((c, k) for k, c in entries.items()), key=lambda e: (-e[0], e[1]))
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[Dict[str, object]]:
+        """Most frequent terms starting with ``prefix`` (or with a word of them starting with it)."""
+        node = self.root
+        for ch in normalize_term(prefix):
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        limit = self.top_k if limit is None else min(limit, self.top_k)
+        return [{"term": self.labels.get(key, key), "count": count} for count, key in node.top[:limit]]
@@ -0,0 +1,141 @@
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# Signals every matcher can fuse; each feature array is expected in [0, 1]
+FEATURES = ("vector", "bm25", "skill_overlap", "quiz", "progress", "social")
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "vector": 0.30,
+    "bm25": 0.20,
+    "skill_overlap": 0.25,
+    "quiz": 0.12,
+    "progress": 0.10,
+    "social": 0.03,
+}
+
+# Student-to-student similarity leans on skills and embeddings, not on progress
+RELATED_WEIGHTS: Dict[str, float] = {"vector": 0.4, "skill_overlap": 0.4, "bm25": 0.2}
+
+RRF_K = 60
+
+
+class TermIndex:
+    """Sparse term-count index over a fixed list of documents.
+
+    Stored as parallel (row, term, count) arrays so term lookups for the whole
+    roster are a single ``np.isin`` plus a ``np.bincount`` instead of a Python
+    loop per document.
+    """
+
+    def __init__(self, docs: Sequence[Sequence[str]]):
+        self.vocab: Dict[str, int] = {}
+        rows, cols, counts = [], [], []
+        for row, terms in enumerate(docs):
+            for term, count in Counter(terms).items():
+                cols.append(self.vocab.setdefault(term, len(self.vocab)))
+                rows.append(row)
+                counts.append(count)
+        self.n_docs = len(docs)
+        self.rows = np.asarray(rows, dtype=np.int32)
+        self.cols = np.asarray(cols, dtype=np.int32)
+        self.counts = np.asarray(counts, dtype=np.float32)
+        self.doc_len = np.asarray([len(d) for d in docs], dtype=np.float32)
+        self.doc_terms = np.bincount(self.rows, minlength=self.n_docs).astype(np.float32)
+        self.df = np.bincount(self.cols, minlength=len(self.vocab)).astype(np.float32)
+
+    def term_ids(self, terms: Sequence[str]) -> np.ndarray:
+        return np.asarray(sorted({self.vocab[t] for t in terms if t in self.vocab}), dtype=np.int32)
+
+    def matches(self, terms: Sequence[str]) -> np.ndarray:
+        """Boolean mask over the stored entries whose term is in ``terms``."""
+        ids = self.term_ids(terms)
+        if not len(ids):
+            return np.zeros(len(self.cols), dtype=bool)
+        return np.isin(self.cols, ids)
+
+    def overlap_counts(self, terms: Sequence[str]) -> np.ndarray:
+        """Number of distinct ``terms`` present in each document."""
+        mask = self.matches(terms)
+        return np.bincount(self.rows[mask], minlength=self.n_docs).astype(np.float32)
+
+
+def bm25_scores(index: TermIndex, query_terms: Sequence[str], k1: float = 1.2, b: float = 0.75) -> np.ndarray:
+    """Okapi BM25 of one query against every document in ``index``."""
+    scores = np.zeros(index.n_docs, dtype=np.float32)
+    mask = index.matches(query_terms)
+    if not mask.any():
+        return scores
+    rows = index.rows[mask]
+    df = index.df[index.cols[mask]]
+    tf = index.counts[mask]
+    idf = np.log1p((index.n_docs - df + 0.5) / (df + 0.5))
+    avgdl = float(index.doc_len.mean()) or 1.0
+    norm = tf + k1 * (1 - b + b * index.doc_len[rows] / avgdl)
+    contrib = idf * tf * (k1 + 1) / norm
+    return np.bincount(rows, weights=contrib, minlength=index.n_docs).astype(np.float32)
+
+
+def scale_to_unit(values: np.ndarray) -> np.ndarray:
+    """Divide by the max so unbounded scores (BM25) land in [0, 1]."""
+    top = float(values.max()) if len(values) else 0.0
+    if top <= 0:
+        return np.zeros_like(values, dtype=np.float32)
+    return (values / top).astype(np.float32)
+
+
+def _descending_ranks(values: np.ndarray) -> np.ndarray:
+    order = np.argsort(-values, kind="stable")
+    ranks = np.empty(len(values), dtype=np.float32)
+    ranks[order] = np.arange(len(values), dtype=np.float32)
+    return ranks
+
+
+def fuse(features: Dict[str, np.ndarray], weights: Optional[Dict[str, float]] = None, method: str = "weighted",
+         rrf_k: int = RRF_K) -> np.ndarray:
+    """Fuse per-candidate feature arrays into a single prior in [0, 1].
+
+    ``weighted`` takes the weighted mean of the (already unit-scaled) features;
+    ``rrf`` uses weighted reciprocal rank fusion, which ignores score scale and
+    only cares about each feature's ordering.
+    """
+    weights = {name: float(w) for name, w in (weights or DEFAULT_WEIGHTS).items() if name in features and w and w > 0}
+    n = len(next(iter(features.values()))) if features else 0
+    fused = np.zeros(n, dtype=np.float32)
+    total = sum(weights.values())
+    if not n or total <= 0:
+        return fused
+    if method == "rrf":
+        for name, w in weights.items():
+            fused += w / (rrf_k + 1 + _descending_ranks(features[name]))
+        return fused / (total / (rrf_k + 1))
+    for name, w in weights.items():
+        fused += w * features[name]
+    return fused / total
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> List[int]:
+    """Indices of the ``k`` best scores, best first; ties keep roster order."""
+    n = len(scores)
+    if n == 0 or k <= 0:
+        return []
+    candidates = np.arange(n)
+    if k < n:
+        # Every score tied with the k-th best stays in, so the roster-order tie break below picks among all of them
+        kth = np.partition(-scores, k - 1)[k - 1]
+        if not np.isnan(kth):
+            candidates = np.flatnonzero(-scores <= kth)
+    order = np.lexsort((candidates, -scores[candidates]))
+    return [int(i) for i in candidates[order][:k]]
+
+
+def blend_llm_score(prior: float, llm_score: int, llm_weight: float) -> int:
+    """Combine an LLM 0-100 score with the fused prior (0-1) on the 0-100 scale."""
+    return int(round(llm_weight * llm_score + (1 - llm_weight) * prior * 100))
+
+
+def max_blended_score(prior: float, llm_weight: float) -> int:
+    """Upper bound of ``blend_llm_score`` for this prior, i.e. with a perfect LLM score."""
+    return blend_llm_score(prior, 100, llm_weight)
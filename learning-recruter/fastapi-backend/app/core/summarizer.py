@@ -28,3 +28,15 @@ Return only plain text.
         return "Learner shows consistent progress with practical skill development across completed months."
 
 
+def summarize_learning_offline(onboarding: Dict, months_completed: int, skills_observed: str = "") -> str:
+    """Template summary with no model call, used when re-embedding the whole roster."""
+    goals = onboarding.get('career_goals')
+    if isinstance(goals, list):
+        goals = ", ".join(g for g in goals if isinstance(g, str))
+    parts = [f"{onboarding.get('name') or 'Learner'} ({onboarding.get('grade') or 'grade not set'})"]
+    if goals:
+        parts.append(f"working towards {goals}")
+    parts.append(f"{months_completed} month(s) completed")
+    if skills_observed:
+        parts.append(f"skills observed: {skills_observed}")
+    return "; ".join(parts) + "."
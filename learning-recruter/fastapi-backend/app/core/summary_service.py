@@ -5,17 +5,18 @@ from app.models.learning_plan import LearningPlan
 from app.models.onboarding import Onboarding
 from app.models.quiz import Quiz, QuizSubmission
 from app.core.embeddings import simple_text_embedding, cosine_similarity
+from app.core.vector_codec import encode_vector, stored_vector
 from app.core.summarizer import summarize_learning
 import json
 from datetime import datetime, timedelta
 
 
-def upsert_student_profile_summary(db: Session, user_id: int) -> None:
-    # Get all user data
-    onb = db.query(Onboarding).filter(Onboarding.user_id == user_id).first()
-    plan = db.query(LearningPlan).filter(LearningPlan.user_id == user_id).first()
-    quizzes = db.query(Quiz).filter(Quiz.user_id == user_id).all()
-    
+def build_student_profile_summary(onb, plan, quiz_submissions, summarize=summarize_learning) -> Dict[str, Any]:
+    """Derive the profile summary fields for one student from already loaded rows.
+
+    Kept free of queries so the same logic serves both the single-user upsert
+    and the bulk reindex pipeline.
+    """
     # Extract learning plan data
     months = (plan.plan or {}).get("months", []) if plan and plan.plan else []
     months_completed = sum(1 for m in months if m.get("status") == "completed")
@@ -70,9 +71,6 @@ def upsert_student_profile_summary(db: Session, user_id: int) -> None:
         elif isinstance(onb.career_goals, str):
             interests = [onb.career_goals]
     
-    # Get quiz submissions for performance metrics
-    quiz_submissions = db.query(QuizSubmission).filter(QuizSubmission.user_id == user_id).all()
-    
     # Calculate quiz performance metrics
     quiz_scores = [q.score for q in quiz_submissions if q.score is not None]
     avg_quiz_score = sum(quiz_scores) / len(quiz_scores) if quiz_scores else 0
@@ -118,7 +116,7 @@ def upsert_student_profile_summary(db: Session, user_id: int) -> None:
     
     # Enhanced summary with performance metrics
     summary_parts = [
-        summarize_learning(onboarding_dict, months_completed, ", ".join(skills)),
+        summarize(onboarding_dict, months_completed, ", ".join(skills)),
         f"Learning Progress: {progress_percentage:.1%} ({months_completed}/{total_months} months completed)",
         f"Quiz Performance: {avg_quiz_score:.1%} average ({total_quizzes} quizzes taken)",
         f"Learning Velocity: {learning_velocity:.1f} topics per month",
@@ -127,9 +125,32 @@ def upsert_student_profile_summary(db: Session, user_id: int) -> None:
     
     summary_text = " | ".join(summary_parts)
     
-    # Create comprehensive embedding
+    # Text the embedding is computed from
     embedding_text = f"{summary_text} | skills: {', '.join(skills)} | interests: {', '.join(interests)} | performance: {avg_quiz_score:.2f} | progress: {progress_percentage:.2f}"
-    vector = simple_text_embedding(embedding_text)
+    
+    return {
+        "summary_text": summary_text,
+        "interests": interests,
+        "skills_tags": skills,
+        "embedding_text": embedding_text,
+        "profile_data": profile_data
+    }
+
+
+def upsert_student_profile_summary(db: Session, user_id: int) -> None:
+    # Get all user data
+    onb = db.query(Onboarding).filter(Onboarding.user_id == user_id).first()
+    plan = db.query(LearningPlan).filter(LearningPlan.user_id == user_id).first()
+    quiz_submissions = db.query(QuizSubmission).filter(QuizSubmission.user_id == user_id).all()
+    
+    fields = build_student_profile_summary(onb, plan, quiz_submissions)
+    summary_text = fields["summary_text"]
+    interests = fields["interests"]
+    skills = fields["skills_tags"]
+    profile_data = fields["profile_data"]
+    
+    # Create comprehensive embedding
+    packed = encode_vector(simple_text_embedding(fields["embedding_text"]))
     
     # Update or create profile summary
     row = db.query(StudentProfileSummary).filter(StudentProfileSummary.user_id == user_id).first()
@@ -137,7 +158,11 @@ def upsert_student_profile_summary(db: Session, user_id: int) -> None:
         row.summary_text = summary_text
         row.interests = interests
         row.skills_tags = skills
-        row.vector = vector
+        row.vector = None
+        row.vector_f32 = packed["vector_f32"]
+        row.vector_i8 = packed["vector_i8"]
+        row.vector_scale = packed["vector_scale"]
+        row.updated_at = datetime.utcnow()
         # Store additional profile data as JSON
         if hasattr(row, 'profile_data'):
             row.profile_data = profile_data
@@ -147,8 +172,8 @@ def upsert_student_profile_summary(db: Session, user_id: int) -> None:
             summary_text=summary_text,
             interests=interests,
             skills_tags=skills,
-            vector=vector,
-            graph_neighbors=[]
+            graph_neighbors=[],
+            **packed
         )
         # Add profile_data if the column exists
         if hasattr(row, 'profile_data'):
@@ -320,6 +345,10 @@ def compute_neighbors(db: Session, k: int = 10) -> None:
     from app.models.job import Job
     
     all_rows = db.query(StudentProfileSummary).all()
+    vectors = {}
+    for row in all_rows:
+        vec = stored_vector(row)
+        vectors[row.user_id] = vec.tolist() if vec is not None else []
     
     for src in all_rows:
         scored = []
@@ -337,7 +366,7 @@ def compute_neighbors(db: Session, k: int = 10) -> None:
                 continue
             
             # Use both cosine similarity and AI-enhanced matching
-            cosine_score = cosine_similarity(src.vector or [], dst.vector or [])
+            cosine_score = cosine_similarity(vectors[src.user_id], vectors[dst.user_id])
             
             # Create a mock job based on src user's profile for AI matching
             mock_job = Job(
@@ -412,7 +441,8 @@ def enhanced_candidate_matching(db: Session, job_description: str, requirements:
             print(f"AI matching error for user {user.id}: {e}")
             # Fallback to basic cosine similarity
             job_vec = simple_text_embedding(job_description)
-            candidate_vec = profile.vector or []
+            candidate_vec = stored_vector(profile)
+            candidate_vec = candidate_vec.tolist() if candidate_vec is not None else []
             score = cosine_similarity(job_vec, candidate_vec)
             
             matches.append({
@@ -0,0 +1,73 @@
+import heapq
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class TopK:
+    """Bounded min-heap keeping the ``k`` highest scored items.
+
+    Ties are resolved in favour of the item pushed first, matching what a
+    stable ``sort(reverse=True)`` followed by ``[:k]`` would return.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._seq = count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def full(self) -> bool:
+        return len(self._heap) >= self.k
+
+    def threshold(self) -> Optional[float]:
+        """Score an item must beat to enter, or None while there is room."""
+        return self._heap[0][0] if self.full() else None
+
+    def can_beat(self, bound: float) -> bool:
+        return self.k > 0 and (not self.full() or bound > self._heap[0][0])
+
+    def push(self, score: float, item: Any) -> bool:
+        if self.k <= 0:
+            return False
+        entry = (score, -next(self._seq), item)
+        if not self.full():
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+            return True
+        return False
+
+    def items(self) -> List[Tuple[float, Any]]:
+        """(score, item) pairs, best first."""
+        return [(score, item) for score, _, item in sorted(self._heap, reverse=True)]
+
+
+def select_top_k(candidates: Iterable[Any], k: int, score_fn: Callable[[Any], Optional[Tuple[float, Any]]],
+                 upper_bound_fn: Optional[Callable[[Any], float]] = None,
+                 sorted_by_bound: bool = False) -> Tuple[List[Tuple[float, Any]], Dict[str, int]]:
+    """Score candidates into a bounded heap, skipping ones that cannot make the cut.
+
+    ``score_fn`` returns ``(score, payload)`` or None to drop the candidate.
+    ``upper_bound_fn`` is a cheap ceiling on what ``score_fn`` could return;
+    candidates whose ceiling cannot beat the current k-th best are never
+    scored. When the candidates arrive in descending bound order
+    (``sorted_by_bound``) the first such candidate ends the scan.
+    """
+    top = TopK(k)
+    stats = {"scored": 0, "qualified": 0, "pruned": 0}
+    for candidate in candidates:
+        if upper_bound_fn is not None and top.full() and not top.can_beat(upper_bound_fn(candidate)):
+            stats["pruned"] += 1
+            if sorted_by_bound:
+                break
+            continue
+        stats["scored"] += 1
+        result = score_fn(candidate)
+        if result is None:
+            continue
+        stats["qualified"] += 1
+        top.push(result[0], result[1])
+    return top.items(), stats
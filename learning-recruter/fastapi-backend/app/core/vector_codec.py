@@ -0,0 +1,84 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Rows scored per block in ``quantized_dot``; bounds the int32 temporary
+_BLOCK = 4096
+
+
+def pack_float32(vec) -> bytes:
+    return np.asarray(vec, dtype="<f4").tobytes()
+
+
+def unpack_float32(buf: bytes) -> np.ndarray:
+    """Zero-copy, read-only view of a packed float32 vector."""
+    return np.frombuffer(buf, dtype="<f4")
+
+
+def quantize_int8(vec) -> Tuple[bytes, float]:
+    """Symmetric int8 quantization: ``vec ~= codes * scale``."""
+    arr = np.asarray(vec, dtype=np.float32)
+    peak = float(np.abs(arr).max()) if arr.size else 0.0
+    scale = peak / 127.0 if peak > 0 else 1.0
+    codes = np.clip(np.rint(arr / scale), -127, 127).astype(np.int8)
+    return codes.tobytes(), scale
+
+
+def unpack_int8(buf: bytes) -> np.ndarray:
+    return np.frombuffer(buf, dtype=np.int8)
+
+
+def dequantize_int8(buf: bytes, scale: float) -> np.ndarray:
+    return unpack_int8(buf).astype(np.float32) * np.float32(scale)
+
+
+def encode_vector(vec) -> Dict[str, Any]:
+    """Column values for a vector: packed float32 plus int8 codes and their scale."""
+    codes, scale = quantize_int8(vec)
+    return {"vector_f32": pack_float32(vec), "vector_i8": codes, "vector_scale": scale}
+
+
+def stored_vector(row) -> Optional[np.ndarray]:
+    """Float32 vector of a model row, preferring the packed column over the legacy JSON list."""
+    packed = getattr(row, "vector_f32", None)
+    if packed:
+        return unpack_float32(packed)
+    if getattr(row, "vector", None):
+        return np.asarray(row.vector, dtype=np.float32)
+    return None
+
+
+def stack_rows(buffers: Sequence[bytes], dtype, dim: int) -> np.ndarray:
+    """One (len(buffers), dim) matrix from equally sized packed rows with a single copy."""
+    if not buffers:
+        return np.zeros((0, dim), dtype=dtype)
+    return np.frombuffer(b"".join(buffers), dtype=dtype).reshape(len(buffers), dim)
+
+
+def quantize_rows(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row symmetric int8 quantization of a float matrix."""
+    peaks = np.abs(matrix).max(axis=1) if matrix.size else np.zeros(len(matrix), dtype=np.float32)
+    scales = np.where(peaks > 0, peaks / 127.0, 1.0).astype(np.float32)
+    codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def int8_row_norms(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    squares = np.einsum("ij,ij->i", codes, codes, dtype=np.int64)
+    return np.sqrt(squares).astype(np.float32) * scales
+
+
+def quantized_dot(codes: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Approximate ``dequantized_rows @ query`` with integer arithmetic.
+
+    The query is quantized to int8 as well, so the scan is an int32 dot
+    product per row plus one float multiply; relative error is well under
+    one percent for unit-length embeddings, plenty for a first-pass filter.
+    """
+    q_codes, q_scale = quantize_int8(query)
+    q = np.frombuffer(q_codes, dtype=np.int8).astype(np.int32)
+    out = np.empty(len(codes), dtype=np.float32)
+    for start in range(0, len(codes), _BLOCK):
+        block = codes[start:start + _BLOCK].astype(np.int32)
+        out[start:start + _BLOCK] = (block @ q) * scales[start:start + _BLOCK] * np.float32(q_scale)
+    return out
@@ -4,7 +4,7 @@ from typing import Optional, List, Dict, Any, Union
 import re
 from app.core.google_auth import get_google_oauth2_session
 from app.models.user import User
-from app.database.db import get_db
+from app.database.session_scope import session_scope
 from composio import Composio
 import os
 
@@ -16,8 +16,8 @@ composio = Composio(api_key=COMPOSIO_API_KEY)
 def _get_session_for_user(user_id: int):
     try:
         print(f"Getting session for user {user_id}")
-        db = next(get_db())
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        with session_scope("youtube_services.session_for_user") as db:
+            user = db.query(User).filter(User.id == int(user_id)).first()
         
         if not user:
             print(f"User {user_id} not found in database")
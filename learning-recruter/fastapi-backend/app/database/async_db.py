@@ -0,0 +1,54 @@
+import os
+from functools import lru_cache
+from typing import AsyncIterator
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database.db import DATABASE_URL, ENGINE_OPTIONS
+
+# Backend -> asyncio driver; the sync engine keeps psycopg2 / pysqlite
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+# Defaults to DATABASE_URL with the driver swapped
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+
+
+def async_database_url(url: str) -> str:
+    """``url`` with its driver swapped for the asyncio one, e.g. psycopg2 -> asyncpg."""
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS.values():
+        return url
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+def make_async_engine(url: str, **options) -> AsyncEngine:
+    return create_async_engine(async_database_url(url), **options)
+
+
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """Shared async engine, created on first use so the asyncio driver is only imported when needed."""
+    return make_async_engine(ASYNC_DATABASE_URL or DATABASE_URL, **ENGINE_OPTIONS)
+
+
+@lru_cache(maxsize=None)
+def async_session_factory() -> async_sessionmaker:
+    # No expiry on commit: attribute access after commit would need an awaited refresh
+    return async_sessionmaker(get_async_engine(), expire_on_commit=False, autoflush=False)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """AsyncSession dependency for ``async def`` routes; await its queries instead of blocking the event loop."""
+    async with async_session_factory()() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+        async_session_factory.cache_clear()
+        get_async_engine.cache_clear()
@@ -0,0 +1,128 @@
+import os
+import time
+from typing import Any, Dict, List, Set
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database.db import Base
+
+ALEMBIC_INI = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini"))
+# pg_advisory_lock key shared by every worker running startup migrations
+MIGRATION_LOCK_KEY = 4_823_017
+# Heads before tables were created by migrations; what the old drop-and-recreate startup built
+BASELINE_REVISIONS = ("3223a1adbd71", "add_google_oauth_fields", "add_learning_path_tracking_to_user",
+                      "add_recruiter_tracking", "update_onboarding_schema")
+# Tables the migrations after the baseline create; none of them exist in a baseline-shaped database
+MIGRATED_TABLES = {"reindex_checkpoints", "job_matches", "match_runs", "student_profile_documents",
+                   "student_stats", "learning_plan_days"}
+
+
+def alembic_config(connection: Connection = None) -> Config:
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(os.path.dirname(ALEMBIC_INI), "alembic"))
+    if connection is not None:
+        # env.py runs on this connection instead of the URL in alembic.ini
+        config.attributes["connection"] = connection
+    return config
+
+
+def _current(connection: Connection) -> Set[str]:
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def _lock(connection: Connection, acquire: bool):
+    if connection.dialect.name != "postgresql":
+        return  # SQLite (dev, benchmarks) runs a single worker
+    fn = "pg_advisory_lock" if acquire else "pg_advisory_unlock"
+    connection.execute(text(f"SELECT {fn}(:key)"), {"key": MIGRATION_LOCK_KEY})
+    connection.commit()
+
+
+def missing_columns(connection: Connection) -> Dict[str, List[str]]:
+    """Model columns absent from tables that exist (tables that do not exist are not listed)."""
+    inspector = inspect(connection)
+    existing = set(inspector.get_table_names())
+    missing = {}
+    for name, table in Base.metadata.tables.items():
+        if name in existing:
+            columns = {c["name"] for c in inspector.get_columns(name)}
+            absent = [c.name for c in table.columns if c.name not in columns]
+            if absent:
+                missing[name] = absent
+    return missing
+
+
+def _adopt_unversioned(connection: Connection, config: Config, existing: Set[str]) -> str:
+    """Version a schema built by ``create_all``: migrate a baseline one, stamp a current one, refuse the rest."""
+    if not existing & MIGRATED_TABLES:
+        # Baseline models: run every later migration so columns are added and data backfilled
+        command.stamp(config, list(BASELINE_REVISIONS))
+        command.upgrade(config, "heads")
+        Base.metadata.create_all(bind=connection)
+        missing = missing_columns(connection)
+        if missing:
+            raise RuntimeError(f"Schema still lacks model columns after migrating: {missing}")
+        return "upgraded unversioned baseline schema"
+    missing = missing_columns(connection)
+    if missing:
+        raise RuntimeError(f"Unversioned schema matches neither the baseline nor the models; "
+                           f"missing columns: {missing}")
+    # Built from the current models; tables added since are new, so create_all can add them
+    Base.metadata.create_all(bind=connection)
+    command.stamp(config, "heads")
+    return "stamped unversioned schema"
+
+
+def ensure_schema(engine: Engine) -> Dict[str, Any]:
+    """Bring the database to the migration heads without touching existing data.
+
+    The common case, an up-to-date database, is one read of
+    ``alembic_version``. Otherwise the first worker takes a Postgres
+    advisory lock and applies the pending migrations while the others wait
+    on it and then find nothing left to do. An empty database gets the
+    current models via ``create_all`` and is stamped at the heads.
+
+    A database built by the old drop-and-recreate startup has tables but no
+    version row. If it already has every model column it is stamped at the
+    heads; if it has the baseline tables only, it is stamped at
+    ``BASELINE_REVISIONS`` and migrated, since ``create_all`` never adds
+    columns to existing tables. Anything else refuses to start.
+    """
+    started = time.perf_counter()
+    heads = set(ScriptDirectory.from_config(alembic_config()).get_heads())
+    with engine.connect() as connection:
+        current = _current(connection)
+        connection.commit()
+        if current == heads:
+            return {"action": "up to date", "revisions": sorted(current), "seconds": time.perf_counter() - started}
+
+        _lock(connection, True)
+        try:
+            # Another worker may have migrated while we waited for the lock
+            current = _current(connection)
+            connection.commit()
+            config = alembic_config(connection)
+            if current == heads:
+                action = "up to date"
+            elif current:
+                command.upgrade(config, "heads")
+                action = f"upgraded from {', '.join(sorted(current))}"
+            else:
+                existing = set(inspect(connection).get_table_names())
+                if existing:
+                    action = _adopt_unversioned(connection, config, existing)
+                else:
+                    Base.metadata.create_all(bind=connection)
+                    command.stamp(config, "heads")
+                    action = "created schema"
+            connection.commit()
+        finally:
+            # A failed migration leaves an aborted transaction; the unlock needs a fresh one
+            connection.rollback()
+            _lock(connection, False)
+    return {"action": action, "revisions": sorted(heads), "seconds": time.perf_counter() - started}
@@ -0,0 +1,48 @@
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import CompoundSelect, Select
+
+
+def _is_plain_read(clause) -> bool:
+    if isinstance(clause, CompoundSelect):
+        return True
+    return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+class RoutingSession(Session):
+    """Session that reads from a replica until its first write, then uses the primary for everything.
+
+    Plain SELECTs (ORM queries, lazy loads, ``select()``) go to ``replica``.
+    A flush, an INSERT/UPDATE/DELETE, ``SELECT ... FOR UPDATE`` or raw SQL
+    goes to the primary bind and pins the session there, so the rest of the
+    request reads its own writes instead of a lagging replica. Without a
+    replica it behaves like a plain ``Session``; an explicit ``bind`` in
+``bind_arguments`` always wins.
+    """
+
+    def __init__(self, *args, replica: Optional[Engine] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    @property
+    def pinned_to_primary(self) -> bool:
+        return self.info.get("pinned_to_primary", False)
+
+    def pin_to_primary(self):
+        self.info["pinned_to_primary"] = True
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kw):
+        if bind is not None:
+            # execute(..., bind_arguments={"bind": engine}) picks the engine explicitly
+            return bind
+        if self.replica is None or self.pinned_to_primary:
+            return super().get_bind(mapper, clause=clause, **kw)
+        if self._flushing or (clause is not None and not _is_plain_read(clause)):
+            self.pin_to_primary()
+            return super().get_bind(mapper, clause=clause, **kw)
+        if clause is None:
+            # connection() / get_bind() without a statement, e.g. to look up the dialect
+            return super().get_bind(mapper, **kw)
+        return self.replica
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, func, literal, select
+from sqlalchemy.orm import Session
+
+
+def server_now(db: Session):
+    """SQL for the database server's current UTC time, stored like ``datetime.utcnow()`` values.
+
+    Timestamps several workers compare (heartbeats, change watermarks) are
+    taken from this one clock, so skew between app hosts does not matter.
+    Postgres reads the wall clock at the statement, not the transaction
+    start; SQLite gets the microsecond text layout SQLAlchemy writes, so
+    values round-trip and compare equal.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.timezone("UTC", func.clock_timestamp(), type_=DateTime)
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m-%d %H:%M:%f000", "now", type_=DateTime)
+    return literal(datetime.utcnow(), DateTime)
+
+
+def read_server_now(db: Session) -> datetime:
+    """The database server's current UTC time, e.g. to compute a cutoff for ``server_now`` stamps."""
+    return db.execute(select(server_now(db))).scalar()
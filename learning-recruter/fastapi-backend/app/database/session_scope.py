@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.database.db import SessionLocal, engine, replica_engine
+
+# Sessions and pooled connections held longer than this are reported as leaks
+LEAK_THRESHOLD_SECONDS = float(os.getenv("DB_LEAK_THRESHOLD_SECONDS", "30"))
+LEAK_CHECK_INTERVAL_SECONDS = float(os.getenv("DB_LEAK_CHECK_INTERVAL_SECONDS", "10"))
+
+_lock = threading.Lock()
+# id -> {"label", "since", "thread"} of open session scopes and checked-out pool connections
+_open_scopes: Dict[int, Dict[str, Any]] = {}
+_checked_out: Dict[int, Dict[str, Any]] = {}
+_counters = {"checkouts": 0, "checkins": 0, "scopes_opened": 0, "scopes_closed": 0}
+_reported = set()
+_instrumented = set()
+_detector: Optional[threading.Thread] = None
+_stop = threading.Event()
+# Label of the innermost session scope on this thread, attached to the connections it checks out
+_current = threading.local()
+
+
+def _holder(label: str) -> Dict[str, Any]:
+    return {"label": label, "since": time.monotonic(), "thread": threading.current_thread().name}
+
+
+def instrument_pool(target: Engine, name: str = "primary"):
+    """Count checkouts/checkins of ``target``'s pool and remember who holds each connection."""
+    def on_checkout(dbapi_connection, record, proxy):
+        with _lock:
+            _counters["checkouts"] += 1
+            scope = getattr(_current, "label", None)
+            _checked_out[id(record)] = _holder(f"{name} ({scope})" if scope else name)
+
+    def on_checkin(dbapi_connection, record):
+        with _lock:
+            _counters["checkins"] += 1
+            _checked_out.pop(id(record), None)
+
+    def on_detach(dbapi_connection, record):
+        with _lock:
+            _checked_out.pop(id(record), None)
+
+    if id(target) in _instrumented:
+        return
+    _instrumented.add(id(target))
+    event.listen(target, "checkout", on_checkout)
+    event.listen(target, "checkin", on_checkin)
+    event.listen(target, "detach", on_detach)
+
+
+instrument_pool(engine)
+if replica_engine is not None:
+    instrument_pool(replica_engine, "replica")
+
+
+@contextmanager
+def session_scope(label: str, commit: bool = False, bind: Optional[Engine] = None) -> Iterator[Session]:
+    """Session for code outside a request (threads, helpers): rolled back on error, always closed.
+
+    Rows loaded inside the scope stay readable after it closes (they are
+    detached, not expired), so helpers can look up a user and use its
+    columns afterwards without holding a pooled connection. ``bind``
+    overrides the primary engine, e.g. to follow the caller's session.
+    """
+    db = SessionLocal(bind=bind) if bind is not None else SessionLocal()
+    key = id(db)
+    outer, _current.label = getattr(_current, "label", None), label
+    with _lock:
+        _counters["scopes_opened"] += 1
+        _open_scopes[key] = _holder(label)
+    try:
+        yield db
+        if commit:
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        _current.label = outer
+        with _lock:
+            _counters["scopes_closed"] += 1
+            _open_scopes.pop(key, None)
+
+
+def pool_stats(target: Optional[Engine] = None) -> Dict[str, Any]:
+    """Checkout/checkin counters, connections currently out and open session scopes."""
+    with _lock:
+        stats = dict(_counters)
+        stats["checked_out"] = len(_checked_out)
+        stats["open_scopes"] = sorted(s["label"] for s in _open_scopes.values())
+    stats["pool"] = (target or engine).pool.status()
+    return stats
+
+
+def find_leaks(threshold: float = LEAK_THRESHOLD_SECONDS) -> List[Dict[str, Any]]:
+    """Session scopes and pooled connections held for longer than ``threshold`` seconds."""
+    now = time.monotonic()
+    leaks = []
+    with _lock:
+        for kind, held in (("session", _open_scopes), ("connection", _checked_out)):
+            for key, holder in held.items():
+                seconds = now - holder["since"]
+                if seconds > threshold:
+                    leaks.append({"kind": kind, "key": key, "label": holder["label"],
+                                  "thread": holder["thread"], "held_seconds": round(seconds, 1)})
+    return leaks
+
+
+def report_leaks(threshold: float = LEAK_THRESHOLD_SECONDS) -> List[Dict[str, Any]]:
+    """Log leaks not reported before and return them."""
+    fresh = []
+    for leak in find_leaks(threshold):
+        if (leak["kind"], leak["key"]) in _reported:
+            continue
+        _reported.add((leak["kind"], leak["key"]))
+        fresh.append(leak)
+        print(f"⚠️ DB {leak['kind']} '{leak['label']}' held {leak['held_seconds']}s "
+              f"on thread {leak['thread']} (threshold {threshold:g}s)")
+    # Forget released holders so a reused id is reported again
+    with _lock:
+        live = {("session", k) for k in _open_scopes} | {("connection", k) for k in _checked_out}
+    _reported.intersection_update(live)
+    return fresh
+
+
+def start_leak_detector(interval: float = LEAK_CHECK_INTERVAL_SECONDS,
+                        threshold: float = LEAK_THRESHOLD_SECONDS) -> threading.Thread:
+    """Daemon thread that calls ``report_leaks`` every ``interval`` seconds."""
+    global _detector
+    if _detector is not None and _detector.is_alive():
+        return _detector
+    _stop.clear()
+
+    def run():
+        while not _stop.wait(interval):
+            try:
+                report_leaks(threshold)
+            except Exception as e:
+                print(f"❌ Leak detector error: {e}")
+
+    _detector = threading.Thread(target=run, name="db-leak-detector", daemon=True)
+    _detector.start()
+    print(f"🔍 DB leak detector started (threshold {threshold:g}s)")
+    return _detector
+
+
+def stop_leak_detector():
+    _stop.set()
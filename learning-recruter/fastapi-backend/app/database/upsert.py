@@ -0,0 +1,17 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+
+def upsert_insert(db: Session, model):
+    """``INSERT`` for ``model`` that supports ``on_conflict_do_update`` on the session's primary dialect.
+
+    Postgres in production, SQLite in benchmarks; both spell the upsert as
+    ``INSERT ... ON CONFLICT (...) DO UPDATE``.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return pg_insert(model)
+    if dialect == "sqlite":
+        return sqlite_insert(model)
+    raise NotImplementedError(f"No ON CONFLICT upsert for dialect {dialect}")
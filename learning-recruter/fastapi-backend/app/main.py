@@ -1,10 +1,14 @@
+import time
+# Taken before the route imports so the ready log covers them
+STARTED_AT = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import auth, onboarding, youtube_schedule, chatbot, call_bot, voice_webhook, recruiter
 from app.routes import learning_plan, subplans
 from app.routes import quiz
-from app.database.db import create_tables, engine, Base
-from sqlalchemy import text
+from app.database.db import engine
+from fastapi.concurrency import run_in_threadpool
 
 app = FastAPI(title="EduAI Learning Platform", version="1.0.0")
 
@@ -31,24 +35,33 @@ app.include_router(recruiter.router, tags=["Recruiter"])
 
 @app.on_event("startup")
 async def startup_event():
-    """Fresh database setup: drop and recreate all tables on startup"""
+    """Apply pending migrations (never drops data) and report time to ready"""
     try:
-        print("🔄 Fresh database setup - dropping and recreating all tables...")
-        
         # Import all models to ensure they're registered
-        from app.models import user, onboarding, learning_plan, job, email_application, candidate_vector, quiz, shortlist
-        
-        # Drop all tables and recreate them fresh
-        print("🗑️ Dropping all existing tables...")
-        Base.metadata.drop_all(bind=engine)
-        print("✅ All tables dropped")
-        
-        print("🔨 Creating all tables fresh...")
-        Base.metadata.create_all(bind=engine)
-        print("✅ All tables created fresh")
+        from app.models import user, onboarding, learning_plan, learning_path, job, email_application, candidate_vector, quiz, shortlist
+        from app.models import student_profile_summary, youtube_schedule, reindex_checkpoint, job_match, match_run, student_profile_document, student_stats
+        from app.database.migrations import ensure_schema
+        from app.database.session_scope import start_leak_detector
         
+        result = await run_in_threadpool(ensure_schema, engine)
+        print(f"✅ Schema {result['action']} at {', '.join(result['revisions'])} ({result['seconds'] * 1000:.0f} ms)")
+        # Runs whose worker stopped beating will never finish
+        from app.services.match_jobs import match_job_manager
+        await run_in_threadpool(match_job_manager.fail_orphaned_runs)
+        start_leak_detector()
     except Exception as e:
-        print(f"❌ Error during table creation: {e}")
+        print(f"❌ Schema check failed: {e}")
+        raise
+    print(f"🚀 Ready in {(time.perf_counter() - STARTED_AT) * 1000:.0f} ms since import")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the leak detector and close the async engine's connections"""
+    from app.database.async_db import dispose_async_engine
+    from app.database.session_scope import stop_leak_detector
+    stop_leak_detector()
+    await dispose_async_engine()
 
 
 
@@ -60,3 +73,12 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/db")
+def db_health_check():
+    """Pool checkout counters, sessions held past the leak threshold and plan JSON bytes written"""
+    from app.database.session_scope import find_leaks, pool_stats
+    from app.services.plan_mutations import write_stats
+    leaks = find_leaks()
+    return {"status": "leaking" if leaks else "healthy", "pool": pool_stats(), "leaks": leaks,
+            "plan_writes": write_stats()}
+
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, LargeBinary
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 from app.database.db import Base
@@ -9,9 +9,13 @@ class CandidateVector(Base):
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
-    vector = Column(JSONB)  # store as list[float] for portability
+    vector = Column(JSONB)  # legacy list[float]; superseded by vector_f32
+    vector_f32 = Column(LargeBinary, nullable=True)  # packed little-endian float32
+    vector_i8 = Column(LargeBinary, nullable=True)   # int8 codes, vector ~= codes * vector_scale
+    vector_scale = Column(Float, nullable=True)
     summary_text = Column(String)
     skills_tags = Column(JSONB)  # list[str]
+    embedding_version = Column(String, nullable=True)  # embedder that produced `vector`; NULL = hash embedding
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
 
@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from app.database.db import Base
 from datetime import datetime
 
 class EmailApplication(Base):
     __tablename__ = "email_applications"
+    __table_args__ = (Index("ix_email_applications_recruiter_received", "recruiter_id", "received_at", "id"),)
     
     id = Column(Integer, primary_key=True, index=True)
     recruiter_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -7,7 +7,7 @@ class Job(Base):
     __tablename__ = "jobs"
     
     id = Column(Integer, primary_key=True, index=True)
-    recruiter_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    recruiter_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     title = Column(String(200), nullable=False)
     description = Column(Text, nullable=False)
     requirements = Column(JSON, default=[])
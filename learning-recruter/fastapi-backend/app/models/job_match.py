@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Index
+from datetime import datetime
+from app.database.db import Base
+
+
+class JobMatch(Base):
+    __tablename__ = "job_matches"
+    __table_args__ = (Index("ix_job_matches_job_rank", "job_id", "rank"),)
+
+    id = Column(Integer, primary_key=True)
+    recruiter_id = Column(Integer, ForeignKey("users.id"), index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    rank = Column(Integer)
+    score = Column(Integer)            # final 0-100 score returned to recruiters
+    prior_score = Column(Float)        # fused ranking prior, 0-100
+    llm_score = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
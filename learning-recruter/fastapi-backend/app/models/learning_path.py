@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database.db import Base
@@ -6,6 +6,7 @@ from app.database.db import Base
 
 class LearningPath(Base):
     __tablename__ = "learning_paths"
+    __table_args__ = (Index("ix_learning_paths_plan_month", "plan_id", "global_month_index"),)
 
     id = Column(Integer, primary_key=True)
     plan_id = Column(Integer, ForeignKey("learning_plans.id"), index=True)
@@ -41,6 +42,7 @@ class LearningPath(Base):
 
 class DayProgress(Base):
     __tablename__ = "day_progress"
+    __table_args__ = (Index("ix_day_progress_user_plan_day", "user_id", "plan_id", "month_index", "day_number"),)
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -9,13 +9,39 @@ class LearningPlan(Base):
     __tablename__ = "learning_plans"
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     title = Column(String, default="Personalized Learning Plan")
     total_years = Column(Integer)
-    plan = Column(JSONB)  # { months: [{ index, title, goals, topics, status, days?: [...], days_generated?: boolean }] }
+    plan = Column(JSONB)  # { months: [{ index, title, goals, topics, status, days_generated?: boolean }] }; days live in learning_plan_days
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
 
     user = relationship("User", back_populates="learning_plans")
 
 
+class LearningPlanDay(Base):
+    """One day of a learning plan month; updated on its own instead of rewriting the plan JSON."""
+    __tablename__ = "learning_plan_days"
+    __table_args__ = (UniqueConstraint("plan_id", "month_index", "day_number", name="uq_learning_plan_day"),)
+
+    id = Column(Integer, primary_key=True)
+    plan_id = Column(Integer, ForeignKey("learning_plans.id"), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    month_index = Column(Integer)  # 1-based month of the plan
+    day_number = Column(Integer)   # 1-based day of the month
+
+    concept = Column(String)
+    status = Column(String, default="locked")  # locked, active, completed
+    completed = Column(Boolean, default=False)
+    time_estimate = Column(Integer, nullable=True)  # minutes
+    quiz_id = Column(Integer, nullable=True)
+    quiz_min_score = Column(Integer, nullable=True)
+    quiz_score = Column(Integer, nullable=True)
+    quiz_attempts = Column(Integer, nullable=True)
+    # None is stored as SQL NULL (not JSON null), so "detail IS NULL" finds days not generated yet
+    detail = Column(JSONB(none_as_null=True), nullable=True)  # generated study plan for the day, loaded only when asked for
+    extra = Column(JSONB(none_as_null=True), nullable=True)   # any other keys of the day
+
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
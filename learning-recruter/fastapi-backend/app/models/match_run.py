@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Boolean, Integer, String, Text, DateTime, JSON, ForeignKey, false
+from datetime import datetime
+from app.database.db import Base
+
+
+class MatchRun(Base):
+    __tablename__ = "match_runs"
+
+    id = Column(String(36), primary_key=True)  # uuid4 handed back to the recruiter
+    recruiter_id = Column(Integer, ForeignKey("users.id"), index=True)
+    status = Column(String(20), default="queued")  # queued, running, completed, cancelled, failed
+    job_description = Column(Text, nullable=False)
+    params = Column(JSON, default={})  # requirements, company, location, weights, fusion
+    total = Column(Integer, default=0)  # candidates sent to the LLM stage
+    scored = Column(Integer, default=0)
+    results = Column(JSON, nullable=True)  # partial ranking while running, final matches once the run ends
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # bumped on every progress write
+    cancel_requested = Column(Boolean, nullable=False, default=False, server_default=false())  # set by any worker
+    worker_id = Column(String(100), nullable=True)  # process executing the run
+    heartbeat_at = Column(DateTime, nullable=True)  # database clock, refreshed while that process holds the run
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 from app.database.db import Base
@@ -6,6 +6,7 @@ from app.database.db import Base
 
 class Quiz(Base):
     __tablename__ = "quizzes"
+    __table_args__ = (Index("ix_quizzes_plan_month_day", "plan_id", "month_index", "day"),)
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
@@ -20,6 +21,11 @@ class Quiz(Base):
 
 class QuizSubmission(Base):
     __tablename__ = "quiz_submissions"
+    __table_args__ = (
+        Index("ix_quiz_submissions_user_quiz", "user_id", "quiz_id"),
+        Index("ix_quiz_submissions_user_plan_day", "user_id", "plan_id", "month_index", "day"),
+        Index("ix_quiz_submissions_user_created", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), index=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from datetime import datetime
+from app.database.db import Base
+
+
+class ReindexCheckpoint(Base):
+    __tablename__ = "reindex_checkpoints"
+
+    id = Column(Integer, primary_key=True)
+    job_name = Column(String, unique=True, nullable=False)
+    status = Column(String, default="idle")  # idle, running, paused, completed, failed
+    last_user_id = Column(Integer, default=0)  # every student id <= this has been reindexed
+    processed = Column(Integer, default=0)
+    total = Column(Integer, default=0)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+    error = Column(Text, nullable=True)
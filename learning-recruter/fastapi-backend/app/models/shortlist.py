@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Text, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Text, String, Index
 from sqlalchemy.orm import relationship
 from app.database.db import Base
 from datetime import datetime
 
 class Shortlist(Base):
     __tablename__ = "shortlists"
+    __table_args__ = (
+        Index("ix_shortlists_recruiter_job_student", "recruiter_id", "job_id", "student_id"),
+        Index("ix_shortlists_recruiter_job_created", "recruiter_id", "job_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     recruiter_id = Column(Integer, ForeignKey("users.id"), nullable=False)
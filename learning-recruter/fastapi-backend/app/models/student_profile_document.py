@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+from app.database.db import Base
+
+
+class StudentProfileDocument(Base):
+    __tablename__ = "student_profile_documents"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, index=True)
+    version = Column(Integer, default=1)          # bumped every time the document is regenerated
+    schema_version = Column(Integer, default=1)   # layout of ``document``; older layouts are rebuilt on read
+    stale = Column(Boolean, default=False, index=True)  # set when an input row changes
+    document = Column(JSONB)       # normalized skills, stats, learning and social summary
+    prompt_text = Column(Text)     # prompt-ready profile text
+    token_count = Column(Integer)
+    updated_at = Column(DateTime, default=datetime.utcnow, index=True)  # database clock; moves on every stale mark and rebuild
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, LargeBinary
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 from app.database.db import Base
@@ -12,7 +12,10 @@ class StudentProfileSummary(Base):
     summary_text = Column(String)
     interests = Column(JSONB)          # list[str]
     skills_tags = Column(JSONB)        # list[str]
-    vector = Column(JSONB)             # list[float]
+    vector = Column(JSONB)             # legacy list[float]; superseded by vector_f32
+    vector_f32 = Column(LargeBinary, nullable=True)  # packed little-endian float32
+    vector_i8 = Column(LargeBinary, nullable=True)   # int8 codes, vector ~= codes * vector_scale
+    vector_scale = Column(Float, nullable=True)
     graph_neighbors = Column(JSONB)    # [{user_id, weight}] precomputed related
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
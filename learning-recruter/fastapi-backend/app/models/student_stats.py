@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Float, Boolean, ForeignKey, DateTime
+from datetime import datetime
+from app.database.db import Base
+
+
+class StudentStats(Base):
+    __tablename__ = "student_stats"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, index=True)
+
+    # Quiz aggregates over all submissions
+    quiz_count = Column(Integer, default=0)
+    passed_quizzes = Column(Integer, default=0)
+    avg_quiz_score = Column(Float, default=0)
+
+    # Progress through the student's first learning plan
+    total_months = Column(Integer, default=0)
+    completed_months = Column(Integer, default=0)
+    learning_progress = Column(Float, default=0, index=True)  # % of months completed
+    current_month = Column(Integer, default=1)
+    current_day = Column(Integer, default=1)
+    has_plan = Column(Boolean, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow)
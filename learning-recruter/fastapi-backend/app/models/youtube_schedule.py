@@ -8,7 +8,7 @@ class YouTubeSchedule(Base):
     __tablename__ = "youtube_schedules"
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     playlist_id = Column(String)
     playlist_url = Column(String)
     playlist_title = Column(String)
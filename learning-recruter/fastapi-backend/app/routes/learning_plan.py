@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, Any
 import threading
 from app.database.db import get_db
+from app.database.session_scope import session_scope
+from app.database.async_db import get_async_db
 from app.models.user import User
 from app.models.onboarding import Onboarding
 from app.models.learning_plan import LearningPlan
@@ -16,6 +19,9 @@ from app.core.gemini_ai import chatbot
 from datetime import datetime
 # Removed recruiter dependency
 from app.core.summary_service import upsert_student_profile_summary
+from app.services.student_stats import update_student_stats
+from app.services.plan_days import load_plan, store_plan
+from app.services.plan_mutations import set_month_fields
 from app.core.composio_service import composio_auth
 
 
@@ -24,12 +30,12 @@ bearer_scheme = HTTPBearer()
 
 
 @router.get("/user/current-position")
-def get_current_learning_position(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)):
+async def get_current_learning_position(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: AsyncSession = Depends(get_async_db)):
     user_id = decode_token(credentials.credentials)
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -42,9 +48,10 @@ def get_current_learning_position(credentials: HTTPAuthorizationCredentials = De
     
     # Get additional context if plan exists
     if user.current_plan_id:
-        plan = db.query(LearningPlan).filter(LearningPlan.id == user.current_plan_id).first()
+        plan = await db.get(LearningPlan, user.current_plan_id)
         if plan and isinstance(plan.plan, dict) and "months" in plan.plan:
-            months = plan.plan.get("months", [])
+            document = await db.run_sync(load_plan, plan, [user.current_month_index or 1], False)
+            months = document["months"]
             if user.current_month_index and 1 <= user.current_month_index <= len(months):
                 month = months[user.current_month_index - 1]
                 current_position["current_month_title"] = month.get("title")
@@ -185,7 +192,6 @@ def generate_learning_plan(credentials: HTTPAuthorizationCredentials = Depends(b
             month = {
                 **m,
                 "status": month_status,
-                "days": [],
                 "days_generated": False
             }
             months.append(month)
@@ -197,6 +203,7 @@ def generate_learning_plan(credentials: HTTPAuthorizationCredentials = Depends(b
             plan={"months": months}
         )
         db.add(plan)
+        update_student_stats(db, [user.id])
         db.commit()
         db.refresh(plan)
 
@@ -220,7 +227,7 @@ def generate_learning_plan(credentials: HTTPAuthorizationCredentials = Depends(b
         db.commit()
 
         # Pre-generate first month's 30 days and day 1 detail
-        months = plan.plan.get("months", [])
+        months = load_plan(db, plan, [1])["months"]
         if months:
             first_month = months[0]
             try:
@@ -256,7 +263,7 @@ def generate_learning_plan(credentials: HTTPAuthorizationCredentials = Depends(b
                     except Exception as e:
                         print(f"Error generating day 1 detail/quiz: {str(e)}")
                 months[0] = first_month
-                plan.plan = {"months": months}
+                store_plan(db, plan, {"months": months})
                 db.commit()
                 db.refresh(plan)
             except Exception as e:
@@ -266,6 +273,7 @@ def generate_learning_plan(credentials: HTTPAuthorizationCredentials = Depends(b
         user.current_plan_id = plan.id
         user.current_month_index = 1
         user.current_day = 1
+        update_student_stats(db, [user.id])
         db.commit()
 
         # Google Drive: create root folder EDUAI_NAME_LEARNING_MAIN_PATH
@@ -281,7 +289,7 @@ def generate_learning_plan(credentials: HTTPAuthorizationCredentials = Depends(b
             user_id=plan.user_id,
             title=plan.title,
             total_years=plan.total_years,
-            plan=plan.plan
+            plan=load_plan(db, plan)
         )
     except HTTPException:
         raise
@@ -380,7 +388,7 @@ def start_next_month(plan_id: int, credentials: HTTPAuthorizationCredentials = D
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
 
-    months = plan.plan.get("months", [])
+    months = load_plan(db, plan, detail=False)["months"]
     # Disallow starting if an active month exists
     if any((m.get("status") == "active") for m in months):
         raise HTTPException(status_code=400, detail="An active month already exists")
@@ -394,7 +402,7 @@ def start_next_month(plan_id: int, credentials: HTTPAuthorizationCredentials = D
             break
 
     if start_idx is None:
-        return {"message": "All months completed", "plan": plan.plan}
+        return {"message": "All months completed", "plan": load_plan(db, plan)}
 
     # Generate days if not present
     month = months[start_idx]
@@ -411,17 +419,18 @@ def start_next_month(plan_id: int, credentials: HTTPAuthorizationCredentials = D
         elif i > start_idx and m.get("status") != "completed":
             m["status"] = "locked"
 
-    # Ensure JSON shape is a dict with months array only
-    plan.plan = {"months": [dict(m) for m in months]}
+    # Month fields go to the plan JSON, days to their rows
+    store_plan(db, plan, {"months": months})
     # Update LearningPath status
     active_path = db.query(LearningPath).filter(LearningPath.plan_id == plan.id, LearningPath.global_month_index == (start_idx + 1)).first()
     if active_path:
         from datetime import datetime
         active_path.status = "active"
         active_path.started_at = datetime.utcnow()
+    update_student_stats(db, [plan.user_id])
     db.commit()
     db.refresh(plan)
-    return {"message": "Month started", "plan": plan.plan}
+    return {"message": "Month started", "plan": load_plan(db, plan)}
 
 
 @router.post("/learning-plan/{plan_id}/start-month/{month_index}")
@@ -434,7 +443,7 @@ def start_month(plan_id: int, month_index: int, credentials: HTTPAuthorizationCr
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
 
-    months = plan.plan.get("months", [])
+    months = load_plan(db, plan, [month_index], detail=False)["months"]
     if month_index < 1 or month_index > len(months):
         raise HTTPException(status_code=400, detail="Invalid month index")
 
@@ -444,6 +453,10 @@ def start_month(plan_id: int, month_index: int, credentials: HTTPAuthorizationCr
     if month.get("status") == "completed":
         raise HTTPException(status_code=400, detail="Month already completed")
     
+    # Activate this month
+    activated = {"status": "active", "started_at": datetime.utcnow().isoformat()}
+    month.update(activated)
+    
     # Generate days if not already generated
     if not month.get("days") or len(month.get("days", [])) == 0:
         onboarding = db.query(Onboarding).filter(Onboarding.user_id == int(user_id)).first()
@@ -453,14 +466,13 @@ def start_month(plan_id: int, month_index: int, credentials: HTTPAuthorizationCr
         # Generate 30 days for this month
         month["days"] = _generate_days_for_month_via_ai(month, onboarding)
         month["days_generated"] = True
-
-    # Activate this month
-    month["status"] = "active"
-    month["started_at"] = datetime.utcnow().isoformat()
-    
-    # Update the plan in database
-    months[month_index - 1] = month
-    plan.plan = {"months": months}
+        
+        # New days go to their rows, the month fields to the plan JSON
+        months[month_index - 1] = month
+        store_plan(db, plan, {"months": months})
+    else:
+        # Only the two month fields change; set them in place instead of syncing the month's days
+        set_month_fields(db, plan, month_index, **activated)
     
     # Update LearningPath status
     learning_path = db.query(LearningPath).filter(
@@ -492,13 +504,14 @@ def start_month(plan_id: int, month_index: int, credentials: HTTPAuthorizationCr
     except Exception as gerr:
         print(f"Drive month folder create error: {gerr}")
     
+    update_student_stats(db, [int(user_id)])
     db.commit()
     db.refresh(plan)
     
     return {
         "message": f"Month {month_index} started successfully",
         "month": month,
-        "plan": plan.plan
+        "plan": load_plan(db, plan)
     }
 
 
@@ -512,7 +525,7 @@ def get_month_days(plan_id: int, month_index: int, credentials: HTTPAuthorizatio
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
     
-    months = plan.plan.get("months", [])
+    months = load_plan(db, plan, [month_index])["months"]
     if month_index < 1 or month_index > len(months):
         raise HTTPException(status_code=400, detail="Invalid month index")
     
@@ -529,7 +542,7 @@ def get_month_days(plan_id: int, month_index: int, credentials: HTTPAuthorizatio
         month["days"] = _generate_days_for_month_via_ai(month, onboarding)
         month["days_generated"] = True
         months[month_index - 1] = month
-        plan.plan = {"months": [dict(m) for m in months]}
+        store_plan(db, plan, {"months": months})
         db.commit()
         db.refresh(plan)
         days = month["days"]
@@ -543,7 +556,7 @@ def activate_month(plan_id: int, month_index: int, credentials: HTTPAuthorizatio
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
 
-    months = plan.plan.get("months", [])
+    months = load_plan(db, plan, [])["months"]
     if month_index < 1 or month_index > len(months):
         raise HTTPException(status_code=400, detail="Invalid month index")
 
@@ -551,10 +564,10 @@ def activate_month(plan_id: int, month_index: int, credentials: HTTPAuthorizatio
     for i, m in enumerate(months, start=1):
         m["status"] = "active" if i == month_index else (m.get("status") if i < month_index and m.get("status") == "completed" else "locked")
 
-    plan.plan["months"] = months
+    store_plan(db, plan, {"months": months})
     db.commit()
     db.refresh(plan)
-    return {"message": "Month activated", "plan": plan.plan}
+    return {"message": "Month activated", "plan": load_plan(db, plan)}
 
 
 @router.post("/learning-plan/{plan_id}/generate-days/{month_index}")
@@ -563,7 +576,7 @@ def generate_days_for_month(plan_id: int, month_index: int, credentials: HTTPAut
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
 
-    months = plan.plan.get("months", [])
+    months = load_plan(db, plan, [month_index], detail=False)["months"]
     if month_index < 1 or month_index > len(months):
         raise HTTPException(status_code=400, detail="Invalid month index")
 
@@ -574,10 +587,10 @@ def generate_days_for_month(plan_id: int, month_index: int, credentials: HTTPAut
         raise HTTPException(status_code=400, detail="Onboarding data required")
     month["days"] = _generate_days_for_month_via_ai(month, onboarding)
     months[month_index - 1] = month
-    plan.plan = {"months": [dict(m) for m in months]}
+    store_plan(db, plan, {"months": months})
     db.commit()
     db.refresh(plan)
-    return {"message": "Days generated", "plan": plan.plan}
+    return {"message": "Days generated", "plan": load_plan(db, plan)}
 
 
 def _generate_day_detail_via_ai(month: dict, day: dict, onboarding: Onboarding) -> dict:
@@ -646,7 +659,7 @@ def start_day(plan_id: int, month_index: int, day: int, credentials: HTTPAuthori
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found or unauthorized access")
 
-    months = plan.plan.get("months", [])
+    months = load_plan(db, plan, [month_index])["months"]
     if month_index < 1 or month_index > len(months):
         raise HTTPException(status_code=400, detail="Invalid month index")
 
@@ -674,7 +687,7 @@ def start_day(plan_id: int, month_index: int, day: int, credentials: HTTPAuthori
                 days[day - 2]["completed_at"] = datetime.utcnow().isoformat()
                 month["days"] = days
                 months[month_index - 1] = month
-                plan.plan = {"months": months}
+                store_plan(db, plan, {"months": months})
                 db.commit()
             else:
                 raise HTTPException(status_code=400, detail="Complete previous day first")
@@ -751,7 +764,7 @@ def start_day(plan_id: int, month_index: int, day: int, credentials: HTTPAuthori
     # Update the plan in database
     month["days"] = days
     months[month_index - 1] = month
-    plan.plan = {"months": months}
+    store_plan(db, plan, {"months": months})
     
     # Update LearningPath current day
     learning_path = db.query(LearningPath).filter(
@@ -802,10 +815,17 @@ def start_day(plan_id: int, month_index: int, day: int, credentials: HTTPAuthori
         print(f"Drive/Calendar day assets error: {gerr}")
     
     # GitHub: create learning repo and add daily notes (background)
+    # The request's session is closed by the time the thread runs, so it loads the user itself
+    github_user_id = int(user_id)
+
     def _github_background_task():
         try:
-            user_email = user.email
-            user_name = (user.google_name or user.email or 'USER').split(' ')[0] if user else 'USER'
+            with session_scope("learning_plan.github_notes") as thread_db:
+                thread_user = thread_db.query(User).filter(User.id == github_user_id).first()
+            if not thread_user:
+                return
+            user_email = thread_user.email
+            user_name = (thread_user.google_name or thread_user.email or 'USER').split(' ')[0]
             day_concept = days[day - 1].get('concept', '')
             day_detail = days[day - 1].get('detail') or {}
             
@@ -828,13 +848,14 @@ def start_day(plan_id: int, month_index: int, day: int, credentials: HTTPAuthori
     
     threading.Thread(target=_github_background_task, daemon=True).start()
     
+    update_student_stats(db, [int(user_id)])
     db.commit()
     db.refresh(plan)
     
     return {
         "message": f"Day {day} started successfully",
         "day": days[day - 1],
-        "plan": plan.plan
+        "plan": load_plan(db, plan)
     }
 
 
@@ -855,7 +876,7 @@ def complete_day(plan_id: int, month_index: int, day: int, score: int, credentia
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found or unauthorized access")
 
-    months = plan.plan.get("months", [])
+    months = load_plan(db, plan, detail=False)["months"]
     if month_index < 1 or month_index > len(months):
         raise HTTPException(status_code=400, detail="Invalid month index")
 
@@ -903,7 +924,7 @@ def complete_day(plan_id: int, month_index: int, day: int, score: int, credentia
         
         month["days"] = days
         # Update the plan to save the attempt
-        plan.plan = {"months": [dict(m) for m in months]}
+        store_plan(db, plan, {"months": months})
         db.commit()
         
         # Determine message based on attempts
@@ -1064,10 +1085,11 @@ def complete_day(plan_id: int, month_index: int, day: int, score: int, credentia
             user.current_day = next_day
 
     months[month_index - 1] = month
-    plan.plan = {"months": [dict(m) for m in months]}
+    store_plan(db, plan, {"months": months})
+    update_student_stats(db, [int(user_id)])
     db.commit()
     db.refresh(plan)
-    return {"message": "Day completed", "plan": plan.plan}
+    return {"message": "Day completed", "plan": load_plan(db, plan)}
 
 
 @router.get("/learning-plan", response_model=LearningPlanResponse)
@@ -1081,7 +1103,8 @@ def get_learning_plan(credentials: HTTPAuthorizationCredentials = Depends(bearer
         raise HTTPException(status_code=404, detail="Learning plan not found")
     
     # Always fetch fresh data from database and ensure days_generated tracking
-    months = plan.plan.get("months", []) if isinstance(plan.plan, dict) else []
+    document = load_plan(db, plan)
+    months = document["months"]
     updated = False
     
     for i, m in enumerate(months):
@@ -1107,7 +1130,7 @@ def get_learning_plan(credentials: HTTPAuthorizationCredentials = Depends(bearer
                 updated = True
     
     if updated:
-        plan.plan = {"months": months}
+        store_plan(db, plan, {"months": months})
         db.commit()
         db.refresh(plan)
     
@@ -1124,7 +1147,7 @@ def get_learning_plan(credentials: HTTPAuthorizationCredentials = Depends(bearer
         user_id=plan.user_id,
         title=plan.title,
         total_years=plan.total_years,
-        plan=plan.plan
+        plan=document
     )
     
     # Add current position to response
@@ -1143,7 +1166,8 @@ def get_learning_plan_by_id(plan_id: int, credentials: HTTPAuthorizationCredenti
     plan = db.query(LearningPlan).filter(LearningPlan.id == plan_id, LearningPlan.user_id == int(user_id)).first()
     if not plan:
         raise HTTPException(status_code=404, detail="Learning plan not found")
-    months = plan.plan.get("months", []) if isinstance(plan.plan, dict) else []
+    document = load_plan(db, plan)
+    months = document["months"]
     updated = False
     for i, m in enumerate(months):
         # Check if days are generated for active months
@@ -1167,7 +1191,7 @@ def get_learning_plan_by_id(plan_id: int, credentials: HTTPAuthorizationCredenti
                 months[i] = m
                 updated = True
     if updated:
-        plan.plan = {"months": months}
+        store_plan(db, plan, {"months": months})
         db.commit()
         db.refresh(plan)
     
@@ -1184,7 +1208,7 @@ def get_learning_plan_by_id(plan_id: int, credentials: HTTPAuthorizationCredenti
         user_id=plan.user_id,
         title=plan.title,
         total_years=plan.total_years,
-        plan=plan.plan
+        plan=document
     )
     
     # Add current position to response
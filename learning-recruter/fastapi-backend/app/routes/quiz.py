@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.database.db import get_db
+from app.database.async_db import get_async_db
 from app.core.security import decode_token
 from app.models.quiz import Quiz, QuizSubmission
 from app.models.learning_plan import LearningPlan
@@ -10,6 +13,10 @@ from app.models.onboarding import Onboarding
 from app.core.gemini_ai import chatbot
 from app.routes.learning_plan import _generate_days_for_month_via_ai
 from app.core.learning_path_service import LearningPathService
+from app.services.student_stats import update_student_stats
+from app.services.plan_days import get_day, load_plan, store_plan
+from app.services.quiz_progress import available_quizzes, quiz_progress
+from app.core.pagination import InvalidCursor, clamp_limit, keyset_page_async
 
 router = APIRouter()
 bearer_scheme = HTTPBearer()
@@ -176,7 +183,7 @@ def generate_quiz(plan_id: int, month_index: int, day: int, credentials: HTTPAut
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
 
-    months = plan.plan.get("months", [])
+    months = load_plan(db, plan, [month_index])["months"]
     if month_index < 1 or month_index > len(months):
         raise HTTPException(status_code=400, detail="Invalid month index")
     month = months[month_index - 1]
@@ -189,7 +196,7 @@ def generate_quiz(plan_id: int, month_index: int, day: int, credentials: HTTPAut
         month["days"] = _generate_days_for_month_via_ai(month, onboarding)
         month["days_generated"] = True
         months[month_index - 1] = month
-        plan.plan = {"months": [dict(m) for m in months]}
+        store_plan(db, plan, {"months": months})
         db.commit()
         db.refresh(plan)
     
@@ -213,7 +220,7 @@ def generate_quiz(plan_id: int, month_index: int, day: int, credentials: HTTPAut
             days[day - 1] = day_data
             month['days'] = days
             months[month_index - 1] = month
-            plan.plan = {"months": [dict(m) for m in months]}
+            store_plan(db, plan, {"months": months})
             db.commit()
         except Exception as e:
             print(f"Error generating day detail: {str(e)}")
@@ -246,7 +253,7 @@ def generate_quiz(plan_id: int, month_index: int, day: int, credentials: HTTPAut
     days[day - 1]["quiz_id"] = quiz.id
     month["days"] = days
     months[month_index - 1] = month
-    plan.plan = {"months": [dict(m) for m in months]}
+    store_plan(db, plan, {"months": months})
     db.commit()
     
     return {
@@ -279,7 +286,7 @@ def get_quiz(plan_id: int, month_index: int, day: int, credentials: HTTPAuthoriz
         if not plan:
             raise HTTPException(status_code=404, detail="Plan not found")
             
-        months = plan.plan.get("months", [])
+        months = load_plan(db, plan, [month_index], detail=False)["months"]
         if month_index < 1 or month_index > len(months):
             raise HTTPException(status_code=400, detail="Invalid month index")
             
@@ -373,6 +380,7 @@ def submit_quiz(plan_id: int, month_index: int, day: int, answers: List[int], cr
         attempt_number=attempt_count + 1  # Increment attempt number
     )
     db.add(record)
+    update_student_stats(db, [int(user_id)])
     db.commit()
 
     # If quiz is passed, use LearningPathService to complete the day and advance
@@ -387,12 +395,9 @@ def submit_quiz(plan_id: int, month_index: int, day: int, answers: List[int], cr
             try:
                 plan = db.query(LearningPlan).filter(LearningPlan.id == plan_id).first()
                 if plan:
-                    months = plan.plan.get("months", [])
-                    if 1 <= month_index <= len(months):
-                        month = months[month_index - 1]
-                        days = month.get("days", [])
-                        if 1 <= day <= len(days):
-                            concept = days[day - 1].get("concept")
+                    day_data = get_day(db, plan, month_index, day, detail=False)
+                    if day_data:
+                        concept = day_data.get("concept")
             except Exception:
                 pass
 
@@ -425,12 +430,9 @@ def submit_quiz(plan_id: int, month_index: int, day: int, answers: List[int], cr
     try:
         plan = db.query(LearningPlan).filter(LearningPlan.id == plan_id).first()
         if plan:
-            months = plan.plan.get("months", [])
-            if 1 <= month_index <= len(months):
-                month = months[month_index - 1]
-                days = month.get("days", [])
-                if 1 <= day <= len(days):
-                    concept = days[day - 1].get("concept")
+            day_data = get_day(db, plan, month_index, day, detail=False)
+            if day_data:
+                concept = day_data.get("concept")
     except Exception:
         pass
 
@@ -459,7 +461,7 @@ def regenerate_quiz(plan_id: int, month_index: int, day: int, credentials: HTTPA
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
 
-    months = plan.plan.get("months", [])
+    months = load_plan(db, plan, [month_index])["months"]
     if month_index < 1 or month_index > len(months):
         raise HTTPException(status_code=400, detail="Invalid month index")
     month = months[month_index - 1]
@@ -537,7 +539,7 @@ def regenerate_quiz(plan_id: int, month_index: int, day: int, credentials: HTTPA
 
     # Update quiz_id in plan
     try:
-        months = plan.plan.get("months", [])
+        months = load_plan(db, plan, [month_index], detail=False)["months"]
         if 1 <= month_index <= len(months):
             month = months[month_index - 1]
             ds = month.get("days", [])
@@ -545,7 +547,7 @@ def regenerate_quiz(plan_id: int, month_index: int, day: int, credentials: HTTPA
                 ds[day - 1]["quiz_id"] = str(quiz.id)
                 month["days"] = ds
                 months[month_index - 1] = month
-                plan.plan = {"months": months}
+                store_plan(db, plan, {"months": months})
                 db.commit()
                 db.refresh(plan)
     except Exception:
@@ -574,70 +576,22 @@ def get_available_quizzes(credentials: HTTPAuthorizationCredentials = Depends(be
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
     
-    # Get all quizzes for the user
-    quizzes = db.query(Quiz).filter(Quiz.user_id == int(user_id)).order_by(Quiz.created_at.desc()).all()
-    
-    quiz_list = []
-    for quiz in quizzes:
-        # Get plan and month info
-        plan = db.query(LearningPlan).filter(LearningPlan.id == quiz.plan_id).first()
-        if plan and plan.plan and "months" in plan.plan:
-            months = plan.plan["months"]
-            if 1 <= quiz.month_index <= len(months):
-                month = months[quiz.month_index - 1]
-                month_title = month.get("title", f"Month {quiz.month_index}")
-                
-                # Get day info
-                days = month.get("days", [])
-                if 1 <= quiz.day <= len(days):
-                    day_concept = days[quiz.day - 1].get("concept", f"Day {quiz.day}")
-                else:
-                    day_concept = f"Day {quiz.day}"
-                
-                # Check if quiz is completed
-                submission = db.query(QuizSubmission).filter(
-                    QuizSubmission.quiz_id == quiz.id,
-                    QuizSubmission.passed == 1
-                ).first()
-                
-                quiz_list.append({
-                    "id": quiz.id,
-                    "title": quiz.title,
-                    "plan_id": quiz.plan_id,
-                    "plan_title": plan.title,
-                    "month_index": quiz.month_index,
-                    "month_title": month_title,
-                    "day": quiz.day,
-                    "day_concept": day_concept,
-                    "required_score": quiz.required_score,
-                    "total_questions": len(quiz.questions),
-                    "completed": submission is not None,
-                    "best_score": submission.score if submission else None,
-                    "created_at": quiz.created_at.isoformat(),
-                    "url": f"/learning-plans/{quiz.plan_id}/month/{quiz.month_index}/day/{quiz.day}/quiz"
-                })
-    
-    return {
-        "quizzes": quiz_list,
-        "total_quizzes": len(quiz_list),
-        "completed_quizzes": len([q for q in quiz_list if q["completed"]]),
-        "pending_quizzes": len([q for q in quiz_list if not q["completed"]])
-    }
+    return available_quizzes(db, int(user_id))
 
 @router.get("/quiz/{plan_id}/{month_index}/{day}/status")
-def get_quiz_status(plan_id: int, month_index: int, day: int, credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: Session = Depends(get_db)):
+async def get_quiz_status(plan_id: int, month_index: int, day: int, credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: AsyncSession = Depends(get_async_db)):
     """Get the current status of a quiz for a specific day"""
     user_id = decode_token(credentials.credentials)
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid token")
     
     # Check if quiz exists
-    quiz = db.query(Quiz).filter(
+    quiz = (await db.execute(select(Quiz).where(
         Quiz.plan_id == plan_id, 
         Quiz.month_index == month_index, 
         Quiz.day == day, 
         Quiz.user_id == int(user_id)
-    ).order_by(Quiz.id.desc()).first()
+    ).order_by(Quiz.id.desc()).limit(1))).scalars().first()
     
     if not quiz:
         return {
@@ -647,10 +601,10 @@ def get_quiz_status(plan_id: int, month_index: int, day: int, credentials: HTTPA
         }
     
     # Check if quiz is completed
-    submission = db.query(QuizSubmission).filter(
+    submission = (await db.execute(select(QuizSubmission).where(
         QuizSubmission.quiz_id == quiz.id,
         QuizSubmission.passed == 1
-    ).first()
+    ).limit(1))).scalars().first()
     
     if submission:
         return {
@@ -664,10 +618,10 @@ def get_quiz_status(plan_id: int, month_index: int, day: int, credentials: HTTPA
         }
     
     # Check if there are failed attempts
-    failed_attempts = db.query(QuizSubmission).filter(
+    failed_attempts = (await db.execute(select(QuizSubmission).where(
         QuizSubmission.quiz_id == quiz.id,
         QuizSubmission.passed == 0
-    ).order_by(QuizSubmission.created_at.desc()).all()
+    ).order_by(QuizSubmission.created_at.desc()))).scalars().all()
     
     if failed_attempts:
         best_score = max([a.score for a in failed_attempts])
@@ -703,106 +657,36 @@ def get_quiz_progress(credentials: HTTPAuthorizationCredentials = Depends(bearer
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Get learning plan
-    plan = db.query(LearningPlan).filter(LearningPlan.user_id == int(user_id)).first()
-    
-    # Get all quiz submissions
-    submissions = db.query(QuizSubmission).filter(
-        QuizSubmission.user_id == int(user_id)
-    ).order_by(QuizSubmission.created_at.asc()).all()
-    
-    # Calculate learning progress
-    learning_progress = 0
-    current_position = {
-        "current_month_index": user.current_month_index or 1,
-        "current_day": user.current_day or 1,
-        "plan_title": "No Active Plan"
-    }
+    return quiz_progress(db, user)
+
+
+@router.get("/quiz/history")
+async def get_quiz_history(cursor: str = "", limit: int = 20, credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), db: AsyncSession = Depends(get_async_db)):
+    """Quiz submissions of the current user, newest first, one cursor page at a time"""
+    user_id = decode_token(credentials.credentials)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid token")
     
-    month_progress = []
+    try:
+        submissions, next_cursor = await keyset_page_async(
+            db, select(QuizSubmission).where(QuizSubmission.user_id == int(user_id)),
+            QuizSubmission.created_at, QuizSubmission.id, cursor, clamp_limit(limit), "quiz_history"
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    if plan and plan.plan:
-        current_position["plan_title"] = plan.title or "Learning Plan"
-        months = plan.plan.get("months", [])
-        
-        completed_months = 0
-        total_days_completed = 0
-        total_days = 0
-        
-        for i, month in enumerate(months):
-            month_index = i + 1
-            days = month.get("days", [])
-            month_total_days = len(days)
-            total_days += month_total_days
-            
-            # Count completed days in this month
-            month_completed_days = 0
-            for j, day in enumerate(days):
-                day_num = j + 1
-                # Check if this day has a passed quiz
-                day_submission = next(
-                    (s for s in submissions if s.month_index == month_index and s.day == day_num and s.passed),
-                    None
-                )
-                if day_submission:
-                    month_completed_days += 1
-                    total_days_completed += 1
-            
-            # Determine month status
-            if month_completed_days == 0:
-                status = "not_started"
-            elif month_completed_days == month_total_days:
-                status = "completed"
-                completed_months += 1
-            else:
-                status = "in_progress"
-            
-            month_progress.append({
-                "index": month_index,
-                "title": month.get("title", f"Month {month_index}"),
-                "status": status,
-                "days_completed": month_completed_days,
-                "total_days": month_total_days,
-                "progress_percentage": (month_completed_days / max(month_total_days, 1)) * 100
-            })
-        
-        # Calculate overall progress
-        if total_days > 0:
-            learning_progress = (total_days_completed / total_days) * 100
-    
-    # Process quiz submissions for visualization
-    quiz_submissions = []
-    for submission in submissions:
-        quiz_submissions.append({
+    return {
+        "submissions": [{
+            "id": submission.id,
+            "plan_id": submission.plan_id,
             "month_index": submission.month_index,
             "day": submission.day,
+            "quiz_id": submission.quiz_id,
             "score": submission.score,
-            "passed": submission.passed,
-            "created_at": submission.created_at.isoformat() if submission.created_at else None,
-            "attempt_number": getattr(submission, 'attempt_number', 1)
-        })
-    
-    # Calculate summary statistics
-    summary = {
-        "overall_progress": f"{learning_progress:.1f}%",
-        "total_quizzes": len(submissions),
-        "passed_quizzes": len([s for s in submissions if s.passed]),
-        "average_score": sum(s.score for s in submissions) / len(submissions) if submissions else 0,
-        "pass_rate": (len([s for s in submissions if s.passed]) / len(submissions) * 100) if submissions else 0
-    }
-    
-    return {
-        "current_position": current_position,
-        "month_progress": month_progress,
-        "summary": summary,
-        "submissions": quiz_submissions,
-        "learning_progress_percentage": learning_progress,
-        "user_info": {
-            "name": user.google_name or user.email.split('@')[0],
-            "email": user.email,
-            "current_month": user.current_month_index or 1,
-            "current_day": user.current_day or 1
-        }
+            "passed": bool(submission.passed),
+            "attempt_number": submission.attempt_number or 1,
+            "time_taken": submission.time_taken,
+            "created_at": submission.created_at.isoformat() if submission.created_at else None
+        } for submission in submissions],
+        "next_cursor": next_cursor
     }
-
-
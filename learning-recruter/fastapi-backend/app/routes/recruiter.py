@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 import random
 from fastapi import HTTPException
 from typing import List, Dict
 import google.generativeai as genai
+import json
 import uuid
-from app.database.db import get_db
+import numpy as np
+from app.database.db import get_db, get_read_db
+from app.database.session_scope import session_scope
+from app.database.async_db import get_async_db
 from app.core.security import create_access_token, decode_token
 from passlib.context import CryptContext
 from app.models.candidate_vector import CandidateVector
@@ -18,11 +26,28 @@ from app.models.onboarding import Onboarding
 from app.models.job import Job
 from app.models.email_application import EmailApplication
 from app.models.shortlist import Shortlist
+from app.models.job_match import JobMatch
+from app.models.match_run import MatchRun
 from app.core.embeddings import simple_text_embedding, cosine_similarity
+from app.core.vector_codec import encode_vector
 from app.models.quiz import QuizSubmission
 from app.core.summary_service import get_comprehensive_user_analytics
 from app.core.graph_rag import GraphRAG
 from app.services.candidate_service import CandidateService
+from app.services.reindex_service import reindex_service
+from app.services.embedder_service import fit_lsa_embedder, embedder_status
+from app.services.candidate_features import load_candidate_features
+from app.services.roster_snapshot import roster_snapshot
+from app.services.roster_loader import load_roster
+from app.services.profile_documents import get_profile_document
+from app.services.chat_context import build_chat_context
+from app.services.autocomplete_service import autocomplete_index, KINDS as AUTOCOMPLETE_KINDS
+from app.core.ranking import top_k_indices, blend_llm_score, max_blended_score, RELATED_WEIGHTS
+from app.core.topk import select_top_k
+from app.core.pagination import InvalidCursor, clamp_limit, decode_cursor, encode_cursor, keyset_page
+from app.services.match_scoring import score_recruiter_match, explain_match
+from app.services.match_jobs import match_job_manager, serialize_match_run, FINISHED
+from app.core.config import settings
 from datetime import datetime
 
 router = APIRouter()
@@ -52,7 +77,7 @@ def _require_recruiter(credentials: HTTPAuthorizationCredentials, db: Session) -
     return user
 
 @router.post("/recruiter/match")
-def recruiter_match(data: Dict[str, Any], credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def recruiter_match(data: Dict[str, Any], credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     _require_recruiter(credentials, db)
     job_description = data.get("job_description") or ""
     requirements = data.get("requirements", [])
@@ -66,172 +91,32 @@ def recruiter_match(data: Dict[str, Any], credentials: HTTPAuthorizationCredenti
     try:
         from app.core.gemini_ai import chatbot
         
-        # Get all students with comprehensive data
-        students = db.query(User).filter(User.user_type == 'student').all()
-        matches = []
+        # Rank the whole roster in one pass; only the best-ranked candidates go to the LLM
+        features = load_candidate_features(db)
+        prior = features.score(f"{job_description} {' '.join(requirements or [])}", requirements or [],
+                               weights=data.get("weights"), method=data.get("fusion"))
         
-        for student in students:
-            # Get comprehensive student data
-            onboarding = db.query(Onboarding).filter(Onboarding.user_id == student.id).first()
-            learning_plan = db.query(LearningPlan).filter(LearningPlan.user_id == student.id).first()
-            quiz_scores = db.query(QuizSubmission).filter(QuizSubmission.user_id == student.id).all()
-            candidate_vector = db.query(CandidateVector).filter(CandidateVector.user_id == student.id).first()
-            
-            # Calculate metrics
-            avg_score = sum(q.score for q in quiz_scores) / len(quiz_scores) if quiz_scores else 0
-            passed_quizzes = sum(1 for q in quiz_scores if q.passed)
-            
-            # Learning progress
-            learning_progress = 0
-            current_topic = "No active learning"
-            if learning_plan and learning_plan.plan:
-                months = learning_plan.plan.get("months", [])
-                completed = sum(1 for m in months if m.get("status") == "completed")
-                learning_progress = (completed / len(months) * 100) if months else 0
-                
-                # Get current topic
-                current_month_index = student.current_month_index or 1
-                current_day = student.current_day or 1
-                if 1 <= current_month_index <= len(months):
-                    current_month = months[current_month_index - 1]
-                    days = current_month.get("days", [])
-                    if 0 < current_day <= len(days):
-                        current_day_data = days[current_day - 1]
-                        current_topic = current_day_data.get('concept', 'No topic assigned')
-            
-            # Social connections
-            linkedin_connected = student.linkedin_profile_data is not None
-            github_connected = student.github_profile_data is not None
-            twitter_connected = student.twitter_profile_data is not None
-            
-            # Parse social data for additional skills
-            github_skills = []
-            if github_connected and student.github_profile_data:
-                try:
-                    import json
-                    github_data = json.loads(student.github_profile_data)
-                    if isinstance(github_data, list):
-                        for repo in github_data[:5]:  # Top 5 repos
-                            if repo.get('language'):
-                                github_skills.append(repo['language'])
-                except: pass
-            
-            # Build comprehensive student profile
-            profile_sections = []
-            profile_sections.append(f"STUDENT: {student.google_name or student.email}")
-            profile_sections.append(f"EMAIL: {student.email}")
-            
-            if onboarding:
-                profile_sections.append(f"CAREER GOALS: {str(onboarding.career_goals) if onboarding.career_goals else 'Not specified'}")
-                profile_sections.append(f"CURRENT SKILLS: {str(onboarding.current_skills) if onboarding.current_skills else 'Not specified'}")
-                profile_sections.append(f"EDUCATION LEVEL: {onboarding.grade or 'Not specified'}")
-                profile_sections.append(f"TIME COMMITMENT: {onboarding.time_commitment or 'Not specified'}")
-            
-            # Learning metrics
-            profile_sections.append(f"LEARNING PROGRESS: {learning_progress:.1f}% completed")
-            profile_sections.append(f"CURRENT LEARNING TOPIC: {current_topic}")
-            profile_sections.append(f"QUIZ PERFORMANCE: {avg_score:.1f}% average ({len(quiz_scores)} quizzes, {passed_quizzes} passed)")
-            
-            # Additional skills from GitHub
-            if github_skills:
-                profile_sections.append(f"GITHUB PROGRAMMING LANGUAGES: {', '.join(set(github_skills))}")
-            
-            # Professional presence
-            social_presence = []
-            if linkedin_connected: social_presence.append("LinkedIn")
-            if github_connected: social_presence.append("GitHub")
-            if twitter_connected: social_presence.append("Twitter")
-            profile_sections.append(f"PROFESSIONAL PRESENCE: {', '.join(social_presence) if social_presence else 'None'}")
-            
-            # AI summary if available
-            if candidate_vector and candidate_vector.summary_text:
-                profile_sections.append(f"AI PROFILE SUMMARY: {candidate_vector.summary_text}")
-            
-            if candidate_vector and candidate_vector.skills_tags:
-                profile_sections.append(f"EXTRACTED SKILLS: {', '.join(candidate_vector.skills_tags)}")
-            
-            student_profile = "\n".join(profile_sections)
-            
-            # Enhanced AI matching prompt with better evaluation criteria
-            match_prompt = f"""You are an expert recruiter. Analyze if this student can successfully perform this job.
-
-JOB REQUIREMENTS:
-{job_description}
-Specific Requirements: {', '.join(requirements) if requirements else 'See job description'}
-Company: {company or 'Not specified'}
-
-STUDENT ANALYSIS:
-{student_profile}
-
-EVALUATE THESE KEY QUESTIONS:
-1. Do the student's career goals align with this job role?
-2. Do their current skills match the job requirements?
-3. Is their learning progress showing good commitment and ability?
-4. Can they realistically perform this work based on their background?
-5. Are they at the right education/experience level for this position?
-6. Do their GitHub projects show relevant practical experience?
-
-SCORING CRITERIA:
-- 85-100: Perfect fit - goals align, has required skills, strong progress
-- 70-84: Very good fit - most requirements met, good potential
-- 55-69: Good fit - some gaps but learnable, decent alignment
-- 40-54: Moderate fit - significant gaps but possible with training
-- 25-39: Poor fit - major misalignment in goals or skills
-- 0-24: No fit - completely wrong match
-
-Focus on: Can this student actually DO this job successfully?
-
-Score (0-100):"""
-            
-            try:
-                response = chatbot.model.generate_content(match_prompt)
-                score_text = response.text.strip()
-                import re
-                numbers = re.findall(r'\d+', score_text)
-                score = int(numbers[0]) if numbers else 0
-                score = min(max(score, 0), 100)
-                
-                # Generate match explanation
-                explanation_prompt = f"""Based on the {score}% match score, provide a brief 2-3 sentence explanation of why this student is or isn't a good fit for the job. Focus on key strengths or gaps.
-
-Job: {job_description}
-Student: {student.google_name or student.email}
-Score: {score}%
-
-Key factors: skills, experience, learning progress, career goals alignment.
-
-Explanation:"""
-                
-                explanation_response = chatbot.model.generate_content(explanation_prompt)
-                explanation = explanation_response.text.strip()
-                
-                if score > 40:  # Include more candidates with detailed analysis
-                    matches.append({
-                        "user_id": student.id,
-                        "name": student.google_name or student.email,
-                        "email": student.email,
-                        "score": score,
-                        "avg_quiz_score": round(avg_score, 1),
-                        "learning_progress": round(learning_progress, 1),
-                        "career_goals": str(onboarding.career_goals) if onboarding and onboarding.career_goals else "Not specified",
-                        "skills": str(onboarding.current_skills) if onboarding and onboarding.current_skills else "Not specified",
-                        "github_skills": github_skills,
-                        "social_connections": len(social_presence),
-                        "match_explanation": explanation,
-                        "performance_level": "Excellent" if avg_score >= 80 else "Good" if avg_score >= 60 else "Developing",
-                        "recommendation": "Highly Recommended" if score >= 85 else "Recommended" if score >= 70 else "Consider" if score >= 55 else "Not Ideal",
-                        "shortlisted": False  # Will be updated by shortlist check
-                    })
-            except Exception as e:
-                print(f"AI matching error for student {student.id}: {e}")
-                continue
+        def score_candidate(idx):
+            return score_recruiter_match(chatbot.model, features.profiles[idx], float(prior[idx]),
+                                         job_description, requirements, company)
+        
+        # Top 25 by blended score; stop calling the LLM once even a perfect LLM score can't reach the top 25
+        top, stats = select_top_k(
+            top_k_indices(prior, settings.MATCH_LLM_DEPTH), 25, score_candidate,
+            upper_bound_fn=lambda idx: max_blended_score(float(prior[idx]), settings.MATCH_LLM_WEIGHT),
+            sorted_by_bound=True,
+        )
+        matches = [match for _, match in top]
+        
+        # Explanations only for the candidates that are actually returned
+        for match in matches:
+            match["match_explanation"] = explain_match(chatbot.model, match, job_description)
         
-        # Sort by score
-        matches.sort(key=lambda x: x["score"], reverse=True)
         return {
-            "matches": matches[:25],  # Top 25 matches
-            "total_analyzed": len(students),
-            "total_matches": len(matches),
+            "matches": matches,  # Top 25 matches
+            "total_analyzed": len(features),
+            "total_matches": stats["qualified"],
+            "candidates_scored": stats["scored"],
             "job_summary": {
                 "description": job_description,
                 "requirements": requirements,
@@ -243,170 +128,249 @@ Explanation:"""
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI matching error: {str(e)}")
 
+@router.post("/recruiter/match/jobs")
+def start_match_job(data: Dict[str, Any], credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+    """Queue a background match run; poll or stream it with the returned run_id"""
+    recruiter = _require_recruiter(credentials, db)
+    if not data.get("job_description"):
+        raise HTTPException(status_code=400, detail="job_description required")
+    run_id = match_job_manager.start(recruiter.id, data)
+    return {"run_id": run_id, "status": "queued"}
+
+def _get_match_run(run_id: str, recruiter_id: int, db: Session) -> MatchRun:
+    run = db.query(MatchRun).filter(MatchRun.id == run_id, MatchRun.recruiter_id == recruiter_id).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Match run not found")
+    return run
+
+@router.get("/recruiter/match/jobs/{run_id}")
+def get_match_job(run_id: str, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+    """Current state of a match run: live partial ranking while running, stored results afterwards"""
+    recruiter = _require_recruiter(credentials, db)
+    result = serialize_match_run(_get_match_run(run_id, recruiter.id, db))
+    state = match_job_manager.state(run_id)
+    if state:
+        live = state.snapshot()
+        result.update({key: live[key] for key in ("status", "total", "scored", "matches")})
+    return result
+
+@router.get("/recruiter/match/jobs/{run_id}/stream")
+def stream_match_job(run_id: str, credentials: HTTPAuthorizationCredentials = Depends(bearer)):
+    """Server-sent events: a progress event with the partial ranking after each scored candidate, then done"""
+    # A short scope rather than Depends(get_db): a yield dependency stays open until the stream ends
+    with session_scope("recruiter.match_stream") as db:
+        recruiter = _require_recruiter(credentials, db)
+        _get_match_run(run_id, recruiter.id, db)
+    
+    def events():
+        version = -1
+        while True:
+            snapshot = match_job_manager.wait_for_update(run_id, version)
+            if snapshot is None or snapshot["status"] in FINISHED:
+                # Run has ended; the stored row is the source of truth
+                with session_scope("recruiter.match_stream") as stream_db:
+                    final = serialize_match_run(stream_db.query(MatchRun).filter(MatchRun.id == run_id).first())
+                yield f"event: done\ndata: {json.dumps(final)}\n\n"
+                return
+            if snapshot["version"] == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = snapshot["version"]
+            yield f"event: progress\ndata: {json.dumps(snapshot)}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.post("/recruiter/match/jobs/{run_id}/cancel")
+def cancel_match_job(run_id: str, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+    """Stop a queued or running match before its next LLM call, on whichever worker runs it; the partial ranking is kept"""
+    recruiter = _require_recruiter(credentials, db)
+    run = _get_match_run(run_id, recruiter.id, db)
+    cancelled = match_job_manager.cancel(run_id)
+    return {"run_id": run_id, "cancelled": cancelled, "status": "cancelling" if cancelled else run.status}
+
+def _csv(value: str) -> List[str]:
+    return [v.strip().lower() for v in value.split(",") if v.strip()]
+
 @router.get("/recruiter/students/search")
-def search_students(q: str = "", skills: str = "", min_score: int = 0, social: str = "", credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
-    """Search and filter students with advanced options"""
+def search_students(q: str = "", skills: str = "", min_score: int = 0, social: str = "", domain: str = "", level: str = "",
+                    availability: str = "", credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
+    """Search and filter students with advanced options.
+    
+    Facet filters are comma separated: values of one facet are OR-ed, facets
+    are AND-ed. Skills match any skill containing the given text. Facet
+    counts for the filtered set come back under ``facets``.
+    """
     recruiter = _require_recruiter(credentials, db)
     
-    students = db.query(User).filter(User.user_type == 'student').all()
-    filtered_students = []
+    snapshot = roster_snapshot.get(db)
+    index = snapshot.facets()
+    
+    # Plain column filters become one bitset, then each facet is AND-ed in
+    mask = snapshot.mask(min_quiz_score=min_score)
+    if q:
+        mask &= snapshot.name_matches(q)
+    bits = index.from_mask(mask)
+    for fragment in _csv(skills):
+        bits &= index.any_of("skill", index.matching("skill", fragment))
+    for facet, value in (("domain", domain), ("level", level), ("availability", availability)):
+        if value:
+            bits &= index.any_of(facet, _csv(value))
+    if social:
+        bits &= index.any_of("social", ["linkedin", "github", "twitter"] if social == "any" else _csv(social))
     
-    for student in students:
-        onboarding = db.query(Onboarding).filter(Onboarding.user_id == student.id).first()
-        quiz_scores = db.query(QuizSubmission).filter(QuizSubmission.user_id == student.id).all()
-        avg_score = sum(q.score for q in quiz_scores) / len(quiz_scores) if quiz_scores else 0
-        
-        # Apply filters
-        if q and q.lower() not in (student.google_name or student.email or "").lower():
-            continue
-        
-        if skills and onboarding and skills.lower() not in str(onboarding.current_skills or "").lower():
-            continue
-        
-        if avg_score < min_score:
-            continue
-        
-        if social:
-            social_count = sum([
-                student.linkedin_profile_data is not None,
-                student.github_profile_data is not None,
-                student.twitter_profile_data is not None
-            ])
-            if social == "linkedin" and not student.linkedin_profile_data:
-                continue
-            if social == "github" and not student.github_profile_data:
-                continue
-            if social == "twitter" and not student.twitter_profile_data:
-                continue
-            if social == "any" and social_count == 0:
-                continue
-        
+    filtered_students = []
+    for idx in np.flatnonzero(index.to_mask(bits)):
+        row = snapshot.row(int(idx))
         filtered_students.append({
-            "id": student.id,
-            "name": student.google_name or (onboarding.name if onboarding else f"Student {student.id}"),
-            "email": student.email,
-            "picture": student.google_picture,
-            "avg_score": round(avg_score, 1),
-            "quiz_count": len(quiz_scores),
-            "career_goals": str(onboarding.career_goals) if onboarding and onboarding.career_goals else "Not specified",
-            "skills": str(onboarding.current_skills) if onboarding and onboarding.current_skills else "Not specified",
+            "id": row["user_id"],
+            "name": row["name"] or row["onboarding_name"] or f"Student {row['user_id']}",
+            "email": row["email"],
+            "picture": row["picture"],
+            "avg_score": round(row["avg_quiz_score"], 1),
+            "quiz_count": row["quiz_count"],
+            "career_goals": str(row["career_goals"]) if row["career_goals"] else "Not specified",
+            "skills": str(row["current_skills"]) if row["current_skills"] else "Not specified",
             "social_connections": {
-                "linkedin": student.linkedin_profile_data is not None,
-                "github": student.github_profile_data is not None,
-                "twitter": student.twitter_profile_data is not None
+                "linkedin": row["has_linkedin"],
+                "github": row["has_github"],
+                "twitter": row["has_twitter"]
             }
         })
     
     return {
         "students": filtered_students,
         "total": len(filtered_students),
+        "facets": {facet: index.counts(facet, bits, top=20) for facet in ("skill", "domain", "level", "availability", "social")},
         "filters_applied": {
             "search_query": q,
             "skills_filter": skills,
             "min_score": min_score,
-            "social_filter": social
+            "social_filter": social,
+            "domain_filter": domain,
+            "level_filter": level,
+            "availability_filter": availability
         }
     }
 
+def _parse_profile_json(raw):
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except Exception:
+        return None
+
+def _social_profiles(db: Session, user_ids: List[int]) -> Dict[int, Any]:
+    """Parsed LinkedIn/GitHub/Twitter data for just the students on the page"""
+    if not user_ids:
+        return {}
+    rows = db.query(
+        User.id, User.linkedin_profile_data, User.github_profile_data, User.twitter_profile_data
+    ).filter(User.id.in_(user_ids)).all()
+    return {row.id: (
+        _parse_profile_json(row.linkedin_profile_data),
+        _parse_profile_json(row.github_profile_data),
+        _parse_profile_json(row.twitter_profile_data)
+    ) for row in rows}
+
+@router.get("/recruiter/autocomplete")
+def autocomplete(q: str = "", kinds: str = "", limit: int = 8, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
+    """Typeahead for skills, career goals, job titles and student names, most frequent first.
+    
+    ``kinds`` is a comma separated subset of skill, career_goal, job_title and name.
+    """
+    _require_recruiter(credentials, db)
+    selected = _csv(kinds) or list(AUTOCOMPLETE_KINDS)
+    unknown = [k for k in selected if k not in AUTOCOMPLETE_KINDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown autocomplete kinds: {', '.join(unknown)}")
+    if not q.strip():
+        return {"query": q, "suggestions": {kind: [] for kind in selected}}
+    suggestions = autocomplete_index.complete(db, q, selected, max(1, min(limit, autocomplete_index.top_k)))
+    return {"query": q, "suggestions": suggestions}
+
+def _optional_flag(value: str) -> Optional[bool]:
+    if value == "":
+        return None
+    return value.lower() in ("1", "true", "yes")
+
 @router.get("/recruiter/students")
-def get_all_students(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def get_all_students(min_progress: float = 0, min_quiz_score: float = 0, has_github: str = "", has_linkedin: str = "",
+                     has_twitter: str = "", skills: str = "", sort: str = "", order: str = "desc", offset: int = 0,
+                     limit: Optional[int] = None, cursor: str = "",
+                     credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     recruiter = _require_recruiter(credentials, db)
     
-    # Get all students with comprehensive data
-    students = db.query(User).filter(User.user_type == 'student').all()
+    # Filter, sort and paginate on the in-memory roster snapshot
+    snapshot = roster_snapshot.get(db)
+    mask = snapshot.mask(
+        min_progress=min_progress,
+        min_quiz_score=min_quiz_score,
+        has_github=_optional_flag(has_github),
+        has_linkedin=_optional_flag(has_linkedin),
+        has_twitter=_optional_flag(has_twitter),
+        skills=[s for s in skills.split(",") if s.strip()]
+    )
+    # A cursor names the order it was issued for, so it cannot be replayed under another sort
+    cursor_sort = f"students:{sort}:{order}"
+    try:
+        after = tuple(decode_cursor(cursor, cursor_sort)) if cursor else None
+        positions, total = snapshot.select(mask, sort_by=sort or None, descending=order != "asc",
+                                           offset=0 if after else max(offset, 0), limit=limit, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    next_cursor = None
+    if limit is not None and len(positions) == limit:
+        next_cursor = encode_cursor(cursor_sort, *snapshot.sort_key(positions[-1], sort or None))
+    
+    rows = [snapshot.row(idx) for idx in positions]
+    social = _social_profiles(db, [row["user_id"] for row in rows])
     
     student_profiles = []
-    for student in students:
-        candidate_vector = db.query(CandidateVector).filter(CandidateVector.user_id == student.id).first()
-        onboarding = db.query(Onboarding).filter(Onboarding.user_id == student.id).first()
-        learning_plan = db.query(LearningPlan).filter(LearningPlan.user_id == student.id).first()
-        
-        # Get quiz scores
-        quiz_scores = db.query(QuizSubmission).filter(QuizSubmission.user_id == student.id).all()
-        avg_score = sum(q.score for q in quiz_scores) / len(quiz_scores) if quiz_scores else 0
-        passed_quizzes = sum(1 for q in quiz_scores if q.passed)
-        
-        # Parse social connections
-        linkedin_data = None
-        github_data = None
-        twitter_data = None
-        
-        if student.linkedin_profile_data:
-            try:
-                import json
-                linkedin_data = json.loads(student.linkedin_profile_data)
-            except: pass
-        
-        if student.github_profile_data:
-            try:
-                import json
-                github_data = json.loads(student.github_profile_data)
-            except: pass
-        
-        if student.twitter_profile_data:
-            try:
-                import json
-                twitter_data = json.loads(student.twitter_profile_data)
-            except: pass
-        
-        # Learning plan details
-        learning_status = "Not yet started"
-        learning_progress = 0
-        current_topic = "No active learning"
-        plan_title = "No learning plan"
-        
-        if learning_plan and learning_plan.plan:
-            plan_title = learning_plan.title or "Learning Plan"
-            months = learning_plan.plan.get("months", [])
-            completed = sum(1 for m in months if m.get("status") == "completed")
-            total = len(months)
-            learning_progress = (completed / total * 100) if total > 0 else 0
-            
-            if learning_progress > 0:
-                learning_status = f"{learning_progress:.1f}% completed"
-            else:
-                learning_status = "Started but no progress"
-            
-            # Get current topic
-            current_month_index = student.current_month_index or 1
-            current_day = student.current_day or 1
-            
-            if 1 <= current_month_index <= len(months):
-                current_month = months[current_month_index - 1]
-                days = current_month.get("days", [])
-                if 0 < current_day <= len(days):
-                    current_day_data = days[current_day - 1]
-                    current_topic = current_day_data.get('concept', 'No topic assigned')
+    for row in rows:
+        linkedin_data, github_data, twitter_data = social.get(row["user_id"], (None, None, None))
+        learning_progress = row["learning_progress"]
+        avg_score = row["avg_quiz_score"]
+        quiz_count = row["quiz_count"]
+        passed_quizzes = row["passed_quizzes"]
+        
+        if not row["has_plan"]:
+            learning_status = "Not yet started"
+        elif learning_progress > 0:
+            learning_status = f"{learning_progress:.1f}% completed"
+        else:
+            learning_status = "Started but no progress"
         
         profile = {
-            "id": student.id,
-            "name": student.google_name or (onboarding.name if onboarding else f"Student {student.id}"),
-            "email": student.email,
-            "picture": student.google_picture or "/default-avatar.png",
-            "created_at": student.created_at.isoformat() if student.created_at else "Unknown",
-            "summary": candidate_vector.summary_text if candidate_vector else "No profile summary available",
-            "skills": candidate_vector.skills_tags if candidate_vector else [],
-            "career_goals": str(onboarding.career_goals) if onboarding and onboarding.career_goals else "No career goals specified",
-            "current_skills": str(onboarding.current_skills) if onboarding and onboarding.current_skills else "No skills listed",
-            "grade": onboarding.grade if onboarding else "Not specified",
-            "time_commitment": onboarding.time_commitment if onboarding else "Not specified",
+            "id": row["user_id"],
+            "name": row["name"] or row["onboarding_name"] or f"Student {row['user_id']}",
+            "email": row["email"],
+            "picture": row["picture"] or "/default-avatar.png",
+            "created_at": row["created_at"].isoformat() if row["created_at"] else "Unknown",
+            "summary": row["summary"] if row["summary"] is not None else "No profile summary available",
+            "skills": row["skills_tags"],
+            "career_goals": str(row["career_goals"]) if row["career_goals"] else "No career goals specified",
+            "current_skills": str(row["current_skills"]) if row["current_skills"] else "No skills listed",
+            "grade": row["grade"] if row["has_onboarding"] else "Not specified",
+            "time_commitment": row["time_commitment"] if row["has_onboarding"] else "Not specified",
             "learning_progress": learning_progress,
             "learning_status": learning_status,
-            "current_topic": current_topic,
-            "plan_title": plan_title,
+            "current_topic": row["current_topic"] if row["has_plan"] else "No active learning",
+            "plan_title": row["plan_title"] or "No learning plan",
             "quiz_performance": {
                 "average_score": round(avg_score, 1),
-                "total_quizzes": len(quiz_scores),
+                "total_quizzes": quiz_count,
                 "passed_quizzes": passed_quizzes,
-                "pass_rate": round((passed_quizzes / len(quiz_scores) * 100), 1) if quiz_scores else 0,
+                "pass_rate": round((passed_quizzes / quiz_count * 100), 1) if quiz_count else 0,
                 "performance_status": "Excellent" if avg_score >= 80 else "Good" if avg_score >= 60 else "Needs Improvement" if avg_score > 0 else "No quizzes taken"
             },
             "social_connections": {
                 "linkedin": {
                     "connected": linkedin_data is not None,
                     "profile": linkedin_data,
-                    "name": linkedin_data.get('data', {}).get('response_dict', {}).get('name') if linkedin_data else None,
-                    "email": linkedin_data.get('data', {}).get('response_dict', {}).get('email') if linkedin_data else None
+                    "name": linkedin_data.get('data', {}).get('response_dict', {}).get('name') if isinstance(linkedin_data, dict) else None,
+                    "email": linkedin_data.get('data', {}).get('response_dict', {}).get('email') if isinstance(linkedin_data, dict) else None
                 },
                 "github": {
                     "connected": github_data is not None,
@@ -417,116 +381,79 @@ def get_all_students(credentials: HTTPAuthorizationCredentials = Depends(bearer)
                 "twitter": {
                     "connected": twitter_data is not None,
                     "profile": twitter_data,
-                    "username": twitter_data.get('data', {}).get('username') if twitter_data else None,
-                    "name": twitter_data.get('data', {}).get('name') if twitter_data else None
+                    "username": twitter_data.get('data', {}).get('username') if isinstance(twitter_data, dict) else None,
+                    "name": twitter_data.get('data', {}).get('name') if isinstance(twitter_data, dict) else None
                 }
             },
             "contact_info": {
-                "email": student.email,
-                "google_email": student.google_email,
+                "email": row["email"],
+                "google_email": row["google_email"],
                 "phone": "Not provided",
                 "location": "Not specified"
             },
             "platform_activity": {
                 "last_login": "Not tracked",
                 "days_active": "Not tracked",
-                "engagement_level": "Active" if quiz_scores else "Low"
+                "engagement_level": "Active" if quiz_count else "Low"
             },
-            "added_by_recruiter": student.created_by_recruiter_id == recruiter.id,
-            "source": "Email Application" if student.created_by_recruiter_id == recruiter.id else "Platform User"
+            "added_by_recruiter": row["created_by_recruiter_id"] == recruiter.id,
+            "source": "Email Application" if row["created_by_recruiter_id"] == recruiter.id else "Platform User"
         }
         
         student_profiles.append(profile)
     
-    return {"students": student_profiles, "total": len(student_profiles)}
+    return {"students": student_profiles, "total": total, "offset": offset, "limit": limit, "next_cursor": next_cursor}
+
+def _dashboard_summary(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": row["user_id"],
+        "name": row["name"] or row["onboarding_name"] or f"Student {row['user_id']}",
+        "email": row["email"],
+        "picture": row["picture"],
+        "avg_score": round(row["avg_quiz_score"], 1),
+        "quiz_count": row["quiz_count"],
+        "learning_progress": round(row["learning_progress"], 1),
+        "social_connections": row["social_count"],
+        "career_goals": str(row["career_goals"]) if row["career_goals"] else "Not specified",
+        "skills": str(row["current_skills"]) if row["current_skills"] else "Not specified",
+        "joined_date": row["created_at"].strftime("%Y-%m-%d") if row["created_at"] else "Unknown"
+    }
 
 @router.get("/recruiter/dashboard")
-def get_recruiter_dashboard(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def get_recruiter_dashboard(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     """Complete recruiter dashboard with organized data"""
     recruiter = _require_recruiter(credentials, db)
     
-    # Get all students with complete data
-    students = db.query(User).filter(User.user_type == 'student').all()
-    
-    # Organize students by categories
-    top_performers = []
-    active_learners = []
-    social_connected = []
-    recent_joiners = []
-    
-    for student in students:
-        onboarding = db.query(Onboarding).filter(Onboarding.user_id == student.id).first()
-        quiz_scores = db.query(QuizSubmission).filter(QuizSubmission.user_id == student.id).all()
-        learning_plan = db.query(LearningPlan).filter(LearningPlan.user_id == student.id).first()
-        
-        avg_score = sum(q.score for q in quiz_scores) / len(quiz_scores) if quiz_scores else 0
-        
-        # Calculate learning progress
-        progress = 0
-        if learning_plan and learning_plan.plan:
-            months = learning_plan.plan.get("months", [])
-            completed = sum(1 for m in months if m.get("status") == "completed")
-            progress = (completed / len(months) * 100) if months else 0
-        
-        # Social connections count
-        social_count = sum([
-            student.linkedin_profile_data is not None,
-            student.github_profile_data is not None,
-            student.twitter_profile_data is not None
-        ])
-        
-        student_summary = {
-            "id": student.id,
-            "name": student.google_name or (onboarding.name if onboarding else f"Student {student.id}"),
-            "email": student.email,
-            "picture": student.google_picture,
-            "avg_score": round(avg_score, 1),
-            "quiz_count": len(quiz_scores),
-            "learning_progress": round(progress, 1),
-            "social_connections": social_count,
-            "career_goals": str(onboarding.career_goals) if onboarding and onboarding.career_goals else "Not specified",
-            "skills": str(onboarding.current_skills) if onboarding and onboarding.current_skills else "Not specified",
-            "joined_date": student.created_at.strftime("%Y-%m-%d") if student.created_at else "Unknown"
-        }
-        
-        # Categorize students
-        if avg_score >= 75 and len(quiz_scores) >= 3:
-            top_performers.append(student_summary)
-        
-        if progress > 20:
-            active_learners.append(student_summary)
-        
-        if social_count >= 2:
-            social_connected.append(student_summary)
-        
-        if student.created_at and (datetime.utcnow() - student.created_at).days <= 30:
-            recent_joiners.append(student_summary)
+    snapshot = roster_snapshot.get(db)
+    avg_scores = np.round(snapshot["avg_quiz_score"], 1)
     
-    # Sort categories
-    top_performers.sort(key=lambda x: x["avg_score"], reverse=True)
-    active_learners.sort(key=lambda x: x["learning_progress"], reverse=True)
-    social_connected.sort(key=lambda x: x["social_connections"], reverse=True)
-    recent_joiners.sort(key=lambda x: x["joined_date"], reverse=True)
+    # Each category is a mask over the roster; only its top 10 rows are materialized
+    categories = {
+        "top_performers": (snapshot.mask(min_quiz_score=75, min_quizzes=3), "avg_quiz_score"),
+        "active_learners": (snapshot["learning_progress"] > 20, "learning_progress"),
+        "social_connected": (snapshot.mask(min_social=2), "social_count"),
+        "recent_joiners": (snapshot.mask(joined_within_days=30), "created_ts"),
+    }
+    counts = {}
+    pages = {}
+    for name, (mask, sort_by) in categories.items():
+        positions, counts[name] = snapshot.select(mask, sort_by=sort_by, limit=10)
+        pages[name] = [_dashboard_summary(snapshot.row(idx)) for idx in positions]
     
     # Quick stats
-    total_students = len(students)
-    avg_platform_score = sum(s["avg_score"] for s in [student_summary]) / total_students if total_students > 0 else 0
+    total_students = len(snapshot)
+    avg_platform_score = float(avg_scores.mean()) if total_students > 0 else 0
     
     return {
         "overview": {
             "total_students": total_students,
-            "top_performers": len(top_performers),
-            "active_learners": len(active_learners),
-            "social_connected": len(social_connected),
-            "recent_joiners": len(recent_joiners),
+            "top_performers": counts["top_performers"],
+            "active_learners": counts["active_learners"],
+            "social_connected": counts["social_connected"],
+            "recent_joiners": counts["recent_joiners"],
             "platform_avg_score": round(avg_platform_score, 1)
         },
-        "categories": {
-            "top_performers": top_performers[:10],
-            "active_learners": active_learners[:10],
-            "social_connected": social_connected[:10],
-            "recent_joiners": recent_joiners[:10]
-        },
+        "categories": pages,
         "quick_actions": {
             "create_job_posting": "/recruiter/jobs",
             "ai_matching": "/recruiter/match",
@@ -536,7 +463,7 @@ def get_recruiter_dashboard(credentials: HTTPAuthorizationCredentials = Depends(
     }
 
 @router.get("/recruiter/analytics")
-def get_recruiter_analytics(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def get_recruiter_analytics(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     recruiter = _require_recruiter(credentials, db)
     
     # Real data from database
@@ -619,7 +546,7 @@ def send_email_to_student(data: Dict[str, Any], credentials: HTTPAuthorizationCr
     }
 
 @router.get("/recruiter/analytics/user/{user_id}")
-def get_comprehensive_user_analytics_endpoint(user_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def get_comprehensive_user_analytics_endpoint(user_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     user = _get_current_user(credentials, db)
     if user.user_type != 'recruiter':
         raise HTTPException(status_code=403, detail="Recruiter access required")
@@ -628,12 +555,34 @@ def get_comprehensive_user_analytics_endpoint(user_id: int, credentials: HTTPAut
     return analytics
 
 @router.post("/recruiter/reindex-students")
-def recruiter_reindex_students(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def recruiter_reindex_students(restart: bool = False, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+    """Start or resume the background reindex of every student's vectors and summaries."""
     _require_recruiter(credentials, db)
-    candidate_service = CandidateService(db)
-    result = candidate_service.bulk_update_candidates(limit=200)
+    result = reindex_service.start(restart=restart)
     return {"status": "ok", "result": result}
 
+@router.get("/recruiter/reindex-students/status")
+def recruiter_reindex_status(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+    _require_recruiter(credentials, db)
+    return reindex_service.status()
+
+@router.post("/recruiter/embedder/fit")
+def recruiter_fit_embedder(reindex: bool = True, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+    """Fit the local TF-IDF + SVD embedder on profiles and jobs, then re-embed stored student vectors."""
+    _require_recruiter(credentials, db)
+    try:
+        result = fit_lsa_embedder(db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if reindex:
+        result["reindex"] = reindex_service.start(restart=True)
+    return {"status": "ok", "embedder": result}
+
+@router.get("/recruiter/embedder/status")
+def recruiter_embedder_status(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+    _require_recruiter(credentials, db)
+    return embedder_status()
+
 @router.post("/recruiter/jobs")
 def create_job_posting(data: Dict[str, Any], credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
     recruiter = _require_recruiter(credentials, db)
@@ -682,66 +631,56 @@ def get_job_postings(credentials: HTTPAuthorizationCredentials = Depends(bearer)
     }
 
 @router.post("/recruiter/jobs/{job_id}/match")
-def match_candidates_to_job(job_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def match_candidates_to_job(job_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     recruiter = _require_recruiter(credentials, db)
     
     job = db.query(Job).filter(Job.id == job_id, Job.recruiter_id == recruiter.id).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Get all students with their profiles
-    students = db.query(User).filter(User.user_type == 'student').all()
-    
-    matches = []
-    for student in students:
-        # Get student profile data
-        onboarding = db.query(Onboarding).filter(Onboarding.user_id == student.id).first()
-        learning_plan = db.query(LearningPlan).filter(LearningPlan.user_id == student.id).first()
-        
-        # Create student profile text
-        profile_parts = []
-        if onboarding:
-            if onboarding.career_goals:
-                profile_parts.append(f"Career Goals: {onboarding.career_goals}")
-            if onboarding.current_skills:
-                profile_parts.append(f"Skills: {onboarding.current_skills}")
-            if onboarding.grade:
-                profile_parts.append(f"Level: {onboarding.grade}")
-        
-        # Add learning progress
-        progress = 0
-        if learning_plan and learning_plan.plan:
-            months = learning_plan.plan.get("months", [])
-            completed = sum(1 for m in months if m.get("status") == "completed")
-            progress = (completed / len(months) * 100) if months else 0
-            profile_parts.append(f"Learning Progress: {progress:.0f}%")
-        
-        student_profile = " | ".join(profile_parts)
-        
-        # Use Gemini AI to calculate match percentage
-        match_score = _calculate_ai_match_score(job, student_profile)
-        
-        if match_score > 0:  # Only include candidates with some match
-            matches.append({
-                "user_id": student.id,
-                "name": student.google_name or student.email or f"Student {student.id}",
-                "email": student.email,
-                "score": match_score,
-                "profile": student_profile,
-                "career_goals": onboarding.career_goals if onboarding else None,
-                "skills": onboarding.current_skills if onboarding else None,
-                "learning_progress": progress,
-                "match_explanation": f"{match_score}% match based on AI analysis of profile vs job requirements"
-            })
+    # Rank the whole roster in one pass; only the best-ranked candidates go to the LLM
+    features = load_candidate_features(db)
+    prior = features.score(_job_query_text(job), job.requirements or [])
+    
+    def score_candidate(idx):
+        candidate = features.profiles[idx]
+        progress = candidate["learning_progress"]
+        student_profile = _job_match_profile(candidate)
+        
+        # Use Gemini AI to rescore the shortlisted candidate, blended with the fused prior
+        llm_score = _calculate_ai_match_score(job, student_profile)
+        match_score = blend_llm_score(float(prior[idx]), llm_score, settings.MATCH_LLM_WEIGHT)
+        
+        if match_score <= 0:  # Only include candidates with some match
+            return None
+        return match_score, {
+            "user_id": candidate["user_id"],
+            "name": candidate["name"],
+            "email": candidate["email"],
+            "score": match_score,
+            "llm_score": llm_score,
+            "prior_score": round(float(prior[idx]) * 100, 1),
+            "profile": student_profile,
+            "career_goals": candidate["career_goals_raw"],
+            "skills": candidate["current_skills_raw"],
+            "learning_progress": progress,
+            "match_explanation": f"{match_score}% match based on AI analysis of profile vs job requirements"
+        }
     
-    # Sort by match score (highest first)
-    matches.sort(key=lambda x: x["score"], reverse=True)
+    # Top 20 by blended score; stop calling the LLM once even a perfect LLM score can't reach the top 20
+    top, stats = select_top_k(
+        top_k_indices(prior, settings.MATCH_LLM_DEPTH), 20, score_candidate,
+        upper_bound_fn=lambda idx: max_blended_score(float(prior[idx]), settings.MATCH_LLM_WEIGHT),
+        sorted_by_bound=True,
+    )
+    matches = [match for _, match in top]
     
     return {
         "job_id": job_id,
         "job_title": job.title,
-        "matches": matches[:20],  # Top 20 matches
-        "total_matches": len(matches),
+        "matches": matches,  # Top 20 matches
+        "total_matches": stats["qualified"],
+        "candidates_scored": stats["scored"],
         "job_details": {
             "title": job.title,
             "description": job.description,
@@ -751,6 +690,115 @@ def match_candidates_to_job(job_id: int, credentials: HTTPAuthorizationCredentia
         }
     }
 
+@router.post("/recruiter/jobs/batch-match")
+def batch_match_jobs(data: Dict[str, Any] = Body(default={}), credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+    """Match every active job of the recruiter against the roster in one pass and store the results"""
+    recruiter = _require_recruiter(credentials, db)
+    top_k = max(1, min(int(data.get("top_k", 20)), 100))
+    use_llm = bool(data.get("use_llm", True))
+    
+    jobs = db.query(Job).filter(Job.recruiter_id == recruiter.id, Job.status == 'active').order_by(Job.id).all()
+    if not jobs:
+        return {"jobs": [], "total_jobs": 0, "total_analyzed": 0, "stored_matches": 0}
+    
+    # Roster and feature matrix are loaded once and shared by every job
+    features = load_candidate_features(db)
+    priors = features.score_matrix([{"text": _job_query_text(job), "skills": job.requirements or []} for job in jobs])
+    
+    now = datetime.utcnow()
+    rows = []
+    results = []
+    for j, job in enumerate(jobs):
+        job_matches = []
+        # Only each job's own top K reaches the LLM
+        for idx in top_k_indices(priors[j], top_k):
+            candidate = features.profiles[idx]
+            prior = float(priors[j, idx])
+            llm_score = _calculate_ai_match_score(job, _job_match_profile(candidate)) if use_llm else None
+            score = blend_llm_score(prior, llm_score, settings.MATCH_LLM_WEIGHT) if llm_score is not None else int(round(prior * 100))
+            job_matches.append({
+                "user_id": candidate["user_id"],
+                "name": candidate["name"],
+                "email": candidate["email"],
+                "score": score,
+                "llm_score": llm_score,
+                "prior_score": round(prior * 100, 1),
+                "learning_progress": candidate["learning_progress"],
+                "avg_quiz_score": round(candidate["avg_quiz_score"], 1)
+            })
+        job_matches.sort(key=lambda x: x["score"], reverse=True)
+        for rank, match in enumerate(job_matches, start=1):
+            rows.append({
+                "recruiter_id": recruiter.id,
+                "job_id": job.id,
+                "user_id": match["user_id"],
+                "rank": rank,
+                "score": match["score"],
+                "prior_score": match["prior_score"],
+                "llm_score": match["llm_score"],
+                "created_at": now
+            })
+        results.append({"job_id": job.id, "job_title": job.title, "matches": job_matches})
+    
+    # Replace the stored matches of these jobs in two statements
+    db.query(JobMatch).filter(JobMatch.job_id.in_([job.id for job in jobs])).delete(synchronize_session=False)
+    if rows:
+        db.execute(insert(JobMatch), rows)
+    db.commit()
+    
+    return {
+        "jobs": results,
+        "total_jobs": len(jobs),
+        "total_analyzed": len(features),
+        "stored_matches": len(rows),
+        "matched_at": now.isoformat()
+    }
+
+@router.get("/recruiter/jobs/{job_id}/stored-matches")
+def get_stored_job_matches(job_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
+    """Matches written by the last batch run for this job"""
+    recruiter = _require_recruiter(credentials, db)
+    job = db.query(Job).filter(Job.id == job_id, Job.recruiter_id == recruiter.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    rows = db.query(JobMatch, User).join(User, JobMatch.user_id == User.id).filter(
+        JobMatch.job_id == job_id
+    ).order_by(JobMatch.rank).all()
+    return {
+        "job_id": job_id,
+        "job_title": job.title,
+        "matches": [{
+            "user_id": user.id,
+            "name": user.google_name or user.email or f"Student {user.id}",
+            "email": user.email,
+            "rank": match.rank,
+            "score": match.score,
+            "prior_score": match.prior_score,
+            "llm_score": match.llm_score
+        } for match, user in rows],
+        "matched_at": rows[0][0].created_at.isoformat() if rows and rows[0][0].created_at else None
+    }
+
+def _job_query_text(job: Job) -> str:
+    return f"{job.title} {job.description} {' '.join(job.requirements or [])}"
+
+def _job_match_profile(candidate: Dict[str, Any]) -> str:
+    """Short profile text used by the per-job LLM scoring prompt"""
+    profile_parts = []
+    if candidate["career_goals_raw"]:
+        profile_parts.append(f"Career Goals: {candidate['career_goals_raw']}")
+    if candidate["current_skills_raw"]:
+        profile_parts.append(f"Skills: {candidate['current_skills_raw']}")
+    if candidate["grade"]:
+        profile_parts.append(f"Level: {candidate['grade']}")
+    
+    # Add learning progress
+    if candidate["has_plan"]:
+        profile_parts.append(f"Learning Progress: {candidate['learning_progress']:.0f}%")
+    
+    return " | ".join(profile_parts)
+
 def _calculate_ai_match_score(job: Job, student_profile: str) -> int:
     """Use Gemini AI to calculate match percentage between job and student"""
     try:
@@ -802,10 +850,17 @@ Respond with ONLY the number (e.g., 85):
         return min(int(overlap * 5), 100)  # Simple fallback scoring
 
 @router.get("/recruiter/emails")
-def get_email_applications(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def get_email_applications(cursor: str = "", limit: int = 10, credentials: HTTPAuthorizationCredentials = Depends(bearer),
+                           db: Session = Depends(get_db)):
     recruiter = _require_recruiter(credentials, db)
     
-    applications = db.query(EmailApplication).filter(EmailApplication.recruiter_id == recruiter.id).order_by(EmailApplication.received_at.desc()).limit(10).all()
+    try:
+        applications, next_cursor = keyset_page(
+            db.query(EmailApplication).filter(EmailApplication.recruiter_id == recruiter.id),
+            EmailApplication.received_at, EmailApplication.id, cursor, clamp_limit(limit, 10), "emails"
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
         "applications": [{
@@ -819,18 +874,24 @@ def get_email_applications(credentials: HTTPAuthorizationCredentials = Depends(b
             "student_matched": app.student_id is not None
         } for app in applications],
         "total": len(applications),
-        "unprocessed": len([app for app in applications if not app.processed])
+        "unprocessed": len([app for app in applications if not app.processed]),
+        "next_cursor": next_cursor
     }
 
 @router.get("/recruiter/emails/recent")
-def get_recent_emails(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
-    """Get recent job-related emails from Gmail with enhanced filtering"""
+def get_recent_emails(cursor: str = "", limit: int = 5, credentials: HTTPAuthorizationCredentials = Depends(bearer),
+                      db: Session = Depends(get_db)):
+    """Get recent job-related emails from Gmail with enhanced filtering
+    
+    Gmail and demo emails come with the first page only; ``cursor`` pages
+    further back through the stored applications.
+    """
     recruiter = _require_recruiter(credentials, db)
     
     all_emails = []
     
     # Try to fetch real Gmail emails if user has Google access token
-    if recruiter.google_access_token:
+    if recruiter.google_access_token and not cursor:
         try:
             from app.core.email_service import email_service
             gmail_emails = email_service.fetch_recent_job_emails(recruiter.google_access_token, days_back=1)
@@ -861,10 +922,14 @@ def get_recent_emails(credentials: HTTPAuthorizationCredentials = Depends(bearer
         except Exception as e:
             print(f"Enhanced Gmail fetch error: {e}")
     
-    # Get stored applications
-    applications = db.query(EmailApplication).filter(
-        EmailApplication.recruiter_id == recruiter.id
-    ).order_by(EmailApplication.received_at.desc()).limit(5).all()
+    # Get stored applications, newest first
+    try:
+        applications, next_cursor = keyset_page(
+            db.query(EmailApplication).filter(EmailApplication.recruiter_id == recruiter.id),
+            EmailApplication.received_at, EmailApplication.id, cursor, clamp_limit(limit, 5), "emails"
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     for app in applications:
         all_emails.append({
@@ -885,7 +950,7 @@ def get_recent_emails(credentials: HTTPAuthorizationCredentials = Depends(bearer
         })
     
     # Always provide demo data if no real emails or for testing
-    if not all_emails or len(all_emails) < 3:
+    if not cursor and (not all_emails or len(all_emails) < 3):
         demo_emails = [
             {
                 "sender_email": "alice.johnson@email.com",
@@ -939,7 +1004,8 @@ def get_recent_emails(credentials: HTTPAuthorizationCredentials = Depends(bearer
         "total": len(all_emails),
         "unread": len([email for email in all_emails if not email['processed']]),
         "high_priority": len([email for email in all_emails if email['priority'] == 'high']),
-        "with_resume": len([email for email in all_emails if email.get('has_resume', False)])
+        "with_resume": len([email for email in all_emails if email.get('has_resume', False)]),
+        "next_cursor": next_cursor
     }
 
 # Removed old _fetch_gmail_emails function - now using enhanced email_service
@@ -1144,9 +1210,9 @@ def add_email_to_shortlist(email_id: str, data: Dict[str, Any], credentials: HTT
         vector = simple_text_embedding(summary or email_content)
         candidate_vector = CandidateVector(
             user_id=new_user.id,
-            vector=vector,
             summary_text=summary or f"Email candidate: {sender_name}",
-            skills_tags=skills[:10]
+            skills_tags=skills[:10],
+            **encode_vector(vector)
         )
         db.add(candidate_vector)
     except Exception as e:
@@ -1259,10 +1325,16 @@ Skills (comma-separated):
             "error": str(e)
         }
 
+def _chat_context(question: str) -> Dict[str, Any]:
+    # Ranks the whole roster on a pooled sync session; run in the threadpool, not on the event loop
+    with session_scope("recruiter_chat.context") as db:
+        return build_chat_context(db, question)
+
+
 @router.post("/recruiter/chat")
-async def recruiter_chat(message: Dict[str, str], credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+async def recruiter_chat(message: Dict[str, str], credentials: HTTPAuthorizationCredentials = Depends(bearer), db: AsyncSession = Depends(get_async_db)):
     """Enhanced recruiter chatbot with calendar, emails, and candidate data"""
-    recruiter = _require_recruiter(credentials, db)
+    recruiter = await db.run_sync(lambda session: _require_recruiter(credentials, session))
     
     try:
         from app.core.gemini_ai import chatbot
@@ -1274,9 +1346,9 @@ async def recruiter_chat(message: Dict[str, str], credentials: HTTPAuthorization
         context_snippets.append(f"GOOGLE_CONNECTED: {bool(recruiter.google_access_token)}")
         
         # Get recent email applications
-        recent_emails = db.query(EmailApplication).filter(
+        recent_emails = (await db.execute(select(EmailApplication).where(
             EmailApplication.recruiter_id == recruiter.id
-        ).order_by(EmailApplication.received_at.desc()).limit(5).all()
+        ).order_by(EmailApplication.received_at.desc()).limit(5))).scalars().all()
         
         context_snippets.append(f"RECENT_EMAILS: {len(recent_emails)}")
         for i, email in enumerate(recent_emails):
@@ -1285,42 +1357,28 @@ async def recruiter_chat(message: Dict[str, str], credentials: HTTPAuthorization
             context_snippets.append(f"EMAIL_{i+1}_PROCESSED: {email.processed}")
         
         # Get job postings
-        jobs = db.query(Job).filter(Job.recruiter_id == recruiter.id).all()
+        jobs = (await db.execute(select(Job).where(Job.recruiter_id == recruiter.id))).scalars().all()
         context_snippets.append(f"ACTIVE_JOBS: {len(jobs)}")
         for i, job in enumerate(jobs[:3]):
             context_snippets.append(f"JOB_{i+1}: {job.title} - {job.location or 'Remote'}")
         
         # Get shortlisted candidates
-        shortlisted = db.query(Shortlist).filter(Shortlist.recruiter_id == recruiter.id).count()
+        shortlisted = await db.scalar(
+            select(func.count()).select_from(Shortlist).where(Shortlist.recruiter_id == recruiter.id)
+        )
         context_snippets.append(f"SHORTLISTED_CANDIDATES: {shortlisted}")
         
-        # Get all students with full profiles
-        students = db.query(User).filter(User.user_type == 'student').all()
-        context_snippets.append(f"TOTAL_STUDENTS: {len(students)}")
-        
-        # Student profiles with social connections and scores
-        for student in students[:8]:  # Limit to top 8 for context
-            onboarding = db.query(Onboarding).filter(Onboarding.user_id == student.id).first()
-            quiz_scores = db.query(QuizSubmission).filter(QuizSubmission.user_id == student.id).all()
-            avg_score = sum(q.score for q in quiz_scores) / len(quiz_scores) if quiz_scores else 0
-            
-            linkedin_connected = student.linkedin_profile_data is not None
-            github_connected = student.github_profile_data is not None
-            twitter_connected = student.twitter_profile_data is not None
-            
-            context_snippets.append(f"STUDENT_{student.id}: {student.google_name or student.email}")
-            context_snippets.append(f"STUDENT_{student.id}_EMAIL: {student.email}")
-            context_snippets.append(f"STUDENT_{student.id}_SCORE: {avg_score:.1f}%")
-            context_snippets.append(f"STUDENT_{student.id}_QUIZZES: {len(quiz_scores)}")
-            context_snippets.append(f"STUDENT_{student.id}_LINKEDIN: {linkedin_connected}")
-            context_snippets.append(f"STUDENT_{student.id}_GITHUB: {github_connected}")
-            context_snippets.append(f"STUDENT_{student.id}_TWITTER: {twitter_connected}")
-            
-            if onboarding:
-                goals = str(onboarding.career_goals) if onboarding.career_goals else "Not specified"
-                skills = str(onboarding.current_skills) if onboarding.current_skills else "Not specified"
-                context_snippets.append(f"STUDENT_{student.id}_GOALS: {goals}")
-                context_snippets.append(f"STUDENT_{student.id}_SKILLS: {skills}")
+        # Only the students relevant to this question, packed into a fixed token budget; the
+        # ranking is CPU-bound, so it runs in the threadpool like the /chat context build
+        question = message.get('message', '')
+        student_context = await run_in_threadpool(_chat_context, question)
+        context_snippets.append(f"TOTAL_STUDENTS: {student_context['roster_size']}")
+        context_snippets.append(
+            f"RELEVANT_STUDENTS: {len(student_context['students'])} retrieved for this query "
+            f"({student_context['tokens']} of {settings.RECRUITER_CHAT_CONTEXT_TOKENS} context tokens)"
+        )
+        if student_context["text"]:
+            context_snippets.append(student_context["text"])
         
         # Create enriched message with enhanced context
         enriched_message = f"""[RECRUITER_CONTEXT]
@@ -1357,11 +1415,12 @@ You are RecruiterAI, a specialized AI assistant for recruiters with access to:
 - Suggest actionable next steps
 - Use bullet points for clarity
 
-Recruiter Query: {message.get('message', '')}"""
+Recruiter Query: {question}"""
         
-        # Use direct model call for recruiter to ensure proper processing
+        # Use direct model call for recruiter to ensure proper processing (blocking, so off the event loop)
         try:
-            response = chatbot.model.generate_content(
+            response = await run_in_threadpool(
+                chatbot.model.generate_content,
                 enriched_message,
                 generation_config=genai.types.GenerationConfig(
                     temperature=0.3,
@@ -1382,45 +1441,36 @@ Recruiter Query: {message.get('message', '')}"""
         return {
             "response": response_data["response"],
             "timestamp": response_data["timestamp"],
-            "message_id": response_data["message_id"]
+            "message_id": response_data["message_id"],
+            "students_included": student_context["students"],
+            "context_tokens": student_context["tokens"]
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Recruiter chat error: {str(e)}")
 
 @router.get("/recruiter/chatbot/insights")
-def get_chatbot_insights(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def get_chatbot_insights(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     """Get comprehensive insights for recruiter chatbot including emails"""
     recruiter = _require_recruiter(credentials, db)
     
-    # Get all students with detailed information
-    students = db.query(User).filter(User.user_type == 'student').all()
-    
+    # Student facts come from the in-memory roster snapshot
+    snapshot = roster_snapshot.get(db)
     student_insights = []
-    for student in students:
-        onboarding = db.query(Onboarding).filter(Onboarding.user_id == student.id).first()
-        learning_plan = db.query(LearningPlan).filter(LearningPlan.user_id == student.id).first()
-        candidate_vector = db.query(CandidateVector).filter(CandidateVector.user_id == student.id).first()
-        
-        # Calculate learning progress
-        progress = 0
-        if learning_plan and learning_plan.plan:
-            months = learning_plan.plan.get("months", [])
-            completed = sum(1 for m in months if m.get("status") == "completed")
-            progress = (completed / len(months) * 100) if months else 0
-        
+    for idx in range(len(snapshot)):
+        row = snapshot.row(idx)
         student_insights.append({
-            "id": student.id,
-            "name": student.google_name or student.email or f"Student {student.id}",
-            "email": student.email,
-            "learning_progress": progress,
-            "career_goals": onboarding.career_goals if onboarding else None,
-            "current_skills": onboarding.current_skills if onboarding else None,
-            "grade": onboarding.grade if onboarding else None,
-            "skills_tags": candidate_vector.skills_tags if candidate_vector else [],
-            "summary": candidate_vector.summary_text if candidate_vector else None,
-            "created_at": student.created_at.isoformat() if student.created_at else None,
-            "added_by_recruiter": student.created_by_recruiter_id == recruiter.id
+            "id": row["user_id"],
+            "name": row["name"] or row["email"] or f"Student {row['user_id']}",
+            "email": row["email"],
+            "learning_progress": row["learning_progress"],
+            "career_goals": row["career_goals"],
+            "current_skills": row["current_skills"],
+            "grade": row["grade"],
+            "skills_tags": row["skills_tags"],
+            "summary": row["summary"],
+            "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+            "added_by_recruiter": row["created_by_recruiter_id"] == recruiter.id
         })
     
     # Get recent emails with full content
@@ -1463,9 +1513,10 @@ def get_chatbot_insights(credentials: HTTPAuthorizationCredentials = Depends(bea
         })
     
     # Calculate analytics
-    total_students = len(students)
-    active_students = len([s for s in student_insights if s["learning_progress"] > 0])
-    avg_progress = sum(s["learning_progress"] for s in student_insights) / total_students if total_students > 0 else 0
+    progress = snapshot["learning_progress"]
+    total_students = len(snapshot)
+    active_students = int((progress > 0).sum())
+    avg_progress = float(progress.mean()) if total_students > 0 else 0
     
     # Skill distribution
     all_skills = []
@@ -1502,16 +1553,16 @@ def get_chatbot_insights(credentials: HTTPAuthorizationCredentials = Depends(bea
                 "percentage": round((count / total_students * 100), 1) if total_students > 0 else 0
             } for skill, count in top_skills],
             "progress_distribution": {
-                "high_progress": len([s for s in student_insights if s["learning_progress"] >= 70]),
-                "medium_progress": len([s for s in student_insights if 30 <= s["learning_progress"] < 70]),
-                "low_progress": len([s for s in student_insights if 0 < s["learning_progress"] < 30]),
-                "not_started": len([s for s in student_insights if s["learning_progress"] == 0])
+                "high_progress": int((progress >= 70).sum()),
+                "medium_progress": int(((progress >= 30) & (progress < 70)).sum()),
+                "low_progress": int(((progress > 0) & (progress < 30)).sum()),
+                "not_started": int((progress == 0).sum())
             }
         }
     }
 
 @router.get("/recruiter/analytics/advanced")
-def get_advanced_analytics(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def get_advanced_analytics(credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     recruiter = _require_recruiter(credentials, db)
     
     # Get comprehensive analytics
@@ -1552,47 +1603,20 @@ def get_advanced_analytics(credentials: HTTPAuthorizationCredentials = Depends(b
     }
 
 @router.get("/recruiter/student/{user_id}/profile")
-def get_student_profile_for_recruiter(user_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def get_student_profile_for_recruiter(user_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     """Get comprehensive student profile for recruiter view"""
     recruiter = _require_recruiter(credentials, db)
     
-    # Get student
-    student = db.query(User).filter(User.id == user_id, User.user_type == 'student').first()
-    if not student:
+    # One precomputed document instead of the user, onboarding, plan, quiz and vector tables
+    doc = get_profile_document(db, user_id)
+    if not doc:
         raise HTTPException(status_code=404, detail="Student not found")
     
-    # Get all related data
-    onboarding = db.query(Onboarding).filter(Onboarding.user_id == user_id).first()
-    learning_plan = db.query(LearningPlan).filter(LearningPlan.user_id == user_id).first()
-    quiz_scores = db.query(QuizSubmission).filter(QuizSubmission.user_id == user_id).all()
-    candidate_vector = db.query(CandidateVector).filter(CandidateVector.user_id == user_id).first()
-    
-    # Calculate quiz performance
-    avg_score = sum(q.score for q in quiz_scores) / len(quiz_scores) if quiz_scores else 0
-    passed_quizzes = sum(1 for q in quiz_scores if q.passed)
-    
-    # Parse social connections
-    linkedin_data = None
-    github_data = None
-    twitter_data = None
-    
-    if student.linkedin_profile_data:
-        try:
-            import json
-            linkedin_data = json.loads(student.linkedin_profile_data)
-        except: pass
-    
-    if student.github_profile_data:
-        try:
-            import json
-            github_data = json.loads(student.github_profile_data)
-        except: pass
-    
-    if student.twitter_profile_data:
-        try:
-            import json
-            twitter_data = json.loads(student.twitter_profile_data)
-        except: pass
+    avg_score = doc["avg_quiz_score"]
+    quiz_count = doc["quiz_count"]
+    passed_quizzes = doc["passed_quizzes"]
+    social = doc["social"]
+    social_count = sum(1 for name in ("linkedin", "github", "twitter") if social[name]["connected"])
     
     # Learning plan details
     learning_details = {
@@ -1606,112 +1630,68 @@ def get_student_profile_for_recruiter(user_id: int, credentials: HTTPAuthorizati
         "completed_months": 0
     }
     
-    if learning_plan and learning_plan.plan:
-        months = learning_plan.plan.get("months", [])
-        completed = sum(1 for m in months if m.get("status") == "completed")
-        total = len(months)
-        progress = (completed / total * 100) if total > 0 else 0
-        
+    if doc["has_plan"]:
+        progress = doc["learning_progress"]
         learning_details.update({
             "status": f"{progress:.1f}% completed" if progress > 0 else "Started but no progress",
             "progress_percentage": progress,
-            "plan_title": learning_plan.title or "Learning Plan",
-            "current_month": student.current_month_index or 1,
-            "current_day": student.current_day or 1,
-            "total_months": total,
-            "completed_months": completed
+            "current_topic": doc["current_topic"],
+            "plan_title": doc["plan_title"],
+            "current_month": doc["current_month"],
+            "current_day": doc["current_day"],
+            "total_months": doc["total_months"],
+            "completed_months": doc["completed_months"]
         })
-        
-        # Get current topic
-        current_month_index = student.current_month_index or 1
-        current_day = student.current_day or 1
-        
-        if 1 <= current_month_index <= len(months):
-            current_month = months[current_month_index - 1]
-            days = current_month.get("days", [])
-            if 0 < current_day <= len(days):
-                current_day_data = days[current_day - 1]
-                learning_details["current_topic"] = current_day_data.get('concept', 'No topic assigned')
     
     return {
         "basic_info": {
-            "id": student.id,
-            "name": student.google_name or (onboarding.name if onboarding else f"Student {student.id}"),
-            "email": student.email,
-            "google_email": student.google_email,
-            "picture": student.google_picture,
-            "created_at": student.created_at.isoformat() if student.created_at else None,
-            "user_type": student.user_type
+            "id": user_id,
+            "name": doc["google_name"] or doc["onboarding_name"] or f"Student {user_id}",
+            "email": doc["email"],
+            "google_email": doc["google_email"],
+            "picture": doc["picture"],
+            "created_at": doc["created_at"],
+            "user_type": "student"
         },
         "onboarding_details": {
-            "name": onboarding.name if onboarding else "Not provided",
-            "career_goals": str(onboarding.career_goals) if onboarding and onboarding.career_goals else "Not specified",
-            "current_skills": str(onboarding.current_skills) if onboarding and onboarding.current_skills else "Not specified",
-            "grade": onboarding.grade if onboarding else "Not specified",
-            "time_commitment": onboarding.time_commitment if onboarding else "Not specified",
-            "completed_at": "Profile completed" if onboarding else "Not completed"
+            "name": doc["onboarding_name"] if doc["has_onboarding"] else "Not provided",
+            "career_goals": str(doc["career_goals_raw"]) if doc["career_goals_raw"] else "Not specified",
+            "current_skills": str(doc["current_skills_raw"]) if doc["current_skills_raw"] else "Not specified",
+            "grade": doc["grade"] if doc["has_onboarding"] else "Not specified",
+            "time_commitment": doc["time_commitment"] if doc["has_onboarding"] else "Not specified",
+            "completed_at": "Profile completed" if doc["has_onboarding"] else "Not completed"
         },
         "learning_progress": learning_details,
         "quiz_performance": {
             "average_score": round(avg_score, 1),
-            "total_quizzes": len(quiz_scores),
+            "total_quizzes": quiz_count,
             "passed_quizzes": passed_quizzes,
-            "pass_rate": round((passed_quizzes / len(quiz_scores) * 100), 1) if quiz_scores else 0,
+            "pass_rate": round((passed_quizzes / quiz_count * 100), 1) if quiz_count else 0,
             "performance_level": "Excellent" if avg_score >= 80 else "Good" if avg_score >= 60 else "Needs Improvement" if avg_score > 0 else "No quizzes taken",
-            "recent_scores": [{
-                "month": q.month_index,
-                "day": q.day,
-                "score": q.score,
-                "passed": q.passed,
-                "date": q.created_at.isoformat() if q.created_at else None
-            } for q in quiz_scores[-5:]]  # Last 5 quiz scores
-        },
-        "social_connections": {
-            "linkedin": {
-                "connected": linkedin_data is not None,
-                "name": linkedin_data.get('data', {}).get('response_dict', {}).get('name') if linkedin_data else None,
-                "email": linkedin_data.get('data', {}).get('response_dict', {}).get('email') if linkedin_data else None,
-                "profile_url": f"https://linkedin.com/in/{linkedin_data.get('data', {}).get('response_dict', {}).get('sub')}" if linkedin_data else None
-            },
-            "github": {
-                "connected": github_data is not None,
-                "username": github_data[0].get('owner', {}).get('login') if github_data and isinstance(github_data, list) and len(github_data) > 0 else None,
-                "profile_url": github_data[0].get('owner', {}).get('html_url') if github_data and isinstance(github_data, list) and len(github_data) > 0 else None,
-                "repos_count": len(github_data) if github_data and isinstance(github_data, list) else 0,
-                "public_repos": [{
-                    "name": repo.get('name'),
-                    "description": repo.get('description'),
-                    "language": repo.get('language'),
-                    "stars": repo.get('stargazers_count', 0)
-                } for repo in (github_data[:3] if github_data and isinstance(github_data, list) else [])]  # Top 3 repos
-            },
-            "twitter": {
-                "connected": twitter_data is not None,
-                "username": twitter_data.get('data', {}).get('username') if twitter_data else None,
-                "name": twitter_data.get('data', {}).get('name') if twitter_data else None,
-                "profile_url": f"https://twitter.com/{twitter_data.get('data', {}).get('username')}" if twitter_data else None
-            }
+            "recent_scores": doc["recent_scores"]  # Last 5 quiz scores
         },
+        "social_connections": social,
         "profile_summary": {
-            "summary": candidate_vector.summary_text if candidate_vector else "No profile summary available",
-            "skills_tags": candidate_vector.skills_tags if candidate_vector else [],
+            "summary": doc["summary_text"] if doc["summary_text"] is not None else "No profile summary available",
+            "skills_tags": doc["skills_tags"],
             "profile_completeness": {
-                "onboarding_complete": onboarding is not None,
-                "learning_plan_active": learning_plan is not None,
-                "quiz_activity": len(quiz_scores) > 0,
-                "social_connections": sum([linkedin_data is not None, github_data is not None, twitter_data is not None]),
+                "onboarding_complete": doc["has_onboarding"],
+                "learning_plan_active": doc["plan_exists"],
+                "quiz_activity": quiz_count > 0,
+                "social_connections": social_count,
                 "overall_score": round((
-                    (1 if onboarding else 0) +
-                    (1 if learning_plan else 0) +
-                    (1 if quiz_scores else 0) +
-                    (0.33 * sum([linkedin_data is not None, github_data is not None, twitter_data is not None]))
+                    (1 if doc["has_onboarding"] else 0) +
+                    (1 if doc["plan_exists"] else 0) +
+                    (1 if quiz_count else 0) +
+                    (0.33 * social_count)
                 ) / 3.33 * 100, 1)
-            }
+            },
+            "token_count": doc["token_count"]
         }
     }
 
 @router.get("/recruiter/related/{user_id}")
-def get_related_candidates(user_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def get_related_candidates(user_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     """Get candidates related to a specific user based on skills and interests"""
     recruiter = _require_recruiter(credentials, db)
     
@@ -1725,40 +1705,33 @@ def get_related_candidates(user_id: int, credentials: HTTPAuthorizationCredentia
     if not target_profile or not target_profile.skills_tags:
         return {"related_candidates": [], "message": "No related candidates found - insufficient profile data"}
     
-    # Find similar candidates based on skills
-    target_skills = set(target_profile.skills_tags)
-    
-    # Get all other students with profiles
-    all_profiles = db.query(CandidateVector).filter(
-        CandidateVector.user_id != user_id
-    ).all()
-    
+    # Score every student against the target in one pass: embedding, keyword and skill Jaccard
+    features = load_candidate_features(db)
+    target_idx = features.index_of(user_id)
+    target_skills = target_profile.skills_tags
+    target_text = " ".join(features.profiles[target_idx]["doc_terms"]) if target_idx is not None else " ".join(target_skills)
+    overlap = features.skill_overlap(target_skills, jaccard=True)
+    similarity = features.score(target_text, target_skills, weights=RELATED_WEIGHTS, jaccard=True,
+                                query_vector=features.row_vector(target_idx) if target_idx is not None else None)
+    similarity[overlap <= 0] = -1  # only candidates sharing at least one skill
+    if target_idx is not None:
+        similarity[target_idx] = -1
+    
+    target_keys = {s.lower() for s in target_skills}
     related_candidates = []
-    for profile in all_profiles:
-        if not profile.skills_tags:
-            continue
-            
-        candidate_skills = set(profile.skills_tags)
-        skill_overlap = len(target_skills.intersection(candidate_skills))
-        
-        if skill_overlap > 0:
-            # Get user details
-            user = db.query(User).filter(User.id == profile.user_id).first()
-            if user:
-                similarity_score = skill_overlap / len(target_skills.union(candidate_skills))
-                
-                related_candidates.append({
-                    "id": user.id,
-                    "name": user.google_name or user.email or f"Student {user.id}",
-                    "email": user.email,
-                    "skills": profile.skills_tags,
-                    "shared_skills": list(target_skills.intersection(candidate_skills)),
-                    "similarity_score": round(similarity_score, 2),
-                    "summary": profile.summary_text
-                })
-    
-    # Sort by similarity score
-    related_candidates.sort(key=lambda x: x["similarity_score"], reverse=True)
+    for idx in top_k_indices(similarity, 10):
+        if similarity[idx] < 0:
+            break
+        candidate = features.profiles[idx]
+        related_candidates.append({
+            "id": candidate["user_id"],
+            "name": candidate["name"],
+            "email": candidate["email"],
+            "skills": candidate["skills_tags"] or candidate["skills"],
+            "shared_skills": [skill for skill in candidate["skills"] if skill.lower() in target_keys],
+            "similarity_score": round(float(similarity[idx]), 2),
+            "summary": candidate["summary_text"]
+        })
     
     return {
         "related_candidates": related_candidates[:10],  # Top 10 similar candidates
@@ -1890,7 +1863,7 @@ Keep each bullet point to 1 line maximum. Be concise and professional.
 
 # Enhanced AI Matching Endpoints
 @router.get("/recruiter/jobs/{job_id}/matches")
-def get_job_matches(job_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def get_job_matches(job_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     """Get AI-powered candidate matches for a specific job"""
     recruiter = _require_recruiter(credentials, db)
     
@@ -1902,43 +1875,32 @@ def get_job_matches(job_id: int, credentials: HTTPAuthorizationCredentials = Dep
     try:
         from app.core.gemini_ai import chatbot
         
-        # Get all students with comprehensive data
-        students = db.query(User).filter(User.user_type == 'student').all()
-        matches = []
-        
         # Get existing shortlisted candidates for this job
         shortlisted_ids = [s.student_id for s in db.query(Shortlist).filter(
             Shortlist.recruiter_id == recruiter.id,
             Shortlist.job_id == job_id
         ).all()]
         
-        for student in students:
-            # Get comprehensive student data
-            onboarding = db.query(Onboarding).filter(Onboarding.user_id == student.id).first()
-            learning_plan = db.query(LearningPlan).filter(LearningPlan.user_id == student.id).first()
-            quiz_scores = db.query(QuizSubmission).filter(QuizSubmission.user_id == student.id).all()
-            
-            # Calculate metrics
-            avg_score = sum(q.score for q in quiz_scores) / len(quiz_scores) if quiz_scores else 0
-            
-            # Learning progress
-            learning_progress = 0
-            if learning_plan and learning_plan.plan:
-                months = learning_plan.plan.get("months", [])
-                completed = sum(1 for m in months if m.get("status") == "completed")
-                learning_progress = (completed / len(months) * 100) if months else 0
+        # Rank the whole roster in one pass; only the best-ranked candidates go to the LLM
+        features = load_candidate_features(db)
+        prior = features.score(_job_query_text(job), job.requirements or [])
+        
+        def score_candidate(idx):
+            candidate = features.profiles[idx]
+            avg_score = candidate["avg_quiz_score"]
+            learning_progress = candidate["learning_progress"]
             
             # Build student profile
             profile_sections = []
-            profile_sections.append(f"STUDENT: {student.google_name or student.email}")
+            profile_sections.append(f"STUDENT: {candidate['name']}")
             
-            if onboarding:
-                profile_sections.append(f"CAREER GOALS: {str(onboarding.career_goals) if onboarding.career_goals else 'Not specified'}")
-                profile_sections.append(f"CURRENT SKILLS: {str(onboarding.current_skills) if onboarding.current_skills else 'Not specified'}")
-                profile_sections.append(f"EDUCATION LEVEL: {onboarding.grade or 'Not specified'}")
+            if candidate["has_onboarding"]:
+                profile_sections.append(f"CAREER GOALS: {str(candidate['career_goals_raw']) if candidate['career_goals_raw'] else 'Not specified'}")
+                profile_sections.append(f"CURRENT SKILLS: {str(candidate['current_skills_raw']) if candidate['current_skills_raw'] else 'Not specified'}")
+                profile_sections.append(f"EDUCATION LEVEL: {candidate['grade'] or 'Not specified'}")
             
             profile_sections.append(f"LEARNING PROGRESS: {learning_progress:.1f}% completed")
-            profile_sections.append(f"QUIZ PERFORMANCE: {avg_score:.1f}% average ({len(quiz_scores)} quizzes)")
+            profile_sections.append(f"QUIZ PERFORMANCE: {avg_score:.1f}% average ({candidate['quiz_count']} quizzes)")
             
             student_profile = "\n".join(profile_sections)
             
@@ -1965,29 +1927,37 @@ Score 0-100 (where 80+ = excellent fit, 60-79 = good fit, 40-59 = moderate fit,
                 score_text = response.text.strip()
                 import re
                 numbers = re.findall(r'\d+', score_text)
-                score = int(numbers[0]) if numbers else 0
-                score = min(max(score, 0), 100)
+                llm_score = int(numbers[0]) if numbers else 0
+                llm_score = min(max(llm_score, 0), 100)
+                score = blend_llm_score(float(prior[idx]), llm_score, settings.MATCH_LLM_WEIGHT)
                 
                 # Include all candidates to show match percentages
-                matches.append({
-                    "user_id": student.id,
-                    "name": student.google_name or student.email,
-                    "email": student.email,
+                return score, {
+                    "user_id": candidate["user_id"],
+                    "name": candidate["name"],
+                    "email": candidate["email"],
                     "score": score,
+                    "llm_score": llm_score,
+                    "prior_score": round(float(prior[idx]) * 100, 1),
                     "avg_quiz_score": round(avg_score, 1),
                     "learning_progress": round(learning_progress, 1),
-                    "career_goals": str(onboarding.career_goals) if onboarding and onboarding.career_goals else "Not specified",
-                    "skills": str(onboarding.current_skills) if onboarding and onboarding.current_skills else "Not specified",
+                    "career_goals": str(candidate["career_goals_raw"]) if candidate["career_goals_raw"] else "Not specified",
+                    "skills": str(candidate["current_skills_raw"]) if candidate["current_skills_raw"] else "Not specified",
                     "match_explanation": f"AI analysis: {score}% match based on skills alignment, career goals, and learning commitment.",
                     "recommendation": "Highly Recommended" if score >= 80 else "Recommended" if score >= 60 else "Consider" if score >= 40 else "Not Ideal",
-                    "shortlisted": student.id in shortlisted_ids
-                })
+                    "shortlisted": candidate["user_id"] in shortlisted_ids
+                }
             except Exception as e:
-                print(f"AI matching error for student {student.id}: {e}")
-                continue
-        
-        # Sort by score
-        matches.sort(key=lambda x: x["score"], reverse=True)
+                print(f"AI matching error for student {candidate['user_id']}: {e}")
+                return None
+        
+        # Top 20 by blended score; stop calling the LLM once even a perfect LLM score can't reach the top 20
+        top, stats = select_top_k(
+            top_k_indices(prior, settings.MATCH_LLM_DEPTH), 20, score_candidate,
+            upper_bound_fn=lambda idx: max_blended_score(float(prior[idx]), settings.MATCH_LLM_WEIGHT),
+            sorted_by_bound=True,
+        )
+        matches = [match for _, match in top]
         
         return {
             "job": {
@@ -1999,8 +1969,9 @@ Score 0-100 (where 80+ = excellent fit, 60-79 = good fit, 40-59 = moderate fit,
                 "salary_range": job.salary_range or "Not specified",
                 "created_at": job.created_at.isoformat() if job.created_at else None
             },
-            "matches": matches[:20],  # Top 20 matches
-            "total_matches": len(matches),
+            "matches": matches,  # Top 20 matches
+            "total_matches": stats["qualified"],
+            "candidates_scored": stats["scored"],
             "shortlisted_count": len(shortlisted_ids)
         }
         
@@ -2008,7 +1979,7 @@ Score 0-100 (where 80+ = excellent fit, 60-79 = good fit, 40-59 = moderate fit,
         raise HTTPException(status_code=500, detail=f"Error finding matches: {str(e)}")
 
 @router.get("/recruiter/candidate/{user_id}/job-recommendations")
-def get_candidate_job_recommendations(user_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+def get_candidate_job_recommendations(user_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_read_db)):
     """Get AI-powered job recommendations for a specific candidate"""
     recruiter = _require_recruiter(credentials, db)
     
@@ -2449,8 +2420,9 @@ def shortlist_candidate(data: Dict[str, Any], credentials: HTTPAuthorizationCred
     return {"message": "Candidate shortlisted successfully", "shortlist_id": shortlist.id}
 
 @router.get("/recruiter/jobs/{job_id}/shortlisted")
-def get_shortlisted_candidates(job_id: int, credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
-    """Get shortlisted candidates for a job"""
+def get_shortlisted_candidates(job_id: int, cursor: str = "", limit: Optional[int] = None,
+                               credentials: HTTPAuthorizationCredentials = Depends(bearer), db: Session = Depends(get_db)):
+    """Get shortlisted candidates for a job, most recently shortlisted first (paged when ``limit`` is given)"""
     recruiter = _require_recruiter(credentials, db)
     
     # Verify job belongs to recruiter
@@ -2458,17 +2430,29 @@ def get_shortlisted_candidates(job_id: int, credentials: HTTPAuthorizationCreden
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    shortlisted = db.query(Shortlist).filter(
+    query = db.query(Shortlist).filter(
         Shortlist.recruiter_id == recruiter.id,
         Shortlist.job_id == job_id
-    ).all()
+    )
+    next_cursor = None
+    if cursor or limit:
+        try:
+            shortlisted, next_cursor = keyset_page(query, Shortlist.created_at, Shortlist.id, cursor,
+                                                   clamp_limit(limit), f"shortlist:{job_id}")
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    else:
+        shortlisted = query.order_by(Shortlist.created_at.desc(), Shortlist.id.desc()).all()
     
+    # Users and onboarding for every shortlisted student in one bulk load
+    roster = load_roster(db, {entry.student_id for entry in shortlisted}, vectors=False)
+
     candidates = []
     for entry in shortlisted:
-        student = db.query(User).filter(User.id == entry.student_id).first()
-        onboarding = db.query(Onboarding).filter(Onboarding.user_id == entry.student_id).first()
-        
-        if student:
+        bundle = roster.get(entry.student_id)
+
+        if bundle:
+            student, onboarding = bundle.user, bundle.onboarding
             candidates.append({
                 "shortlist_id": entry.id,
                 "student_id": student.id,
@@ -2489,7 +2473,8 @@ def get_shortlisted_candidates(job_id: int, credentials: HTTPAuthorizationCreden
             "description": job.description
         },
         "shortlisted_candidates": candidates,
-        "total_shortlisted": len(candidates)
+        "total_shortlisted": len(candidates),
+        "next_cursor": next_cursor
     }
 
 @router.delete("/recruiter/shortlist/{shortlist_id}")
@@ -2548,26 +2533,31 @@ def get_upcoming_interviews(credentials: HTTPAuthorizationCredentials = Depends(
         
         interviews = google_meet_service.get_upcoming_interviews(recruiter.id, days_ahead=14)
         
+        # Candidate email per interview: the first attendee who is not the recruiter
+        candidate_emails = [
+            next((a.get('email') for a in interview.get('attendees', []) if a.get('email') != recruiter.email), None)
+            for interview in interviews
+        ]
+        users_by_email = {
+            user.email: user for user in db.query(User.id, User.email, User.google_name, User.google_picture).filter(
+                User.email.in_({email for email in candidate_emails if email})
+            ).all()
+        }
+        
         # Enhance with candidate information
         enhanced_interviews = []
-        for interview in interviews:
+        for interview, candidate_email in zip(interviews, candidate_emails):
             # Try to match with shortlisted candidates
             candidate_info = None
             
-            # Extract candidate email from attendees
-            for attendee in interview.get('attendees', []):
-                if attendee.get('email') != recruiter.email:
-                    candidate_email = attendee.get('email')
-                    candidate = db.query(User).filter(User.email == candidate_email).first()
-                    
-                    if candidate:
-                        candidate_info = {
-                            "id": candidate.id,
-                            "name": candidate.google_name or candidate.email.split('@')[0],
-                            "email": candidate.email,
-                            "picture": candidate.google_picture
-                        }
-                    break
+            candidate = users_by_email.get(candidate_email)
+            if candidate:
+                candidate_info = {
+                    "id": candidate.id,
+                    "name": candidate.google_name or candidate.email.split('@')[0],
+                    "email": candidate.email,
+                    "picture": candidate.google_picture
+                }
             
             enhanced_interviews.append({
                 **interview,
@@ -2855,9 +2845,9 @@ def add_email_to_shortlist(data: Dict[str, Any], credentials: HTTPAuthorizationC
         vector = simple_text_embedding(summary)
         candidate_vector = CandidateVector(
             user_id=new_user.id,
-            vector=vector,
             summary_text=summary,
-            skills_tags=skills[:10]
+            skills_tags=skills[:10],
+            **encode_vector(vector)
         )
         db.add(candidate_vector)
     except Exception as e:
@@ -3091,25 +3081,28 @@ def get_all_shortlisted_candidates(credentials: HTTPAuthorizationCredentials = D
         Shortlist.recruiter_id == recruiter.id
     ).order_by(Shortlist.created_at.desc()).all()
     
+    # Students from the roster snapshot, jobs in one query
+    snapshot = roster_snapshot.get(db)
+    jobs = {job.id: job for job in db.query(Job).filter(Job.id.in_({entry.job_id for entry in shortlisted})).all()}
+    
     candidates = []
     for entry in shortlisted:
-        student = db.query(User).filter(User.id == entry.student_id).first()
-        job = db.query(Job).filter(Job.id == entry.job_id).first()
-        onboarding = db.query(Onboarding).filter(Onboarding.user_id == entry.student_id).first()
-        candidate_vector = db.query(CandidateVector).filter(CandidateVector.user_id == entry.student_id).first()
+        student = snapshot.get(entry.student_id)
+        job = jobs.get(entry.job_id)
         
         if student:
+            has_onboarding = student["has_onboarding"]
             candidates.append({
                 "shortlist_id": entry.id,
-                "student_id": student.id,
-                "name": student.google_name or student.email,
-                "email": student.email,
-                "picture": student.google_picture,
+                "student_id": student["user_id"],
+                "name": student["name"] or student["email"],
+                "email": student["email"],
+                "picture": student["picture"],
                 "match_score": entry.match_score,
                 "notes": entry.notes,
                 "status": entry.status,
                 "shortlisted_at": entry.created_at.isoformat(),
-                "source": getattr(entry, 'source', 'email' if student.created_by_recruiter_id == recruiter.id else 'platform'),
+                "source": getattr(entry, 'source', 'email' if student["created_by_recruiter_id"] == recruiter.id else 'platform'),
                 "job": {
                     "id": job.id,
                     "title": job.title,
@@ -3117,17 +3110,11 @@ def get_all_shortlisted_candidates(credentials: HTTPAuthorizationCredentials = D
                     "location": job.location
                 } if job else None,
                 "profile": {
-                    "career_goals": str(onboarding.career_goals) if onboarding and onboarding.career_goals else "Not specified",
-                    "skills": str(onboarding.current_skills) if onboarding and onboarding.current_skills else "Not specified",
-                    "grade": onboarding.grade if onboarding else "Not specified",
-                    "summary": candidate_vector.summary_text if candidate_vector else "No summary available",
-                    "skills_tags": candidate_vector.skills_tags if candidate_vector else []
-                } if onboarding else {
-                    "career_goals": "Not specified",
-                    "skills": "Not specified", 
-                    "grade": "Not specified",
-                    "summary": candidate_vector.summary_text if candidate_vector else "No summary available",
-                    "skills_tags": candidate_vector.skills_tags if candidate_vector else []
+                    "career_goals": str(student["career_goals"]) if has_onboarding and student["career_goals"] else "Not specified",
+                    "skills": str(student["current_skills"]) if has_onboarding and student["current_skills"] else "Not specified",
+                    "grade": student["grade"] if has_onboarding else "Not specified",
+                    "summary": student["summary"] if student["summary"] is not None else "No summary available",
+                    "skills_tags": student["skills_tags"]
                 },
                 "can_schedule_interview": True,
                 "can_update_status": True,
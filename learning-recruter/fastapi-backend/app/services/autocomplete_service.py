@@ -0,0 +1,173 @@
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.prefix_trie import PrefixTrie, normalize_term
+from app.models.user import User
+from app.models.onboarding import Onboarding
+from app.models.job import Job
+from app.models.student_profile_summary import StudentProfileSummary
+from app.services.candidate_features import _as_list
+
+KINDS = ("skill", "career_goal", "job_title", "name")
+
+# kind -> terms of one student or job; each source counts a term once
+Terms = Dict[str, List[str]]
+
+
+def _distinct(values: Iterable[str]) -> List[str]:
+    seen = {}
+    for value in values:
+        key = normalize_term(value) if isinstance(value, str) else ""
+        if key:
+            seen.setdefault(key, value.strip())
+    return list(seen.values())
+
+
+def load_student_terms(db: Session, user_ids: Optional[Iterable[int]] = None) -> Dict[int, Terms]:
+    """Skills, career goals and names per student from profile summaries and onboarding."""
+    students = db.query(User.id, User.google_name).filter(User.user_type == 'student')
+    if user_ids is not None:
+        students = students.filter(User.id.in_(list(user_ids)))
+    student_subquery = students.with_entities(User.id).scalar_subquery()
+    summaries = {
+        row.user_id: row for row in db.query(
+            StudentProfileSummary.user_id, StudentProfileSummary.skills_tags, StudentProfileSummary.interests,
+        ).filter(StudentProfileSummary.user_id.in_(student_subquery)).order_by(StudentProfileSummary.id).all()
+    }
+    onboarding = {
+        row.user_id: row for row in db.query(
+            Onboarding.user_id, Onboarding.name, Onboarding.career_goals, Onboarding.current_skills,
+        ).filter(Onboarding.user_id.in_(student_subquery)).all()
+    }
+    terms = {}
+    for student in students.all():
+        summary = summaries.get(student.id)
+        onb = onboarding.get(student.id)
+        terms[student.id] = {
+            "skill": _distinct(_as_list(summary.skills_tags if summary else None)
+                               + _as_list(onb.current_skills if onb else None)),
+            "career_goal": _distinct(_as_list(summary.interests if summary else None)
+                                     + _as_list(onb.career_goals if onb else None)),
+            "name": _distinct([student.google_name or (onb.name if onb else None)]),
+        }
+    return terms
+
+
+def load_job_terms(db: Session, job_ids: Optional[Iterable[int]] = None) -> Dict[int, Terms]:
+    jobs = db.query(Job.id, Job.title)
+    if job_ids is not None:
+        jobs = jobs.filter(Job.id.in_(list(job_ids)))
+    return {job.id: {"job_title": _distinct([job.title])} for job in jobs.all()}
+
+
+class AutocompleteIndex:
+    """Typeahead over skills, career goals, job titles and student names.
+
+    One ``PrefixTrie`` per kind, counting how many students (or jobs) carry
+    each term. The index is loaded once; afterwards committed changes to
+    users, onboarding, profile summaries and jobs mark their source dirty
+    and the next lookup swaps just those sources' terms in and out.
+    """
+
+    TRACKED = (User, Onboarding, StudentProfileSummary, Job)
+
+    def __init__(self, top_k: int = 10):
+        self.top_k = top_k
+        self._tries: Optional[Dict[str, PrefixTrie]] = None
+        self._sources: Dict[Tuple[str, int], Terms] = {}
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+
+    def _build(self, db: Session):
+        self._sources = {("user", uid): terms for uid, terms in load_student_terms(db).items()}
+        self._sources.update({("job", jid): terms for jid, terms in load_job_terms(db).items()})
+        counts = {kind: Counter() for kind in KINDS}
+        for terms in self._sources.values():
+            for kind, values in terms.items():
+                counts[kind].update(values)
+        self._tries = {kind: PrefixTrie.build(counts[kind], self.top_k) for kind in KINDS}
+        self._dirty.clear()
+
+    def _apply(self, key: Tuple[str, int], terms: Optional[Terms]):
+        old = self._sources.pop(key, None) or {}
+        for kind, values in old.items():
+            for value in values:
+                self._tries[kind].add(value, -1)
+        if terms:
+            self._sources[key] = terms
+            for kind, values in terms.items():
+                for value in values:
+                    self._tries[kind].add(value, 1)
+
+    def _refresh(self, db: Session):
+        if self._tries is None:
+            self._build(db)
+            return
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        user_ids = [i for source, i in dirty if source == "user"]
+        job_ids = [i for source, i in dirty if source == "job"]
+        fresh = {("user", uid): t for uid, t in (load_student_terms(db, user_ids) if user_ids else {}).items()}
+        fresh.update({("job", jid): t for jid, t in (load_job_terms(db, job_ids) if job_ids else {}).items()})
+        for key in dirty:
+            self._apply(key, fresh.get(key))
+
+    def complete(self, db: Session, prefix: str, kinds: Optional[Iterable[str]] = None,
+                 limit: int = 10) -> Dict[str, List[Dict[str, object]]]:
+        """Top ``limit`` completions of ``prefix`` per kind, most frequent first."""
+        with self._lock:
+            self._refresh(db)
+            return {kind: self._tries[kind].complete(prefix, limit) for kind in (kinds or KINDS)}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {kind: len(trie) for kind, trie in (self._tries or {}).items()}
+
+    def mark_dirty(self, user_ids: Iterable[int] = (), job_ids: Iterable[int] = ()):
+        keys = {("user", int(u)) for u in user_ids if u is not None}
+        keys |= {("job", int(j)) for j in job_ids if j is not None}
+        if keys:
+            with self._lock:
+                self._dirty |= keys
+
+    def invalidate(self):
+        with self._lock:
+            self._tries = None
+            self._sources = {}
+            self._dirty.clear()
+
+    def _source_of(self, obj) -> Optional[Tuple[str, int]]:
+        if isinstance(obj, Job):
+            return ("job", obj.id) if obj.id is not None else None
+        user_id = obj.id if isinstance(obj, User) else getattr(obj, "user_id", None)
+        return ("user", user_id) if user_id is not None else None
+
+    def _after_flush(self, session, flush_context):
+        pending = session.info.setdefault("autocomplete_dirty", set())
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, self.TRACKED):
+                pending.add(self._source_of(obj))
+
+    def _after_commit(self, session):
+        keys = {key for key in session.info.pop("autocomplete_dirty", ()) if key}
+        if keys:
+            with self._lock:
+                self._dirty |= keys
+
+    def _after_rollback(self, session):
+        session.info.pop("autocomplete_dirty", None)
+
+    def track_changes(self):
+        """Listen for committed changes on every ORM session."""
+        event.listen(Session, "after_flush", self._after_flush)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+
+autocomplete_index = AutocompleteIndex()
+autocomplete_index.track_changes()
@@ -0,0 +1,258 @@
+import json
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.embeddings import _tokenize, simple_text_embedding
+from app.core.lsa_embedder import HASH_VERSION, LsaEmbedder, active_embedder
+from app.core.ranking import TermIndex, bm25_scores, fuse, scale_to_unit
+from app.core.vector_codec import int8_row_norms, quantize_rows, quantized_dot, unpack_float32, unpack_int8
+from app.models.candidate_vector import CandidateVector
+
+EMBEDDING_DIM = 256
+
+
+def _as_list(value) -> List[str]:
+    if isinstance(value, list):
+        return [v for v in value if isinstance(v, str)]
+    if isinstance(value, str) and value:
+        return [value]
+    return []
+
+
+def _github_languages(raw: Optional[str]) -> List[str]:
+    if not raw:
+        return []
+    try:
+        repos = json.loads(raw)
+    except Exception:
+        return []
+    if not isinstance(repos, list):
+        return []
+    return [repo['language'] for repo in repos[:5] if isinstance(repo, dict) and repo.get('language')]
+
+
+def _plan_progress(plan: Optional[Dict[str, Any]], month_index: Optional[int], day: Optional[int],
+                   current_day: Any = None, stats: Any = None) -> Dict[str, Any]:
+    """``current_day`` is the student's current ``learning_plan_days`` row; without one the plan JSON is read.
+
+    With ``stats`` (the student's ``student_stats`` row) progress, month
+    counts and ``has_plan`` are its maintained values; the JSON only
+    supplies topics.
+    """
+    months = (plan or {}).get("months", []) or []
+    topics = []
+    for m in months:
+        topics.extend(t for t in (m.get("topics") or []) if isinstance(t, str))
+    current_topic = "No active learning"
+    month_index = month_index or 1
+    day = day or 1
+    if current_day is not None:
+        current_topic = current_day.concept or 'No topic assigned'
+    elif months and 1 <= month_index <= len(months):
+        days = months[month_index - 1].get("days", []) or []
+        if 0 < day <= len(days):
+            current_topic = days[day - 1].get('concept', 'No topic assigned')
+    if stats is not None:
+        return {
+            "learning_progress": stats.learning_progress or 0,
+            "completed_months": stats.completed_months or 0,
+            "total_months": stats.total_months or 0,
+            "topics": list(dict.fromkeys(topics)),
+            "current_topic": current_topic,
+            "has_plan": bool(stats.has_plan),
+        }
+    completed = sum(1 for m in months if m.get("status") == "completed")
+    return {
+        "learning_progress": (completed / len(months) * 100) if months else 0,
+        "completed_months": completed,
+        "total_months": len(months),
+        "topics": list(dict.fromkeys(topics)),
+        "current_topic": current_topic,
+        "has_plan": bool(months),
+    }
+
+
+class CandidateFeatures:
+    """Per-candidate feature arrays for the student roster, aligned by position.
+
+    Built once per request from a handful of set-based queries; every matcher
+    then scores the whole roster with array operations and only looks at
+    ``profiles`` for the few candidates it actually returns.
+
+    Roster vectors are either float32 rows or, when ``scales`` is given, int8
+    codes with one scale per row; the latter is a quarter of the memory and
+    is scanned with integer dot products.
+    """
+
+    def __init__(self, profiles: List[Dict[str, Any]], vectors: np.ndarray, embedder: Optional[LsaEmbedder] = None,
+                 scales: Optional[np.ndarray] = None):
+        self.profiles = profiles
+        self.embedder = embedder
+        self.user_ids = np.asarray([p["user_id"] for p in profiles], dtype=np.int64)
+        self._position = {p["user_id"]: i for i, p in enumerate(profiles)}
+        self.codes = None
+        self.scales = None
+        if scales is not None:
+            # Fold each row's norm into its scale so the scan yields cosine similarity
+            norms = int8_row_norms(vectors, scales) if len(vectors) else np.zeros(0, dtype=np.float32)
+            norms[norms == 0] = 1.0
+            self.codes = vectors
+            self.scales = (scales / norms).astype(np.float32)
+            self.vectors = None
+        else:
+            norms = np.linalg.norm(vectors, axis=1) if len(vectors) else np.zeros(0, dtype=np.float32)
+            norms[norms == 0] = 1.0
+            self.vectors = (vectors / norms[:, None]).astype(np.float32) if len(vectors) else vectors
+        self.terms = TermIndex([p["doc_terms"] for p in profiles])
+        self.skills = TermIndex([p["skill_keys"] for p in profiles])
+        self.quiz = np.asarray([p["avg_quiz_score"] / 100.0 for p in profiles], dtype=np.float32)
+        self.progress = np.asarray([p["learning_progress"] / 100.0 for p in profiles], dtype=np.float32)
+        self.social = np.asarray([len(p["social_presence"]) / 3.0 for p in profiles], dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def index_of(self, user_id: int) -> Optional[int]:
+        return self._position.get(user_id)
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Embed query text in the same space as the roster vectors."""
+        if self.embedder is not None:
+            return self.embedder.embed(text)
+        return np.asarray(simple_text_embedding(text), dtype=np.float32)
+
+    def row_vector(self, idx: int) -> np.ndarray:
+        """Unit-length float32 vector of one roster row."""
+        if self.codes is not None:
+            return self.codes[idx].astype(np.float32) * self.scales[idx]
+        return self.vectors[idx]
+
+    def vector_similarity(self, query_vector) -> np.ndarray:
+        if not len(self):
+            return np.zeros(0, dtype=np.float32)
+        q = np.asarray(query_vector, dtype=np.float32)
+        q_norm = float(np.linalg.norm(q)) or 1.0
+        if self.codes is not None:
+            return np.clip(quantized_dot(self.codes, self.scales, q / q_norm), 0.0, 1.0)
+        return np.clip(self.vectors @ (q / q_norm), 0.0, 1.0)
+
+    def skill_overlap(self, skills: List[str], jaccard: bool = False) -> np.ndarray:
+        """Share of ``skills`` each candidate has (or Jaccard similarity)."""
+        keys = list({s.strip().lower() for s in skills if isinstance(s, str) and s.strip()})
+        if not keys or not len(self):
+            return np.zeros(len(self), dtype=np.float32)
+        shared = self.skills.overlap_counts(keys)
+        if jaccard:
+            union = self.skills.doc_terms + len(keys) - shared
+            return np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+        return shared / len(keys)
+
+    def feature_arrays(self, query_text: str, skills: List[str], query_vector: Optional[np.ndarray] = None,
+                       jaccard: bool = False) -> Dict[str, np.ndarray]:
+        return {
+            "vector": self.vector_similarity(query_vector if query_vector is not None else self.embed_query(query_text)),
+            "bm25": scale_to_unit(bm25_scores(self.terms, _tokenize(query_text))),
+            "skill_overlap": self.skill_overlap(skills, jaccard=jaccard),
+            "quiz": self.quiz,
+            "progress": self.progress,
+            "social": self.social,
+        }
+
+    def score(self, query_text: str, skills: List[str], weights: Optional[Dict[str, float]] = None,
+              method: Optional[str] = None, query_vector: Optional[np.ndarray] = None,
+              jaccard: bool = False) -> np.ndarray:
+        """Fused prior in [0, 1] for every candidate against one query."""
+        features = self.feature_arrays(query_text, skills, query_vector=query_vector, jaccard=jaccard)
+        return fuse(features, weights=weights, method=method or settings.MATCH_FUSION)
+
+    def score_matrix(self, queries: List[Dict[str, Any]], weights: Optional[Dict[str, float]] = None,
+                     method: Optional[str] = None) -> np.ndarray:
+        """Fused priors for many queries at once, shape (len(queries), len(self)).
+
+        Each query is ``{"text": ..., "skills": [...]}``. With float32 rows the
+        embedding similarity for all queries is a single matrix product.
+        """
+        if not queries:
+            return np.zeros((0, len(self)), dtype=np.float32)
+        query_vectors = np.asarray([self.embed_query(q["text"]) for q in queries], dtype=np.float32)
+        query_vectors /= np.maximum(np.linalg.norm(query_vectors, axis=1, keepdims=True), 1e-12)
+        if not len(self):
+            similarity = np.zeros((len(queries), 0), dtype=np.float32)
+        elif self.codes is not None:
+            similarity = np.vstack([self.vector_similarity(q) for q in query_vectors])
+        else:
+            similarity = np.clip(query_vectors @ self.vectors.T, 0.0, 1.0)
+        method = method or settings.MATCH_FUSION
+        rows = []
+        for row, query in enumerate(queries):
+            features = {
+                "vector": similarity[row],
+                "bm25": scale_to_unit(bm25_scores(self.terms, _tokenize(query["text"]))),
+                "skill_overlap": self.skill_overlap(query.get("skills") or []),
+                "quiz": self.quiz,
+                "progress": self.progress,
+                "social": self.social,
+            }
+            rows.append(fuse(features, weights=weights, method=method))
+        return np.vstack(rows)
+
+
+def load_candidate_features(db: Session, user_ids: Optional[List[int]] = None) -> CandidateFeatures:
+    """Load the student roster (or ``user_ids``) as a ``CandidateFeatures``.
+
+    Profiles come from the materialized profile documents, so with fresh
+    documents this is three queries.
+
+    Stored vectors are used only when they were written by the active
+    embedder; anything else is re-embedded from the profile document so
+    roster and query vectors always share one space. With
+    ``VECTOR_SCAN_DTYPE=int8`` only the packed int8 codes are read.
+    """
+    from app.services.profile_documents import get_profile_documents
+
+    quantized = settings.VECTOR_SCAN_DTYPE == "int8"
+    embedder = active_embedder()
+    version = embedder.version if embedder else HASH_VERSION
+    dim = embedder.dim if embedder else EMBEDDING_DIM
+    documents = get_profile_documents(db, user_ids)
+    packed_column = (CandidateVector.vector_i8 if quantized else CandidateVector.vector_f32).label("packed")
+    vectors = {}
+    vector_query = db.query(
+        CandidateVector.user_id, CandidateVector.vector, packed_column, CandidateVector.vector_scale,
+        CandidateVector.embedding_version,
+    )
+    if user_ids is not None:
+        vector_query = vector_query.filter(CandidateVector.user_id.in_(list(documents)))
+    for row in vector_query.order_by(CandidateVector.id).all():
+        vectors.setdefault(row.user_id, row)
+
+    profiles = []
+    matrix = np.zeros((len(documents), dim), dtype=np.int8 if quantized else np.float32)
+    scales = np.ones(len(documents), dtype=np.float32)
+    unpacked = []  # (row, float vector) for rows without usable packed data
+    for i, (user_id, document) in enumerate(documents.items()):
+        cv = vectors.get(user_id)
+        doc = document["search_text"]
+        profiles.append({**document, "doc_terms": _tokenize(doc)})
+        current = cv is not None and (cv.embedding_version or HASH_VERSION) == version
+        packed = (unpack_int8 if quantized else unpack_float32)(cv.packed) if current and cv.packed else None
+        if packed is not None and len(packed) == dim:
+            matrix[i] = packed
+            scales[i] = cv.vector_scale or 1.0
+        elif current and cv.vector and len(cv.vector) == dim:
+            unpacked.append((i, cv.vector))  # not migrated to packed storage yet
+        else:
+            unpacked.append((i, embedder.embed(doc) if embedder else simple_text_embedding(doc)))
+
+    if unpacked:
+        rows = np.asarray([r for r, _ in unpacked], dtype=np.int64)
+        dense = np.asarray([v for _, v in unpacked], dtype=np.float32)
+        if quantized:
+            matrix[rows], scales[rows] = quantize_rows(dense)
+        else:
+            matrix[rows] = dense
+
+    return CandidateFeatures(profiles, matrix, embedder=embedder, scales=scales if quantized else None)
@@ -1,13 +1,21 @@
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from app.models.user import User
 from app.models.onboarding import Onboarding
 from app.models.learning_plan import LearningPlan
 from app.models.candidate_vector import CandidateVector
-from app.models.quiz import Quiz
-from app.core.embeddings import simple_text_embedding
-from app.core.summarizer import summarize_learning
+from app.models.quiz import QuizSubmission
+from app.models.student_profile_summary import StudentProfileSummary
+from app.core.embeddings import embed_texts
+from app.core.lsa_embedder import embed_documents
+from app.core.vector_codec import encode_vector
+from app.core.summarizer import summarize_learning_offline
+from app.core.summary_service import build_student_profile_summary
+from app.services.roster_snapshot import roster_snapshot
+from app.services.autocomplete_service import autocomplete_index
+from app.services.profile_documents import mark_profile_documents_stale
 
 
 class CandidateService:
@@ -21,8 +29,42 @@ class CandidateService:
             
         onboarding = self.db.query(Onboarding).filter(Onboarding.user_id == user_id).first()
         learning_plan = self.db.query(LearningPlan).filter(LearningPlan.user_id == user_id).first()
-        quizzes = self.db.query(Quiz).filter(Quiz.user_id == user_id).all()
+        submissions = self.db.query(QuizSubmission).filter(QuizSubmission.user_id == user_id).all()
         
+        profile_data, summary_text = self.build_candidate_profile(user, onboarding, learning_plan, submissions)
+        vectors, version = embed_documents([summary_text])
+        packed = encode_vector(vectors[0])
+        
+        existing = self.db.query(CandidateVector).filter(CandidateVector.user_id == user_id).first()
+        if existing:
+            existing.vector = None
+            existing.vector_f32 = packed["vector_f32"]
+            existing.vector_i8 = packed["vector_i8"]
+            existing.vector_scale = packed["vector_scale"]
+            existing.embedding_version = version
+            existing.summary_text = summary_text
+            existing.skills_tags = profile_data['skills']
+            existing.updated_at = datetime.utcnow()
+        else:
+            candidate_vector = CandidateVector(
+                user_id=user_id,
+                embedding_version=version,
+                **packed,
+                summary_text=summary_text,
+                skills_tags=profile_data['skills']
+            )
+            self.db.add(candidate_vector)
+        
+        self.db.commit()
+        return profile_data
+    
+    def update_candidate_vector(self, user_id: int) -> Dict[str, Any]:
+        """Refresh the stored candidate vector for one student."""
+        return self.create_candidate_summary(user_id)
+    
+    def build_candidate_profile(self, user, onboarding, learning_plan, submissions) -> Tuple[Dict[str, Any], str]:
+        """Profile data and summary text for one candidate from already loaded rows."""
+        user_id = user.id
         months = []
         skills = []
         if learning_plan and learning_plan.plan:
@@ -36,39 +78,124 @@ class CandidateService:
         total_months = len(months)
         progress_percentage = (completed_months / total_months * 100) if total_months > 0 else 0
         
-        quiz_scores = [q.score for q in quizzes if q.score is not None]
+        quiz_scores = [s.score for s in submissions if s.score is not None]
         avg_quiz_score = sum(quiz_scores) / len(quiz_scores) if quiz_scores else 0
         
         profile_data = {
             "user_id": user_id,
-            "name": getattr(onboarding, "name", f"User {user_id}"),
+            "name": getattr(onboarding, "name", None) or f"User {user_id}",
             "email": getattr(user, "email", ""),
-            "skills": list(set(skills))[:20],
+            "skills": list(dict.fromkeys(skills))[:20],
             "learning_progress": progress_percentage,
             "avg_quiz_score": avg_quiz_score,
             "career_readiness": self._assess_career_readiness(progress_percentage, avg_quiz_score, len(skills))
         }
         
         summary_text = f"{profile_data['name']} - Progress: {progress_percentage:.1f}%, Skills: {', '.join(skills[:5])}"
-        vector = simple_text_embedding(summary_text)
+        return profile_data, summary_text
+    
+    def load_student_batch(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Load users, onboarding, plans and quiz submissions for many students at once.
+
+        Four IN queries regardless of batch size, instead of four per student.
+        """
+        if not user_ids:
+            return {}
+        batch = {
+            u.id: {"user": u, "onboarding": None, "plan": None, "submissions": []}
+            for u in self.db.query(User).filter(User.id.in_(user_ids)).all()
+        }
+        for onb in self.db.query(Onboarding).filter(Onboarding.user_id.in_(user_ids)).all():
+            if onb.user_id in batch and batch[onb.user_id]["onboarding"] is None:
+                batch[onb.user_id]["onboarding"] = onb
+        for plan in self.db.query(LearningPlan).filter(LearningPlan.user_id.in_(user_ids)).order_by(LearningPlan.id).all():
+            if plan.user_id in batch and batch[plan.user_id]["plan"] is None:
+                batch[plan.user_id]["plan"] = plan
+        for sub in self.db.query(QuizSubmission).filter(QuizSubmission.user_id.in_(user_ids)).all():
+            if sub.user_id in batch:
+                batch[sub.user_id]["submissions"].append(sub)
+        return batch
+    
+    def bulk_update_candidates(self, limit: int = 200, after_id: int = 0, user_ids: Optional[List[int]] = None,
+                               summarize=summarize_learning_offline) -> Dict[str, Any]:
+        """Re-embed a chunk of students and upsert their vectors and profile summaries.
+
+        Without ``user_ids`` the next ``limit`` students after ``after_id`` are
+        processed, so callers can walk the roster by passing back ``last_user_id``.
+        """
+        if user_ids is None:
+            user_ids = [
+                row.id for row in self.db.query(User.id)
+                .filter(User.user_type == 'student', User.id > after_id)
+                .order_by(User.id)
+                .limit(limit)
+                .all()
+            ]
+        if not user_ids:
+            return {"processed": 0, "last_user_id": after_id}
         
-        existing = self.db.query(CandidateVector).filter(CandidateVector.user_id == user_id).first()
-        if existing:
-            existing.vector = vector
-            existing.summary_text = summary_text
-            existing.skills_tags = profile_data['skills']
-            existing.updated_at = datetime.utcnow()
-        else:
-            candidate_vector = CandidateVector(
-                user_id=user_id,
-                vector=vector,
-                summary_text=summary_text,
-                skills_tags=profile_data['skills']
+        batch = self.load_student_batch(user_ids)
+        ids = sorted(batch)
+        candidate_rows = []
+        summary_rows = []
+        for user_id in ids:
+            data = batch[user_id]
+            profile_data, summary_text = self.build_candidate_profile(
+                data["user"], data["onboarding"], data["plan"], data["submissions"]
             )
-            self.db.add(candidate_vector)
+            candidate_rows.append({"user_id": user_id, "summary_text": summary_text, "skills_tags": profile_data["skills"]})
+            summary_rows.append(build_student_profile_summary(
+                data["onboarding"], data["plan"], data["submissions"], summarize=summarize
+            ))
+        
+        # Candidate vectors feed the match prefilter and use the active embedder;
+        # profile summaries keep the hash embedding they are compared with
+        candidate_vectors, version = embed_documents([r["summary_text"] for r in candidate_rows])
+        vectors = embed_texts([r["embedding_text"] for r in summary_rows])
+        now = datetime.utcnow()
+        for i, row in enumerate(candidate_rows):
+            row["vector"] = None
+            row.update(encode_vector(candidate_vectors[i]))
+            row["embedding_version"] = version
+            row["updated_at"] = now
+        summary_rows = [
+            {
+                "user_id": user_id,
+                "summary_text": fields["summary_text"],
+                "interests": fields["interests"],
+                "skills_tags": fields["skills_tags"],
+                "vector": None,
+                **encode_vector(vectors[i]),
+                "updated_at": now,
+            }
+            for i, (user_id, fields) in enumerate(zip(ids, summary_rows))
+        ]
         
+        self._bulk_upsert(CandidateVector, candidate_rows, now)
+        self._bulk_upsert(StudentProfileSummary, summary_rows, now, defaults={"graph_neighbors": []})
+        mark_profile_documents_stale(self.db, ids)
         self.db.commit()
-        return profile_data
+        # Bulk statements bypass the ORM change tracking
+        roster_snapshot.mark_dirty(ids)
+        autocomplete_index.mark_dirty(user_ids=ids)
+        return {"processed": len(ids), "last_user_id": max(user_ids)}
+    
+    def _bulk_upsert(self, model, rows: List[Dict[str, Any]], now: datetime, defaults: Optional[Dict[str, Any]] = None):
+        """Update the existing row per user and insert the rest, one statement each."""
+        existing = {}
+        for row_id, user_id in (
+            self.db.query(model.id, model.user_id)
+            .filter(model.user_id.in_([r["user_id"] for r in rows]))
+            .order_by(model.id)
+            .all()
+        ):
+            existing.setdefault(user_id, row_id)
+        updates = [dict(r, id=existing[r["user_id"]]) for r in rows if r["user_id"] in existing]
+        inserts = [dict(defaults or {}, created_at=now, **r) for r in rows if r["user_id"] not in existing]
+        if updates:
+            self.db.execute(update(model), updates)
+        if inserts:
+            self.db.execute(insert(model), inserts)
     
     def _assess_career_readiness(self, progress: float, quiz_score: float, skill_count: int) -> str:
         readiness_score = (progress * 0.4) + (quiz_score * 0.4) + (min(skill_count, 10) * 2)
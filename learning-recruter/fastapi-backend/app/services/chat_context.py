@@ -0,0 +1,78 @@
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.ranking import top_k_indices
+from app.services.candidate_features import CandidateFeatures, load_candidate_features
+from app.services.profile_documents import estimate_tokens
+
+# Students ranked past this many times the cap are never worth a prompt slot
+_SCAN_FACTOR = 5
+
+
+def question_skills(features: CandidateFeatures, question: str) -> List[str]:
+    """Roster skills named in the question ("python", "machine learning", ...)."""
+    text = f" {question.lower()} "
+    return [skill for skill in features.skills.vocab
+            if skill and re.search(rf"(?<!\w){re.escape(skill)}(?!\w)", text)]
+
+
+def mentioned_students(features: CandidateFeatures, question: str) -> np.ndarray:
+    """Mask of students the question names by full name, email or a distinctive first name."""
+    text = f" {question.lower()} "
+    words = set(re.findall(r"[\w.@+-]+", text))
+    names = [(p.get("google_name") or p.get("onboarding_name") or "").lower().strip() for p in features.profiles]
+    first_names = Counter(name.split(" ")[0] for name in names if name)
+    mask = np.zeros(len(features), dtype=bool)
+    for i, (profile, name) in enumerate(zip(features.profiles, names)):
+        first = name.split(" ")[0] if name else ""
+        email = (profile.get("email") or "").lower()
+        mask[i] = bool(
+            (name and re.search(rf"(?<!\w){re.escape(name)}(?!\w)", text))
+            or (email and email in words)
+            # A first name shared by many students ("Student", "Alex") names nobody in particular
+            or (len(first) >= 3 and first in words and first_names[first] <= 3)
+        )
+    return mask
+
+
+def build_chat_context(db: Session, question: str, token_budget: Optional[int] = None,
+                       max_students: Optional[int] = None) -> Dict[str, Any]:
+    """Profiles of the students most relevant to ``question``, packed into a token budget.
+
+    Students the question names come first, then the rest of the roster by
+    the fused match prior for the question. Profiles are taken whole, best
+    first, skipping any that no longer fit the remaining budget.
+    """
+    token_budget = settings.RECRUITER_CHAT_CONTEXT_TOKENS if token_budget is None else token_budget
+    max_students = settings.RECRUITER_CHAT_MAX_STUDENTS if max_students is None else max_students
+    features = load_candidate_features(db)
+    if not len(features) or max_students <= 0:
+        return {"text": "", "students": [], "tokens": 0, "roster_size": len(features)}
+
+    prior = features.score(question, question_skills(features, question))
+    mentioned = mentioned_students(features, question)
+    ranking = prior + mentioned
+
+    blocks, students, used = [], [], 0
+    for idx in top_k_indices(ranking, max_students * _SCAN_FACTOR):
+        profile = features.profiles[idx]
+        text = profile["prompt_text"]
+        cost = profile.get("token_count") or estimate_tokens(text)
+        if used + cost > token_budget:
+            continue
+        blocks.append(f"[STUDENT_ID {profile['user_id']}]\n{text}")
+        students.append({
+            "user_id": profile["user_id"],
+            "name": profile["name"],
+            "relevance": round(float(prior[idx]), 3),
+            "mentioned": bool(mentioned[idx]),
+        })
+        used += cost
+        if len(students) >= max_students:
+            break
+    return {"text": "\n\n".join(blocks), "students": students, "tokens": used, "roster_size": len(features)}
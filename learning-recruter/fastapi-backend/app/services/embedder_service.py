@@ -0,0 +1,42 @@
+from typing import Dict, Any, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.lsa_embedder import LsaEmbedder, active_embedder, HASH_VERSION
+from app.models.job import Job
+from app.services.candidate_features import load_candidate_features
+
+
+def build_embedding_corpus(db: Session) -> list:
+    """Profile documents of every student plus every job posting's text."""
+    features = load_candidate_features(db)
+    docs = [" ".join(profile["doc_terms"]) for profile in features.profiles]
+    for title, description, requirements in db.query(Job.title, Job.description, Job.requirements).all():
+        docs.append(f"{title or ''} {description or ''} {' '.join(requirements or [])}")
+    return [doc for doc in docs if doc.strip()]
+
+
+def fit_lsa_embedder(db: Session, dim: Optional[int] = None) -> Dict[str, Any]:
+    """Fit the TF-IDF + SVD embedder on the current corpus and make it the active one."""
+    docs = build_embedding_corpus(db)
+    if not docs:
+        raise ValueError("No profile or job text to fit the embedder on")
+    embedder = LsaEmbedder.fit(docs, dim=dim or settings.LSA_DIM)
+    embedder.save(settings.LSA_MODEL_PATH)
+    print(f"✅ Fitted LSA embedder {embedder.version} on {len(docs)} documents ({len(embedder.vocab)} terms)")
+    return embedder_status()
+
+
+def embedder_status() -> Dict[str, Any]:
+    embedder = active_embedder()
+    if embedder is None:
+        return {"version": HASH_VERSION, "fitted": False}
+    return {
+        "version": embedder.version,
+        "fitted": True,
+        "dim": embedder.dim,
+        "vocab_size": len(embedder.vocab),
+        "n_docs": embedder.n_docs,
+        "fitted_at": embedder.fitted_at,
+    }
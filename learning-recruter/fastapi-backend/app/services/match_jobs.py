@@ -0,0 +1,330 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.ranking import top_k_indices, max_blended_score
+from app.core.topk import TopK
+from app.database.server_time import read_server_now, server_now
+from app.database.session_scope import session_scope
+from app.models.match_run import MatchRun
+from app.services.candidate_features import load_candidate_features
+from app.services.match_scoring import score_recruiter_match, explain_match
+
+MATCH_LIMIT = 25
+FINISHED = ("completed", "cancelled", "failed")
+# Seconds between row reads when streaming a run another worker executes
+POLL_SECONDS = 1.0
+# Owner of the runs this process executes; the suffix tells a restarted process from its predecessor
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class _RunState:
+    """In-memory copy of a run's progress, so streams in the worker's own process wake without polling."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.status = "queued"
+        self.total = 0
+        self.scored = 0
+        self.matches: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.version = 0
+        self.cancel = threading.Event()
+        self.lost = False  # the row was failed (or taken over) elsewhere; stop writing to it
+        self.changed = threading.Condition()
+
+    def publish(self, version: int, **fields):
+        with self.changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version = version
+            self.changed.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.changed:
+            return {
+                "run_id": self.run_id,
+                "status": self.status,
+                "total": self.total,
+                "scored": self.scored,
+                "matches": list(self.matches),
+                "error": self.error,
+                "version": self.version,
+            }
+
+
+class MatchJobManager:
+    """Runs recruiter matches in the background so requests return immediately.
+
+    Each run ranks the roster, then LLM-scores the best-ranked candidates one
+    at a time, writing the partial top list to its ``MatchRun`` row (and
+    bumping ``version``) after every call, so any worker can stream it.
+    Cancelling sets ``cancel_requested`` on the row; the run checks it
+    before the next model call and keeps whatever was ranked so far. Each
+    read and write is its own short ``session_scope``, so no connection is
+    held across model calls.
+
+    Rows record the executing process (``worker_id``) and a ``heartbeat_at``
+    on the database clock, refreshed by every write and, for queued runs and
+    long model calls, by a heartbeat thread. Only runs whose heartbeat went
+    quiet are failed as orphans.
+    """
+
+    def __init__(self, workers: int = None, heartbeat_seconds: Optional[float] = None):
+        self.workers = max(1, workers or settings.MATCH_JOB_WORKERS)
+        self.heartbeat_seconds = heartbeat_seconds or settings.MATCH_RUN_HEARTBEAT_SECONDS
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="match-job")
+        self._runs: Dict[str, _RunState] = {}
+        self._lock = threading.Lock()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def start(self, recruiter_id: int, data: Dict[str, Any]) -> str:
+        run_id = str(uuid.uuid4())
+        with session_scope("match_job", commit=True) as db:
+            db.add(MatchRun(
+                id=run_id,
+                recruiter_id=recruiter_id,
+                status="queued",
+                job_description=data["job_description"],
+                params={key: data.get(key) for key in ("requirements", "company", "location", "salary_range", "weights", "fusion")},
+                total=0,
+                scored=0,
+                worker_id=WORKER_ID,
+                heartbeat_at=server_now(db),
+                created_at=datetime.utcnow(),
+            ))
+        with self._lock:
+            self._runs[run_id] = _RunState(run_id)
+            if self._heartbeat is None or not self._heartbeat.is_alive():
+                self._heartbeat = threading.Thread(target=self._beat, name="match-job-heartbeat", daemon=True)
+                self._heartbeat.start()
+        self._pool.submit(self._run, run_id)
+        return run_id
+
+    def _beat(self):
+        """Refresh ``heartbeat_at`` of every run this process holds, queued ones included, until it holds none."""
+        while True:
+            time.sleep(self.heartbeat_seconds)
+            with self._lock:
+                run_ids = list(self._runs)
+                if not run_ids:
+                    self._heartbeat = None
+                    return
+            try:
+                with session_scope("match_job.heartbeat", commit=True) as db:
+                    db.execute(update(MatchRun)
+                               .where(MatchRun.id.in_(run_ids), MatchRun.worker_id == WORKER_ID,
+                                      MatchRun.status.notin_(FINISHED))
+                               .values(heartbeat_at=server_now(db)))
+            except Exception as e:
+                print(f"❌ Match run heartbeat failed: {e}")
+
+    def state(self, run_id: str) -> Optional[_RunState]:
+        return self._runs.get(run_id)
+
+    def cancel(self, run_id: str) -> bool:
+        """Flag a queued or running run for cancellation, whichever worker runs it; False once it has finished."""
+        with session_scope("match_job", commit=True) as db:
+            flagged = db.execute(
+                update(MatchRun)
+                .where(MatchRun.id == run_id, MatchRun.status.notin_(FINISHED))
+                .values(cancel_requested=True)
+            ).rowcount
+        state = self._runs.get(run_id)
+        if state:
+            state.cancel.set()
+        return bool(flagged)
+
+    def stored_snapshot(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Progress of a run as last written to its row; None if there is no such run."""
+        with session_scope("match_job") as db:
+            run = db.query(MatchRun).filter(MatchRun.id == run_id).first()
+        if not run:
+            return None
+        return {
+            "run_id": run.id,
+            "status": run.status,
+            "total": run.total or 0,
+            "scored": run.scored or 0,
+            "matches": run.results or [],
+            "error": run.error,
+            "version": run.version or 0,
+        }
+
+    def wait_for_update(self, run_id: str, version: int, timeout: float = 15.0,
+                        poll: float = POLL_SECONDS) -> Optional[Dict[str, Any]]:
+        """Block until the run moves past ``version`` (or ``timeout``) and return its snapshot.
+
+        A run executing in this process wakes the caller directly; any other
+        run is read from its row every ``poll`` seconds.
+        """
+        state = self._runs.get(run_id)
+        if state:
+            with state.changed:
+                state.changed.wait_for(lambda: state.version > version or state.status in FINISHED, timeout=timeout)
+            return state.snapshot()
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self.stored_snapshot(run_id)
+            if snapshot is None or snapshot["version"] > version or snapshot["status"] in FINISHED:
+                return snapshot
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return snapshot
+            time.sleep(min(poll, remaining))
+
+    def fail_orphaned_runs(self, stale_after: Optional[float] = None) -> int:
+        """Mark queued/running runs with no heartbeat for ``stale_after`` seconds as failed.
+
+        Their process stopped without finishing them. Runs of live workers
+        keep beating whenever this is called (e.g. when one worker restarts),
+        so they are never touched. The cutoff is on the database clock, the
+        one heartbeats are written with.
+        """
+        stale_after = stale_after if stale_after is not None else settings.MATCH_RUN_STALE_SECONDS
+        with session_scope("match_job", commit=True) as db:
+            cutoff = read_server_now(db) - timedelta(seconds=stale_after)
+            failed = db.execute(
+                update(MatchRun)
+                .where(MatchRun.status.in_(("queued", "running")),
+                       (MatchRun.heartbeat_at.is_(None)) | (MatchRun.heartbeat_at < cutoff))
+                .values(status="failed", error="Interrupted: the worker running it stopped",
+                        finished_at=datetime.utcnow(), version=MatchRun.version + 1)
+            ).rowcount
+        if failed:
+            print(f"⚠️ Marked {failed} interrupted match runs as failed")
+        return failed
+
+    def _publish(self, state: _RunState, columns: Optional[Dict[str, Any]] = None, **fields) -> bool:
+        """Write progress (plus any extra ``columns``) to the run's row, then wake streams in this process.
+
+        Only writes while the row is unfinished and owned by this process;
+        otherwise the run is marked lost and stopped, and local streams get
+        what the row says. Returns whether the row was written.
+        """
+        if state.lost:
+            return False
+        version = state.version + 1
+        values = {("results" if name == "matches" else name): value for name, value in fields.items()}
+        with session_scope("match_job", commit=True) as db:
+            written = db.execute(
+                update(MatchRun)
+                .where(MatchRun.id == state.run_id, MatchRun.worker_id == WORKER_ID, MatchRun.status.notin_(FINISHED))
+                .values(**values, **(columns or {}), version=version, heartbeat_at=server_now(db))
+            ).rowcount
+        if not written:
+            state.lost = True
+            state.cancel.set()
+            stored = self.stored_snapshot(state.run_id) or {"status": "failed", "version": version}
+            print(f"⚠️ Match run {state.run_id} was {stored['status']} elsewhere; stopping it")
+            state.publish(stored["version"], status=stored["status"], error=stored.get("error"))
+            return False
+        state.publish(version, **fields)
+        return True
+
+    def _cancelled(self, state: _RunState) -> bool:
+        """Cancelled in this process or, through ``cancel_requested``, by any other worker."""
+        if not state.cancel.is_set():
+            with session_scope("match_job") as db:
+                requested = db.query(MatchRun.cancel_requested).filter(MatchRun.id == state.run_id).scalar()
+            if requested:
+                state.cancel.set()
+        return state.cancel.is_set()
+
+    def _finish(self, state: _RunState, status: str, error: Optional[str] = None):
+        self._publish(state, {"finished_at": datetime.utcnow()}, status=status, scored=state.scored,
+                      matches=state.matches, error=error)
+        # Finished runs are served from the table from now on
+        with self._lock:
+            self._runs.pop(state.run_id, None)
+
+    def _run(self, run_id: str):
+        state = self._runs[run_id]
+        try:
+            from app.core.gemini_ai import chatbot
+
+            if self._cancelled(state):
+                self._finish(state, "cancelled")
+                return
+            if not self._publish(state, {"started_at": datetime.utcnow()}, status="running"):
+                self._finish(state, state.status)
+                return
+
+            with session_scope("match_job") as db:
+                run = db.query(MatchRun).filter(MatchRun.id == run_id).first()
+                features = load_candidate_features(db)
+            params = run.params or {}
+            job_description = run.job_description
+            requirements = params.get("requirements") or []
+            company = params.get("company") or ""
+
+            prior = features.score(f"{job_description} {' '.join(requirements)}", requirements,
+                                   weights=params.get("weights"), method=params.get("fusion"))
+            order = top_k_indices(prior, settings.MATCH_LLM_DEPTH)
+            self._publish(state, total=len(order))
+
+            # Same selection as /recruiter/match, published after every LLM call
+            top = TopK(MATCH_LIMIT)
+            scored = 0
+            for idx in order:
+                if self._cancelled(state):
+                    break
+                if top.full() and not top.can_beat(max_blended_score(float(prior[idx]), settings.MATCH_LLM_WEIGHT)):
+                    break
+                result = score_recruiter_match(chatbot.model, features.profiles[idx], float(prior[idx]),
+                                               job_description, requirements, company)
+                scored += 1
+                if result is not None:
+                    top.push(result[0], result[1])
+                self._publish(state, scored=scored, matches=[match for _, match in top.items()])
+
+            matches = [match for _, match in top.items()]
+            for match in matches:
+                if self._cancelled(state):
+                    break
+                match["match_explanation"] = explain_match(chatbot.model, match, job_description)
+                self._publish(state, matches=list(matches))
+
+            self._finish(state, "cancelled" if self._cancelled(state) else "completed")
+            print(f"✅ Match run {run_id} {state.status}: {len(matches)} matches from {scored} scored candidates")
+        except Exception as e:
+            print(f"❌ Match run {run_id} failed: {e}")
+            try:
+                self._finish(state, "failed", error=str(e))
+            except Exception as store_error:
+                print(f"❌ Could not record failure of match run {run_id}: {store_error}")
+                state.publish(state.version + 1, status="failed", error=str(e))
+                with self._lock:
+                    self._runs.pop(run_id, None)
+
+
+def serialize_match_run(run: MatchRun) -> Dict[str, Any]:
+    params = run.params or {}
+    return {
+        "run_id": run.id,
+        "status": run.status,
+        "total": run.total or 0,
+        "scored": run.scored or 0,
+        "matches": run.results or [],
+        "error": run.error,
+        "job_summary": {
+            "description": run.job_description,
+            "requirements": params.get("requirements") or [],
+            "company": params.get("company") or "",
+            "location": params.get("location") or "",
+        },
+        "created_at": run.created_at.isoformat() if run.created_at else None,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "finished_at": run.finished_at.isoformat() if run.finished_at else None,
+    }
+
+
+match_job_manager = MatchJobManager()
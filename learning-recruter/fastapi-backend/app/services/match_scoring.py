@@ -0,0 +1,136 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.ranking import blend_llm_score
+
+
+def recruiter_match_profile(candidate: Dict[str, Any]) -> str:
+    """Comprehensive student profile text for the recruiter matching prompt."""
+    avg_score = candidate["avg_quiz_score"]
+    github_skills = candidate["github_skills"]
+    social_presence = candidate["social_presence"]
+
+    profile_sections = []
+    profile_sections.append(f"STUDENT: {candidate['name']}")
+    profile_sections.append(f"EMAIL: {candidate['email']}")
+
+    if candidate["has_onboarding"]:
+        profile_sections.append(f"CAREER GOALS: {str(candidate['career_goals_raw']) if candidate['career_goals_raw'] else 'Not specified'}")
+        profile_sections.append(f"CURRENT SKILLS: {str(candidate['current_skills_raw']) if candidate['current_skills_raw'] else 'Not specified'}")
+        profile_sections.append(f"EDUCATION LEVEL: {candidate['grade'] or 'Not specified'}")
+        profile_sections.append(f"TIME COMMITMENT: {candidate['time_commitment'] or 'Not specified'}")
+
+    # Learning metrics
+    profile_sections.append(f"LEARNING PROGRESS: {candidate['learning_progress']:.1f}% completed")
+    profile_sections.append(f"CURRENT LEARNING TOPIC: {candidate['current_topic']}")
+    profile_sections.append(f"QUIZ PERFORMANCE: {avg_score:.1f}% average ({candidate['quiz_count']} quizzes, {candidate['passed_quizzes']} passed)")
+
+    # Additional skills from GitHub
+    if github_skills:
+        profile_sections.append(f"GITHUB PROGRAMMING LANGUAGES: {', '.join(dict.fromkeys(github_skills))}")
+
+    # Professional presence
+    profile_sections.append(f"PROFESSIONAL PRESENCE: {', '.join(social_presence) if social_presence else 'None'}")
+
+    # AI summary if available
+    if candidate["summary_text"]:
+        profile_sections.append(f"AI PROFILE SUMMARY: {candidate['summary_text']}")
+
+    if candidate["skills_tags"]:
+        profile_sections.append(f"EXTRACTED SKILLS: {', '.join(candidate['skills_tags'])}")
+
+    return "\n".join(profile_sections)
+
+
+def score_recruiter_match(model, candidate: Dict[str, Any], prior: float, job_description: str,
+                          requirements: List[str], company: str = "") -> Optional[Tuple[int, Dict[str, Any]]]:
+    """LLM-score one preloaded candidate for a free-text job and blend it with the fused prior.
+
+    Returns ``(score, match)``, or None when the match is weak or the model
+    call fails. Shared by ``/recruiter/match`` and the background match jobs.
+    """
+    student_profile = candidate.get("prompt_text") or recruiter_match_profile(candidate)
+
+    # Enhanced AI matching prompt with better evaluation criteria
+    match_prompt = f"""You are an expert recruiter. Analyze if this student can successfully perform this job.
+
+JOB REQUIREMENTS:
+{job_description}
+Specific Requirements: {', '.join(requirements) if requirements else 'See job description'}
+Company: {company or 'Not specified'}
+
+STUDENT ANALYSIS:
+{student_profile}
+
+EVALUATE THESE KEY QUESTIONS:
+1. Do the student's career goals align with this job role?
+2. Do their current skills match the job requirements?
+3. Is their learning progress showing good commitment and ability?
+4. Can they realistically perform this work based on their background?
+5. Are they at the right education/experience level for this position?
+6. Do their GitHub projects show relevant practical experience?
+
+SCORING CRITERIA:
+- 85-100: Perfect fit - goals align, has required skills, strong progress
+- 70-84: Very good fit - most requirements met, good potential
+- 55-69: Good fit - some gaps but learnable, decent alignment
+- 40-54: Moderate fit - significant gaps but possible with training
+- 25-39: Poor fit - major misalignment in goals or skills
+- 0-24: No fit - completely wrong match
+
+Focus on: Can this student actually DO this job successfully?
+
+Score (0-100):"""
+
+    try:
+        response = model.generate_content(match_prompt)
+        score_text = response.text.strip()
+        numbers = re.findall(r'\d+', score_text)
+        llm_score = int(numbers[0]) if numbers else 0
+        llm_score = min(max(llm_score, 0), 100)
+    except Exception as e:
+        print(f"AI matching error for student {candidate['user_id']}: {e}")
+        return None
+
+    score = blend_llm_score(prior, llm_score, settings.MATCH_LLM_WEIGHT)
+    if score <= 40:  # Weak matches are not returned
+        return None
+
+    avg_score = candidate["avg_quiz_score"]
+    return score, {
+        "user_id": candidate["user_id"],
+        "name": candidate["name"],
+        "email": candidate["email"],
+        "score": score,
+        "llm_score": llm_score,
+        "prior_score": round(prior * 100, 1),
+        "avg_quiz_score": round(avg_score, 1),
+        "learning_progress": round(candidate["learning_progress"], 1),
+        "career_goals": str(candidate["career_goals_raw"]) if candidate["career_goals_raw"] else "Not specified",
+        "skills": str(candidate["current_skills_raw"]) if candidate["current_skills_raw"] else "Not specified",
+        "github_skills": candidate["github_skills"],
+        "social_connections": len(candidate["social_presence"]),
+        "performance_level": "Excellent" if avg_score >= 80 else "Good" if avg_score >= 60 else "Developing",
+        "recommendation": "Highly Recommended" if score >= 85 else "Recommended" if score >= 70 else "Consider" if score >= 55 else "Not Ideal",
+        "shortlisted": False  # Will be updated by shortlist check
+    }
+
+
+def explain_match(model, match: Dict[str, Any], job_description: str) -> str:
+    """Short LLM explanation for a match that is about to be returned."""
+    explanation_prompt = f"""Based on the {match['score']}% match score, provide a brief 2-3 sentence explanation of why this student is or isn't a good fit for the job. Focus on key strengths or gaps.
+
+Job: {job_description}
+Student: {match['name']}
+Score: {match['score']}%
+
+Key factors: skills, experience, learning progress, career goals alignment.
+
+Explanation:"""
+    try:
+        explanation_response = model.generate_content(explanation_prompt)
+        return explanation_response.text.strip()
+    except Exception as e:
+        print(f"AI explanation error for student {match['user_id']}: {e}")
+        return f"{match['score']}% match based on skills, progress and career goals."
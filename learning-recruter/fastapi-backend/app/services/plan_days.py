@@ -0,0 +1,187 @@
+import copy
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, defer
+
+from app.models.learning_plan import LearningPlan, LearningPlanDay
+from app.services.plan_mutations import JsonWrite, month_changes, record_write, set_json_paths
+
+# Day keys stored in their own columns; anything else goes to ``extra``
+VALUE_KEYS = ("concept", "time_estimate", "quiz_id", "quiz_min_score", "completed", "quiz_score", "quiz_attempts", "detail")
+TIMESTAMP_KEYS = ("started_at", "completed_at")
+INTEGER_KEYS = ("time_estimate", "quiz_id", "quiz_min_score", "quiz_score", "quiz_attempts")
+# Keys every day dict carries, even when empty
+BASE_KEYS = ("concept", "time_estimate", "quiz_id", "quiz_min_score", "completed", "started_at", "detail")
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if isinstance(value, datetime) or value is None:
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _as_int(value) -> Optional[int]:
+    try:
+        return None if value is None else int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def day_status(day: Dict[str, Any]) -> str:
+    if day.get("completed"):
+        return "completed"
+    return "active" if day.get("started_at") else "locked"
+
+
+def day_values(day: Dict[str, Any]) -> Dict[str, Any]:
+    """Column values for a day dict; keys the dict does not carry are left out (and left unchanged)."""
+    values = {key: day[key] for key in VALUE_KEYS if key in day}
+    extra = {k: v for k, v in day.items() if k not in VALUE_KEYS and k not in TIMESTAMP_KEYS and k != "day"}
+    for key in INTEGER_KEYS:
+        if key in values:
+            number = _as_int(values[key])
+            if number is None and values[key] is not None:
+                extra[key] = values[key]  # keep odd generated values (e.g. "1 hour") as they were
+            values[key] = number
+    if "completed" in values:
+        values["completed"] = bool(values["completed"])
+    values.update({key: _parse_timestamp(day[key]) for key in TIMESTAMP_KEYS if key in day})
+    values["status"] = day_status(day)
+    values["extra"] = extra or None
+    return values
+
+
+def day_dict(row: LearningPlanDay, detail: bool = True) -> Dict[str, Any]:
+    """The day in the JSON shape the plan API has always returned."""
+    day = {"day": row.day_number}
+    for key in VALUE_KEYS + TIMESTAMP_KEYS:
+        if key == "detail" and not detail:
+            continue
+        value = getattr(row, key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        if value is not None or key in BASE_KEYS:
+            day[key] = value
+    day["completed"] = bool(row.completed)
+    day.update(row.extra or {})
+    return day
+
+
+def _day_rows(db: Session, plan_id: int, month_indexes: Optional[Iterable[int]] = None, detail: bool = True):
+    query = db.query(LearningPlanDay).filter(LearningPlanDay.plan_id == plan_id)
+    if month_indexes is not None:
+        query = query.filter(LearningPlanDay.month_index.in_(list(month_indexes)))
+    if not detail:
+        query = query.options(defer(LearningPlanDay.detail))
+    return query.order_by(LearningPlanDay.month_index, LearningPlanDay.day_number).all()
+
+
+def load_plan(db: Session, plan: LearningPlan, month_indexes: Optional[Iterable[int]] = None,
+              detail: bool = True) -> Dict[str, Any]:
+    """The plan document with ``days`` filled in from day rows, as a copy safe to mutate.
+
+    Only the months in ``month_indexes`` (default all) get a ``days`` list;
+    with ``detail=False`` the days carry no ``detail`` key, which
+    ``store_plan`` then leaves untouched. Months written before days moved
+    to rows keep the days found in the JSON until they are next stored.
+    """
+    document = copy.deepcopy(plan.plan) if isinstance(plan.plan, dict) else {}
+    months = document.setdefault("months", [])
+    wanted = range(1, len(months) + 1) if month_indexes is None else [i for i in month_indexes if 1 <= i <= len(months)]
+    if not wanted:
+        return document
+    grouped: Dict[int, List[Dict[str, Any]]] = {}
+    for row in _day_rows(db, plan.id, None if month_indexes is None else wanted, detail):
+        grouped.setdefault(row.month_index, []).append(day_dict(row, detail))
+    for month_index in wanted:
+        month = months[month_index - 1]
+        if month_index in grouped:
+            month["days"] = grouped[month_index]
+        else:
+            month["days"] = month.get("days") or []
+    return document
+
+
+def store_plan(db: Session, plan: LearningPlan, document: Dict[str, Any]) -> Optional[JsonWrite]:
+    """Write a plan document back: changed days as row updates, the rest as (month-only) JSON.
+
+    Months that carry a ``days`` list are synced to day rows: only rows
+    whose values changed are updated, new days are inserted and days past
+    the end of the list deleted. Changed month fields are set in place in
+    the plan JSON; the column is only rewritten when months were added or
+    removed. Returns what the JSON write sent (also counted in
+    ``plan_mutations.write_stats``), or ``None`` if nothing.
+    """
+    months = document.get("months", []) or []
+    skeleton = {**document, "months": [{k: v for k, v in m.items() if k != "days"} for m in months]}
+    day_months = {i: m["days"] for i, m in enumerate(months, start=1) if isinstance(m.get("days"), list)}
+    if day_months:
+        with_detail = any("detail" in day for days in day_months.values() for day in days)
+        existing: Dict[Tuple[int, int], LearningPlanDay] = {
+            (row.month_index, row.day_number): row for row in _day_rows(db, plan.id, day_months, with_detail)
+        }
+        for month_index, days in day_months.items():
+            for day_number, day in enumerate(days, start=1):
+                values = day_values(day)
+                row = existing.pop((month_index, day_number), None)
+                if row is None:
+                    db.add(LearningPlanDay(plan_id=plan.id, user_id=plan.user_id, month_index=month_index,
+                                           day_number=day_number, **values))
+                    continue
+                for key, value in values.items():
+                    if getattr(row, key) != value:
+                        setattr(row, key, value)
+        for row in existing.values():
+            db.delete(row)
+    if skeleton == plan.plan:
+        return None
+    changes = month_changes(plan.plan, skeleton)
+    if changes is not None and plan.id is not None:
+        return set_json_paths(db, plan, "plan", changes)
+    plan.plan = skeleton
+    plan.updated_at = datetime.utcnow()
+    size = len(json.dumps(skeleton, default=str).encode())
+    return record_write(plan, "plan", JsonWrite(size, size, False))
+
+
+def get_plan_day(db: Session, plan_id: int, month_index: int, day_number: int,
+                 lock: bool = False) -> Optional[LearningPlanDay]:
+    """One day row by position; ``lock`` takes a row lock for read-modify-write."""
+    query = db.query(LearningPlanDay).filter(
+        LearningPlanDay.plan_id == plan_id,
+        LearningPlanDay.month_index == month_index,
+        LearningPlanDay.day_number == day_number,
+    )
+    if lock:
+        query = query.with_for_update()
+    return query.first()
+
+
+def get_day(db: Session, plan: LearningPlan, month_index: int, day_number: int,
+            detail: bool = True) -> Optional[Dict[str, Any]]:
+    """One day as a dict (reading a single row), or ``None`` when the plan has no such day."""
+    row = get_plan_day(db, plan.id, month_index, day_number)
+    if row is not None:
+        return day_dict(row, detail)
+    months = (plan.plan or {}).get("months", []) if isinstance(plan.plan, dict) else []
+    days = months[month_index - 1].get("days") or [] if 1 <= month_index <= len(months) else []
+    return dict(days[day_number - 1]) if 1 <= day_number <= len(days) else None
+
+
+def update_plan_day(row: LearningPlanDay, **changes):
+    """Apply day-dict style changes (``completed=True``, ``quiz_score=...``) to one row."""
+    values = day_values(changes)
+    extra = values.pop("extra")
+    if extra:
+        row.extra = {**(row.extra or {}), **extra}
+    values["status"] = day_status({
+        "completed": values.get("completed", row.completed),
+        "started_at": values.get("started_at", row.started_at),
+    })
+    for key, value in values.items():
+        setattr(row, key, value)
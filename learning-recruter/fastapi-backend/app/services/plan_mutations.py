@@ -0,0 +1,178 @@
+import copy
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Sequence, Tuple, Union
+
+from sqlalchemy import Text, cast, func, literal, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+logger = logging.getLogger(__name__)
+
+PathPart = Union[str, int]
+Change = Tuple[Sequence[PathPart], Any]
+
+_lock = threading.Lock()
+# Process-wide totals of the JSON writes below, for /health/db
+_totals = {"writes": 0, "in_place": 0, "bytes_written": 0, "document_bytes": 0}
+
+
+@dataclass
+class JsonWrite:
+    """What one mutation sent: the changed values vs re-sending the whole document."""
+
+    bytes_written: int
+    document_bytes: int
+    in_place: bool
+
+    @property
+    def saved_bytes(self) -> int:
+        return max(self.document_bytes - self.bytes_written, 0)
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, default=str).encode())
+
+
+def record_write(row, column: str, write: JsonWrite) -> JsonWrite:
+    """Count ``write`` in the process totals and log what it sent; returns it unchanged."""
+    with _lock:
+        _totals["writes"] += 1
+        _totals["in_place"] += int(write.in_place)
+        _totals["bytes_written"] += write.bytes_written
+        _totals["document_bytes"] += write.document_bytes
+    logger.debug("%s.%s %s: wrote %d of %d bytes (%s)", row.__tablename__, column, row.id, write.bytes_written,
+                 write.document_bytes, "in place" if write.in_place else "rewritten")
+    return write
+
+
+def write_stats() -> Dict[str, int]:
+    """Writes, in-place writes, bytes sent and bytes a full rewrite would have sent, since start."""
+    with _lock:
+        stats = dict(_totals)
+    stats["saved_bytes"] = max(stats["document_bytes"] - stats["bytes_written"], 0)
+    return stats
+
+
+def _mark_changed(db: Session, row):
+    """The Core UPDATE skips the ORM after_flush listeners, so flag the row's student for them."""
+    user_id = getattr(row, "user_id", None)
+    if user_id is None:
+        return
+    # Imported here: both import plan_days (through the roster loader), which imports this module
+    from app.services.profile_documents import mark_profile_documents_stale
+    from app.services.roster_snapshot import roster_snapshot
+    mark_profile_documents_stale(db, [user_id])
+    roster_snapshot.mark_dirty_on_commit(db, [user_id])
+
+
+def _apply(document: Any, path: Sequence[PathPart], value: Any) -> Any:
+    """``document`` with ``value`` at ``path``, creating missing object keys like ``jsonb_set``."""
+    document = copy.deepcopy(document) if document is not None else {}
+    target = document
+    for part in path[:-1]:
+        target = target[part] if isinstance(part, int) else target.setdefault(part, {})
+    target[path[-1]] = value
+    return document
+
+
+def _pg_path(path: Sequence[PathPart]) -> str:
+    return "{" + ",".join(str(part) for part in path) + "}"
+
+
+def _sqlite_path(path: Sequence[PathPart]) -> str:
+    return "$" + "".join(f"[{part}]" if isinstance(part, int) else f'."{part}"' for part in path)
+
+
+def _set_expression(dialect: str, column, path: Sequence[PathPart], value: Any):
+    payload = json.dumps(value, default=str)
+    if dialect == "postgresql":
+        return func.jsonb_set(column, cast(literal(_pg_path(path)), ARRAY(Text)), cast(literal(payload), JSONB), True)
+    # SQLite (tests, benchmarks): json_set edits the stored text in the same statement
+    return func.json_set(column, _sqlite_path(path), func.json(payload))
+
+
+def set_json_paths(db: Session, row, column: str, changes: List[Change]) -> JsonWrite:
+    """Write ``changes`` (``(path, value)`` pairs) into one JSON column of ``row`` in a single UPDATE.
+
+    On Postgres this is a chain of ``jsonb_set`` calls and on SQLite of
+    ``json_set``, so only the changed values travel to the database; other
+    dialects fall back to rewriting the column. Paths use 0-based list
+    indexes. The in-memory value is updated too, without marking the row
+    dirty, so a later flush does not send the document again; the row's
+    student is marked for a profile document rebuild and a roster snapshot
+    patch instead. Every write is counted in ``write_stats``.
+    """
+    current = getattr(row, column)
+    document = current
+    for path, value in changes:
+        document = _apply(document, path, value)
+    document_bytes = _size(document)
+    if not changes:
+        return JsonWrite(0, document_bytes, True)
+
+    dialect = db.get_bind().dialect.name
+    if current is None or dialect not in ("postgresql", "sqlite"):
+        setattr(row, column, document)
+        return record_write(row, column, JsonWrite(document_bytes, document_bytes, False))
+
+    model = type(row)
+    expression = getattr(model, column)
+    for path, value in changes:
+        expression = _set_expression(dialect, expression, path, value)
+    values = {column: expression}
+    if hasattr(model, "updated_at"):
+        values["updated_at"] = datetime.utcnow()
+    db.flush()
+    db.execute(
+        update(model).where(model.id == row.id).values(**values).execution_options(synchronize_session=False)
+    )
+    set_committed_value(row, column, document)
+    if "updated_at" in values:
+        set_committed_value(row, "updated_at", values["updated_at"])
+    _mark_changed(db, row)
+    written = sum(_size(value) + len(_pg_path(path)) for path, value in changes)
+    return record_write(row, column, JsonWrite(written, document_bytes, True))
+
+
+def set_json_path(db: Session, row, column: str, path: Sequence[PathPart], value: Any) -> JsonWrite:
+    return set_json_paths(db, row, column, [(path, value)])
+
+
+def set_month_fields(db: Session, plan, month_index: int, **fields) -> JsonWrite:
+    """Set fields of one month (1-based) of ``plan.plan`` in place, e.g. ``status="completed"``."""
+    return set_json_paths(db, plan, "plan", [(("months", month_index - 1, key), value) for key, value in fields.items()])
+
+
+def set_day_detail(db: Session, day, key: str, value: Any) -> JsonWrite:
+    """Set one key of a ``learning_plan_days`` row's ``detail`` document in place."""
+    if day.detail is None:
+        day.detail = {key: value}
+        return record_write(day, "detail", JsonWrite(_size(day.detail), _size(day.detail), False))
+    return set_json_path(db, day, "detail", (key,), value)
+
+
+def month_changes(stored: Any, document: Any) -> Union[List[Change], None]:
+    """``(path, value)`` pairs turning ``stored`` into ``document``, when only month fields were set.
+
+    ``None`` when the change is not expressible as in-place sets (months
+    added or removed, keys dropped, other top-level keys changed); the
+    caller then rewrites the document.
+    """
+    if not isinstance(stored, dict) or not isinstance(document, dict):
+        return None
+    old_months, new_months = stored.get("months"), document.get("months")
+    if not isinstance(old_months, list) or not isinstance(new_months, list) or len(old_months) != len(new_months):
+        return None
+    if {k: v for k, v in stored.items() if k != "months"} != {k: v for k, v in document.items() if k != "months"}:
+        return None
+    changes = []
+    for i, (old, new) in enumerate(zip(old_months, new_months)):
+        if not isinstance(old, dict) or not isinstance(new, dict) or set(old) - set(new):
+            return None
+        changes.extend((("months", i, key), value) for key, value in new.items() if old.get(key, object()) != value)
+    return changes
@@ -0,0 +1,312 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, func, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.database.routing import RoutingSession
+from app.database.server_time import server_now
+from app.database.session_scope import session_scope
+from app.database.upsert import upsert_insert
+
+from app.models.user import User
+from app.models.onboarding import Onboarding
+from app.models.learning_plan import LearningPlan, LearningPlanDay
+from app.models.quiz import QuizSubmission
+from app.models.candidate_vector import CandidateVector
+from app.models.student_profile_document import StudentProfileDocument
+from app.services.candidate_features import _as_list, _github_languages, _plan_progress
+from app.services.match_scoring import recruiter_match_profile
+from app.services.roster_loader import current_position, load_roster
+
+# Bump when the layout of ``document`` changes; older documents are rebuilt on read
+SCHEMA_VERSION = 1
+
+# User columns a document is derived from; token refreshes and the like leave it fresh
+USER_INPUTS = (
+    "email", "google_email", "google_name", "google_picture", "user_type", "created_at",
+    "current_month_index", "current_day", "linkedin_profile_data", "github_profile_data", "twitter_profile_data",
+)
+
+# Other tables a document is derived from, keyed by their ``user_id``
+TRACKED = (Onboarding, LearningPlan, LearningPlanDay, QuizSubmission, CandidateVector)
+
+REBUILD_BATCH = 500
+
+# session.info key: students whose documents the session's open transaction marked stale
+STALE_DOCUMENTS_KEY = "stale_profile_documents"
+
+# (version, updated_at, needs rebuild) of one student's document as last read
+DocumentState = Tuple[Optional[int], Optional[datetime], bool]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough prompt token count (about four characters per token for English text)."""
+    return (len(text or "") + 3) // 4
+
+
+def _parse_json(raw: Optional[str]):
+    if not raw:
+        return None
+    try:
+        return json.loads(raw)
+    except Exception:
+        return None
+
+
+def _social_summary(linkedin_raw: Optional[str], github_raw: Optional[str], twitter_raw: Optional[str]) -> Dict[str, Any]:
+    """Connected accounts as shown on the recruiter profile view, parsed once."""
+    linkedin = _parse_json(linkedin_raw)
+    github = _parse_json(github_raw)
+    twitter = _parse_json(twitter_raw)
+    linkedin_info = linkedin.get('data', {}).get('response_dict', {}) if isinstance(linkedin, dict) else {}
+    twitter_info = twitter.get('data', {}) if isinstance(twitter, dict) else {}
+    repos = github if isinstance(github, list) else []
+    owner = repos[0].get('owner', {}) if repos and isinstance(repos[0], dict) else {}
+    return {
+        "linkedin": {
+            "connected": linkedin is not None,
+            "name": linkedin_info.get('name'),
+            "email": linkedin_info.get('email'),
+            "profile_url": f"https://linkedin.com/in/{linkedin_info.get('sub')}" if linkedin is not None else None,
+        },
+        "github": {
+            "connected": github is not None,
+            "username": owner.get('login'),
+            "profile_url": owner.get('html_url'),
+            "repos_count": len(repos),
+            "public_repos": [{
+                "name": repo.get('name'),
+                "description": repo.get('description'),
+                "language": repo.get('language'),
+                "stars": repo.get('stargazers_count', 0),
+            } for repo in repos[:3] if isinstance(repo, dict)],
+        },
+        "twitter": {
+            "connected": twitter is not None,
+            "username": twitter_info.get('username'),
+            "name": twitter_info.get('name'),
+            "profile_url": f"https://twitter.com/{twitter_info.get('username')}" if twitter is not None else None,
+        },
+    }
+
+
+def build_profile_documents(db: Session, user_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Any]]:
+    """Profile document per student (or ``user_ids``), computed from one bulk roster load."""
+    documents = {}
+    for bundle in load_roster(db, user_ids, recent_quizzes=5, social_profiles=True).values():
+        student, onb, plan, stats, cv = bundle.user, bundle.onboarding, bundle.plan, bundle.quiz, bundle.vector
+        month_index, day = current_position(bundle)
+        progress = _plan_progress(plan.plan if plan else None, month_index, day, bundle.current_day, bundle.stats)
+        career_goals = _as_list(onb.career_goals) if onb else []
+        current_skills = _as_list(onb.current_skills) if onb else []
+        skills_tags = _as_list(cv.skills_tags) if cv else []
+        github_skills = _github_languages(student.github_profile_data)
+        skills = list(dict.fromkeys(current_skills + skills_tags + github_skills))
+        summary_text = cv.summary_text if cv else None
+        social = _social_summary(student.linkedin_profile_data, student.github_profile_data, student.twitter_profile_data)
+        connected = {
+            "linkedin_connected": student.linkedin_profile_data is not None,
+            "github_connected": student.github_profile_data is not None,
+            "twitter_connected": student.twitter_profile_data is not None,
+        }
+
+        document = {
+            "user_id": student.id,
+            "name": student.google_name or student.email or f"Student {student.id}",
+            "google_name": student.google_name,
+            "email": student.email,
+            "google_email": student.google_email,
+            "picture": student.google_picture,
+            "created_at": student.created_at.isoformat() if student.created_at else None,
+            "onboarding_name": onb.name if onb else None,
+            "has_onboarding": onb is not None,
+            "career_goals_raw": onb.career_goals if onb else None,
+            "current_skills_raw": onb.current_skills if onb else None,
+            "career_goals": career_goals,
+            "current_skills": current_skills,
+            "grade": onb.grade if onb else None,
+            "time_commitment": onb.time_commitment if onb else None,
+            "skills": skills,
+            "skill_keys": list(dict.fromkeys(s.lower() for s in skills)),
+            "skills_tags": skills_tags,
+            "github_skills": github_skills,
+            "social_presence": [name for name, key in (
+                ("LinkedIn", "linkedin_connected"), ("GitHub", "github_connected"), ("Twitter", "twitter_connected")
+            ) if connected[key]],
+            **connected,
+            "social": social,
+            "avg_quiz_score": stats.avg_score,
+            "quiz_count": stats.count,
+            "passed_quizzes": stats.passed,
+            "recent_scores": [{
+                "month": row.month_index,
+                "day": row.day,
+                "score": row.score,
+                "passed": row.passed,
+                "date": row.created_at.isoformat() if row.created_at else None,
+            } for row in bundle.recent_quizzes],
+            "plan_exists": plan is not None,
+            "plan_title": (plan.title or "Learning Plan") if plan else None,
+            "current_month": month_index or 1,
+            "current_day": day or 1,
+            "summary_text": summary_text,
+            "search_text": " ".join(career_goals + skills + progress["topics"]
+                                    + [(onb.grade or "") if onb else "", summary_text or ""]),
+            **progress,
+        }
+        documents[student.id] = document
+    return documents
+
+
+def _document_states(db: Session, user_ids: Optional[List[int]] = None, bind=None) -> Dict[int, DocumentState]:
+    """``{student id: (version, updated_at, needs rebuild)}`` for every student (or ``user_ids``)."""
+    query = (
+        select(User.id, StudentProfileDocument.version, StudentProfileDocument.updated_at,
+               or_(StudentProfileDocument.id.is_(None), StudentProfileDocument.stale.is_(True),
+                   StudentProfileDocument.schema_version != SCHEMA_VERSION).label("pending"))
+        .outerjoin(StudentProfileDocument, StudentProfileDocument.user_id == User.id)
+        .where(User.user_type == 'student')
+    )
+    if user_ids is not None:
+        query = query.where(User.id.in_(user_ids))
+    rows = db.execute(query.order_by(User.id), bind_arguments={"bind": bind} if bind else None)
+    return {row.id: (row.version, row.updated_at, bool(row.pending)) for row in rows}
+
+
+def _store_document(db: Session, user_id: int, read_at: Optional[datetime], document: Dict[str, Any]) -> int:
+    """Upsert one rebuilt document; 0 when the row changed since ``read_at`` (its stale mark is kept)."""
+    prompt_text = recruiter_match_profile(document)
+    values = dict(schema_version=SCHEMA_VERSION, stale=False, document=document, prompt_text=prompt_text,
+                  token_count=estimate_tokens(prompt_text), updated_at=server_now(db))
+    statement = upsert_insert(db, StudentProfileDocument).values(user_id=user_id, version=1, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[StudentProfileDocument.user_id],
+        set_={**values, "version": func.coalesce(StudentProfileDocument.version, 0) + 1},
+        # Writers move updated_at when they mark a row stale, and so does a concurrent rebuild
+        where=(StudentProfileDocument.updated_at == read_at) if read_at is not None
+        else StudentProfileDocument.updated_at.is_(None),
+    )
+    return db.execute(statement).rowcount
+
+
+def refresh_profile_documents(db: Session, user_ids: Optional[Iterable[int]] = None,
+                              states: Optional[Dict[int, DocumentState]] = None) -> List[int]:
+    """Regenerate missing, stale and outdated documents (all students, or ``user_ids``); returns the ids written.
+
+    Runs in a short transaction of its own on the caller's primary, so a
+    read-only handler never commits its request transaction and a lagging
+    replica never decides what is stale. Rows are upserted, so concurrent
+    rebuilds of one student do not collide, and a row another writer
+    touched since it was read keeps its stale mark for the next read.
+    Documents the caller's open transaction has marked stale are left to it
+    (it holds their row locks).
+    """
+    held = db.info.get(STALE_DOCUMENTS_KEY, set())
+    written: List[int] = []
+    with session_scope("profile_documents.refresh", bind=db.get_bind()) as rebuild_db:
+        if states is None:
+            states = _document_states(rebuild_db, None if user_ids is None else list(user_ids))
+        pending = [(user_id, read_at) for user_id, (_, read_at, stale) in states.items() if stale and user_id not in held]
+        for start in range(0, len(pending), REBUILD_BATCH):
+            batch = pending[start:start + REBUILD_BATCH]
+            documents = build_profile_documents(rebuild_db, [user_id for user_id, _ in batch])
+            for user_id, read_at in batch:
+                if user_id in documents and _store_document(rebuild_db, user_id, read_at, documents[user_id]):
+                    written.append(user_id)
+            rebuild_db.commit()
+    if written:
+        print(f"📄 Regenerated {len(written)} student profile documents")
+    return written
+
+
+def _read_documents(db: Session, user_ids: Optional[List[int]], bind=None) -> Dict[int, Dict[str, Any]]:
+    query = select(
+        StudentProfileDocument.user_id, StudentProfileDocument.version, StudentProfileDocument.document,
+        StudentProfileDocument.prompt_text, StudentProfileDocument.token_count,
+    ).join(User, User.id == StudentProfileDocument.user_id).where(User.user_type == 'student')
+    if user_ids is not None:
+        query = query.where(StudentProfileDocument.user_id.in_(user_ids))
+    rows = db.execute(query.order_by(StudentProfileDocument.user_id), bind_arguments={"bind": bind} if bind else None)
+    return {
+        row.user_id: {**row.document, "prompt_text": row.prompt_text, "token_count": row.token_count, "version": row.version}
+        for row in rows
+    }
+
+
+def get_profile_documents(db: Session, user_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Any]]:
+    """Up-to-date profile documents keyed by user id, in user id order.
+
+    Each document also carries ``prompt_text``, ``token_count`` and
+    ``version``. Documents whose inputs changed are rebuilt first; when
+    everything is fresh this is two queries. Staleness is checked on the
+    primary; documents are read through ``db`` (a replica for read
+    endpoints), and any the replica lacks, holds an older version of, or
+    that were just rebuilt are read again from the primary.
+    """
+    if user_ids is not None:
+        user_ids = list(user_ids)
+    # get_bind() without a statement is the primary and does not pin a RoutingSession to it
+    primary = db.get_bind()
+    states = _document_states(db, user_ids, bind=primary)
+    written = set(refresh_profile_documents(db, user_ids, states))
+    documents = _read_documents(db, user_ids)
+    if isinstance(db, RoutingSession) and db.replica is not None and not db.pinned_to_primary:
+        behind = [user_id for user_id, (version, _, _) in states.items()
+                  if user_id in written or user_id not in documents or (documents[user_id]["version"] or 0) < (version or 0)]
+        if behind:
+            documents.update(_read_documents(db, behind, bind=primary))
+            documents = dict(sorted(documents.items()))
+    return documents
+
+
+def get_profile_document(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
+    return get_profile_documents(db, [user_id]).get(user_id)
+
+
+def _mark_stale(session: Session, execute, user_ids: List[int]):
+    # updated_at moves too, so a rebuild that read the row before this mark does not clear it; it is
+    # the database clock, so roster snapshots on every host can use it as a change watermark
+    execute(update(StudentProfileDocument).where(StudentProfileDocument.user_id.in_(user_ids))
+            .values(stale=True, updated_at=server_now(session)))
+    session.info.setdefault(STALE_DOCUMENTS_KEY, set()).update(user_ids)
+
+
+def mark_profile_documents_stale(db: Session, user_ids: Iterable[int]):
+    """Flag documents for rebuild; for writers that bypass the ORM (bulk statements)."""
+    ids = sorted({int(u) for u in user_ids if u is not None})
+    if ids:
+        _mark_stale(db, db.execute, ids)
+
+
+def _changed_inputs(obj) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in USER_INPUTS)
+
+
+def _after_flush(session, flush_context):
+    """Mark the documents of students whose inputs were just written as stale, in the same transaction."""
+    user_ids = set()
+    for obj in session.dirty:
+        if isinstance(obj, User) and _changed_inputs(obj):
+            user_ids.add(obj.id)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, TRACKED):
+            user_ids.add(obj.user_id)
+    user_ids.discard(None)
+    if user_ids:
+        _mark_stale(session, session.connection().execute, sorted(user_ids))
+
+
+def _transaction_ended(session):
+    session.info.pop(STALE_DOCUMENTS_KEY, None)
+
+
+def track_changes():
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_commit", _transaction_ended)
+    event.listen(Session, "after_rollback", _transaction_ended)
+
+
+track_changes()
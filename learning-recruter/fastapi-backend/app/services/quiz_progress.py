@@ -0,0 +1,150 @@
+from typing import Any, Dict, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.learning_plan import LearningPlan
+from app.models.quiz import Quiz, QuizSubmission
+from app.models.user import User
+from app.services.plan_days import load_plan
+
+
+def passed_days(submissions: List[QuizSubmission]) -> Set[Tuple[int, int]]:
+    """``(month_index, day)`` of every passed submission, for constant-time day lookups."""
+    return {(s.month_index, s.day) for s in submissions if s.passed}
+
+
+def month_progress(months: List[Dict[str, Any]], passed: Set[Tuple[int, int]]) -> Tuple[List[Dict[str, Any]], float]:
+    """Per-month completion (a day counts once it has a passed quiz) and the overall percentage."""
+    progress = []
+    total_days = total_days_completed = 0
+    for month_index, month in enumerate(months, start=1):
+        month_total_days = len(month.get("days", []))
+        month_completed_days = sum(1 for day_num in range(1, month_total_days + 1) if (month_index, day_num) in passed)
+        total_days += month_total_days
+        total_days_completed += month_completed_days
+
+        if month_completed_days == 0:
+            status = "not_started"
+        elif month_completed_days == month_total_days:
+            status = "completed"
+        else:
+            status = "in_progress"
+        progress.append({
+            "index": month_index,
+            "title": month.get("title", f"Month {month_index}"),
+            "status": status,
+            "days_completed": month_completed_days,
+            "total_days": month_total_days,
+            "progress_percentage": (month_completed_days / max(month_total_days, 1)) * 100
+        })
+    learning_progress = (total_days_completed / total_days) * 100 if total_days > 0 else 0
+    return progress, learning_progress
+
+
+def quiz_progress(db: Session, user: User) -> Dict[str, Any]:
+    """Body of ``GET /quiz/progress``: one plan read, one submissions query, then set lookups per day."""
+    plan = db.query(LearningPlan).filter(LearningPlan.user_id == user.id).first()
+    submissions = db.query(QuizSubmission).filter(
+        QuizSubmission.user_id == user.id
+    ).order_by(QuizSubmission.created_at.asc()).all()
+
+    learning_progress = 0
+    current_position = {
+        "current_month_index": user.current_month_index or 1,
+        "current_day": user.current_day or 1,
+        "plan_title": "No Active Plan"
+    }
+    months_progress = []
+    if plan and plan.plan:
+        current_position["plan_title"] = plan.title or "Learning Plan"
+        months = load_plan(db, plan, detail=False)["months"]
+        months_progress, learning_progress = month_progress(months, passed_days(submissions))
+
+    passed_count = sum(1 for s in submissions if s.passed)
+    summary = {
+        "overall_progress": f"{learning_progress:.1f}%",
+        "total_quizzes": len(submissions),
+        "passed_quizzes": passed_count,
+        "average_score": sum(s.score for s in submissions) / len(submissions) if submissions else 0,
+        "pass_rate": (passed_count / len(submissions) * 100) if submissions else 0
+    }
+    return {
+        "current_position": current_position,
+        "month_progress": months_progress,
+        "summary": summary,
+        "submissions": [{
+            "month_index": s.month_index,
+            "day": s.day,
+            "score": s.score,
+            "passed": s.passed,
+            "created_at": s.created_at.isoformat() if s.created_at else None,
+            "attempt_number": getattr(s, 'attempt_number', 1)
+        } for s in submissions],
+        "learning_progress_percentage": learning_progress,
+        "user_info": {
+            "name": user.google_name or user.email.split('@')[0],
+            "email": user.email,
+            "current_month": user.current_month_index or 1,
+            "current_day": user.current_day or 1
+        }
+    }
+
+
+def passed_scores_by_quiz(db: Session, user_id: int) -> Dict[int, int]:
+    """Score of the first passed submission of each of the user's quizzes, in one query."""
+    scores: Dict[int, int] = {}
+    rows = db.query(QuizSubmission.quiz_id, QuizSubmission.score).filter(
+        QuizSubmission.user_id == user_id,
+        QuizSubmission.passed == 1
+    ).order_by(QuizSubmission.id.asc())
+    for quiz_id, score in rows:
+        scores.setdefault(quiz_id, score)
+    return scores
+
+
+def available_quizzes(db: Session, user_id: int) -> Dict[str, Any]:
+    """Body of ``GET /available-quizzes``: each plan is read once, not once per quiz."""
+    quizzes = db.query(Quiz).filter(Quiz.user_id == user_id).order_by(Quiz.created_at.desc()).all()
+    plan_ids = {quiz.plan_id for quiz in quizzes}
+    plans = {p.id: p for p in db.query(LearningPlan).filter(LearningPlan.id.in_(plan_ids))} if plan_ids else {}
+    months_by_plan: Dict[int, List[Dict[str, Any]]] = {}
+    for plan_id, plan in plans.items():
+        if plan.plan and "months" in plan.plan:
+            wanted = sorted({quiz.month_index for quiz in quizzes if quiz.plan_id == plan_id})
+            months_by_plan[plan_id] = load_plan(db, plan, wanted, detail=False)["months"]
+    passed = passed_scores_by_quiz(db, user_id) if quizzes else {}
+
+    quiz_list = []
+    for quiz in quizzes:
+        months = months_by_plan.get(quiz.plan_id)
+        if months is None or not 1 <= quiz.month_index <= len(months):
+            continue
+        month = months[quiz.month_index - 1]
+        days = month.get("days", [])
+        if 1 <= quiz.day <= len(days):
+            day_concept = days[quiz.day - 1].get("concept", f"Day {quiz.day}")
+        else:
+            day_concept = f"Day {quiz.day}"
+        quiz_list.append({
+            "id": quiz.id,
+            "title": quiz.title,
+            "plan_id": quiz.plan_id,
+            "plan_title": plans[quiz.plan_id].title,
+            "month_index": quiz.month_index,
+            "month_title": month.get("title", f"Month {quiz.month_index}"),
+            "day": quiz.day,
+            "day_concept": day_concept,
+            "required_score": quiz.required_score,
+            "total_questions": len(quiz.questions),
+            "completed": quiz.id in passed,
+            "best_score": passed.get(quiz.id),
+            "created_at": quiz.created_at.isoformat(),
+            "url": f"/learning-plans/{quiz.plan_id}/month/{quiz.month_index}/day/{quiz.day}/quiz"
+        })
+
+    return {
+        "quizzes": quiz_list,
+        "total_quizzes": len(quiz_list),
+        "completed_quizzes": len([q for q in quiz_list if q["completed"]]),
+        "pending_quizzes": len([q for q in quiz_list if not q["completed"]])
+    }
@@ -0,0 +1,148 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from app.core.config import settings
+from app.database.session_scope import session_scope
+from app.models.user import User
+from app.models.reindex_checkpoint import ReindexCheckpoint
+from app.services.candidate_service import CandidateService
+
+
+class ReindexService:
+    """Re-embeds every student in the background, resuming from a stored checkpoint.
+
+    A coordinator thread walks student ids in keyset order and hands chunks to
+    a worker pool. Each wave of chunks is checkpointed only once all of it has
+    been written, so ``last_user_id`` never skips over unfinished work and a
+    restart picks up where the previous run stopped. The coordinator and
+    every chunk use short ``session_scope`` sessions, so none is held for
+    the length of the run.
+    """
+
+    JOB_NAME = "student_vectors"
+
+    def __init__(self, workers: int = None, chunk_size: int = None):
+        self.workers = max(1, workers or settings.REINDEX_WORKERS)
+        self.chunk_size = max(1, chunk_size or settings.REINDEX_CHUNK_SIZE)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._run_started: Optional[float] = None
+        self._run_processed = 0
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, restart: bool = False) -> Dict[str, Any]:
+        """Start (or resume) the reindex job; a no-op when it is already running."""
+        with self._lock:
+            if self.is_running():
+                return self.status()
+            with session_scope("reindex", commit=True) as db:
+                checkpoint = self._get_checkpoint(db)
+                if restart or checkpoint.status in (None, "idle", "completed"):
+                    checkpoint.last_user_id = 0
+                    checkpoint.processed = 0
+                    checkpoint.started_at = datetime.utcnow()
+                checkpoint.status = "running"
+                checkpoint.finished_at = None
+                checkpoint.error = None
+                checkpoint.total = db.query(User).filter(User.user_type == 'student').count()
+                checkpoint.updated_at = datetime.utcnow()
+            self._stop.clear()
+            self._run_started = time.monotonic()
+            self._run_processed = 0
+            self._thread = threading.Thread(target=self._run, name="student-reindex", daemon=True)
+            self._thread.start()
+        return self.status()
+
+    def stop(self):
+        """Ask the coordinator to stop after the wave in flight; progress stays checkpointed."""
+        self._stop.set()
+
+    def status(self) -> Dict[str, Any]:
+        with session_scope("reindex") as db:
+            checkpoint = db.query(ReindexCheckpoint).filter(ReindexCheckpoint.job_name == self.JOB_NAME).first()
+        if not checkpoint:
+            return {"job": self.JOB_NAME, "status": "idle", "processed": 0, "total": 0, "running": False}
+        elapsed = time.monotonic() - self._run_started if self._run_started and self.is_running() else None
+        throughput = self._run_processed / elapsed if elapsed else None
+        remaining = max((checkpoint.total or 0) - (checkpoint.processed or 0), 0)
+        return {
+            "job": self.JOB_NAME,
+            "status": checkpoint.status,
+            "running": self.is_running(),
+            "processed": checkpoint.processed or 0,
+            "total": checkpoint.total or 0,
+            "last_user_id": checkpoint.last_user_id or 0,
+            "students_per_second": round(throughput, 2) if throughput else None,
+            "eta_seconds": round(remaining / throughput, 1) if throughput else None,
+            "workers": self.workers,
+            "chunk_size": self.chunk_size,
+            "started_at": checkpoint.started_at.isoformat() if checkpoint.started_at else None,
+            "finished_at": checkpoint.finished_at.isoformat() if checkpoint.finished_at else None,
+            "error": checkpoint.error,
+        }
+
+    def _get_checkpoint(self, db) -> ReindexCheckpoint:
+        checkpoint = db.query(ReindexCheckpoint).filter(ReindexCheckpoint.job_name == self.JOB_NAME).first()
+        if not checkpoint:
+            checkpoint = ReindexCheckpoint(job_name=self.JOB_NAME, status="idle", last_user_id=0, processed=0, total=0)
+            db.add(checkpoint)
+            db.flush()
+        return checkpoint
+
+    def _next_ids(self, db, after_id: int, limit: int) -> List[int]:
+        rows = (
+            db.query(User.id)
+            .filter(User.user_type == 'student', User.id > after_id)
+            .order_by(User.id)
+            .limit(limit)
+            .all()
+        )
+        return [row.id for row in rows]
+
+    def _process_chunk(self, user_ids: List[int]) -> int:
+        with session_scope("reindex") as db:
+            return CandidateService(db).bulk_update_candidates(user_ids=user_ids)["processed"]
+
+    def _run(self):
+        try:
+            with session_scope("reindex") as db:
+                cursor = self._get_checkpoint(db).last_user_id or 0
+            print(f"🔄 Student reindex running from user id {cursor} ({self.workers} workers, chunks of {self.chunk_size})")
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="reindex-worker") as pool:
+                while not self._stop.is_set():
+                    with session_scope("reindex") as db:
+                        ids = self._next_ids(db, cursor, self.chunk_size * self.workers)
+                    if not ids:
+                        break
+                    chunks = [ids[i:i + self.chunk_size] for i in range(0, len(ids), self.chunk_size)]
+                    processed = sum(pool.map(self._process_chunk, chunks))
+                    cursor = ids[-1]
+                    self._run_processed += processed
+                    with session_scope("reindex", commit=True) as db:
+                        checkpoint = self._get_checkpoint(db)
+                        checkpoint.last_user_id = cursor
+                        checkpoint.processed = (checkpoint.processed or 0) + processed
+                        checkpoint.updated_at = datetime.utcnow()
+            with session_scope("reindex", commit=True) as db:
+                checkpoint = self._get_checkpoint(db)
+                checkpoint.status = "paused" if self._stop.is_set() else "completed"
+                checkpoint.finished_at = None if self._stop.is_set() else datetime.utcnow()
+                checkpoint.updated_at = datetime.utcnow()
+                summary = f"{checkpoint.status}: {checkpoint.processed}/{checkpoint.total} students"
+            print(f"✅ Student reindex {summary}")
+        except Exception as e:
+            print(f"❌ Student reindex failed: {e}")
+            with session_scope("reindex", commit=True) as db:
+                checkpoint = self._get_checkpoint(db)
+                checkpoint.status = "failed"
+                checkpoint.error = str(e)
+                checkpoint.updated_at = datetime.utcnow()
+
+
+reindex_service = ReindexService()
@@ -0,0 +1,161 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.onboarding import Onboarding
+from app.models.learning_plan import LearningPlan, LearningPlanDay
+from app.models.learning_path import LearningPath
+from app.models.quiz import QuizSubmission
+from app.models.candidate_vector import CandidateVector
+from app.models.student_stats import StudentStats
+from app.services.student_stats import STAT_FIELDS
+
+
+@dataclass
+class QuizStats:
+    avg_score: float = 0.0
+    count: int = 0
+    passed: int = 0
+
+
+@dataclass
+class StudentBundle:
+    """Everything the recruiter views read about one student, loaded in bulk.
+
+    ``user``, ``onboarding``, ``plan``, ``current_day``, ``stats``, ``vector`` and ``current_path`` are
+    column rows (not ORM instances); the optional ones are ``None`` when the
+    student has no such row or it was not requested.
+    """
+
+    user: Any
+    onboarding: Any = None
+    plan: Any = None
+    current_day: Any = None  # the plan's day row at the student's current position
+    quiz: QuizStats = field(default_factory=QuizStats)
+    stats: Any = None  # the student's ``student_stats`` row, if maintained yet
+    recent_quizzes: List[Any] = field(default_factory=list)  # newest last
+    vector: Any = None
+    current_path: Any = None
+
+    @property
+    def user_id(self) -> int:
+        return self.user.id
+
+
+def current_position(bundle: StudentBundle) -> Tuple[Optional[int], Optional[int]]:
+    """``(month, day)`` the student is on: the maintained stats row's, else the user row's."""
+    if bundle.stats is not None:
+        return bundle.stats.current_month, bundle.stats.current_day
+    return bundle.user.current_month_index, bundle.user.current_day
+
+
+def load_roster(db: Session, user_ids: Optional[Iterable[int]] = None, recent_quizzes: int = 0,
+                social_profiles: bool = False, vectors: bool = True, paths: bool = False) -> Dict[int, StudentBundle]:
+    """Bundles for every student (or ``user_ids``), ordered by user id.
+
+    One query per table whatever the roster size: users, onboarding, plans,
+    the day row at each student's current position, the maintained ``student_stats`` rows (quiz aggregates,
+    plan progress and position; a grouped quiz aggregate stands in for students that have none yet), then optionally the last
+    ``recent_quizzes`` submissions per student (a ``row_number`` window),
+    candidate vectors and the learning path of each student's current
+    month. Raw social
+    profile JSON is only selected with ``social_profiles``; otherwise the
+    user row carries ``linkedin``/``github``/``twitter`` connected flags.
+    """
+    student_ids = db.query(User.id).filter(User.user_type == 'student')
+    if user_ids is not None:
+        student_ids = student_ids.filter(User.id.in_(list(user_ids)))
+    student_subquery = student_ids.scalar_subquery()
+
+    columns = [
+        User.id, User.google_name, User.email, User.google_email, User.google_picture, User.created_at,
+        User.created_by_recruiter_id, User.current_month_index, User.current_day,
+        User.linkedin_profile_data.isnot(None).label("linkedin"),
+        User.github_profile_data.isnot(None).label("github"),
+        User.twitter_profile_data.isnot(None).label("twitter"),
+    ]
+    if social_profiles:
+        columns += [User.linkedin_profile_data, User.github_profile_data, User.twitter_profile_data]
+    roster = {
+        row.id: StudentBundle(user=row)
+        for row in db.query(*columns).filter(User.id.in_(student_subquery)).order_by(User.id).all()
+    }
+    if not roster:
+        return roster
+
+    for row in db.query(
+        Onboarding.user_id, Onboarding.name, Onboarding.grade, Onboarding.career_goals,
+        Onboarding.current_skills, Onboarding.time_commitment,
+    ).filter(Onboarding.user_id.in_(student_subquery)).order_by(Onboarding.id).all():
+        if roster[row.user_id].onboarding is None:
+            roster[row.user_id].onboarding = row
+
+    for row in db.query(LearningPlan.id, LearningPlan.user_id, LearningPlan.title, LearningPlan.plan).filter(
+        LearningPlan.user_id.in_(student_subquery)
+    ).order_by(LearningPlan.id).all():
+        if roster[row.user_id].plan is None:
+            roster[row.user_id].plan = row
+
+    plan_ids = {bundle.plan.id: bundle for bundle in roster.values() if bundle.plan is not None}
+    if plan_ids:
+        for row in db.query(LearningPlanDay.plan_id, LearningPlanDay.concept, LearningPlanDay.completed).join(
+            User, User.id == LearningPlanDay.user_id
+        ).filter(
+            LearningPlanDay.plan_id.in_(list(plan_ids)),
+            LearningPlanDay.month_index == func.coalesce(User.current_month_index, 1),
+            LearningPlanDay.day_number == func.coalesce(User.current_day, 1),
+        ).all():
+            plan_ids[row.plan_id].current_day = row
+
+    for row in db.query(StudentStats.user_id, *(getattr(StudentStats, name) for name in STAT_FIELDS)).filter(
+        StudentStats.user_id.in_(student_subquery)
+    ).all():
+        roster[row.user_id].stats = row
+        roster[row.user_id].quiz = QuizStats(float(row.avg_quiz_score or 0), row.quiz_count or 0, row.passed_quizzes or 0)
+    # Students without a stats row yet (before the first rebuild) are aggregated from raw submissions
+    missing = [user_id for user_id, bundle in roster.items() if bundle.stats is None]
+    if missing:
+        for row in db.query(
+            QuizSubmission.user_id,
+            func.avg(QuizSubmission.score).label("avg_score"),
+            func.count(QuizSubmission.id).label("quiz_count"),
+            func.coalesce(func.sum(QuizSubmission.passed), 0).label("passed"),
+        ).filter(QuizSubmission.user_id.in_(missing)).group_by(QuizSubmission.user_id).all():
+            roster[row.user_id].quiz = QuizStats(float(row.avg_score or 0), int(row.quiz_count), int(row.passed or 0))
+
+    if recent_quizzes:
+        latest = (
+            db.query(
+                QuizSubmission.user_id, QuizSubmission.id, QuizSubmission.month_index, QuizSubmission.day,
+                QuizSubmission.score, QuizSubmission.passed, QuizSubmission.created_at,
+                func.row_number().over(partition_by=QuizSubmission.user_id, order_by=QuizSubmission.id.desc()).label("recency"),
+            )
+            .filter(QuizSubmission.user_id.in_(student_subquery))
+            .subquery()
+        )
+        for row in db.query(latest).filter(latest.c.recency <= recent_quizzes).order_by(latest.c.user_id, latest.c.id).all():
+            roster[row.user_id].recent_quizzes.append(row)
+
+    if vectors:
+        for row in db.query(CandidateVector.user_id, CandidateVector.summary_text, CandidateVector.skills_tags).filter(
+            CandidateVector.user_id.in_(student_subquery)
+        ).order_by(CandidateVector.id).all():
+            if roster[row.user_id].vector is None:
+                roster[row.user_id].vector = row
+
+    if paths:
+        if plan_ids:
+            for row in db.query(
+                LearningPath.plan_id, LearningPath.global_month_index, LearningPath.title, LearningPath.status,
+                LearningPath.current_day, LearningPath.days_completed, LearningPath.total_days,
+            ).join(User, User.id == LearningPath.user_id).filter(
+                LearningPath.plan_id.in_(list(plan_ids)),
+                LearningPath.global_month_index == func.coalesce(User.current_month_index, 1),
+            ).order_by(LearningPath.id).all():
+                bundle = plan_ids.get(row.plan_id)
+                if bundle is not None and bundle.current_path is None:
+                    bundle.current_path = row
+    return roster
@@ -0,0 +1,429 @@
+import copy
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.bitmap_index import BitmapIndex
+from app.core.ranking import TermIndex
+from app.models.user import User
+from app.models.onboarding import Onboarding
+from app.models.learning_plan import LearningPlan, LearningPlanDay
+from app.models.quiz import QuizSubmission
+from app.models.candidate_vector import CandidateVector
+from app.models.student_profile_document import StudentProfileDocument
+from app.services.candidate_features import _as_list, _plan_progress
+from app.services.roster_loader import current_position, load_roster
+
+# Column name -> dtype; "O" columns hold plain Python values
+COLUMNS: Dict[str, Any] = {
+    "user_id": np.int64,
+    "created_ts": np.float64,        # epoch seconds, NaN when unknown
+    "created_by_recruiter_id": np.int64,  # 0 when not added by a recruiter
+    "learning_progress": np.float64,
+    "avg_quiz_score": np.float64,
+    "quiz_count": np.int32,
+    "passed_quizzes": np.int32,
+    "has_linkedin": np.bool_,
+    "has_github": np.bool_,
+    "has_twitter": np.bool_,
+    "social_count": np.int8,
+    "has_onboarding": np.bool_,
+    "has_plan": np.bool_,
+    "name": "O",
+    "email": "O",
+    "google_email": "O",
+    "picture": "O",
+    "created_at": "O",
+    "onboarding_name": "O",
+    "career_goals": "O",
+    "current_skills": "O",
+    "grade": "O",
+    "time_commitment": "O",
+    "plan_title": "O",
+    "current_topic": "O",
+    "summary": "O",
+    "skills_tags": "O",
+}
+
+# Facets with one bitmap per value; there is no student location column to facet on
+FACETS = ("skill", "domain", "level", "availability", "social")
+
+SORTABLE = ("learning_progress", "avg_quiz_score", "quiz_count", "passed_quizzes", "social_count", "created_ts", "user_id")
+
+
+def load_roster_rows(db: Session, user_ids: Optional[Iterable[int]] = None) -> List[Dict[str, Any]]:
+    """Per-student facts for the whole roster (or ``user_ids``) from the bulk roster loader."""
+    rows = []
+    for bundle in load_roster(db, user_ids).values():
+        student, onb, plan, stats, cv = bundle.user, bundle.onboarding, bundle.plan, bundle.quiz, bundle.vector
+        month_index, day = current_position(bundle)
+        progress = _plan_progress(plan.plan if plan else None, month_index, day, bundle.current_day, bundle.stats)
+        rows.append({
+            "user_id": student.id,
+            "created_ts": student.created_at.timestamp() if student.created_at else np.nan,
+            "created_by_recruiter_id": student.created_by_recruiter_id or 0,
+            "learning_progress": progress["learning_progress"],
+            "avg_quiz_score": stats.avg_score,
+            "quiz_count": stats.count,
+            "passed_quizzes": stats.passed,
+            "has_linkedin": bool(student.linkedin),
+            "has_github": bool(student.github),
+            "has_twitter": bool(student.twitter),
+            "social_count": int(bool(student.linkedin)) + int(bool(student.github)) + int(bool(student.twitter)),
+            "has_onboarding": onb is not None,
+            "has_plan": progress["has_plan"],
+            "name": student.google_name,
+            "email": student.email,
+            "google_email": student.google_email,
+            "picture": student.google_picture,
+            "created_at": student.created_at,
+            "onboarding_name": onb.name if onb else None,
+            "career_goals": onb.career_goals if onb else None,
+            "current_skills": onb.current_skills if onb else None,
+            "grade": onb.grade if onb else None,
+            "time_commitment": onb.time_commitment if onb else None,
+            "plan_title": (plan.title or "Learning Plan") if plan and plan.plan else None,
+            "current_topic": progress["current_topic"],
+            "summary": cv.summary_text if cv else None,
+            "skills_tags": (cv.skills_tags or []) if cv else [],
+        })
+    return rows
+
+
+def _facet_terms(value) -> List[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    return [v.strip().lower() for v in _as_list(value) if v.strip()]
+
+
+def _row_facets(columns: Dict[str, np.ndarray], idx: int) -> Dict[str, List[str]]:
+    return {
+        "skill": _facet_terms(columns["skills_tags"][idx]) + _facet_terms(columns["current_skills"][idx]),
+        "domain": _facet_terms(columns["career_goals"][idx]),
+        "level": _facet_terms(columns["grade"][idx]),
+        "availability": _facet_terms(columns["time_commitment"][idx]),
+        "social": [name for name in ("linkedin", "github", "twitter") if columns[f"has_{name}"][idx]],
+    }
+
+
+def _column(values: List[Any], dtype) -> np.ndarray:
+    if dtype == "O":
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+    return np.asarray(values, dtype=dtype)
+
+
+class RosterSnapshot:
+    """Columnar, read-only view of the student roster: one NumPy array per attribute.
+
+    Rows are kept in user id order. Filters are boolean masks over the
+    numeric columns, so a dashboard query is a handful of vector operations;
+    only the rows that end up on the page are turned back into dicts.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], built_at: float, facets: Optional[BitmapIndex] = None):
+        self.columns = columns
+        self.built_at = built_at
+        self._skills: Optional[TermIndex] = None
+        self._facets = facets
+        self._search_names: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> "RosterSnapshot":
+        return cls({name: _column([r[name] for r in rows], dtype) for name, dtype in COLUMNS.items()}, time.time())
+
+    def __len__(self) -> int:
+        return len(self.columns["user_id"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def position(self, user_id: int) -> Optional[int]:
+        ids = self.columns["user_id"]
+        idx = int(np.searchsorted(ids, user_id))
+        return idx if idx < len(ids) and ids[idx] == user_id else None
+
+    def row(self, idx: int) -> Dict[str, Any]:
+        return {name: column[idx].item() if hasattr(column[idx], "item") else column[idx]
+                for name, column in self.columns.items()}
+
+    def get(self, user_id: int) -> Optional[Dict[str, Any]]:
+        idx = self.position(user_id)
+        return self.row(idx) if idx is not None else None
+
+    def skill_index(self) -> TermIndex:
+        if self._skills is None:
+            docs = []
+            for tags, current in zip(self.columns["skills_tags"], self.columns["current_skills"]):
+                keys = {s.strip().lower() for s in _as_list(tags) + _as_list(current) if s.strip()}
+                docs.append(sorted(keys))
+            self._skills = TermIndex(docs)
+        return self._skills
+
+    def facets(self) -> BitmapIndex:
+        """Bitmap per facet value over row positions, built on first use."""
+        if self._facets is None:
+            rows = [_row_facets(self.columns, idx) for idx in range(len(self))]
+            self._facets = BitmapIndex.build(len(self), {facet: [r[facet] for r in rows] for facet in FACETS})
+        return self._facets
+
+    def name_matches(self, query: str) -> np.ndarray:
+        """Case-insensitive substring match on name (or email when there is no name)."""
+        if self._search_names is None:
+            self._search_names = np.asarray(
+                [(name or email or "").lower() for name, email in zip(self.columns["name"], self.columns["email"])],
+                dtype=str,
+            )
+        if not len(self):
+            return np.zeros(0, dtype=bool)
+        return np.char.find(self._search_names, query.lower()) >= 0
+
+    def mask(self, min_progress: float = 0, min_quiz_score: float = 0, min_quizzes: int = 0,
+             has_github: Optional[bool] = None, has_linkedin: Optional[bool] = None,
+             has_twitter: Optional[bool] = None, min_social: int = 0, skills: Optional[List[str]] = None,
+             joined_within_days: Optional[int] = None, added_by_recruiter_id: Optional[int] = None) -> np.ndarray:
+        c = self.columns
+        keep = np.ones(len(self), dtype=bool)
+        if min_progress:
+            keep &= c["learning_progress"] >= min_progress
+        if min_quiz_score:
+            keep &= c["avg_quiz_score"] >= min_quiz_score
+        if min_quizzes:
+            keep &= c["quiz_count"] >= min_quizzes
+        for flag, name in ((has_github, "has_github"), (has_linkedin, "has_linkedin"), (has_twitter, "has_twitter")):
+            if flag is not None:
+                keep &= c[name] == flag
+        if min_social:
+            keep &= c["social_count"] >= min_social
+        if skills:
+            keys = list({s.strip().lower() for s in skills if s and s.strip()})
+            if keys:
+                keep &= self.skill_index().overlap_counts(keys) >= len(keys)
+        if joined_within_days is not None:
+            cutoff = (datetime.utcnow() - timedelta(days=joined_within_days)).timestamp()
+            keep &= c["created_ts"] >= cutoff  # NaN compares False
+        if added_by_recruiter_id is not None:
+            keep &= c["created_by_recruiter_id"] == added_by_recruiter_id
+        return keep
+
+    def _sort_values(self, positions: np.ndarray, sort_by: str) -> np.ndarray:
+        if sort_by not in SORTABLE:
+            raise ValueError(f"Cannot sort by {sort_by}")
+        values = self.columns[sort_by][positions].astype(np.float64)
+        return np.nan_to_num(values, nan=-np.inf)
+
+    def select(self, mask: Optional[np.ndarray] = None, sort_by: Optional[str] = None, descending: bool = True,
+               offset: int = 0, limit: Optional[int] = None,
+               after: Optional[Tuple[float, int]] = None) -> Tuple[List[int], int]:
+        """Row positions of one page of the masked roster, plus the number of matching rows.
+
+        ``after`` is the ``sort_key`` of the last row of the previous page;
+        the page then starts right after it, so later pages stay put while
+        rows are inserted or removed ahead of them.
+        """
+        positions = np.flatnonzero(mask) if mask is not None else np.arange(len(self))
+        total = len(positions)
+        # Unsorted listings are in user id order, which is row order
+        descending = descending and sort_by is not None
+        values = self._sort_values(positions, sort_by or "user_id")
+        if after is not None:
+            value, last_id = after
+            ids = self.columns["user_id"][positions]
+            beyond = values < value if descending else values > value
+            keep = beyond | ((values == value) & (ids > last_id))
+            positions, values = positions[keep], values[keep]
+        if sort_by:
+            # Stable sort keeps user id order among ties
+            order = np.argsort(-values if descending else values, kind="stable")
+            positions = positions[order]
+        end = None if limit is None else offset + limit
+        return [int(p) for p in positions[offset:end]], total
+
+    def sort_key(self, idx: int, sort_by: Optional[str] = None) -> Tuple[float, int]:
+        """``(sort value, user id)`` of a row, the keyset position ``select(after=...)`` resumes from."""
+        sort_by = sort_by or "user_id"
+        return float(self._sort_values(np.asarray([idx]), sort_by)[0]), int(self.columns["user_id"][idx])
+
+    def patched(self, rows: List[Dict[str, Any]], removed_ids: Iterable[int]) -> "RosterSnapshot":
+        """Copy of this snapshot with ``rows`` upserted and ``removed_ids`` dropped."""
+        columns = {name: column.copy() for name, column in self.columns.items()}
+        ids = columns["user_id"]
+        keep = ~np.isin(ids, np.fromiter(removed_ids, dtype=np.int64)) if removed_ids else np.ones(len(ids), dtype=bool)
+        new_rows = []
+        for row in rows:
+            idx = self.position(row["user_id"])
+            if idx is None:
+                new_rows.append(row)
+                continue
+            keep[idx] = True
+            for name in COLUMNS:
+                columns[name][idx] = row[name]
+        positions_stable = not new_rows and bool(keep.all())
+        columns = {name: column[keep] for name, column in columns.items()}
+        if new_rows:
+            for name, dtype in COLUMNS.items():
+                columns[name] = np.concatenate([columns[name], _column([r[name] for r in new_rows], dtype)])
+            order = np.argsort(columns["user_id"], kind="stable")
+            columns = {name: column[order] for name, column in columns.items()}
+        facets = None
+        if positions_stable and self._facets is not None:
+            # Same ordinals: move just the changed rows between value bitmaps
+            facets = copy.deepcopy(self._facets)
+            for row in rows:
+                idx = self.position(row["user_id"])
+                for facet, values in _row_facets(columns, idx).items():
+                    facets.set_row(facet, idx, values)
+        return RosterSnapshot(columns, self.built_at, facets=facets)
+
+
+class RosterSnapshotCache:
+    """Process-wide roster snapshot, rebuilt every ``ttl`` seconds and patched in between.
+
+    Committed ORM changes to students, onboarding, plans, quiz submissions and
+    candidate vectors mark their user dirty; the next ``get`` reloads just
+    those users and swaps in a patched copy, so readers never see a half
+    updated snapshot.
+
+    Those listeners only see this process's writes. Every such write also
+    moves its student's ``student_profile_documents.updated_at`` (stamped on
+    the database clock, so app hosts' clocks never meet), so at most every
+    ``sync_interval`` seconds ``get`` also reads the rows past the last
+    watermark (an index range scan) and patches those students, whichever
+    worker changed them. Changes that leave no document behind (a new
+    student whose document is not built yet, deleted rows) wait for the
+    next full rebuild, so ``ttl`` bounds how stale they get.
+
+    One reader at a time rebuilds or patches, outside the lock; the others
+    keep getting the current snapshot until the new one is swapped in, and
+    only wait when there is no snapshot yet.
+    """
+
+    TRACKED = (User, Onboarding, LearningPlan, LearningPlanDay, QuizSubmission, CandidateVector)
+    # Re-read this many seconds before the watermark: a write stamped earlier may commit after a later one
+    WATERMARK_OVERLAP_SECONDS = 5
+
+    def __init__(self, ttl: Optional[float] = None, sync_interval: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else settings.ROSTER_SNAPSHOT_TTL
+        self.sync_interval = sync_interval if sync_interval is not None else settings.ROSTER_SNAPSHOT_SYNC_SECONDS
+        self._snapshot: Optional[RosterSnapshot] = None
+        self._dirty: set = set()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._refreshing = False
+        # Bumped by invalidate, so a refresh that started before it is not swapped in
+        self._generation = 0
+        # Written only by the refreshing reader, when it swaps in its snapshot
+        self._watermark: Optional[datetime] = None
+        # user id -> updated_at of the rows inside the overlap window, already patched
+        self._recent: Dict[int, datetime] = {}
+        self._synced_at = 0.0
+
+    def _changed_elsewhere(self, db: Session, watermark: Optional[datetime],
+                           recent: Dict[int, datetime]) -> Tuple[set, Optional[datetime], Dict[int, datetime]]:
+        """Students whose profile document moved since ``watermark``, from any worker, with the next watermark."""
+        query = db.query(StudentProfileDocument.user_id, StudentProfileDocument.updated_at)
+        if watermark is not None:
+            since = watermark - timedelta(seconds=self.WATERMARK_OVERLAP_SECONDS)
+            query = query.filter(StudentProfileDocument.updated_at > since)
+        rows = {row.user_id: row.updated_at for row in query.filter(StudentProfileDocument.updated_at.isnot(None))}
+        changed = {user_id for user_id, updated_at in rows.items() if recent.get(user_id) != updated_at}
+        if rows:
+            watermark = max(watermark or datetime.min, max(rows.values()))
+        return changed, watermark, rows
+
+    def _rebuild(self, db: Session) -> Tuple[RosterSnapshot, Optional[datetime], Dict[int, datetime], float]:
+        synced_at = time.monotonic()
+        # Taken before the rows, so a change committed while they load is patched in on the next check
+        watermark = db.query(func.max(StudentProfileDocument.updated_at)).scalar()
+        return RosterSnapshot.from_rows(load_roster_rows(db)), watermark, {}, synced_at
+
+    def _patch(self, db: Session, snapshot: RosterSnapshot, dirty: set,
+               sync: bool) -> Tuple[RosterSnapshot, Optional[datetime], Dict[int, datetime], float]:
+        watermark, recent, synced_at = self._watermark, self._recent, self._synced_at
+        if sync:
+            synced_at = time.monotonic()
+            changed, watermark, recent = self._changed_elsewhere(db, watermark, recent)
+            dirty = dirty | changed
+        if dirty:
+            rows = load_roster_rows(db, dirty)
+            found = {r["user_id"] for r in rows}
+            snapshot = snapshot.patched(rows, dirty - found)
+        return snapshot, watermark, recent, synced_at
+
+    def get(self, db: Session) -> RosterSnapshot:
+        with self._changed:
+            while self._refreshing and self._snapshot is None:
+                self._changed.wait()
+            snapshot = self._snapshot
+            expired = snapshot is None or time.time() - snapshot.built_at > self.ttl
+            sync = time.monotonic() - self._synced_at >= self.sync_interval
+            if self._refreshing or not (expired or sync or self._dirty):
+                return snapshot
+            self._refreshing = True
+            generation = self._generation
+            dirty, self._dirty = self._dirty, set()
+        refreshed = None
+        try:
+            refreshed = self._rebuild(db) if expired else self._patch(db, snapshot, dirty, sync)
+        finally:
+            with self._changed:
+                self._refreshing = False
+                if refreshed is not None and generation == self._generation:
+                    self._snapshot, self._watermark, self._recent, self._synced_at = refreshed
+                else:
+                    # Failed or invalidated meanwhile: keep the marks for the next refresh
+                    self._dirty |= dirty
+                self._changed.notify_all()
+        return refreshed[0]
+
+    def mark_dirty(self, user_ids: Iterable[int]):
+        ids = {int(u) for u in user_ids if u is not None}
+        if ids:
+            with self._lock:
+                self._dirty |= ids
+
+    def mark_dirty_on_commit(self, session: Session, user_ids: Iterable[int]):
+        """Mark users dirty once ``session`` commits; for writes that bypass the ORM (Core UPDATEs)."""
+        session.info.setdefault("roster_dirty", set()).update(user_ids)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+            self._dirty.clear()
+            self._watermark = None
+            self._recent = {}
+
+    def _user_id_of(self, obj) -> Optional[int]:
+        if isinstance(obj, User):
+            return obj.id
+        return getattr(obj, "user_id", None)
+
+    def _after_flush(self, session, flush_context):
+        pending = session.info.setdefault("roster_dirty", set())
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if isinstance(obj, self.TRACKED):
+                pending.add(self._user_id_of(obj))
+
+    def _after_commit(self, session):
+        self.mark_dirty(session.info.pop("roster_dirty", ()))
+
+    def _after_rollback(self, session):
+        session.info.pop("roster_dirty", None)
+
+    def track_changes(self):
+        """Listen for committed changes on every ORM session."""
+        event.listen(Session, "after_flush", self._after_flush)
+        event.listen(Session, "after_commit", self._after_commit)
+        event.listen(Session, "after_rollback", self._after_rollback)
+
+
+roster_snapshot = RosterSnapshotCache()
+roster_snapshot.track_changes()
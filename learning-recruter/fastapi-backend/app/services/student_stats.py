@@ -0,0 +1,130 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database.upsert import upsert_insert
+from app.models.user import User
+from app.models.learning_plan import LearningPlan
+from app.models.quiz import QuizSubmission
+from app.models.student_stats import StudentStats
+
+REBUILD_BATCH = 500
+
+# Columns the roster loader reads for every student; nothing else is stored
+STAT_FIELDS = (
+    "quiz_count", "passed_quizzes", "avg_quiz_score", "total_months", "completed_months", "learning_progress",
+    "current_month", "current_day", "has_plan",
+)
+
+
+def _plan_stats(plan: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Month counts and progress from the plan JSON."""
+    months = (plan or {}).get("months", []) or []
+    completed_months = sum(1 for m in months if m.get("status") == "completed")
+    return {
+        "total_months": len(months),
+        "completed_months": completed_months,
+        "learning_progress": (completed_months / len(months) * 100) if months else 0.0,
+        "has_plan": bool(months),
+    }
+
+
+def compute_student_stats(db: Session, user_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, Any]]:
+    """Stats per student (or ``user_ids``) from the source tables, in three set-based queries."""
+    student_ids = db.query(User.id).filter(User.user_type == 'student')
+    if user_ids is not None:
+        student_ids = student_ids.filter(User.id.in_(list(user_ids)))
+    student_subquery = student_ids.scalar_subquery()
+    stats = {
+        row.id: {"current_month": row.current_month_index or 1, "current_day": row.current_day or 1,
+                 "quiz_count": 0, "passed_quizzes": 0, "avg_quiz_score": 0.0, **_plan_stats(None)}
+        for row in db.query(User.id, User.current_month_index, User.current_day)
+        .filter(User.id.in_(student_subquery)).all()
+    }
+    if not stats:
+        return stats
+    for row in db.query(LearningPlan.user_id, LearningPlan.plan).filter(
+        LearningPlan.user_id.in_(student_subquery)
+    ).order_by(LearningPlan.id.desc()).all():
+        # Descending, so the first (oldest) plan is written last, as the roster loader picks it
+        stats[row.user_id].update(_plan_stats(row.plan))
+    for row in db.query(
+        QuizSubmission.user_id,
+        func.count(QuizSubmission.id).label("quiz_count"),
+        func.coalesce(func.sum(QuizSubmission.passed), 0).label("passed"),
+        func.avg(QuizSubmission.score).label("avg_score"),
+    ).filter(QuizSubmission.user_id.in_(student_subquery)).group_by(QuizSubmission.user_id).all():
+        stats[row.user_id].update(
+            quiz_count=int(row.quiz_count), passed_quizzes=int(row.passed or 0),
+            avg_quiz_score=float(row.avg_score or 0),
+        )
+    return stats
+
+
+def _upsert_stats(db: Session, rows: List[Dict[str, Any]], columns: Iterable[str]):
+    """``INSERT ... ON CONFLICT (user_id) DO UPDATE`` of ``columns`` for ``rows``, in one statement."""
+    statement = upsert_insert(db, StudentStats).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[StudentStats.user_id],
+        set_={name: statement.excluded[name] for name in columns},
+    ))
+
+
+def update_student_stats(db: Session, user_ids: Iterable[int]) -> int:
+    """Recompute the stats rows of ``user_ids`` inside the caller's transaction.
+
+    Does not commit: writers call this just before their own ``db.commit()``
+    so the stats change together with the rows they summarize. Pending
+    changes are flushed first. A first upsert creates or locks the rows, so
+    concurrent writers for the same student apply one after the other and
+    never race on inserting it; the recomputed values are then written with
+    a second upsert.
+    """
+    ids = sorted({int(u) for u in user_ids if u is not None})
+    if not ids:
+        return 0
+    db.flush()
+    now = datetime.utcnow()
+    _upsert_stats(db, [{"user_id": user_id, "updated_at": now} for user_id in ids], ["updated_at"])
+    computed = compute_student_stats(db, ids)
+    if computed:
+        _upsert_stats(db, [{"user_id": user_id, **{name: values[name] for name in STAT_FIELDS}, "updated_at": now}
+                           for user_id, values in computed.items()], STAT_FIELDS + ("updated_at",))
+    gone = set(ids) - set(computed)
+    if gone:
+        # No longer students
+        db.query(StudentStats).filter(StudentStats.user_id.in_(gone)).delete(synchronize_session=False)
+    return len(computed)
+
+
+def rebuild_student_stats(db: Session) -> int:
+    """Recompute every student's stats from scratch, committing per batch; returns how many."""
+    ids = [row.id for row in db.query(User.id).filter(User.user_type == 'student').order_by(User.id).all()]
+    for start in range(0, len(ids), REBUILD_BATCH):
+        update_student_stats(db, ids[start:start + REBUILD_BATCH])
+        db.commit()
+    print(f"📊 Rebuilt stats for {len(ids)} students")
+    return len(ids)
+
+
+def get_student_stats(db: Session, user_ids: Optional[Iterable[int]] = None) -> Dict[int, StudentStats]:
+    """Stored stats keyed by user id: one indexed lookup, or a scan of the table without ``user_ids``."""
+    query = db.query(StudentStats)
+    if user_ids is not None:
+        query = query.filter(StudentStats.user_id.in_(list(user_ids)))
+    return {row.user_id: row for row in query.all()}
+
+
+if __name__ == "__main__":
+    # python -m app.services.student_stats  -> rebuild the whole table
+    from app.database.db import SessionLocal
+    from app.models import user, onboarding, learning_plan, learning_path, job, email_application  # noqa: F401
+    from app.models import candidate_vector, quiz, shortlist, student_profile_summary, student_stats  # noqa: F401
+
+    session = SessionLocal()
+    try:
+        rebuild_student_stats(session)
+    finally:
+        session.close()
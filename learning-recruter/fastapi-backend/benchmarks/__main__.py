@@ -0,0 +1,96 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.cases import CASES
+from benchmarks.harness import (
+    baseline_path, compare_to_baseline, load_baseline, make_engine, reset_schema, run_case,
+    save_baseline, session_for,
+)
+from benchmarks.synthetic import generate_roster, parse_scale
+
+
+def _default_database_url(scale: str) -> str:
+    return f"sqlite:///{os.path.join(tempfile.gettempdir(), f'eduai_bench_{scale}.db')}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the recruiter matching hot paths")
+    parser.add_argument("--scale", default="1k", help="1k, 10k, 100k or an explicit student count")
+    parser.add_argument("--database-url", default=None, help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--cases", default=",".join(CASES), help="Comma separated subset of: " + ", ".join(CASES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jobs", type=int, default=10, help="Synthetic job postings to create")
+    parser.add_argument("--no-vectors", action="store_true", help="Skip candidate vectors to speed up seeding")
+    parser.add_argument("--reuse", action="store_true", help="Reuse an already seeded database")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--check", action="store_true", help="Fail when the run regresses against the baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    students = parse_scale(args.scale)
+    database_url = args.database_url or _default_database_url(args.scale)
+    backend = database_url.split(":", 1)[0].split("+", 1)[0]
+    selected = [name.strip() for name in args.cases.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+
+    fixture_path = database_url.replace("/", "_").replace(":", "_") + ".fixture.json"
+    fixture_file = os.path.join(tempfile.gettempdir(), fixture_path[-120:])
+    if args.reuse and os.path.exists(fixture_file):
+        with open(fixture_file) as f:
+            fixture = json.load(f)
+    else:
+        print(f"Seeding {students} students into {database_url} ...")
+        engine = make_engine(database_url)
+        reset_schema(engine)
+        started = time.perf_counter()
+        with session_for(engine) as db:
+            fixture = generate_roster(db, students, seed=args.seed, jobs=args.jobs, with_vectors=not args.no_vectors)
+        engine.dispose()
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+        with open(fixture_file, "w") as f:
+            json.dump(fixture, f)
+
+    cases = []
+    spawn = multiprocessing.get_context("spawn")
+    for name in selected:
+        # One fresh process per case keeps peak RSS attributable to that case
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            metrics = pool.submit(run_case, name, database_url, fixture).result()
+        cases.append(metrics)
+        print(f"{name:<26} {metrics['wall_seconds']:>9.3f}s {metrics['queries']:>8} queries "
+              f"{metrics['model_calls']:>7} model calls {metrics['peak_rss_mb']:>8.1f} MB peak RSS")
+
+    report = {"backend": backend, "scale": args.scale, "students": students, "cases": cases}
+    path = baseline_path(backend, args.scale)
+
+    status = 0
+    if args.check:
+        baseline = load_baseline(path)
+        if baseline is None:
+            print(f"No baseline at {path}; run with --save-baseline first")
+            status = 1
+        else:
+            regressions = compare_to_baseline(report, baseline, time_tolerance=args.time_tolerance)
+            for line in regressions:
+                print(f"REGRESSION {line}")
+            status = 1 if regressions else 0
+            if not regressions:
+                print("No regressions against baseline")
+
+    if args.save_baseline:
+        save_baseline(path, report)
+        print(f"Baseline written to {path}")
+
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
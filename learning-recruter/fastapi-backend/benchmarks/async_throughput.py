@@ -0,0 +1,202 @@
+"""Throughput of async routes on AsyncSession vs the sync Session at 100 and 500 concurrent connections.
+
+    PYTHONPATH=. python -m benchmarks.async_throughput --students 200
+    PYTHONPATH=. python -m benchmarks.async_throughput --database-url postgresql://localhost/eduai_bench --reuse
+
+Serves a small app in-process (httpx over ASGI) and replays a mixed load:
+mostly first pages of the ``/quiz/history`` query, plus a share of slow
+report queries. The same endpoints run three ways:
+
+    async-session   ``async def`` + AsyncSession, as the async routes now do
+    blocking        ``async def`` + sync Session, queries run on the event loop
+    threadpool      ``def`` + sync Session, FastAPI's worker threads
+
+A slow query on the blocking path stalls every request on the worker, which
+shows up as p99 latency of the fast requests. The blocking path also
+deadlocks once requests outnumber pooled connections: a checkout waits on
+the event loop thread for connections only that loop can release. Pools
+are therefore sized to the concurrency level here.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from typing import Dict, List
+
+from fastapi import Depends, FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.harness import import_models, make_engine, reset_schema, session_for
+from benchmarks.synthetic import generate_roster
+
+# Recruiter 1 seeds first, so students are users 2..N+1
+FIRST_STUDENT = 2
+# Portable busy query standing in for a slow report (runs inside the database)
+SLOW_SQL = text("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) SELECT count(*) FROM c")
+MODES = ("async-session", "blocking", "threadpool")
+
+
+def build_app(sync_engine, async_engine, slow_rows: int) -> FastAPI:
+    from sqlalchemy import select
+    from app.core.pagination import keyset_page, keyset_page_async
+    from app.core.security import decode_token
+    from app.database.async_db import get_async_db
+    from app.database.db import get_db
+    from app.models.quiz import QuizSubmission
+
+    SyncSession = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
+    def bench_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def bench_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    def history(db: Session, user_id: str) -> int:
+        rows, _ = keyset_page(db.query(QuizSubmission).filter(QuizSubmission.user_id == int(user_id)),
+                              QuizSubmission.created_at, QuizSubmission.id, "", 20, "quiz_history")
+        return len(rows)
+
+    app = FastAPI()
+    app.dependency_overrides[get_db] = bench_db
+    app.dependency_overrides[get_async_db] = bench_async_db
+
+    # Same query as GET /quiz/history
+    @app.get("/bench/async-session/history")
+    async def async_history(token: str, db: AsyncSession = Depends(get_async_db)):
+        rows, _ = await keyset_page_async(db, select(QuizSubmission).where(QuizSubmission.user_id == int(decode_token(token))),
+                                          QuizSubmission.created_at, QuizSubmission.id, "", 20, "quiz_history")
+        return {"rows": len(rows)}
+
+    @app.get("/bench/async-session/report")
+    async def async_report(db: AsyncSession = Depends(get_async_db)):
+        return {"rows": (await db.execute(SLOW_SQL, {"n": slow_rows})).scalar()}
+
+    @app.get("/bench/blocking/history")
+    async def blocking_history(token: str, db: Session = Depends(get_db)):
+        return {"rows": history(db, decode_token(token))}
+
+    @app.get("/bench/blocking/report")
+    async def blocking_report(db: Session = Depends(get_db)):
+        return {"rows": db.execute(SLOW_SQL, {"n": slow_rows}).scalar()}
+
+    @app.get("/bench/threadpool/history")
+    def threadpool_history(token: str, db: Session = Depends(get_db)):
+        return {"rows": history(db, decode_token(token))}
+
+    @app.get("/bench/threadpool/report")
+    def threadpool_report(db: Session = Depends(get_db)):
+        return {"rows": db.execute(SLOW_SQL, {"n": slow_rows}).scalar()}
+
+    return app
+
+
+async def run_load(app: FastAPI, mode: str, concurrency: int, requests: int, students: int,
+                   slow_share: float, seed: int) -> Dict[str, float]:
+    import httpx
+    from app.core.security import create_access_token
+    rng = random.Random(seed)
+    tokens = [create_access_token({"sub": str(FIRST_STUDENT + i)}) for i in range(min(students, 100))]
+    plan = [rng.random() < slow_share for _ in range(requests)]
+    fast_latencies: List[float] = []
+    errors = 0
+    queue = iter(range(requests))
+
+    async def worker(client):
+        nonlocal errors
+        for i in queue:
+            token = tokens[i % len(tokens)]
+            url = f"/bench/{mode}/report" if plan[i] else f"/bench/{mode}/history?token={token}"
+            started = time.perf_counter()
+            response = await client.get(url)
+            if response.status_code != 200:
+                errors += 1
+            elif not plan[i]:
+                fast_latencies.append(time.perf_counter() - started)
+
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        seconds = time.perf_counter() - started
+    fast_latencies.sort()
+    p99 = fast_latencies[int(len(fast_latencies) * 0.99) - 1] if fast_latencies else 0.0
+    return {"rps": requests / seconds, "p50_ms": statistics.median(fast_latencies) * 1000 if fast_latencies else 0.0,
+            "p99_ms": p99 * 1000, "errors": errors}
+
+
+async def measure(database_url: str, modes: List[str], levels: List[int], args) -> List[Dict]:
+    from sqlalchemy import create_engine
+    from app.database.async_db import make_async_engine
+    rows = []
+    for concurrency in levels:
+        # One pooled connection per client for every mode, so the blocking mode cannot deadlock
+        connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        sync_engine = create_engine(database_url, pool_size=concurrency, max_overflow=0, pool_timeout=120,
+                                    connect_args=connect_args)
+        async_engine = make_async_engine(database_url, pool_size=concurrency, max_overflow=0, pool_timeout=120)
+        app = build_app(sync_engine, async_engine, args.slow_rows)
+        try:
+            for mode in modes:
+                # Warm-up pass opens the pooled connections, which is not what is being measured
+                await run_load(app, mode, concurrency, concurrency, args.students, 0, args.seed)
+                result = await run_load(app, mode, concurrency, args.requests, args.students, args.slow_share, args.seed)
+                rows.append({"mode": mode, "concurrency": concurrency, **result})
+                print(f"{mode:<14} {concurrency:>11} {result['rps']:>9.0f} {result['p50_ms']:>9.1f} "
+                      f"{result['p99_ms']:>9.1f} {result['errors']:>7}")
+        finally:
+            await async_engine.dispose()
+            sync_engine.dispose()
+    return rows
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.async_throughput", description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--database-url", default=None, help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--reuse", action="store_true", help="Reuse an already seeded database")
+    parser.add_argument("--concurrency", default="100,500", help="Comma separated concurrent connection counts")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per mode and concurrency level")
+    parser.add_argument("--slow-share", type=float, default=0.02, help="Share of requests that run the slow report")
+    parser.add_argument("--slow-rows", type=int, default=300000, help="Rows the slow report query iterates")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+    import_models()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'eduai_async_bench.db')}"
+    if not args.reuse:
+        engine = make_engine(database_url)
+        print(f"Seeding {args.students} students into {database_url} ...")
+        reset_schema(engine)
+        with session_for(engine) as db:
+            generate_roster(db, args.students, jobs=0, with_vectors=False)
+        engine.dispose()
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(unknown)}")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    print(f"\n{'mode':<14} {'connections':>11} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    asyncio.run(measure(database_url, modes, levels, args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
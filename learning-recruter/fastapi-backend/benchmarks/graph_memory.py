@@ -0,0 +1,107 @@
+"""Memory held by the GraphRAG knowledge graph: legacy nested dicts vs ``CompactGraph``.
+
+    PYTHONPATH=. python -m benchmarks.graph_memory --nodes 10000,100000
+
+Synthetic students get skills, topics and goals drawn from fixed
+vocabularies (strings are built per student, as rows loaded from the
+database would be) and ``--degree`` random similarity connections each.
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from app.core.compact_graph import CompactGraph
+
+SKILLS = 400
+TOPICS = 1200
+GOALS = 40
+
+
+def synthetic_users(n: int, seed: int) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    for user_id in range(1, n + 1):
+        yield {
+            "user_id": user_id,
+            "skills": [f"skill {rng.randrange(SKILLS)}" for _ in range(rng.randint(2, 8))],
+            "topics": [f"topic {rng.randrange(TOPICS)}" for _ in range(rng.randint(4, 16))],
+            "career_goals": [f"goal {rng.randrange(GOALS)}" for _ in range(rng.randint(1, 3))],
+            "learning_progress": rng.random(),
+            "completed_months": rng.randint(0, 6),
+            "avg_quiz_score": rng.random(),
+            "total_quizzes": rng.randint(0, 30),
+            "grade": rng.choice(["high school", "undergraduate", "graduate", None]),
+            "time_commitment": rng.choice(["30 minutes", "1 hour", "2 hours"]),
+        }
+
+
+def synthetic_edges(n: int, degree: int, seed: int):
+    rng = np.random.default_rng(seed)
+    pairs = n * degree // 2
+    src = rng.integers(0, n, pairs)
+    dst = (src + rng.integers(1, n, pairs)) % n
+    return src, dst, rng.uniform(0.3, 1.0, pairs).astype(np.float32)
+
+
+def legacy_graph(n: int, degree: int, seed: int) -> Dict[str, Any]:
+    """The nested-dict layout ``GraphRAG.build_knowledge_graph`` used to keep."""
+    graph = {"users": {}, "skills": {}, "topics": {}, "learning_paths": {}, "connections": []}
+    for user in synthetic_users(n, seed):
+        user["skills"] = list(set(user["skills"]))
+        user["topics"] = list(set(user["topics"]))
+        graph["users"][str(user["user_id"])] = user
+        for skill in user["skills"]:
+            graph["skills"].setdefault(skill, {"users": [], "related_topics": []})["users"].append(user["user_id"])
+        for topic in user["topics"]:
+            graph["topics"].setdefault(topic, {"users": [], "related_skills": []})["users"].append(user["user_id"])
+    src, dst, weights = synthetic_edges(n, degree, seed)
+    for a, b, w in zip(src.tolist(), dst.tolist(), weights.tolist()):
+        graph["connections"].append({
+            "user1": a + 1, "user2": b + 1, "similarity": w, "connection_type": "learning_similarity",
+        })
+    return graph
+
+
+def compact_graph(n: int, degree: int, seed: int) -> CompactGraph:
+    graph = CompactGraph.from_users(list(synthetic_users(n, seed)))
+    graph.set_edges(*synthetic_edges(n, degree, seed))
+    return graph
+
+
+def measure(build, *args) -> Dict[str, float]:
+    """Bytes still allocated once ``build`` returns (temporaries freed), plus build time."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    graph = build(*args)
+    seconds = time.perf_counter() - started
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del graph
+    return {"retained_mb": retained / 2 ** 20, "peak_mb": peak / 2 ** 20, "seconds": seconds}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.graph_memory", description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", default="10000,100000", help="Comma separated student counts")
+    parser.add_argument("--degree", type=int, default=8, help="Similarity connections per student")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    print(f"{'students':>9} {'layout':<8} {'retained MB':>12} {'peak MB':>9} {'bytes/student':>14} {'build s':>8}")
+    for n in [int(v) for v in args.nodes.split(",") if v.strip()]:
+        for name, build in (("legacy", legacy_graph), ("compact", compact_graph)):
+            m = measure(build, n, args.degree, args.seed)
+            print(f"{n:>9} {name:<8} {m['retained_mb']:>12.1f} {m['peak_mb']:>9.1f} "
+                  f"{m['retained_mb'] * 2 ** 20 / n:>14.0f} {m['seconds']:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
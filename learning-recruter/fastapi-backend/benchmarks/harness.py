@@ -0,0 +1,179 @@
+import asyncio
+import json
+import os
+import resource
+import time
+import warnings
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.fake_llm import install_fake_llm
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kw):
+    # Models declare Postgres JSONB; SQLite stores the same documents as JSON text
+    return "JSON"
+
+
+def import_models():
+    """Import every model the matching paths touch so mappers can configure."""
+    from app.models import user, onboarding, learning_plan, learning_path, job, email_application  # noqa: F401
+    from app.models import candidate_vector, quiz, shortlist, student_profile_summary, youtube_schedule  # noqa: F401
+    from app.models import reindex_checkpoint, job_match, match_run, student_profile_document, student_stats  # noqa: F401
+    from app.database.db import Base
+    return Base
+
+
+def make_engine(database_url: str):
+    if database_url.startswith("sqlite"):
+        return create_engine(database_url, connect_args={"check_same_thread": False})
+    return create_engine(database_url, pool_size=5, max_overflow=5)
+
+
+def reset_schema(engine):
+    Base = import_models()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+class QueryCounter:
+    """Counts statements sent to the database while attached to an engine."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+@contextmanager
+def session_for(engine):
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def _run_async_case(case, database_url: str, fixture: Dict[str, Any]):
+    """Run an ``async def`` case on an AsyncSession; statements are counted on the engine's sync core.
+
+    Work the route hands to the threadpool opens ``session_scope`` sessions,
+    so the app's ``SessionLocal`` is pointed at the same database and its
+    statements are counted too.
+    """
+    from app.database.async_db import make_async_engine
+    from app.database.db import SessionLocal
+    engine = make_async_engine(database_url)
+    sync_engine = make_engine(database_url)
+    SessionLocal.configure(bind=sync_engine)
+    try:
+        with QueryCounter(engine.sync_engine) as counter, QueryCounter(sync_engine) as threaded:
+            async with async_sessionmaker(engine, expire_on_commit=False, autoflush=False)() as db:
+                started = time.perf_counter()
+                result = await case(db, fixture)
+                wall = time.perf_counter() - started
+    finally:
+        await engine.dispose()
+        sync_engine.dispose()
+    return result, wall, counter.count + threaded.count
+
+
+def run_case(case_name: str, database_url: str, fixture: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one benchmark case and return its metrics.
+
+    Meant to be executed in a fresh process so ``peak_rss_mb`` reflects the
+    case alone rather than everything that ran before it.
+    """
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    fake = install_fake_llm()
+    import_models()
+    from benchmarks.cases import CASES, preload
+    preload()
+
+    case = CASES[case_name]
+    fake.reset()
+    rss_before = peak_rss_mb()
+    if asyncio.iscoroutinefunction(case):
+        result, wall, queries = asyncio.run(_run_async_case(case, database_url, fixture))
+    else:
+        engine = make_engine(database_url)
+        with session_for(engine) as db, QueryCounter(engine) as counter:
+            started = time.perf_counter()
+            result = case(db, fixture)
+            wall = time.perf_counter() - started
+        engine.dispose()
+        queries = counter.count
+    return {
+        "case": case_name,
+        "wall_seconds": round(wall, 4),
+        "queries": queries,
+        "model_calls": fake.model.calls,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_growth_mb": round(peak_rss_mb() - rss_before, 1),
+        "result_size": result,
+    }
+
+
+def baseline_path(backend: str, scale: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{backend}-{scale}.json")
+
+
+def save_baseline(path: str, report: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], time_tolerance: float = 0.25,
+                        memory_tolerance: float = 0.25) -> list:
+    """Return human readable regressions of ``report`` against ``baseline``.
+
+    Query and model-call counts are deterministic for a given roster, so any
+    increase is a regression; wall time and memory get a tolerance band.
+    """
+    regressions = []
+    baseline_cases = {c["case"]: c for c in baseline.get("cases", [])}
+    for current in report.get("cases", []):
+        previous = baseline_cases.get(current["case"])
+        if not previous:
+            continue
+        name = current["case"]
+        if current["queries"] > previous["queries"]:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+        if current["model_calls"] > previous["model_calls"]:
+            regressions.append(f"{name}: model calls {previous['model_calls']} -> {current['model_calls']}")
+        if current["wall_seconds"] > previous["wall_seconds"] * (1 + time_tolerance):
+            regressions.append(f"{name}: wall time {previous['wall_seconds']}s -> {current['wall_seconds']}s")
+        if current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + memory_tolerance):
+            regressions.append(f"{name}: peak RSS {previous['peak_rss_mb']}MB -> {current['peak_rss_mb']}MB")
+    return regressions
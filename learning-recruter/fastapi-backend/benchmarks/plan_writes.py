@@ -0,0 +1,143 @@
+"""Bytes written per plan mutation: whole-document rewrites vs in-place JSON sets.
+
+    PYTHONPATH=. python -m benchmarks.plan_writes --students 500
+    PYTHONPATH=. python -m benchmarks.plan_writes --database-url postgresql://...   # adds WAL bytes
+
+Each student's active month is marked completed (two month fields) and a
+key is added to the detail of their current day, once by assigning the
+whole document as the routes used to and once through
+``app.services.plan_mutations``. Both ways must leave every mutated
+student's profile document stale and their roster snapshot row dirty; the
+command exits non-zero when a student is missed.
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import text
+
+from benchmarks.harness import QueryCounter, make_engine, reset_schema, session_for
+from benchmarks.synthetic import generate_roster
+
+
+def _wal_lsn(db):
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    return db.execute(text("SELECT pg_current_wal_lsn()")).scalar()
+
+
+def _wal_bytes(db, start) -> int:
+    if start is None:
+        return 0
+    return int(db.execute(text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), :start)"), {"start": start}).scalar())
+
+
+def _size(value) -> int:
+    return len(json.dumps(value, default=str).encode())
+
+
+def _active_month(document) -> int:
+    for i, month in enumerate(document.get("months", []), start=1):
+        if month.get("status") == "active":
+            return i
+    return 0
+
+
+def rewrite(db, plan, day) -> int:
+    """The old way: build the new document and assign it, so the whole value is sent."""
+    document = copy.deepcopy(plan.plan)
+    month_index = _active_month(document)
+    document["months"][month_index - 1].update(status="completed", completed_at="2026-01-01T00:00:00")
+    plan.plan = document
+    detail = {**(day.detail or {}), "review_note": "Revisit the examples"}
+    day.detail = detail
+    return _size(document) + _size(detail)
+
+
+def in_place(db, plan, day) -> int:
+    from app.services.plan_mutations import set_day_detail, set_month_fields
+    month_index = _active_month(plan.plan)
+    written = set_month_fields(db, plan, month_index, status="completed", completed_at="2026-01-01T00:00:00")
+    return written.bytes_written + set_day_detail(db, day, "review_note", "Revisit the examples").bytes_written
+
+
+def measure(engine, mutate: Callable) -> Dict[str, float]:
+    from app.models.learning_plan import LearningPlan, LearningPlanDay
+    from app.models.student_profile_document import StudentProfileDocument
+    from app.models.user import User
+    from app.services.roster_snapshot import roster_snapshot
+    with session_for(engine) as db:
+        # Give every current day a generated detail document, as started days have
+        for day in db.query(LearningPlanDay).join(User, User.id == LearningPlanDay.user_id).filter(
+            LearningPlanDay.month_index == User.current_month_index, LearningPlanDay.day_number == User.current_day
+        ).all():
+            day.detail = {"overview": f"Study session focused on {day.concept}", "blocks": [
+                {"title": "Core Learning", "minutes": 60, "steps": ["Study the material", "Take notes", "Practice"]},
+            ] * 4}
+        db.commit()
+        pairs = db.query(LearningPlan, LearningPlanDay).join(User, User.id == LearningPlan.user_id).join(
+            LearningPlanDay, LearningPlanDay.plan_id == LearningPlan.id
+        ).filter(
+            LearningPlanDay.month_index == User.current_month_index, LearningPlanDay.day_number == User.current_day
+        ).all()
+        pairs = [(plan, day) for plan, day in pairs if _active_month(plan.plan)]
+        # Forget the marks the setup above left, so only the mutations below set them
+        db.query(StudentProfileDocument).update({"stale": False})
+        db.commit()
+        roster_snapshot.invalidate()
+        start = _wal_lsn(db)
+        written = 0
+        started = time.perf_counter()
+        with QueryCounter(engine) as counter:
+            for plan, day in pairs:
+                written += mutate(db, plan, day)
+                db.commit()
+        seconds = time.perf_counter() - started
+        wal = _wal_bytes(db, start)
+        user_ids = {plan.user_id for plan, _ in pairs}
+        stale = {user_id for (user_id,) in db.query(StudentProfileDocument.user_id).filter(
+            StudentProfileDocument.user_id.in_(user_ids), StudentProfileDocument.stale.is_(True))}
+        missed = len(user_ids - (stale & roster_snapshot._dirty))
+    return {"mutations": len(pairs), "bytes": written, "wal": wal, "statements": counter.count, "seconds": seconds,
+            "missed": missed}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.plan_writes", description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--database-url", default=None, help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'eduai_plan_writes.db')}"
+
+    print(f"{'mode':<9} {'mutations':>9} {'bytes/mutation':>15} {'WAL bytes/mutation':>19} {'statements':>10} "
+          f"{'s':>7} {'unmarked':>8}")
+    failures = []
+    for name, mutate in (("rewrite", rewrite), ("in-place", in_place)):
+        # Fresh roster per mode so both start from the same documents
+        engine = make_engine(database_url)
+        reset_schema(engine)
+        with session_for(engine) as db:
+            generate_roster(db, args.students, seed=args.seed, jobs=0, with_vectors=False)
+        m = measure(engine, mutate)
+        engine.dispose()
+        n = max(m["mutations"], 1)
+        print(f"{name:<9} {m['mutations']:>9} {m['bytes'] / n:>15.0f} {m['wal'] / n:>19.0f} "
+              f"{m['statements']:>10} {m['seconds']:>7.2f} {m['missed']:>8}")
+        if m["missed"]:
+            failures.append(f"{name}: {m['missed']} students not marked stale and dirty")
+    if failures:
+        print("\nFailures:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
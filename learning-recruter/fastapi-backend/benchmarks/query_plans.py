@@ -0,0 +1,167 @@
+"""Query-plan regression check: EXPLAIN the critical queries and fail on large sequential scans.
+
+    PYTHONPATH=. python -m benchmarks.query_plans --database-url postgresql://localhost/eduai_bench --scale 10k
+    PYTHONPATH=. python -m benchmarks.query_plans --scale 1k --reuse   # SQLite, EXPLAIN QUERY PLAN
+
+Seeds (or reuses) the synthetic roster, runs ``EXPLAIN (FORMAT JSON)`` on
+every query in ``QUERIES`` and exits non-zero when a plan reads a table
+with a sequential scan estimated above ``--max-seq-rows`` rows. On SQLite
+the estimate is the scanned table's row count.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from datetime import datetime
+
+from sqlalchemy import and_, desc, or_, select, text
+
+from benchmarks.harness import import_models, make_engine, reset_schema, session_for
+from benchmarks.synthetic import generate_roster, parse_scale
+
+import_models()
+
+from app.models.email_application import EmailApplication  # noqa: E402
+from app.models.job import Job  # noqa: E402
+from app.models.job_match import JobMatch  # noqa: E402
+from app.models.learning_path import DayProgress, LearningPath  # noqa: E402
+from app.models.learning_plan import LearningPlan, LearningPlanDay  # noqa: E402
+from app.models.quiz import Quiz, QuizSubmission  # noqa: E402
+from app.models.shortlist import Shortlist  # noqa: E402
+from app.models.student_stats import StudentStats  # noqa: E402
+from app.models.youtube_schedule import YouTubeSchedule  # noqa: E402
+
+STUDENT_ID = 2
+PLAN_ID = 2
+# Keyset position of a deep page: rows strictly before (CURSOR_AT, CURSOR_ID), newest first
+CURSOR_AT = datetime(2026, 1, 1)
+CURSOR_ID = 1000
+
+
+def _after_cursor(sort_column, id_column):
+    return or_(sort_column < CURSOR_AT, and_(sort_column == CURSOR_AT, id_column < CURSOR_ID))
+
+
+# name -> statement builder taking the seeding fixture; the filters mirror the routes that run them
+QUERIES: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "submissions_for_quiz": lambda f: select(QuizSubmission).where(
+        QuizSubmission.user_id == STUDENT_ID, QuizSubmission.quiz_id == 1),
+    "previous_day_passed": lambda f: select(QuizSubmission).where(
+        QuizSubmission.user_id == STUDENT_ID, QuizSubmission.plan_id == PLAN_ID, QuizSubmission.month_index == 1,
+        QuizSubmission.day == 3, QuizSubmission.passed == 1).order_by(QuizSubmission.created_at.desc()).limit(1),
+    "quiz_for_day": lambda f: select(Quiz).where(
+        Quiz.plan_id == PLAN_ID, Quiz.month_index == 1, Quiz.day == 3, Quiz.user_id == STUDENT_ID),
+    "plan_for_user": lambda f: select(LearningPlan).where(LearningPlan.user_id == STUDENT_ID),
+    "plan_month_days": lambda f: select(LearningPlanDay).where(
+        LearningPlanDay.plan_id == PLAN_ID, LearningPlanDay.month_index == 1),
+    "learning_path_month": lambda f: select(LearningPath).where(
+        LearningPath.plan_id == PLAN_ID, LearningPath.global_month_index == 1),
+    "day_progress": lambda f: select(DayProgress).where(
+        DayProgress.user_id == STUDENT_ID, DayProgress.plan_id == PLAN_ID, DayProgress.month_index == 1,
+        DayProgress.day_number == 3),
+    "recruiter_jobs": lambda f: select(Job).where(Job.recruiter_id == f["recruiter_id"]),
+    "recruiter_shortlist": lambda f: select(Shortlist).where(
+        Shortlist.recruiter_id == f["recruiter_id"], Shortlist.job_id == f["job_ids"][0]),
+    "job_matches_ranked": lambda f: select(JobMatch).where(JobMatch.job_id == f["job_ids"][0]).order_by(JobMatch.rank),
+    "youtube_schedules": lambda f: select(YouTubeSchedule).where(YouTubeSchedule.user_id == STUDENT_ID),
+    "top_students_by_progress": lambda f: select(StudentStats).order_by(desc(StudentStats.learning_progress)).limit(20),
+    "quiz_history_page": lambda f: select(QuizSubmission).where(
+        QuizSubmission.user_id == STUDENT_ID, _after_cursor(QuizSubmission.created_at, QuizSubmission.id)
+    ).order_by(QuizSubmission.created_at.desc(), QuizSubmission.id.desc()).limit(21),
+    "email_applications_page": lambda f: select(EmailApplication).where(
+        EmailApplication.recruiter_id == f["recruiter_id"], _after_cursor(EmailApplication.received_at, EmailApplication.id)
+    ).order_by(EmailApplication.received_at.desc(), EmailApplication.id.desc()).limit(11),
+    "shortlist_page": lambda f: select(Shortlist).where(
+        Shortlist.recruiter_id == f["recruiter_id"], Shortlist.job_id == f["job_ids"][0],
+        _after_cursor(Shortlist.created_at, Shortlist.id)
+    ).order_by(Shortlist.created_at.desc(), Shortlist.id.desc()).limit(21),
+}
+
+
+def _execute_explain(db, prefix: str, statement):
+    compiled = statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+    return db.connection().exec_driver_sql(f"{prefix} {compiled.string}", params).fetchall()
+
+
+def _pg_nodes(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _pg_nodes(child)
+
+
+def explain(db, statement) -> Tuple[List[Tuple[str, int]], str]:
+    """Sequentially scanned ``(table, estimated rows)`` of a statement's plan, plus the plan as text."""
+    if db.get_bind().dialect.name == "postgresql":
+        raw = _execute_explain(db, "EXPLAIN (FORMAT JSON)", statement)[0][0]
+        plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+        scans = [(n.get("Relation Name", "?"), int(n.get("Plan Rows", 0)))
+                 for n in _pg_nodes(plan) if n.get("Node Type") == "Seq Scan"]
+        return scans, json.dumps(plan)
+    # SQLite: "SCAN <table>" is a full scan, "SEARCH <table> USING INDEX" is not
+    rows = _execute_explain(db, "EXPLAIN QUERY PLAN", statement)
+    scans = []
+    for row in rows:
+        detail = row[-1]
+        if detail.startswith("SCAN ") and "USING" not in detail:
+            table = detail.split()[1]
+            scans.append((table, int(db.execute(text(f'SELECT COUNT(*) FROM "{table}"')).scalar())))
+    return scans, "; ".join(row[-1] for row in rows)
+
+
+def check(db, fixture: Dict[str, Any], max_seq_rows: int, verbose: bool = False) -> List[str]:
+    failures = []
+    for name, build in QUERIES.items():
+        scans, plan = explain(db, build(fixture))
+        large = [(table, rows) for table, rows in scans if rows > max_seq_rows]
+        status = "FAIL" if large else "ok"
+        found = ", ".join(f"seq scan {t} ~{r} rows" for t, r in scans) or "no sequential scans"
+        print(f"{name:<26} {status:<5} {found}")
+        if verbose:
+            print(f"    {plan[:400]}")
+        failures.extend(f"{name}: sequential scan on {table} (~{rows} rows)" for table, rows in large)
+    return failures
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.query_plans", description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", default="1k", help="1k, 10k, 100k or an explicit student count")
+    parser.add_argument("--database-url", default=None, help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--max-seq-rows", type=int, default=1000,
+                        help="Fail when a sequential scan is estimated to read more rows than this")
+    parser.add_argument("--reuse", action="store_true", help="Reuse an already seeded database")
+    parser.add_argument("--verbose", action="store_true", help="Print each plan")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or \
+        f"sqlite:///{os.path.join(tempfile.gettempdir(), f'eduai_query_plans_{args.scale}.db')}"
+    engine = make_engine(database_url)
+    fixture = {"recruiter_id": 1, "job_ids": [1]}
+    if not args.reuse:
+        print(f"Seeding {parse_scale(args.scale)} students into {database_url} ...")
+        reset_schema(engine)
+        with session_for(engine) as db:
+            fixture = generate_roster(db, parse_scale(args.scale), with_vectors=False)
+    with session_for(engine) as db:
+        # Fresh statistics so estimates reflect the seeded roster
+        db.execute(text("ANALYZE"))
+        db.commit()
+        failures = check(db, fixture, args.max_seq_rows, args.verbose)
+    engine.dispose()
+
+    if failures:
+        print("\nQuery plan regressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print(f"\nNo sequential scans above {args.max_seq_rows} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Quiz progress micro-benchmark: per-day submission scans vs set lookups, plan reads per quiz vs per plan.
+
+    PYTHONPATH=. python -m benchmarks.quiz_progress
+    PYTHONPATH=. python -m benchmarks.quiz_progress --months 12 --days 30 --submissions 1000 --repeat 50
+
+Seeds one student with a plan of ``--months`` x ``--days`` day rows, a quiz
+per day and ``--submissions`` submissions, then times both the month
+progress loop of ``GET /quiz/progress`` and ``GET /available-quizzes`` the
+way the routes used to run them and through ``app.services.quiz_progress``.
+The two must return the same response; the command exits non-zero if not.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.harness import QueryCounter, import_models, make_engine, reset_schema, session_for
+
+
+def legacy_month_progress(months: List[Dict[str, Any]], submissions) -> Tuple[List[Dict[str, Any]], float]:
+    """The old loop: scans every submission for every day of every month."""
+    month_progress = []
+    total_days_completed = total_days = 0
+    for i, month in enumerate(months):
+        month_index = i + 1
+        days = month.get("days", [])
+        month_total_days = len(days)
+        total_days += month_total_days
+        month_completed_days = 0
+        for j, day in enumerate(days):
+            day_num = j + 1
+            day_submission = next(
+                (s for s in submissions if s.month_index == month_index and s.day == day_num and s.passed), None)
+            if day_submission:
+                month_completed_days += 1
+                total_days_completed += 1
+        if month_completed_days == 0:
+            status = "not_started"
+        elif month_completed_days == month_total_days:
+            status = "completed"
+        else:
+            status = "in_progress"
+        month_progress.append({
+            "index": month_index, "title": month.get("title", f"Month {month_index}"), "status": status,
+            "days_completed": month_completed_days, "total_days": month_total_days,
+            "progress_percentage": (month_completed_days / max(month_total_days, 1)) * 100})
+    learning_progress = (total_days_completed / total_days) * 100 if total_days > 0 else 0
+    return month_progress, learning_progress
+
+
+def legacy_available_quizzes(db, user_id: int) -> Dict[str, Any]:
+    """The old route body: a plan read, a day-row read and a submission query per quiz."""
+    from app.models.learning_plan import LearningPlan
+    from app.models.quiz import Quiz, QuizSubmission
+    from app.services.plan_days import load_plan
+    quizzes = db.query(Quiz).filter(Quiz.user_id == user_id).order_by(Quiz.created_at.desc()).all()
+    quiz_list = []
+    for quiz in quizzes:
+        plan = db.query(LearningPlan).filter(LearningPlan.id == quiz.plan_id).first()
+        if plan and plan.plan and "months" in plan.plan:
+            months = load_plan(db, plan, [quiz.month_index], detail=False)["months"]
+            if 1 <= quiz.month_index <= len(months):
+                month = months[quiz.month_index - 1]
+                days = month.get("days", [])
+                day_concept = days[quiz.day - 1].get("concept", f"Day {quiz.day}") if 1 <= quiz.day <= len(days) \
+                    else f"Day {quiz.day}"
+                submission = db.query(QuizSubmission).filter(
+                    QuizSubmission.quiz_id == quiz.id, QuizSubmission.passed == 1).order_by(QuizSubmission.id).first()
+                quiz_list.append({
+                    "id": quiz.id, "title": quiz.title, "plan_id": quiz.plan_id, "plan_title": plan.title,
+                    "month_index": quiz.month_index, "month_title": month.get("title", f"Month {quiz.month_index}"),
+                    "day": quiz.day, "day_concept": day_concept, "required_score": quiz.required_score,
+                    "total_questions": len(quiz.questions), "completed": submission is not None,
+                    "best_score": submission.score if submission else None,
+                    "created_at": quiz.created_at.isoformat(),
+                    "url": f"/learning-plans/{quiz.plan_id}/month/{quiz.month_index}/day/{quiz.day}/quiz"})
+    return {"quizzes": quiz_list, "total_quizzes": len(quiz_list),
+            "completed_quizzes": len([q for q in quiz_list if q["completed"]]),
+            "pending_quizzes": len([q for q in quiz_list if not q["completed"]])}
+
+
+def seed(db, months: int, days: int, submissions: int, seed_value: int) -> int:
+    from app.models.learning_plan import LearningPlan, LearningPlanDay
+    from app.models.quiz import Quiz, QuizSubmission
+    from app.models.user import User
+    rng = random.Random(seed_value)
+    user = User(email="progress.bench@example.com", google_name="Progress Bench", current_month_index=1, current_day=1)
+    db.add(user)
+    db.flush()
+    plan = LearningPlan(user_id=user.id, title="Bench Plan", total_years=1,
+                        plan={"months": [{"index": m, "title": f"Month {m}", "status": "active"}
+                                         for m in range(1, months + 1)]})
+    db.add(plan)
+    db.flush()
+    started = datetime(2026, 1, 1)
+    quizzes = []
+    for m in range(1, months + 1):
+        for d in range(1, days + 1):
+            db.add(LearningPlanDay(plan_id=plan.id, user_id=user.id, month_index=m, day_number=d,
+                                   concept=f"Concept {m}.{d}", status="active"))
+            quiz = Quiz(user_id=user.id, plan_id=plan.id, month_index=m, day=d, title=f"Quiz {m}.{d}",
+                        questions=[{"question": "q", "options": ["a", "b"], "correct_index": 0}] * 15,
+                        created_at=started + timedelta(days=(m - 1) * days + d))
+            db.add(quiz)
+            quizzes.append(quiz)
+    db.flush()
+    for i in range(submissions):
+        quiz = rng.choice(quizzes)
+        score = rng.randint(30, 100)
+        db.add(QuizSubmission(user_id=user.id, plan_id=plan.id, month_index=quiz.month_index, day=quiz.day,
+                              quiz_id=quiz.id, answers=[], question_results=[], score=score,
+                              passed=int(score >= 70), created_at=started + timedelta(minutes=i)))
+    db.commit()
+    return user.id
+
+
+def timed(fn: Callable[[], Any], repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat * 1000
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.quiz_progress", description=__doc__.splitlines()[0])
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--submissions", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=None, help="SQLAlchemy URL (default: temporary SQLite file)")
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+    import_models()
+    from app.models.learning_plan import LearningPlan
+    from app.models.quiz import QuizSubmission
+    from app.services.plan_days import load_plan
+    from app.models.user import User
+    from app.services.quiz_progress import available_quizzes, month_progress, passed_days, quiz_progress
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'eduai_quiz_progress.db')}"
+    engine = make_engine(database_url)
+    reset_schema(engine)
+    failures = []
+    with session_for(engine) as db:
+        user_id = seed(db, args.months, args.days, args.submissions, args.seed)
+        plan = db.query(LearningPlan).filter(LearningPlan.user_id == user_id).first()
+        months = load_plan(db, plan, detail=False)["months"]
+        submissions = db.query(QuizSubmission).filter(QuizSubmission.user_id == user_id).all()
+
+        print(f"\n{args.months} months x {args.days} days, {len(submissions)} submissions, {args.repeat} repeats")
+        print(f"{'step':<32} {'ms/call':>9} {'queries':>8}")
+        old, old_ms = timed(lambda: legacy_month_progress(months, submissions), args.repeat)
+        new, new_ms = timed(lambda: month_progress(months, passed_days(submissions)), args.repeat)
+        print(f"{'month progress (scan per day)':<32} {old_ms:>9.2f} {'-':>8}")
+        print(f"{'month progress (set lookups)':<32} {new_ms:>9.2f} {'-':>8}")
+        if old != new:
+            failures.append("month progress differs from the per-day scan")
+        user = db.query(User).filter(User.id == user_id).first()
+        with QueryCounter(engine) as counter:
+            body = quiz_progress(db, user)
+        _, ms = timed(lambda: quiz_progress(db, user), args.repeat)
+        print(f"{'quiz progress (whole body)':<32} {ms:>9.2f} {counter.count:>8}")
+        if (body["month_progress"], body["learning_progress_percentage"]) != old:
+            failures.append("quiz progress body differs from the per-day scan")
+
+        for label, fn in (("available quizzes (per quiz)", legacy_available_quizzes),
+                          ("available quizzes (per plan)", available_quizzes)):
+            with QueryCounter(engine) as counter:
+                fn(db, user_id)
+            result, ms = timed(lambda: fn(db, user_id), args.repeat)
+            print(f"{label:<32} {ms:>9.2f} {counter.count:>8}")
+            if label.endswith("(per quiz)"):
+                expected = result
+            elif result != expected:
+                failures.append("available quizzes differ from the per-quiz version")
+    engine.dispose()
+
+    if failures:
+        print("\nMismatches:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nSame responses; speedup of the progress loop: "
+          f"{old_ms / max(new_ms, 1e-9):.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""Read-replica routing check against a local primary + replica pair of SQLite files.
+
+    PYTHONPATH=. python -m benchmarks.replica_routing --students 200
+
+Seeds a primary database and copies it to a second file that stands in for
+the replica (a copy that never catches up, i.e. an infinitely lagging
+replica). Read-only endpoints then run on ``RoutingSession`` and the
+statements each database received are counted. Before that, one
+student's profile document is deleted so only the primary learns of its
+rebuild: two routing sessions read it and must both get the same document
+back. A read-your-writes scenario checks that a session pins itself to the
+primary after a write; the command exits non-zero when it reads stale data,
+misses a rebuilt document or keeps using the replica.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import warnings
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.fake_llm import install_fake_llm
+from benchmarks.harness import QueryCounter, import_models, make_engine, reset_schema, session_for
+from benchmarks.synthetic import generate_roster
+
+# Recruiter 1 seeds first, so the first student is user 2
+STUDENT_ID = 2
+# Student whose profile document neither copy has at the start
+REBUILT_STUDENT_ID = 3
+# Endpoints served from get_read_db
+READ_CASES = ("search_students", "roster_dashboard", "student_profiles", "shortlisted", "get_job_matches")
+
+
+def _routing_session(primary, replica):
+    from app.database.routing import RoutingSession
+    return sessionmaker(autocommit=False, autoflush=False, bind=primary, class_=RoutingSession, replica=replica)()
+
+
+def run_read_cases(primary, replica, fixture) -> List[Dict]:
+    from benchmarks.cases import CASES
+    results = []
+    for name in READ_CASES:
+        db = _routing_session(primary, replica)
+        with QueryCounter(primary) as on_primary, QueryCounter(replica) as on_replica:
+            try:
+                CASES[name](db, fixture)
+            finally:
+                db.close()
+        results.append({"case": name, "replica": on_replica.count, "primary": on_primary.count,
+                        "pinned": db.pinned_to_primary})
+    return results
+
+
+def rebuild_on_lagging_replica(primary, replica, student_id: int) -> List[str]:
+    """Two requests read a document neither copy has: the first rebuilds it, the second must reuse it."""
+    from app.services.profile_documents import get_profile_document
+    failures = []
+    versions = []
+    for request in ("A", "B"):
+        db = _routing_session(primary, replica)
+        try:
+            document = get_profile_document(db, student_id)
+        except Exception as e:
+            failures.append(f"request {request} failed: {e!r}"[:300])
+            continue
+        finally:
+            db.close()
+        if document is None:
+            failures.append(f"request {request} got no document (the replica does not have it yet)")
+        else:
+            versions.append(document["version"])
+    if len(versions) == 2 and versions[0] != versions[1]:
+        failures.append(f"document rebuilt by both requests (versions {versions})")
+    return failures
+
+
+def read_your_writes(primary, replica, student_id: int) -> List[str]:
+    from app.models.user import User
+    failures = []
+    db = _routing_session(primary, replica)
+    try:
+        with QueryCounter(primary) as on_primary, QueryCounter(replica) as on_replica:
+            user = db.query(User).filter(User.id == student_id).one()
+            if on_replica.count != 1 or on_primary.count:
+                failures.append("initial read did not go to the replica")
+            user.google_name = "Renamed Student"
+            db.commit()
+            if not db.pinned_to_primary:
+                failures.append("session was not pinned to the primary after a write")
+            before = on_replica.count
+            name = db.query(User.google_name).filter(User.id == student_id).scalar()
+            if on_replica.count != before:
+                failures.append("read after the write went to the replica")
+            if name != "Renamed Student":
+                failures.append(f"read after the write returned stale data: {name!r}")
+    finally:
+        db.close()
+
+    # A new request starts unpinned again and sees the (lagging) replica
+    db = _routing_session(primary, replica)
+    try:
+        stale = db.query(User.google_name).filter(User.id == student_id).scalar()
+        if stale == "Renamed Student":
+            failures.append("new session read the primary instead of the replica")
+    finally:
+        db.close()
+    return failures
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.replica_routing", description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    install_fake_llm()
+    import_models()
+
+    primary_path = os.path.join(tempfile.gettempdir(), "eduai_replica_primary.db")
+    replica_path = os.path.join(tempfile.gettempdir(), "eduai_replica_replica.db")
+    primary = make_engine(f"sqlite:///{primary_path}")
+    print(f"Seeding {args.students} students into {primary_path} ...")
+    reset_schema(primary)
+    with session_for(primary) as db:
+        fixture = generate_roster(db, args.students, seed=args.seed, jobs=3)
+    with primary.begin() as connection:
+        connection.execute(text("DELETE FROM student_profile_documents WHERE user_id = :id"), {"id": REBUILT_STUDENT_ID})
+    primary.dispose()
+    shutil.copyfile(primary_path, replica_path)
+    primary = make_engine(f"sqlite:///{primary_path}")
+    replica = make_engine(f"sqlite:///{replica_path}")
+
+    failures = rebuild_on_lagging_replica(primary, replica, REBUILT_STUDENT_ID)
+    print(f"\n{'case':<20} {'replica stmts':>13} {'primary stmts':>13} {'pinned':>7}")
+    for row in run_read_cases(primary, replica, fixture):
+        print(f"{row['case']:<20} {row['replica']:>13} {row['primary']:>13} {str(row['pinned']):>7}")
+
+    failures += read_your_writes(primary, replica, STUDENT_ID)
+    primary.dispose()
+    replica.dispose()
+    if failures:
+        print("\nRouting failures:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nRead-your-writes: reads pinned to the primary after the first write")
+    print("Profile documents rebuilt once on the primary and served to a session reading a lagging replica")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Pool usage of background helpers: ``next(get_db())`` vs ``session_scope``.
+
+    PYTHONPATH=. python -m benchmarks.session_leaks --calls 200 --threads 8
+
+Replays the user lookup the Google helpers do (``_get_session_for_user``)
+from a pool of worker threads against a small pool, once with the old
+``db = next(get_db())`` pattern and once inside ``session_scope``. The old
+pattern leaves each connection checked out in an open transaction until
+the garbage collector happens to reclaim the session, so threads queue on
+the pool and time out. The run also holds one scope open past a short
+threshold and checks that the leak detector names it. Exits non-zero when
+the scoped run leaks or the detector misses the held scope.
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine
+
+from benchmarks.harness import import_models, reset_schema, session_for
+from benchmarks.synthetic import generate_roster
+
+FIRST_STUDENT = 2
+
+
+def _old_lookup(user_id: int):
+    from app.database.db import get_db
+    from app.models.user import User
+    db = next(get_db())
+    user = db.query(User).filter(User.id == user_id).first()
+    return user.email
+
+
+def _scoped_lookup(user_id: int):
+    from app.database.session_scope import session_scope
+    from app.models.user import User
+    with session_scope("bench.lookup") as db:
+        user = db.query(User).filter(User.id == user_id).first()
+    return user.email
+
+
+def run(engine, lookup: Callable[[int], str], calls: int, threads: int, students: int) -> Dict[str, float]:
+    from app.database.session_scope import pool_stats
+    errors = 0
+
+    def call(i: int):
+        nonlocal errors
+        try:
+            lookup(FIRST_STUDENT + i % students)
+        except Exception:
+            errors += 1
+
+    before = pool_stats(engine)["checked_out"]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(call, range(calls)))
+    seconds = time.perf_counter() - started
+    held = pool_stats(engine)["checked_out"] - before
+    gc.collect()  # reclaim whatever the old pattern left behind before the next run
+    return {"seconds": seconds, "errors": errors, "held_after": held}
+
+
+def check_detector(threshold: float) -> List[str]:
+    from app.database.session_scope import report_leaks, session_scope
+    from app.models.user import User
+    release = threading.Event()
+
+    def hold():
+        with session_scope("bench.held_scope") as db:
+            db.query(User).first()
+            release.wait()
+
+    holder = threading.Thread(target=hold, name="bench-holder")
+    holder.start()
+    time.sleep(threshold * 2)
+    leaks = report_leaks(threshold)
+    release.set()
+    holder.join()
+    labels = {leak["label"] for leak in leaks}
+    failures = []
+    if "bench.held_scope" not in labels:
+        failures.append("detector did not report the held session scope")
+    if not any("bench.held_scope" in label for label in labels if label != "bench.held_scope"):
+        failures.append("detector did not tie the held connection to its scope")
+    if report_leaks(threshold):
+        failures.append("detector reported a leak after the scope closed")
+    return failures
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.session_leaks", description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--pool-timeout", type=float, default=0.5)
+    parser.add_argument("--threshold", type=float, default=0.3, help="Leak threshold in seconds for the detector check")
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+    import_models()
+
+    from app.database.db import SessionLocal
+    from app.database.session_scope import instrument_pool
+
+    path = os.path.join(tempfile.gettempdir(), "eduai_session_leaks.db")
+    engine = create_engine(f"sqlite:///{path}", pool_size=args.pool_size, max_overflow=0,
+                           pool_timeout=args.pool_timeout, connect_args={"check_same_thread": False})
+    reset_schema(engine)
+    with session_for(engine) as db:
+        generate_roster(db, args.students, jobs=0, with_vectors=False)
+    # Point the app's session factory (and so get_db and session_scope) at the bench pool
+    SessionLocal.configure(bind=engine)
+    instrument_pool(engine, "bench")
+
+    print(f"\n{'pattern':<16} {'seconds':>8} {'timeouts':>9} {'held after':>11}  (pool {args.pool_size}, "
+          f"{args.threads} threads, {args.calls} calls)")
+    results = {}
+    for name, lookup in (("next(get_db())", _old_lookup), ("session_scope", _scoped_lookup)):
+        results[name] = run(engine, lookup, args.calls, args.threads, args.students)
+        r = results[name]
+        print(f"{name:<16} {r['seconds']:>8.2f} {r['errors']:>9} {r['held_after']:>11}")
+
+    failures = check_detector(args.threshold)
+    scoped = results["session_scope"]
+    if scoped["errors"] or scoped["held_after"]:
+        failures.append("session_scope run timed out or left connections checked out")
+    engine.dispose()
+    if failures:
+        print("\nFailures:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\nLeak detector flagged the held scope and its connection")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
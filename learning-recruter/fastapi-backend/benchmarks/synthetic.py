@@ -0,0 +1,229 @@
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.onboarding import Onboarding
+from app.models.learning_plan import LearningPlan, LearningPlanDay
+from app.models.quiz import Quiz, QuizSubmission
+from app.models.job import Job
+from app.models.shortlist import Shortlist
+from app.models.candidate_vector import CandidateVector
+from app.core.embeddings import simple_text_embedding
+from app.core.vector_codec import encode_vector
+from app.services.profile_documents import refresh_profile_documents
+from app.services.student_stats import rebuild_student_stats
+
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "React", "Node.js", "SQL", "PostgreSQL", "Docker",
+    "AWS", "Git", "Java", "C++", "Go", "Rust", "Pandas", "NumPy", "Machine Learning",
+    "Deep Learning", "TensorFlow", "PyTorch", "Data Visualization", "HTML", "CSS", "FastAPI",
+    "Django", "Flask", "Kubernetes", "Linux", "Statistics", "Communication",
+]
+CAREER_GOALS = [
+    "Software Engineer", "Data Scientist", "Machine Learning Engineer", "Frontend Developer",
+    "Backend Developer", "Full Stack Developer", "DevOps Engineer", "Data Analyst",
+    "Cloud Architect", "Mobile Developer",
+]
+GRADES = ["High School", "Undergraduate", "Graduate", "Working Professional"]
+TIME_COMMITMENTS = ["30 minutes", "1 hour", "2 hours", "3+ hours"]
+LANGUAGES = ["Python", "JavaScript", "TypeScript", "Java", "Go", "C++", "Rust"]
+JOB_TITLES = [
+    "Junior Python Developer", "Frontend Engineer (React)", "Data Analyst", "ML Engineer Intern",
+    "Backend Engineer (Node.js)", "Cloud Support Associate", "Full Stack Developer",
+    "Data Engineer", "DevOps Intern", "Software Engineer I",
+]
+
+BATCH_SIZE = 5_000
+
+
+def parse_scale(scale: str) -> int:
+    if scale in SCALES:
+        return SCALES[scale]
+    return int(scale)
+
+
+def _batched_insert(db: Session, model, rows: List[Dict[str, Any]]):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+def _build_plan(rng: random.Random, months_per_plan: int, completed_months: int):
+    """The plan JSON (months only) and its generated days as ``learning_plan_days`` values."""
+    months, days = [], []
+    for i in range(months_per_plan):
+        topics = rng.sample(SKILLS, 3)
+        if i < completed_months:
+            status = "completed"
+        elif i == completed_months:
+            status = "active"
+        else:
+            status = "locked"
+        month = {"index": i + 1, "title": f"Month {i + 1}: {topics[0]}", "topics": topics, "status": status}
+        # Only generated months have days, as in production plans
+        if status != "locked":
+            for d in range(1, 31):
+                completed = status == "completed" or d < 10
+                days.append({"month_index": i + 1, "day_number": d, "concept": f"{rng.choice(topics)} concept {d}",
+                             "completed": completed, "status": "completed" if completed else "locked"})
+            month["days_generated"] = True
+        months.append(month)
+    return {"months": months}, days
+
+
+def generate_roster(db: Session, students: int, seed: int = 42, months_per_plan: int = 6,
+                    quizzes_per_student: int = 5, jobs: int = 10, with_vectors: bool = True) -> Dict[str, Any]:
+    """Insert a synthetic recruiter, student roster and job set.
+
+    Returns the ids needed by the benchmark cases. Ids are assigned
+    explicitly so the whole roster can be written with bulk inserts.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    recruiter_id = 1
+    users = [{
+        "id": recruiter_id,
+        "email": "recruiter@bench.local",
+        "google_name": "Bench Recruiter",
+        "user_type": "recruiter",
+        "created_at": now,
+    }]
+    onboarding_rows, plan_rows, day_rows, quiz_rows, submission_rows, vector_rows = [], [], [], [], [], []
+
+    quiz_id = 0
+    submission_id = 0
+    for offset in range(students):
+        user_id = offset + 2
+        skills = rng.sample(SKILLS, rng.randint(2, 6))
+        goals = rng.sample(CAREER_GOALS, rng.randint(1, 2))
+        user = {
+            "id": user_id,
+            "email": f"student{user_id}@bench.local",
+            "google_name": f"Student {user_id}",
+            "user_type": "student",
+            "created_at": now - timedelta(days=rng.randint(0, 365)),
+            "current_month_index": 1,
+            "current_day": rng.randint(1, 30),
+        }
+        if rng.random() < 0.4:
+            user["linkedin_profile_data"] = json.dumps({"data": {"response_dict": {"name": user["google_name"], "email": user["email"]}}})
+        if rng.random() < 0.3:
+            repos = [{"name": f"repo{r}", "language": rng.choice(LANGUAGES), "owner": {"login": f"s{user_id}"}, "stargazers_count": rng.randint(0, 50)}
+                     for r in range(rng.randint(1, 6))]
+            user["github_profile_data"] = json.dumps(repos)
+        if rng.random() < 0.15:
+            user["twitter_profile_data"] = json.dumps({"data": {"username": f"s{user_id}", "name": user["google_name"]}})
+        users.append(user)
+
+        onboarding_rows.append({
+            "id": user_id,
+            "user_id": user_id,
+            "name": user["google_name"],
+            "grade": rng.choice(GRADES),
+            "career_goals": goals,
+            "current_skills": skills,
+            "time_commitment": rng.choice(TIME_COMMITMENTS),
+        })
+
+        completed_months = rng.randint(0, months_per_plan - 1)
+        plan, days = _build_plan(rng, months_per_plan, completed_months)
+        day_rows.extend({**day, "plan_id": user_id, "user_id": user_id, "updated_at": now} for day in days)
+        plan_rows.append({
+            "id": user_id,
+            "user_id": user_id,
+            "title": f"{goals[0]} Path",
+            "total_years": 1,
+            "plan": plan,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+        for q in range(rng.randint(0, quizzes_per_student * 2)):
+            quiz_id += 1
+            month_index = min(q // 30 + 1, months_per_plan)
+            day = q % 30 + 1
+            quiz_rows.append({
+                "id": quiz_id, "user_id": user_id, "plan_id": user_id, "month_index": month_index,
+                "day": day, "title": f"Day {day} Quiz", "questions": [], "required_score": 70, "created_at": now,
+            })
+            score = rng.randint(20, 100)
+            submission_id += 1
+            submission_rows.append({
+                "id": submission_id, "user_id": user_id, "plan_id": user_id, "month_index": month_index,
+                "day": day, "quiz_id": quiz_id, "answers": [], "question_results": [], "score": score,
+                "passed": 1 if score >= 70 else 0, "attempt_number": 1, "created_at": now,
+            })
+
+        summary = f"{user['google_name']} - Goals: {', '.join(goals)} - Skills: {', '.join(skills)}"
+        packed = encode_vector(simple_text_embedding(summary)) if with_vectors else {}
+        vector_rows.append({
+            "id": user_id,
+            "user_id": user_id,
+            "vector": None,
+            "vector_f32": packed.get("vector_f32"),
+            "vector_i8": packed.get("vector_i8"),
+            "vector_scale": packed.get("vector_scale"),
+            "summary_text": summary,
+            "skills_tags": skills,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    job_rows = []
+    for j in range(jobs):
+        requirements = rng.sample(SKILLS, 4)
+        job_rows.append({
+            "id": j + 1,
+            "recruiter_id": recruiter_id,
+            "title": JOB_TITLES[j % len(JOB_TITLES)],
+            "description": f"We are hiring a {JOB_TITLES[j % len(JOB_TITLES)]} with experience in {', '.join(requirements)}.",
+            "requirements": requirements,
+            "location": "Remote",
+            "status": "active",
+            "created_at": now,
+        })
+
+    # Every tenth student shortlisted for the first job
+    shortlist_rows = [{
+        "id": i + 1, "recruiter_id": recruiter_id, "job_id": 1, "student_id": user["id"],
+        "match_score": rng.randint(50, 100), "status": "shortlisted", "created_at": now, "source": "platform",
+    } for i, user in enumerate(users[1::10])] if jobs else []
+
+    _batched_insert(db, User, users)
+    _batched_insert(db, Onboarding, onboarding_rows)
+    _batched_insert(db, LearningPlan, plan_rows)
+    _batched_insert(db, LearningPlanDay, day_rows)
+    _batched_insert(db, Quiz, quiz_rows)
+    _batched_insert(db, QuizSubmission, submission_rows)
+    _batched_insert(db, CandidateVector, vector_rows)
+    _batched_insert(db, Job, job_rows)
+    _batched_insert(db, Shortlist, shortlist_rows)
+    _sync_sequences(db)
+    db.commit()
+    rebuild_student_stats(db)
+    refresh_profile_documents(db)
+
+    return {
+        "recruiter_id": recruiter_id,
+        "job_ids": [row["id"] for row in job_rows],
+        "students": students,
+        "quiz_submissions": len(submission_rows),
+    }
+
+
+def _sync_sequences(db: Session):
+    """Move Postgres id sequences past the explicitly assigned ids."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in ["users", "onboarding", "learning_plans", "quizzes", "quiz_submissions", "candidate_vectors", "jobs", "shortlists"]:
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))